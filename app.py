@@ -9,6 +9,7 @@ import argparse
 import logging
 import os
 import sys
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
@@ -69,6 +70,30 @@ def setup_logging() -> logging.Logger:
     return logging.getLogger("TaskHeroAI")
 
 
+def run_watch_mode(directory: str) -> None:
+    """Index a directory, then keep re-indexing changed files until interrupted."""
+    from mods.code.indexer import FileIndexer
+    from mods.code.watcher import IndexWatcher
+
+    logger = setup_logging()
+    logger.info(f"Starting watch mode for {directory}")
+
+    indexer = FileIndexer(directory)
+    print(f"{Fore.CYAN}Indexing {Style.BRIGHT}{directory}{Style.RESET_ALL}{Fore.CYAN}...{Style.RESET_ALL}")
+    indexer.index_directory()
+
+    watcher = IndexWatcher(indexer)
+    watcher.start()
+    print(f"{Fore.GREEN}Watching for changes ({watcher.backend}). Press Ctrl+C to stop.{Style.RESET_ALL}")
+    try:
+        while True:
+            time.sleep(1)
+    finally:
+        watcher.stop()
+        stats = watcher.get_stats()
+        print(f"{Fore.CYAN}Re-indexed {stats['files_indexed']} files, removed {stats['files_removed']}.{Style.RESET_ALL}")
+
+
 def main():
     """Main application entry point."""
     try:
@@ -76,6 +101,7 @@ def main():
         parser = argparse.ArgumentParser(description="TaskHeroAI Terminal Application")
         parser.add_argument("directory", nargs="?", help="Directory to index")
         parser.add_argument("--serve", type=int, metavar="PORT", help="Run HTTP API server (not implemented in entry point)")
+        parser.add_argument("--watch", action="store_true", help="Index the directory and re-index changed files until interrupted")
         args = parser.parse_args()
         
         # Handle HTTP server mode
@@ -83,6 +109,14 @@ def main():
             print(f"{Fore.YELLOW}HTTP API server functionality has been moved to separate modules.{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}Please use the HTTP API functionality through the modular interface.{Style.RESET_ALL}")
             return
+
+        # Handle headless watch mode
+        if args.watch:
+            if not args.directory or not os.path.isdir(args.directory):
+                print(f"{Fore.RED}Error: --watch requires a valid directory.{Style.RESET_ALL}")
+                return
+            run_watch_mode(os.path.abspath(args.directory))
+            return
         
         # Display banner
         display_animated_banner(frame_delay=0.2)
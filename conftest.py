@@ -0,0 +1,28 @@
+"""
+Shared pytest fixtures for the test scripts in the project root
+"""
+
+import pytest
+
+
+@pytest.fixture
+def isolated_caches(monkeypatch, tmp_path):
+    """Point the per-user embedding and description caches at a temporary directory.
+
+    Tests that index files would otherwise write to (and hit entries in) the
+    caches under ~/.cache/taskheroai.
+    """
+    import mods.description_cache as description_cache
+    import mods.embedding_cache as embedding_cache
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("EMBEDDING_CACHE_DIR", str(cache_dir))
+    for module in (embedding_cache, description_cache):
+        monkeypatch.setattr(module, "_shared_cache", None)
+        monkeypatch.setattr(module, "_shared_cache_failed", False)
+
+    yield cache_dir
+
+    for module in (embedding_cache, description_cache):
+        if module._shared_cache is not None:
+            module._shared_cache.close()
@@ -9,7 +9,6 @@ import re
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import logging
-import json
 
 
 @dataclass
@@ -190,22 +189,15 @@ class CodebaseContextManager:
             if not self.indexer or not hasattr(self.indexer, 'index_dir'):
                 return []
 
-            metadata_dir = os.path.join(self.indexer.index_dir, "metadata")
-            if not os.path.exists(metadata_dir):
-                return []
-
             query_keywords = set(re.findall(r'\w+', query.lower()))
             scored_files = []
 
             for file_path in indexed_files:
                 filename = os.path.basename(file_path)
-                metadata_file = os.path.join(metadata_dir, f"{filename}.json")
+                metadata = self.indexer.get_file_record(file_path)
 
-                if os.path.exists(metadata_file):
+                if metadata:
                     try:
-                        with open(metadata_file, "r", encoding="utf-8") as f:
-                            metadata = json.load(f)
-
                         description = metadata.get("description", "").lower()
                         if description:
                             # Score based on keyword overlap in description
@@ -230,49 +222,41 @@ class CodebaseContextManager:
         try:
             # Import the file selector from the old system for its robust logic
             from ..code.decisions import FileSelector, FileInfo
-            import json
             import os
 
             # Create file infos like the old system does
             file_infos = []
 
-            if self.indexer and hasattr(self.indexer, 'index_dir'):
-                metadata_dir = os.path.join(self.indexer.index_dir, "metadata")
-                if os.path.exists(metadata_dir):
-                    metadata_files = [f for f in os.listdir(metadata_dir) if f.endswith(".json")]
-
-                    for file in metadata_files:
+            if self.indexer and hasattr(self.indexer, 'iter_file_records'):
+                for metadata in self.indexer.iter_file_records():
+                    try:
+                        file_info = FileInfo(
+                            name=os.path.basename(metadata["path"]),
+                            path=metadata["path"],
+                            description=metadata.get("description", ""),
+                            chunks=[],
+                        )
+
+                        # Read file content for chunks
                         try:
-                            with open(os.path.join(metadata_dir, file), "r", encoding="utf-8") as f:
-                                metadata = json.load(f)
-
-                            file_info = FileInfo(
-                                name=os.path.basename(metadata["path"]),
-                                path=metadata["path"],
-                                description=metadata.get("description", ""),
-                                chunks=[],
-                            )
-
-                            # Read file content for chunks
-                            try:
-                                with open(metadata["path"], "r", encoding="utf-8", errors="replace") as f:
-                                    content = f.read()
-
-                                chunks = [
-                                    {
-                                        "text": content,
-                                        "type": "file_content",
-                                        "start_line": 1,
-                                        "end_line": content.count("\n") + 1,
-                                    }
-                                ]
-                                file_info.chunks = chunks
-                            except Exception as e:
-                                self.logger.warning(f"Error reading file {metadata['path']}: {e}")
-
-                            file_infos.append(file_info)
+                            with open(metadata["path"], "r", encoding="utf-8", errors="replace") as f:
+                                content = f.read()
+
+                            chunks = [
+                                {
+                                    "text": content,
+                                    "type": "file_content",
+                                    "start_line": 1,
+                                    "end_line": content.count("\n") + 1,
+                                }
+                            ]
+                            file_info.chunks = chunks
                         except Exception as e:
-                            self.logger.warning(f"Error processing metadata file {file}: {e}")
+                            self.logger.warning(f"Error reading file {metadata['path']}: {e}")
+
+                        file_infos.append(file_info)
+                    except Exception as e:
+                        self.logger.warning(f"Error processing index record {metadata.get('path')}: {e}")
 
             # Use the robust file selector if we have file infos
             if file_infos:
@@ -781,15 +765,11 @@ class CodebaseContextManager:
     def _get_file_description(self, file_path: str) -> str:
         """Get file description from metadata."""
         try:
-            if self.indexer and hasattr(self.indexer, 'index_dir'):
-                metadata_dir = os.path.join(self.indexer.index_dir, "metadata")
-                filename = os.path.basename(file_path)
-                metadata_file = os.path.join(metadata_dir, f"{filename}.json")
-
-                if os.path.exists(metadata_file):
-                    with open(metadata_file, "r", encoding="utf-8") as f:
-                        metadata = json.load(f)
-                        return metadata.get("description", "")
+            if self.indexer and hasattr(self.indexer, 'get_file_record'):
+                abs_path = file_path if os.path.isabs(file_path) else os.path.join(self.indexer.root_path, file_path)
+                metadata = self.indexer.get_file_record(os.path.normpath(abs_path))
+                if metadata:
+                    return metadata.get("description", "")
         except Exception as e:
             self.logger.debug(f"Could not get description for {file_path}: {e}")
         return ""
@@ -833,14 +813,11 @@ class CodebaseContextManager:
                     pass  # Skip files that can't be read
 
                 # Score based on file metadata description
-                if self.indexer and hasattr(self.indexer, 'index_dir'):
-                    metadata_dir = os.path.join(self.indexer.index_dir, "metadata")
-                    metadata_file = os.path.join(metadata_dir, f"{os.path.basename(file_path)}.json")
+                if self.indexer and hasattr(self.indexer, 'get_file_record'):
+                    metadata = self.indexer.get_file_record(file_path)
 
-                    if os.path.exists(metadata_file):
+                    if metadata:
                         try:
-                            with open(metadata_file, "r", encoding="utf-8") as f:
-                                metadata = json.load(f)
                             description = metadata.get("description", "").lower()
                             for keyword in query_keywords:
                                 if keyword in description:
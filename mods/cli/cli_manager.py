@@ -725,50 +725,23 @@ class CLIManager(BaseManager):
             print(f"\n{Fore.CYAN}Index Directory: {Fore.WHITE}{index_dir}{Style.RESET_ALL}")
 
             if os.path.exists(index_dir):
-                metadata_dir = os.path.join(index_dir, "metadata")
-                embeddings_dir = os.path.join(index_dir, "embeddings")
-                descriptions_dir = os.path.join(index_dir, "descriptions")
+                from ..code.index_store import IndexStore
 
-                print(f"\n{Fore.CYAN}{Style.BRIGHT}Index Directory Structure:{Style.RESET_ALL}")
-                header = f"  {Fore.CYAN}{'Directory':<15} {'Exists':<10} {'Files':<10} {'Size':<10}{Style.RESET_ALL}"
-                separator = f"  {Fore.CYAN}{'-'*15} {'-'*10} {'-'*10} {'-'*10}{Style.RESET_ALL}"
+                print(f"\n{Fore.CYAN}{Style.BRIGHT}Index Store:{Style.RESET_ALL}")
+                header = f"  {Fore.CYAN}{'Store':<15} {'Exists':<10} {'Files':<10} {'Segments':<10} {'Size':<10}{Style.RESET_ALL}"
+                separator = f"  {Fore.CYAN}{'-'*15} {'-'*10} {'-'*10} {'-'*10} {'-'*10}{Style.RESET_ALL}"
                 print(header)
                 print(separator)
 
-                # Check metadata directory
-                if os.path.exists(metadata_dir):
-                    files = [f for f in os.listdir(metadata_dir) if f.endswith(".json")]
-                    size = sum(os.path.getsize(os.path.join(metadata_dir, f)) for f in files)
+                if IndexStore.exists(index_dir):
+                    store_stats = self.indexer.index_store.get_stats()
                     print(
-                        f"  {Fore.GREEN}{'metadata':<15} {Fore.GREEN}{'Yes':<10} {Fore.YELLOW}{len(files):<10} {Fore.MAGENTA}{self._format_size(size):<10}{Style.RESET_ALL}"
+                        f"  {Fore.GREEN}{'store':<15} {Fore.GREEN}{'Yes':<10} {Fore.YELLOW}{store_stats['files']:<10} "
+                        f"{Fore.YELLOW}{store_stats['segments']:<10} {Fore.MAGENTA}{self._format_size(store_stats['size_bytes']):<10}{Style.RESET_ALL}"
                     )
                 else:
                     print(
-                        f"  {Fore.GREEN}{'metadata':<15} {Fore.RED}{'No':<10} {'-':<10} {'-':<10}{Style.RESET_ALL}"
-                    )
-
-                # Check embeddings directory
-                if os.path.exists(embeddings_dir):
-                    files = [f for f in os.listdir(embeddings_dir) if f.endswith(".json")]
-                    size = sum(os.path.getsize(os.path.join(embeddings_dir, f)) for f in files)
-                    print(
-                        f"  {Fore.GREEN}{'embeddings':<15} {Fore.GREEN}{'Yes':<10} {Fore.YELLOW}{len(files):<10} {Fore.MAGENTA}{self._format_size(size):<10}{Style.RESET_ALL}"
-                    )
-                else:
-                    print(
-                        f"  {Fore.GREEN}{'embeddings':<15} {Fore.RED}{'No':<10} {'-':<10} {'-':<10}{Style.RESET_ALL}"
-                    )
-
-                # Check descriptions directory
-                if os.path.exists(descriptions_dir):
-                    files = [f for f in os.listdir(descriptions_dir) if f.endswith(".txt")]
-                    size = sum(os.path.getsize(os.path.join(descriptions_dir, f)) for f in files)
-                    print(
-                        f"  {Fore.GREEN}{'descriptions':<15} {Fore.GREEN}{'Yes':<10} {Fore.YELLOW}{len(files):<10} {Fore.MAGENTA}{self._format_size(size):<10}{Style.RESET_ALL}"
-                    )
-                else:
-                    print(
-                        f"  {Fore.GREEN}{'descriptions':<15} {Fore.RED}{'No':<10} {'-':<10} {'-':<10}{Style.RESET_ALL}"
+                        f"  {Fore.GREEN}{'store':<15} {Fore.RED}{'No':<10} {'-':<10} {'-':<10} {'-':<10}{Style.RESET_ALL}"
                     )
             else:
                 print(f"{Fore.RED}Index directory does not exist.{Style.RESET_ALL}")
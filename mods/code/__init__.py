@@ -2,10 +2,21 @@
 Contains modules for code analysis, embedding, and manipulation.
 """
 
+from . import ann_index
 from . import decisions
+from . import description_queue
 from . import directory
 from . import embed
+from . import embedding_batcher
+from . import file_snapshot
+from . import git_changes
+from . import hybrid_search
+from . import index_store
 from . import indexer
+from . import keyword_index
+from . import quantization
+from . import retrieval_service
+from . import watcher
 
 
-__all__ = ["embed", "directory", "indexer", "decisions"]
\ No newline at end of file
+__all__ = ["ann_index", "embed", "embedding_batcher", "file_snapshot", "git_changes", "hybrid_search", "directory", "index_store", "indexer", "keyword_index", "decisions", "description_queue", "quantization", "retrieval_service", "watcher"]
\ No newline at end of file
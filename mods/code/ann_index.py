@@ -0,0 +1,218 @@
+"""Approximate nearest neighbour (IVF-flat) index over the search matrix.
+
+The index partitions the rows of the pre-normalized search matrix into
+``nlist`` inverted lists around spherical k-means centroids. A query only
+scores the rows of the ``nprobe`` lists whose centroids are closest to it,
+reading those rows straight from the memory-mapped matrix.
+
+Centroids are reused from one store generation to the next, and rows of
+files whose content did not change keep their list assignment, so only new
+or changed rows are assigned when the index is rebuilt after an indexing run.
+The centroids are retrained once the matrix has grown well past the size
+they were trained on.
+"""
+
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("TaskHeroAI.ANNIndex")
+
+ASSIGN_BLOCK_ROWS = 16384
+TRAIN_ITERATIONS = 10
+TRAIN_SAMPLES_PER_LIST = 32
+RETRAIN_GROWTH = 4.0
+
+ANN_MIN_ROWS = int(os.getenv("EMBEDDING_ANN_MIN_ROWS", "200000"))
+ANN_NPROBE = int(os.getenv("EMBEDDING_ANN_NPROBE", "32"))
+
+
+def default_nlist(num_rows: int) -> int:
+    """Choose the number of inverted lists for a matrix.
+
+    Args:
+        num_rows (int): Number of rows in the search matrix.
+
+    Returns:
+        int: Number of lists, roughly the square root of the row count.
+    """
+    return max(1, min(65536, int(math.sqrt(num_rows))))
+
+
+class IVFIndex:
+    """Inverted-file index with exact scoring inside the probed lists."""
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, trained_rows: int):
+        """Initialize the index from centroids and per-row list assignments.
+
+        Args:
+            centroids (np.ndarray): (nlist, dims) unit-length centroids.
+            assignments (np.ndarray): (rows,) list id of every matrix row.
+            trained_rows (int): Row count of the matrix the centroids were trained on.
+        """
+        self.centroids: np.ndarray = np.asarray(centroids, dtype=np.float32)
+        self.assignments: np.ndarray = np.asarray(assignments, dtype=np.int32)
+        self.trained_rows: int = int(trained_rows)
+
+        self.order: np.ndarray = np.argsort(self.assignments, kind="stable").astype(np.int32)
+        counts = np.bincount(self.assignments, minlength=self.nlist)
+        self.offsets: np.ndarray = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    @property
+    def nlist(self) -> int:
+        """Number of inverted lists."""
+        return self.centroids.shape[0]
+
+    @property
+    def num_rows(self) -> int:
+        """Number of indexed matrix rows."""
+        return self.assignments.shape[0]
+
+    @staticmethod
+    def train(matrix: np.ndarray, nlist: Optional[int] = None, seed: int = 0) -> np.ndarray:
+        """Train spherical k-means centroids on a sample of the matrix.
+
+        Args:
+            matrix (np.ndarray): (rows, dims) unit-length vectors.
+            nlist (Optional[int]): Number of centroids. Defaults to :func:`default_nlist`.
+            seed (int): Seed for sampling and initialization.
+
+        Returns:
+            np.ndarray: (nlist, dims) unit-length centroids.
+        """
+        num_rows = matrix.shape[0]
+        nlist = min(nlist or default_nlist(num_rows), num_rows)
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(num_rows, nlist * TRAIN_SAMPLES_PER_LIST)
+        sample_ids = np.sort(rng.choice(num_rows, size=sample_size, replace=False))
+        sample = np.asarray(matrix[sample_ids], dtype=np.float32)
+
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+        for _ in range(TRAIN_ITERATIONS):
+            labels = _nearest_centroids(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] < 1e-8
+            # Re-seed empty lists with random sample points
+            if np.any(empty):
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+                norms[empty] = 1.0
+            centroids = sums / norms
+
+        return centroids.astype(np.float32)
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, files: List[Dict[str, Any]],
+              previous: Optional["IVFIndex"] = None,
+              previous_files: Optional[List[Dict[str, Any]]] = None) -> "IVFIndex":
+        """Build an index for a search matrix, reusing a previous index where possible.
+
+        Args:
+            matrix (np.ndarray): (rows, dims) unit-length search matrix.
+            files (List[Dict[str, Any]]): File table of the matrix.
+            previous (Optional[IVFIndex]): Index of the previous generation.
+            previous_files (Optional[List[Dict[str, Any]]]): File table of the previous generation.
+
+        Returns:
+            IVFIndex: The index for ``matrix``.
+        """
+        num_rows = matrix.shape[0]
+        reusable = (
+            previous is not None
+            and previous_files is not None
+            and previous.centroids.shape[1] == matrix.shape[1]
+            and num_rows <= previous.trained_rows * RETRAIN_GROWTH
+        )
+
+        if not reusable:
+            logger.info(f"Training IVF index with {default_nlist(num_rows)} lists on {num_rows} rows")
+            centroids = cls.train(matrix)
+            return cls(centroids, _assign_rows(matrix, centroids, np.arange(num_rows)), num_rows)
+
+        assignments = np.full(num_rows, -1, dtype=np.int32)
+        previous_rows = {
+            entry["key"]: entry for entry in previous_files if entry.get("hash")
+        }
+        for entry in files:
+            old = previous_rows.get(entry["key"])
+            if old and old["hash"] == entry.get("hash") and old["count"] == entry["count"]:
+                assignments[entry["start"]:entry["start"] + entry["count"]] = \
+                    previous.assignments[old["start"]:old["start"] + old["count"]]
+
+        stale = np.flatnonzero(assignments < 0)
+        if len(stale):
+            assignments[stale] = _assign_rows(matrix, previous.centroids, stale)
+        logger.info(f"Updated IVF index: reused {num_rows - len(stale)} rows, assigned {len(stale)}")
+        return cls(previous.centroids, assignments, previous.trained_rows)
+
+    def candidates(self, queries: np.ndarray, nprobe: int = ANN_NPROBE) -> np.ndarray:
+        """Collect the rows of the lists closest to any of the queries.
+
+        Args:
+            queries (np.ndarray): A (dims,) query or a (Q, dims) query matrix, unit length.
+            nprobe (int): Number of lists probed per query.
+
+        Returns:
+            np.ndarray: Sorted unique row ids.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = max(1, min(nprobe, self.nlist))
+        centroid_scores = queries @ self.centroids.T
+        if nprobe < self.nlist:
+            probed = np.argpartition(centroid_scores, -nprobe, axis=1)[:, -nprobe:]
+        else:
+            probed = np.tile(np.arange(self.nlist), (queries.shape[0], 1))
+
+        lists = np.unique(probed)
+        rows = [self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists]
+        if not rows:
+            return np.empty(0, dtype=np.int32)
+        return np.sort(np.concatenate(rows))
+
+    def save(self, path: str) -> None:
+        """Persist the index to an ``.npz`` file.
+
+        Args:
+            path (str): Destination path.
+        """
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, centroids=self.centroids, assignments=self.assignments,
+                 trained_rows=np.array(self.trained_rows))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IVFIndex"]:
+        """Load an index written by :meth:`save`.
+
+        Args:
+            path (str): Path of the ``.npz`` file.
+
+        Returns:
+            Optional[IVFIndex]: The index, or None if it cannot be read.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return cls(data["centroids"], data["assignments"], int(data["trained_rows"]))
+        except Exception as e:
+            logger.warning(f"Error loading IVF index {path}: {e}")
+            return None
+
+
+def _nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+
+
+def _assign_rows(matrix: np.ndarray, centroids: np.ndarray, row_ids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(row_ids), dtype=np.int32)
+    for start in range(0, len(row_ids), ASSIGN_BLOCK_ROWS):
+        block_ids = row_ids[start:start + ASSIGN_BLOCK_ROWS]
+        block = np.asarray(matrix[block_ids], dtype=np.float32)
+        assignments[start:start + len(block_ids)] = _nearest_centroids(block, centroids)
+    return assignments
@@ -1152,16 +1152,11 @@ Ensure the analysis is thorough and provides insights that would help developers
 
         try:
             root_path = self.indexer.root_path
-            metadata_dir = os.path.join(self.indexer.index_dir, "metadata")
-            
-            if not os.path.exists(metadata_dir):
-                self.logger.warning("Metadata directory does not exist")
-                return {}
 
-            # Collect all available files
-            metadata_files = [f for f in os.listdir(metadata_dir) if f.endswith('.json')]
-            if not metadata_files:
-                self.logger.warning("No metadata files found")
+            # Collect all indexed files
+            indexed_files = self.indexer.get_indexed_files()
+            if not indexed_files:
+                self.logger.warning("No indexed files found")
                 return {}
 
             # Categorize files by type and importance
@@ -1174,31 +1169,23 @@ Ensure the analysis is thorough and provides insights that would help developers
                 'other': []
             }
 
-            for file in metadata_files:
-                try:
-                    with open(os.path.join(metadata_dir, file), 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        file_path = data.get('path', '')
-                        if file_path:
-                            file_name = os.path.basename(file_path).lower()
-                            file_dir = os.path.dirname(file_path).lower()
-                            
-                            # Categorize files for better analysis
-                            if any(x in file_name for x in ['readme', 'license', 'changelog', 'contributing', '.md', 'docs']):
-                                files_by_category['documentation'].append(file_path)
-                            elif any(x in file_name for x in ['config', 'settings', '.json', '.yaml', '.yml', '.toml', '.ini', '.env']):
-                                files_by_category['config'].append(file_path)
-                            elif any(x in file_name for x in ['test', 'spec']) or 'test' in file_dir:
-                                files_by_category['test'].append(file_path)
-                            elif any(x in file_name for x in ['build', 'make', 'docker', 'requirements', 'package', 'setup', 'cmake']):
-                                files_by_category['build'].append(file_path)
-                            elif any(file_path.endswith(ext) for ext in ['.py', '.js', '.java', '.c', '.cpp', '.cs', '.go', '.rs', '.php', '.rb']):
-                                files_by_category['main_code'].append(file_path)
-                            else:
-                                files_by_category['other'].append(file_path)
-                                
-                except Exception as e:
-                    self.logger.error(f"Error reading metadata file {file}: {e}")
+            for file_path in indexed_files:
+                file_name = os.path.basename(file_path).lower()
+                file_dir = os.path.dirname(file_path).lower()
+
+                # Categorize files for better analysis
+                if any(x in file_name for x in ['readme', 'license', 'changelog', 'contributing', '.md', 'docs']):
+                    files_by_category['documentation'].append(file_path)
+                elif any(x in file_name for x in ['config', 'settings', '.json', '.yaml', '.yml', '.toml', '.ini', '.env']):
+                    files_by_category['config'].append(file_path)
+                elif any(x in file_name for x in ['test', 'spec']) or 'test' in file_dir:
+                    files_by_category['test'].append(file_path)
+                elif any(x in file_name for x in ['build', 'make', 'docker', 'requirements', 'package', 'setup', 'cmake']):
+                    files_by_category['build'].append(file_path)
+                elif any(file_path.endswith(ext) for ext in ['.py', '.js', '.java', '.c', '.cpp', '.cs', '.go', '.rs', '.php', '.rb']):
+                    files_by_category['main_code'].append(file_path)
+                else:
+                    files_by_category['other'].append(file_path)
 
             # Select representative files from each category
             sample_files = []
@@ -1609,21 +1596,15 @@ class ChatHandler:
 
         file_infos = []
         try:
-            metadata_dir = os.path.join(self.indexer.index_dir, "metadata")
-            if not os.path.exists(metadata_dir):
-                self.logger.warning("Metadata directory does not exist")
+            if not self.indexer.get_indexed_files():
+                self.logger.warning("Index store is empty")
                 return (
-                    "Error: Metadata directory does not exist. Please reindex the code.",
+                    "Error: No indexed files found. Please reindex the code.",
                     [],
                 )
 
-            metadata_files = [f for f in os.listdir(metadata_dir) if f.endswith(".json")]
-
-            for file in metadata_files:
+            for metadata in self.indexer.iter_file_records():
                 try:
-                    with open(os.path.join(metadata_dir, file), "r", encoding="utf-8") as f:
-                        metadata = json.load(f)
-
                     file_info = FileInfo(
                         name=os.path.basename(metadata["path"]),
                         path=metadata["path"],
@@ -1651,7 +1632,7 @@ class ChatHandler:
 
                     file_infos.append(file_info)
                 except Exception as e:
-                    self.logger.error(f"Error processing metadata file {file}: {e}")
+                    self.logger.error(f"Error processing index record {metadata.get('path')}: {e}")
         except Exception as e:
             self.logger.error(f"Error getting file infos: {e}")
             return f"Error getting file information: {e}", []
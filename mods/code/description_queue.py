@@ -0,0 +1,330 @@
+"""Asynchronous, rate-limit-aware queue for AI file descriptions.
+
+Description generation is an LLM round-trip per file, so it runs on its own
+asyncio event loop in a background thread instead of inside the indexing
+thread pool. Concurrency and a tokens-per-minute budget are configured per
+description provider, and rate-limit errors are retried with exponential
+backoff that pauses every worker of the queue, not just the one that hit it.
+
+Indexing publishes embeddings without waiting for descriptions; the indexer
+stores those files with a ``pending`` description status and fills the
+descriptions in as the queue completes them.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .embedding_batcher import estimate_tokens
+
+logger = logging.getLogger("TaskHeroAI.DescriptionQueue")
+
+DESCRIPTION_STATUS_COMPLETE = "complete"
+DESCRIPTION_STATUS_PENDING = "pending"
+DESCRIPTION_STATUS_FAILED = "failed"
+
+DEFAULT_CONCURRENCY = {
+    "ollama": 2,
+    "openai": 8,
+    "anthropic": 4,
+    "google": 4,
+    "groq": 4,
+    "openrouter": 4,
+    "deepseek": 4,
+}
+RESPONSE_TOKEN_ESTIMATE = 300
+MAX_BACKOFF_SECONDS = 60.0
+
+RATE_LIMIT_MARKERS = ("429", "rate limit", "rate_limit", "ratelimit", "too many requests",
+                      "resource exhausted", "resource_exhausted", "quota")
+
+
+def _provider_setting(name: str, provider: str, default: int) -> int:
+    """Read ``<name>_<PROVIDER>`` or ``<name>`` from the environment.
+
+    Args:
+        name (str): Base environment variable name.
+        provider (str): Description provider name.
+        default (int): Value used when neither variable is set or valid.
+
+    Returns:
+        int: The configured value.
+    """
+    for key in (f"{name}_{provider.upper()}", name):
+        value = os.getenv(key)
+        if value is None:
+            continue
+        try:
+            return int(value)
+        except ValueError:
+            logger.warning(f"Invalid {key} in .env, using default: {default}")
+            break
+    return default
+
+
+def description_concurrency(provider: str) -> int:
+    """Get the number of concurrent description calls allowed for a provider.
+
+    Args:
+        provider (str): Description provider name.
+
+    Returns:
+        int: DESCRIPTION_MAX_CONCURRENCY[_<PROVIDER>] from .env, or the provider default.
+    """
+    return max(1, _provider_setting("DESCRIPTION_MAX_CONCURRENCY", provider, DEFAULT_CONCURRENCY.get(provider, 4)))
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether a provider error is a rate-limit (HTTP 429 style) error.
+
+    Args:
+        error (BaseException): Error raised by the description provider.
+
+    Returns:
+        bool: True if the request should be retried after backing off.
+    """
+    if "ratelimit" in type(error).__name__.lower():
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in RATE_LIMIT_MARKERS)
+
+
+@dataclass
+class DescriptionJob:
+    """A file waiting for its description."""
+
+    path: str
+    """Path of the file to describe."""
+    file_hash: str
+    """Hash of the file content the prompt was built from."""
+    prompt: str
+    """Description prompt."""
+    cache_keys: List[str] = field(default_factory=list)
+    """Description cache keys of the file content."""
+    attempts: int = 0
+    """Number of provider calls made so far."""
+
+
+class TokenBucket:
+    """Tokens-per-minute budget shared by the workers of a queue."""
+
+    def __init__(self, tokens_per_minute: int):
+        """Initialize a full bucket.
+
+        Args:
+            tokens_per_minute (int): Budget per minute. 0 or less disables the limit.
+        """
+        self.capacity: float = float(max(0, tokens_per_minute))
+        self.tokens: float = self.capacity
+        self.updated: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until ``tokens`` can be spent.
+
+        A request larger than the whole budget waits for a full bucket and then
+        spends all of it.
+
+        Args:
+            tokens (int): Estimated tokens of the request.
+        """
+        if self.capacity <= 0:
+            return
+        tokens = min(float(tokens), self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60.0)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) * 60.0 / self.capacity)
+
+
+class DescriptionQueue:
+    """Background queue that generates file descriptions under provider limits.
+
+    Usage:
+        queue = DescriptionQueue(generate_description, on_done, provider="openai")
+        queue.submit(DescriptionJob(path, file_hash, prompt))
+        queue.wait()
+        queue.close()
+    """
+
+    def __init__(self, generate_fn: Callable[[str], str],
+                 on_done: Callable[[DescriptionJob, Optional[str], Optional[BaseException]], None],
+                 provider: str = "ollama",
+                 max_concurrency: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 backoff_seconds: float = 2.0):
+        """Initialize the queue and start its event loop thread.
+
+        Args:
+            generate_fn (Callable[[str], str]): Generates a description for a prompt (blocking).
+            on_done (Callable): Called with (job, description, error) when a job finishes;
+                exactly one of description and error is set.
+            provider (str): Description provider, used to pick the default limits.
+            max_concurrency (Optional[int]): Concurrent provider calls. If None, uses
+                DESCRIPTION_MAX_CONCURRENCY[_<PROVIDER>] from .env.
+            tokens_per_minute (Optional[int]): Token budget per minute, 0 for unlimited. If None,
+                uses DESCRIPTION_TOKENS_PER_MINUTE[_<PROVIDER>] from .env.
+            max_retries (Optional[int]): Retries after rate-limit errors. If None, uses
+                DESCRIPTION_MAX_RETRIES from .env.
+            backoff_seconds (float): First backoff delay; doubled on every retry.
+        """
+        self.generate_fn = generate_fn
+        self.on_done = on_done
+        self.provider: str = provider
+        self.max_concurrency: int = (max(1, max_concurrency) if max_concurrency is not None else
+                                     description_concurrency(provider))
+        self.tokens_per_minute: int = (tokens_per_minute if tokens_per_minute is not None else
+                                       _provider_setting("DESCRIPTION_TOKENS_PER_MINUTE", provider, 0))
+        self.max_retries: int = (max_retries if max_retries is not None else
+                                 _provider_setting("DESCRIPTION_MAX_RETRIES", provider, 5))
+        self.backoff_seconds: float = backoff_seconds
+
+        self.completed: int = 0
+        self.failed: int = 0
+        self.rate_limited: int = 0
+
+        self._outstanding: int = 0
+        self._idle = threading.Condition()
+        self._paused_until: float = 0.0
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="describe"
+        )
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="description-queue", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted jobs that have not finished yet."""
+        return self._outstanding
+
+    def submit(self, job: DescriptionJob) -> None:
+        """Queue a file for description.
+
+        Args:
+            job (DescriptionJob): The file and its prompt.
+        """
+        with self._idle:
+            self._outstanding += 1
+        self._loop.call_soon_threadsafe(self._jobs.put_nowait, job)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted job has finished.
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait; None waits forever.
+
+        Returns:
+            bool: True if the queue drained, False on timeout.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the workers.
+
+        Args:
+            wait (bool): Finish queued jobs first. Otherwise they are dropped.
+        """
+        if wait:
+            self.wait()
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._stop_workers)
+        self._thread.join()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics.
+
+        Returns:
+            Dict[str, Any]: Dictionary with queue metrics.
+        """
+        return {
+            "provider": self.provider,
+            "max_concurrency": self.max_concurrency,
+            "tokens_per_minute": self.tokens_per_minute,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+        }
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._jobs: asyncio.Queue = asyncio.Queue()
+        self._bucket = TokenBucket(self.tokens_per_minute)
+        self._workers = [self._loop.create_task(self._worker()) for _ in range(self.max_concurrency)]
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(asyncio.gather(*self._workers, return_exceptions=True))
+        finally:
+            self._loop.close()
+
+    def _stop_workers(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+
+    async def _worker(self) -> None:
+        while True:
+            job: DescriptionJob = await self._jobs.get()
+            description: Optional[str] = None
+            error: Optional[BaseException] = None
+            try:
+                description = await self._describe(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+            self._finish(job, description, error)
+
+    async def _describe(self, job: DescriptionJob) -> str:
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._bucket.acquire(estimate_tokens(job.prompt) + RESPONSE_TOKEN_ESTIMATE)
+
+            job.attempts += 1
+            try:
+                return await self._loop.run_in_executor(self._executor, self.generate_fn, job.prompt)
+            except Exception as e:
+                if not is_rate_limit_error(e) or job.attempts > self.max_retries:
+                    raise
+                self.rate_limited += 1
+                backoff = min(MAX_BACKOFF_SECONDS, self.backoff_seconds * 2 ** (job.attempts - 1))
+                backoff *= 1.0 + random.random() * 0.25
+                # Pause the whole queue: the other workers would hit the same limit
+                self._paused_until = max(self._paused_until, time.monotonic() + backoff)
+                logger.warning(
+                    f"Description provider {self.provider} rate limited, retrying "
+                    f"{os.path.basename(job.path)} in {backoff:.1f}s (attempt {job.attempts})"
+                )
+
+    def _finish(self, job: DescriptionJob, description: Optional[str], error: Optional[BaseException]) -> None:
+        if error is None:
+            self.completed += 1
+        else:
+            self.failed += 1
+            logger.error(f"Error generating description for {job.path}: {error}")
+        try:
+            self.on_done(job, description, error)
+        except Exception as e:
+            logger.error(f"Error handling description result for {job.path}: {e}", exc_info=True)
+        finally:
+            with self._idle:
+                self._outstanding -= 1
+                self._idle.notify_all()
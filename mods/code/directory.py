@@ -5,12 +5,14 @@ import logging
 import os
 import psutil
 import re
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 from dotenv import load_dotenv
 
 logger = logging.getLogger("TaskHeroAI.Code.DirectoryParser")
@@ -75,6 +77,9 @@ logger.info(f"Memory workers: {MEMORY_WORKERS}")
 logger.info(f"LRU cache size: {LRU_CACHE_SIZE}")
 logger.info(f"Hash cache size: {HASH_CACHE_SIZE}")
 
+# Files a walk may have queued for hashing before it yields them
+WALK_PREFETCH: int = MAX_WORKERS * 4
+
 DEFAULT_IGNORED_NAMES: Set[str] = {
     ".git",
     ".svn",
@@ -138,6 +143,8 @@ class DirectoryEntry:
         extension (str): File extension (files only; empty for folders).
         file_hash (str): File hash (files only; empty for folders or if skipped).
         modified_time (float): Last modified timestamp.
+        mtime_ns (int): Last modified timestamp in nanoseconds.
+        inode (int): Inode number (file index on Windows).
         children (List['DirectoryEntry']): List of DirectoryEntry objects (folders only).
 
     Performance:
@@ -153,6 +160,8 @@ class DirectoryEntry:
     extension: str = ""
     file_hash: str = ""
     modified_time: float = 0.0
+    mtime_ns: int = 0
+    inode: int = 0
     children: List["DirectoryEntry"] = field(default_factory=list)
 
     def is_file(self) -> bool:
@@ -163,6 +172,10 @@ class DirectoryEntry:
         """Returns True if this entry is a folder."""
         return self.entry_type == EntryType.FOLDER
 
+    def stat_signature(self) -> Tuple[int, int, int]:
+        """Returns (size, mtime_ns, inode), which changes whenever the file is written or replaced."""
+        return (self.size, self.mtime_ns, self.inode)
+
     def __repr__(self) -> str:
         """Provides a string representation of the DirectoryEntry."""
         return (
@@ -181,7 +194,57 @@ def _glob_to_regex_segment(segment: str) -> str:
     Returns:
         str: The converted regex segment.
     """
-    return re.escape(segment).replace(r"\*", "[^/]*").replace(r"\?", "[^/]")
+    regex_parts: List[str] = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            regex_parts.append("[^/]*")
+        elif char == "?":
+            regex_parts.append("[^/]")
+        elif char == "[":
+            end = segment.find("]", i + 2)
+            if end == -1:
+                regex_parts.append(re.escape(char))
+            else:
+                char_class = segment[i + 1:end]
+                if char_class[0] in "!^":
+                    char_class = "^" + char_class[1:]
+                regex_parts.append("[" + char_class.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            regex_parts.append(re.escape(char))
+        i += 1
+    return "".join(regex_parts)
+
+
+def _has_glob_chars(pattern: str) -> bool:
+    """Returns True if a glob pattern contains '*', '?' or a '[...]' character class."""
+    return "*" in pattern or "?" in pattern or "[" in pattern
+
+
+def _glob_to_regex_path(pattern: str) -> str:
+    """
+    Converts a glob path that may contain '**' segments to a regex.
+
+    A leading '**/' matches any (or no) leading directories, a trailing '/**' matches
+    everything inside, and '/**/' matches zero or more directories.
+
+    Args:
+        pattern (str): The glob path to convert, without leading or trailing '/'.
+
+    Returns:
+        str: The converted regex.
+    """
+    parts = pattern.split("/")
+    regex_parts: List[str] = []
+    for i, part in enumerate(parts):
+        is_last = i == len(parts) - 1
+        if part == "**":
+            regex_parts.append(".*" if is_last else "(?:.*/)?")
+        else:
+            regex_parts.append(_glob_to_regex_segment(part) + ("" if is_last else "/"))
+    return "".join(regex_parts)
 
 
 class GitIgnorePattern:
@@ -245,6 +308,7 @@ class GitIgnorePattern:
 
         if self.raw_pattern == "**":
             self.regex = re.compile(".*")
+            self.regex_body: str = ".*"
             self.match_all_files = True
             return
         else:
@@ -252,25 +316,10 @@ class GitIgnorePattern:
 
         regex_expr_str: str
         if "**" in self.raw_pattern:
-            if (
-                self.raw_pattern.startswith("**/")
-                and self.raw_pattern.endswith("/**")
-                and len(self.raw_pattern) >= 5
-            ):
-                middle_part = self.raw_pattern[3:-3]
-                regex_expr_str = f"(?:.*/)?{_glob_to_regex_segment(middle_part)}(?:/.*)?"
-            elif self.raw_pattern.startswith("**/"):
-                actual_pattern_part = self.raw_pattern[3:]
-                regex_expr_str = f"(?:.*/)?{_glob_to_regex_segment(actual_pattern_part)}"
-            elif self.raw_pattern.endswith("/**"):
-                actual_pattern_part = self.raw_pattern[:-3]
-                regex_expr_str = f"{_glob_to_regex_segment(actual_pattern_part)}(?:/.*)?"
-            else:
-                sub_patterns = self.raw_pattern.split("**")
-                regex_parts_list = [_glob_to_regex_segment(p) for p in sub_patterns]
-                regex_expr_str = "(.*)".join(regex_parts_list)
+            regex_expr_str = _glob_to_regex_path(self.raw_pattern)
         else:
             regex_expr_str = _glob_to_regex_segment(self.raw_pattern)
+        self.regex_body: str = regex_expr_str
 
         if self.is_anchored_to_base or self.contains_slash:
             final_regex_str = f"^{regex_expr_str}"
@@ -336,6 +385,242 @@ class GitIgnorePattern:
             return False
 
 
+class _PatternTrieNode:
+    """Node of the literal-prefix trie of GitIgnoreMatcher, keyed by path segment."""
+
+    __slots__ = ("children", "exact", "regex", "_sources")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_PatternTrieNode"] = {}
+        self.exact: int = -1
+        self.regex: Optional["re.Pattern[str]"] = None
+        self._sources: List[Tuple[int, str]] = []
+
+
+def _compile_alternation(sources: List[Tuple[int, str]]) -> Optional["re.Pattern[str]"]:
+    """
+    Compiles (pattern index, regex) pairs into one regex whose match names the winner.
+
+    Alternatives are ordered from the last pattern to the first, so the first
+    alternative that matches is the pattern git would apply, and its group name
+    ("p<index>") is the match's lastgroup.
+
+    Args:
+        sources (List[Tuple[int, str]]): Pattern indices and regex bodies.
+
+    Returns:
+        Optional[re.Pattern[str]]: The combined regex, or None without sources.
+    """
+    if not sources:
+        return None
+    return re.compile(
+        "|".join(f"(?P<p{index}>{body})" for index, body in sorted(sources, reverse=True))
+    )
+
+
+class _PatternSet:
+    """
+    The patterns of one GitIgnoreMatcher that apply to files, or to directories,
+    grouped by how they are matched.
+    """
+
+    def __init__(self, indexed_patterns: List[Tuple[int, GitIgnorePattern]]) -> None:
+        self.names: Dict[str, int] = {}
+        name_sources: List[Tuple[int, str]] = []
+        self.trie: _PatternTrieNode = _PatternTrieNode()
+        has_path_patterns = False
+
+        for index, pattern in indexed_patterns:
+            raw = pattern.raw_pattern
+            if pattern.match_all_files or not (pattern.contains_slash or pattern.is_anchored_to_base):
+                if pattern.match_all_files or _has_glob_chars(raw):
+                    name_sources.append((index, ".*" if pattern.match_all_files else pattern.regex_body))
+                else:
+                    self.names[raw] = index
+                continue
+
+            has_path_patterns = True
+            node = self.trie
+            parts = raw.split("/")
+            for i, part in enumerate(parts):
+                if _has_glob_chars(part):
+                    node._sources.append((index, pattern.regex_body))
+                    break
+                node = node.children.setdefault(part, _PatternTrieNode())
+                if i == len(parts) - 1:
+                    node.exact = max(node.exact, index)
+
+        self.name_regex: Optional["re.Pattern[str]"] = _compile_alternation(name_sources)
+        self.has_path_patterns: bool = has_path_patterns
+        stack = [self.trie]
+        while stack:
+            node = stack.pop()
+            node.regex = _compile_alternation(node._sources)
+            node._sources = []
+            stack.extend(node.children.values())
+
+    def last_match(self, rel_path: str, name: str) -> int:
+        """
+        Finds the last pattern that matches a path.
+
+        Args:
+            rel_path (str): '/'-separated path relative to the matcher's base directory.
+            name (str): Last segment of rel_path.
+
+        Returns:
+            int: Index of the matching pattern, or -1 if none matches.
+        """
+        best = self.names.get(name, -1)
+        if self.name_regex is not None:
+            match = self.name_regex.fullmatch(name)
+            if match:
+                best = max(best, int(match.lastgroup[1:]))
+        if not self.has_path_patterns:
+            return best
+
+        node: Optional[_PatternTrieNode] = self.trie
+        for segment in rel_path.split("/"):
+            if node.regex is not None:
+                match = node.regex.fullmatch(rel_path)
+                if match:
+                    best = max(best, int(match.lastgroup[1:]))
+            node = node.children.get(segment)
+            if node is None:
+                return best
+        if node.regex is not None:
+            match = node.regex.fullmatch(rel_path)
+            if match:
+                best = max(best, int(match.lastgroup[1:]))
+        return max(best, node.exact)
+
+
+class GitIgnoreMatcher:
+    """
+    Compiled form of the patterns of one .gitignore (or exclude) file.
+
+    Instead of testing a path against every pattern in turn, the patterns are split
+    into classes that are each matched at once:
+    - literal names without '/' ("node_modules", ".env"): one dict lookup,
+    - glob names without '/' ("*.log", "temp_*"): one alternation regex on the name,
+    - patterns with a '/' ("/build", "docs/api/*.md"): a trie of their literal leading
+      segments, so only patterns whose prefix matches the path are tried, with one
+      alternation regex per trie node for the glob remainders.
+    Within each class the last matching pattern wins, as in git, and negations are
+    resolved from the index of the winning pattern.
+
+    Args:
+        patterns (List[GitIgnorePattern]): Patterns in file order.
+        base_dir (str): Directory the patterns are relative to.
+
+    Usage:
+        matcher = GitIgnoreMatcher.from_file("/project/.gitignore")
+        matcher.is_ignored("/project/build/app.js", False)  # True, False or None
+    """
+
+    def __init__(self, patterns: List[GitIgnorePattern], base_dir: str) -> None:
+        self.base_dir: str = os.path.normpath(base_dir)
+        self.patterns: List[GitIgnorePattern] = patterns
+        self._negations: List[bool] = [pattern.is_negation for pattern in patterns]
+        indexed = list(enumerate(patterns))
+        self._dir_patterns: _PatternSet = _PatternSet(indexed)
+        self._file_patterns: _PatternSet = _PatternSet(
+            [(index, pattern) for index, pattern in indexed if not pattern.is_directory_only]
+        )
+        self._prefix: str = self.base_dir.rstrip(os.sep) + os.sep
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], base_dir: str, source: str = "") -> "GitIgnoreMatcher":
+        """
+        Compiles the patterns of .gitignore lines, skipping blank lines and comments.
+
+        Args:
+            lines (Iterable[str]): Lines of a .gitignore file.
+            base_dir (str): Directory the patterns are relative to.
+            source (str): Name of the file, for warnings.
+
+        Returns:
+            GitIgnoreMatcher: The compiled matcher.
+        """
+        patterns: List[GitIgnorePattern] = []
+        for line_num, line in enumerate(lines, 1):
+            pattern_str = line.strip()
+            if not pattern_str or pattern_str.startswith("#"):
+                continue
+            try:
+                patterns.append(GitIgnorePattern(pattern_str, base_dir))
+            except Exception as e:
+                logger.warning(
+                    f"Error compiling gitignore pattern '{pattern_str}' from {source}:{line_num} - {e}"
+                )
+        return cls(patterns, base_dir)
+
+    @classmethod
+    def from_file(cls, path: str, base_dir: Optional[str] = None) -> Optional["GitIgnoreMatcher"]:
+        """
+        Reads and compiles a .gitignore file.
+
+        Args:
+            path (str): Path to the file.
+            base_dir (Optional[str]): Directory the patterns are relative to. Defaults to
+                the directory containing the file.
+
+        Returns:
+            Optional[GitIgnoreMatcher]: The compiled matcher, or None if the file cannot be read.
+        """
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.readlines()
+        except OSError as e:
+            logger.warning(f"Failed to read ignore file at {path}: {e}")
+            return None
+        return cls.from_lines(lines, base_dir or os.path.dirname(os.path.abspath(path)), path)
+
+    def is_ignored(self, abs_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Checks a path against the patterns.
+
+        Args:
+            abs_path (str): The absolute path to check.
+            is_dir (bool): True if the path is a directory, False otherwise.
+
+        Returns:
+            Optional[bool]: True if the last matching pattern ignores the path, False if it
+            is a negation, None if no pattern matches or the path is outside base_dir.
+        """
+        if not abs_path.startswith(self._prefix):
+            return None
+        rel_path = abs_path[len(self._prefix):]
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        return self.is_ignored_relative(rel_path, is_dir)
+
+    def is_ignored_relative(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Checks a path relative to base_dir against the patterns.
+
+        Args:
+            rel_path (str): '/'-separated path relative to base_dir.
+            is_dir (bool): True if the path is a directory, False otherwise.
+
+        Returns:
+            Optional[bool]: Same as is_ignored().
+        """
+        pattern_set = self._dir_patterns if is_dir else self._file_patterns
+        index = pattern_set.last_match(rel_path, rel_path.rsplit("/", 1)[-1])
+        if index < 0:
+            return None
+        return not self._negations[index]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+
+# DEFAULT_IGNORED_NAMES has no '/' inside its patterns, so they are matched against names
+DEFAULT_IGNORE_MATCHER: GitIgnoreMatcher = GitIgnoreMatcher.from_lines(
+    sorted(DEFAULT_IGNORED_NAMES), os.sep, "DEFAULT_IGNORED_NAMES"
+)
+
+
 class DirectoryParser:
     """
     Parses a directory tree, builds a representation, optionally applying .gitignore rules
@@ -343,10 +628,13 @@ class DirectoryParser:
 
     Args:
         directory_path (str): Path to the root directory to parse.
-        gitignore_path (Optional[str]): Optional path to a .gitignore file.
+        gitignore_path (Optional[str]): Optional path to the .gitignore file of the root directory.
         parallel (bool): Whether to use parallel processing for directory traversal and hashing.
         hash_files (bool): Whether to calculate file hashes.
         extra_exclude_patterns (Optional[List[str]]): A list of additional filename patterns to ignore.
+        stat_cache (Optional[Mapping[str, Tuple[Tuple[int, int, int], str]]]): Known
+            (stat signature, hash) per file path. Files whose signature is unchanged reuse
+            the known hash instead of being read.
 
     Raises:
         FileNotFoundError: If the `directory_path` does not exist.
@@ -354,9 +642,12 @@ class DirectoryParser:
 
     Performance:
         - Uses `os.scandir()` for efficient directory listing.
-        - Optionally uses a `ThreadPoolExecutor` for parallel processing of subdirectories and file hashing.
-        - Caches results of .gitignore checks to avoid redundant computations.
+        - Walks the tree iteratively; `walk_files()` streams file entries without building the tree.
+        - Ignore rules are compiled per file (see GitIgnoreMatcher) and ignored directories
+          are never listed. Nested .gitignore files and .git/info/exclude are honoured.
+        - Optionally hashes files on one `ThreadPoolExecutor` shared by the whole walk.
         - File hashing uses buffered reading and skips very large files.
+        - With a stat cache, only files whose (size, mtime_ns, inode) changed are hashed.
     """
 
     def __init__(
@@ -366,6 +657,7 @@ class DirectoryParser:
         parallel: bool = True,
         hash_files: bool = True,
         extra_exclude_patterns: Optional[List[str]] = None,
+        stat_cache: Optional[Mapping[str, Tuple[Tuple[int, int, int], str]]] = None,
     ) -> None:
         """
         Initializes a DirectoryParser object.
@@ -376,6 +668,8 @@ class DirectoryParser:
             parallel (bool): Whether to use parallel processing for directory traversal and hashing.
             hash_files (bool): Whether to calculate file hashes.
             extra_exclude_patterns (List[str]): A list of additional filename patterns to ignore.
+            stat_cache (Mapping[str, Tuple[Tuple[int, int, int], str]]): Known (stat signature, hash)
+                per file path, e.g. from a previous index.
         """
         self.root_directory_path: str = os.path.abspath(directory_path)
         if not os.path.exists(self.root_directory_path):
@@ -394,53 +688,115 @@ class DirectoryParser:
             extra_exclude_patterns if extra_exclude_patterns else []
         )
 
+        self.stat_cache: Mapping[str, Tuple[Tuple[int, int, int], str]] = stat_cache or {}
+        self.reused_hashes: int = 0
+        self.file_count: int = 0
+        self.dir_count: int = 0
+        self.ignored_count: int = 0
+
+        # fnmatch semantics on the name, as one regex for all patterns
+        self._extra_exclude_regex: Optional["re.Pattern[str]"] = (
+            re.compile("|".join(
+                fnmatch.translate(os.path.normcase(pattern)) for pattern in self.extra_exclude_patterns
+            ))
+            if self.extra_exclude_patterns
+            else None
+        )
+
+        self._root_prefix: str = self.root_directory_path.rstrip(os.sep) + os.sep
+        self._root_rules: Tuple[GitIgnoreMatcher, ...] = ()
+        self._directory_rules: Dict[str, Tuple[GitIgnoreMatcher, ...]] = {}
         self._ignored_paths_cache: Dict[str, bool] = {}
+        self._reused_hashes_lock = threading.Lock()
 
         self._load_gitignore_rules()
 
     def _load_gitignore_rules(self) -> None:
         """
-        Loads and compiles .gitignore patterns from the specified file.
-        Patterns are relative to the directory containing the .gitignore file.
+        Loads and compiles the ignore rules of the root directory: .git/info/exclude and
+        the specified .gitignore file, whose patterns are relative to the directory
+        containing it. .gitignore files in subdirectories are loaded as the walk reaches them.
 
         Performance: O(N*M) where N is lines in .gitignore and M is avg pattern complexity for regex compilation.
         """
+        rules: List[GitIgnoreMatcher] = []
+
+        exclude_path = os.path.join(self.root_directory_path, ".git", "info", "exclude")
+        if os.path.isfile(exclude_path):
+            exclude_rules = GitIgnoreMatcher.from_file(exclude_path, self.root_directory_path)
+            if exclude_rules:
+                rules.append(exclude_rules)
+
         if not self.gitignore_rules_path or not os.path.isfile(
             self.gitignore_rules_path
         ):
             self.logger.info(
                 f"No .gitignore file specified or found at: {self.gitignore_rules_path}"
             )
-            return
+        else:
+            gitignore_rules = GitIgnoreMatcher.from_file(self.gitignore_rules_path)
+            if gitignore_rules is not None:
+                self.gitignore_patterns = gitignore_rules.patterns
+                rules.append(gitignore_rules)
+                self.logger.info(
+                    f"Loaded {len(self.gitignore_patterns)} patterns from {self.gitignore_rules_path}"
+                )
 
-        gitignore_base_dir = os.path.dirname(self.gitignore_rules_path)
-        try:
-            with open(self.gitignore_rules_path, "r", encoding="utf-8") as f:
-                for line_num, line in enumerate(f, 1):
-                    pattern_str = line.strip()
-                    if not pattern_str or pattern_str.startswith("#"):
-                        continue
-                    try:
-                        self.gitignore_patterns.append(
-                            GitIgnorePattern(pattern_str, gitignore_base_dir)
-                        )
-                    except Exception as e:
-                        self.logger.warning(
-                            f"Error compiling gitignore pattern '{pattern_str}' from "
-                            f"{self.gitignore_rules_path}:{line_num} - {e}"
-                        )
-            self.logger.info(
-                f"Loaded {len(self.gitignore_patterns)} patterns from {self.gitignore_rules_path}"
-            )
-        except IOError as e:
-            self.logger.error(
-                f"Failed to read .gitignore file at {self.gitignore_rules_path}: {e}"
+        self._root_rules = tuple(rules)
+        self._directory_rules = {self.root_directory_path: self._root_rules}
+
+    def _with_directory_rules(
+        self, rules: Tuple[GitIgnoreMatcher, ...], dir_path: str, has_gitignore: bool
+    ) -> Tuple[GitIgnoreMatcher, ...]:
+        """
+        Extends the rules that apply in a directory's parent with the directory's own .gitignore.
+
+        Args:
+            rules (Tuple[GitIgnoreMatcher, ...]): Rules of the parent directory, outermost first.
+            dir_path (str): The directory.
+            has_gitignore (bool): Whether the directory contains a .gitignore file.
+
+        Returns:
+            Tuple[GitIgnoreMatcher, ...]: Rules that apply to the directory's entries.
+        """
+        if not has_gitignore or dir_path == self.root_directory_path:
+            return rules
+        nested_rules = GitIgnoreMatcher.from_file(os.path.join(dir_path, ".gitignore"), dir_path)
+        if not nested_rules:
+            return rules
+        return rules + (nested_rules,)
+
+    def _rules_for_directory(self, dir_path: str) -> Tuple[GitIgnoreMatcher, ...]:
+        """
+        Gets the ignore rules that apply to the entries of a directory, loading the
+        .gitignore files between it and the root on first use.
+
+        Args:
+            dir_path (str): Absolute path of the directory.
+
+        Returns:
+            Tuple[GitIgnoreMatcher, ...]: Rules, outermost first. Directories outside the
+            root get the root rules.
+        """
+        missing: List[str] = []
+        current = dir_path
+        while current not in self._directory_rules:
+            if not current.startswith(self._root_prefix):
+                return self._root_rules
+            missing.append(current)
+            current = os.path.dirname(current)
+
+        rules = self._directory_rules[current]
+        for directory in reversed(missing):
+            rules = self._with_directory_rules(
+                rules, directory, os.path.isfile(os.path.join(directory, ".gitignore"))
             )
+            self._directory_rules[directory] = rules
+        return rules
 
     def _is_ignored(self, abs_path: str, is_dir: bool) -> bool:
         """
-        Checks if a given path should be ignored based on .gitignore patterns
-        and common ignored names.
+        Checks if a given path should be ignored, remembering the answer.
 
         Args:
             abs_path (str): The absolute path to check.
@@ -450,33 +806,77 @@ class DirectoryParser:
             bool: True if the path should be ignored, False otherwise.
 
         Performance:
-            O(P) where P is the number of .gitignore patterns (worst case).
-            Uses a cache, so O(1) on average for repeated checks of the same path.
+            O(1) for repeated checks of the same path. Tree walks visit each path once and
+            call _matches_ignore_rules() directly, so the cache does not grow with the tree.
+        """
+        if abs_path not in self._ignored_paths_cache:
+            rules = self._rules_for_directory(os.path.dirname(abs_path))
+            self._ignored_paths_cache[abs_path] = self._matches_ignore_rules(abs_path, is_dir, rules)
+        return self._ignored_paths_cache[abs_path]
+
+    def _matches_ignore_rules(
+        self, abs_path: str, is_dir: bool, rules: Tuple[GitIgnoreMatcher, ...]
+    ) -> bool:
         """
-        if abs_path in self._ignored_paths_cache:
-            return self._ignored_paths_cache[abs_path]
+        Checks if a given path should be ignored based on common ignored names,
+        the extra exclude patterns and the .gitignore rules of its directory.
+
+        Common ignored names and extra exclude patterns always ignore. Among the
+        .gitignore rules the innermost file with a matching pattern decides, so a
+        nested .gitignore can re-include what an outer one ignores.
+
+        Args:
+            abs_path (str): The absolute path to check.
+            is_dir (bool): True if the path is a directory, False otherwise.
+            rules (Tuple[GitIgnoreMatcher, ...]): Rules of the path's directory, outermost first.
+
+        Returns:
+            bool: True if the path should be ignored, False otherwise.
 
+        Performance:
+            One dict lookup and one regex match per pattern class and ignore file,
+            independent of the number of patterns.
+        """
         path_basename = os.path.basename(abs_path)
-        if path_basename in DEFAULT_IGNORED_NAMES:
-            self._ignored_paths_cache[abs_path] = True
+        if DEFAULT_IGNORE_MATCHER.is_ignored_relative(path_basename, is_dir):
             return True
 
-        for pattern in self.extra_exclude_patterns:
-            if fnmatch.fnmatch(path_basename, pattern):
-                self._ignored_paths_cache[abs_path] = True
-                return True
+        if self._extra_exclude_regex is not None and self._extra_exclude_regex.match(
+            os.path.normcase(path_basename)
+        ):
+            return True
 
-        ignored_status = False
-        if not self.gitignore_patterns:
-            self._ignored_paths_cache[abs_path] = False
-            return False
+        for matcher in reversed(rules):
+            ignored = matcher.is_ignored(abs_path, is_dir)
+            if ignored is not None:
+                return ignored
+        return False
 
-        for pattern_obj in self.gitignore_patterns:
-            if pattern_obj.matches(abs_path, is_dir):
-                ignored_status = not pattern_obj.is_negation
+    def is_path_ignored(self, abs_path: str, is_dir: bool = False) -> bool:
+        """
+        Checks whether a scan of the root directory would skip a path, because the
+        path itself or one of the directories above it is ignored.
 
-        self._ignored_paths_cache[abs_path] = ignored_status
-        return ignored_status
+        Args:
+            abs_path (str): The absolute path to check.
+            is_dir (bool): True if the path is a directory, False otherwise.
+
+        Returns:
+            bool: True if the path is ignored or lies outside the root directory.
+        """
+        rel_path = os.path.relpath(abs_path, self.root_directory_path)
+        if rel_path == ".":
+            return False
+        if rel_path.startswith(".."):
+            return True
+
+        current_path = self.root_directory_path
+        parts = rel_path.split(os.sep)
+        for i, part in enumerate(parts):
+            current_path = os.path.join(current_path, part)
+            if self._is_ignored(current_path, is_dir or i < len(parts) - 1):
+                return True
+        return False
 
     @lru_cache(maxsize=HASH_CACHE_SIZE)
     def _calculate_file_hash(self, file_path: str, modified_time: float = 0.0) -> str:
@@ -572,252 +972,230 @@ class DirectoryParser:
                     buffer = f.read(HASH_BUFFER_SIZE)
             return hasher.hexdigest()
 
-    def _parse_single_entry(
+    def _file_entry(
         self, dir_entry: os.DirEntry, current_parent_path: str
     ) -> Optional[DirectoryEntry]:
         """
-        Parses a single os.DirEntry object (file or subdirectory).
+        Builds the DirectoryEntry of a file, hashing it unless the stat cache knows it.
         This is the target for parallel execution.
 
         Args:
-            dir_entry (os.DirEntry): The directory entry to parse.
+            dir_entry (os.DirEntry): The directory entry of the file.
             current_parent_path (str): The path of the parent directory.
 
         Returns:
-            Optional[DirectoryEntry]: A DirectoryEntry object representing the parsed entry, or None if the entry should be ignored.
+            Optional[DirectoryEntry]: The file entry, or None if the file disappeared.
         """
         entry_abs_path = dir_entry.path
         entry_name = dir_entry.name
 
-        try:
-            is_dir = dir_entry.is_dir()
-        except OSError as e:
-            self.logger.warning(f"Cannot determine type of {entry_abs_path}: {e}")
-            return None
-
-        if self._is_ignored(entry_abs_path, is_dir):
-            self.logger.debug(f"Ignoring path: {entry_abs_path}")
-            return None
-
-        entry_type = EntryType.FOLDER if is_dir else EntryType.FILE
         file_size = 0
         extension = ""
         file_hash_val = ""
-        children_entries: List[DirectoryEntry] = []
-
         modified_time = 0.0
+        mtime_ns = 0
+        inode = 0
+
+        if "." in entry_name:
+            ext_part = entry_name.rsplit(".", 1)
+            if len(ext_part) > 1 and ext_part[1]:
+                extension = ext_part[1]
+
         try:
             stat_info = dir_entry.stat()
+            file_size = stat_info.st_size
             modified_time = stat_info.st_mtime
-        except OSError as e:
-            self.logger.warning(f"Cannot stat {entry_abs_path}: {e}")
-
-        if is_dir:
-            try:
-                children_entries = self._parse_directory_contents(entry_abs_path)
-            except PermissionError as e:
-                self.logger.warning(
-                    f"Permission denied listing directory {entry_abs_path}: {e}"
-                )
-            except OSError as e:
-                self.logger.warning(
-                    f"Could not list directory {entry_abs_path}: {e}"
-                )
-
-        else:
-            try:
-                file_size = (
-                    stat_info.st_size if stat_info else dir_entry.stat().st_size
-                )
-
-                if "." in entry_name:
-                    ext_part = entry_name.rsplit(".", 1)
-                    if len(ext_part) > 1 and ext_part[1]:
-                        extension = ext_part[1]
-
-                file_hash_val = self._calculate_file_hash(
-                    entry_abs_path, modified_time
-                )
-            except FileNotFoundError:
-                self.logger.warning(
-                    f"File not found while processing: {entry_abs_path}"
-                )
-                return None
-            except PermissionError:
-                self.logger.warning(
-                    f"Permission denied while processing file: {entry_abs_path}"
-                )
-            except Exception as e:
-                self.logger.warning(
-                    f"Failed to get file info for {entry_abs_path}: {e}"
-                )
+            mtime_ns = stat_info.st_mtime_ns
+            # DirEntry.stat() reports st_ino as 0 on Windows; inode() fetches the real one
+            inode = dir_entry.inode()
+
+            known = self.stat_cache.get(entry_abs_path)
+            if known and self.calculate_hashes and known[0] == (file_size, mtime_ns, inode):
+                file_hash_val = known[1]
+                with self._reused_hashes_lock:
+                    self.reused_hashes += 1
+            else:
+                file_hash_val = self._calculate_file_hash(entry_abs_path, modified_time)
+        except FileNotFoundError:
+            self.logger.warning(f"File not found while processing: {entry_abs_path}")
+            return None
+        except PermissionError:
+            self.logger.warning(
+                f"Permission denied while processing file: {entry_abs_path}"
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to get file info for {entry_abs_path}: {e}")
 
         return DirectoryEntry(
             name=entry_name,
             path=entry_abs_path,
             parent=current_parent_path,
-            entry_type=entry_type,
+            entry_type=EntryType.FILE,
             size=file_size,
             extension=extension,
             file_hash=file_hash_val,
             modified_time=modified_time,
-            children=children_entries,
+            mtime_ns=mtime_ns,
+            inode=inode,
         )
 
-    @lru_cache(maxsize=LRU_CACHE_SIZE)
-    def _is_ignored_cached(self, abs_path: str, is_dir: bool) -> bool:
+    def _folder_entry(
+        self, dir_entry: os.DirEntry, current_parent_path: str
+    ) -> DirectoryEntry:
         """
-        Cached version of _is_ignored for better performance.
+        Builds the DirectoryEntry of a folder, without its children.
 
         Args:
-            abs_path (str): The absolute path to check.
-            is_dir (bool): True if the path is a directory, False otherwise.
+            dir_entry (os.DirEntry): The directory entry of the folder.
+            current_parent_path (str): The path of the parent directory.
 
         Returns:
-            bool: True if the path should be ignored, False otherwise.
+            DirectoryEntry: The folder entry.
         """
-        return self._is_ignored(abs_path, is_dir)
+        modified_time = 0.0
+        try:
+            modified_time = dir_entry.stat().st_mtime
+        except OSError as e:
+            self.logger.warning(f"Cannot stat {dir_entry.path}: {e}")
+        return DirectoryEntry(
+            name=dir_entry.name,
+            path=dir_entry.path,
+            parent=current_parent_path,
+            entry_type=EntryType.FOLDER,
+            modified_time=modified_time,
+        )
 
-    def _parse_directory_contents(self, dir_path: str) -> List[DirectoryEntry]:
+    def _walk(
+        self, directory: Optional[str] = None, include_folders: bool = False
+    ) -> Iterator[DirectoryEntry]:
         """
-        Helper to parse contents of a given directory path with optimized batch processing.
+        Walks the tree with an explicit stack of directories, yielding entries as they
+        are found.
 
-        This implementation:
-        1. Scans the entire directory at once
-        2. Filters ignored entries in a batch
-        3. Processes files and directories separately for better parallelism
-        4. Uses adaptive thread pool sizes based on workload type
+        Directories are listed in the calling thread. Files that have to be hashed are
+        handed to one thread pool shared by the whole walk, with at most WALK_PREFETCH
+        files in flight, so memory stays bounded by the pending directories and the
+        prefetch window instead of growing with the tree. A folder is always yielded
+        before any entry below it.
 
         Args:
-            dir_path (str): The directory path to parse.
+            directory (Optional[str]): Directory to walk. Defaults to the root directory.
+            include_folders (bool): Also yield folder entries (without children).
 
-        Returns:
-            List[DirectoryEntry]: A list of DirectoryEntry objects representing the contents of the directory.
+        Yields:
+            DirectoryEntry: File entries, and folder entries if requested.
         """
-        children_entries: List[DirectoryEntry] = []
+        self.file_count = 0
+        self.dir_count = 0
+        self.ignored_count = 0
+        self.reused_hashes = 0
+
+        executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        if self.use_parallel_processing and self.calculate_hashes:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        pending: Deque[concurrent.futures.Future] = deque()
+        start = os.path.abspath(directory or self.root_directory_path)
+        # Each directory to list, with the ignore rules of its parent
+        stack: List[Tuple[str, Tuple[GitIgnoreMatcher, ...]]] = [
+            (start, self._rules_for_directory(os.path.dirname(start)))
+        ]
 
         try:
-            scanned_entries = list(os.scandir(dir_path))
-        except PermissionError as e:
-            self.logger.warning(
-                f"Permission denied listing directory {dir_path}: {e}"
-            )
-            return children_entries
-        except OSError as e:
-            self.logger.warning(
-                f"Could not list directory {dir_path}: {e}"
-            )
-            return children_entries
+            while stack:
+                dir_path, rules = stack.pop()
+                try:
+                    with os.scandir(dir_path) as it:
+                        scanned_entries = list(it)
+                except PermissionError as e:
+                    self.logger.warning(f"Permission denied listing directory {dir_path}: {e}")
+                    continue
+                except OSError as e:
+                    self.logger.warning(f"Could not list directory {dir_path}: {e}")
+                    continue
+
+                rules = self._with_directory_rules(
+                    rules, dir_path, any(dir_entry.name == ".gitignore" for dir_entry in scanned_entries)
+                )
+                subdirectories: List[str] = []
+                for dir_entry in scanned_entries:
+                    try:
+                        is_dir = dir_entry.is_dir()
+                    except OSError as e:
+                        self.logger.warning(f"Cannot determine type of {dir_entry.path}: {e}")
+                        continue
 
-        if not scanned_entries:
-            return children_entries
+                    # Ignored directories are pruned here, before anything below them is listed
+                    if self._matches_ignore_rules(dir_entry.path, is_dir, rules):
+                        self.ignored_count += 1
+                        continue
 
-        filtered_entries = []
-        for entry in scanned_entries:
-            try:
-                is_dir = entry.is_dir()
-                if not self._is_ignored_cached(entry.path, is_dir):
-                    filtered_entries.append((entry, is_dir))
-            except OSError:
-                continue
+                    if is_dir:
+                        self.dir_count += 1
+                        subdirectories.append(dir_entry.path)
+                        if include_folders:
+                            yield self._folder_entry(dir_entry, dir_path)
+                        continue
 
-        if not filtered_entries:
-            return children_entries
+                    self.file_count += 1
+                    # Files with a known stat signature are not read, so a worker would only add overhead
+                    if executor is None or dir_entry.path in self.stat_cache:
+                        entry = self._file_entry(dir_entry, dir_path)
+                        if entry:
+                            yield entry
+                        continue
 
-        files = [
-            (entry, dir_path) for entry, is_dir in filtered_entries if not is_dir
-        ]
-        directories = [
-            (entry, dir_path) for entry, is_dir in filtered_entries if is_dir
-        ]
+                    pending.append(executor.submit(self._file_entry, dir_entry, dir_path))
+                    if len(pending) >= WALK_PREFETCH:
+                        entry = pending.popleft().result()
+                        if entry:
+                            yield entry
 
-        if self.use_parallel_processing:
-            if files and len(files) > 5:
-                file_workers = min(MAX_WORKERS, len(files) + 1)
-                with concurrent.futures.ThreadPoolExecutor(
-                    max_workers=file_workers
-                ) as executor:
-                    file_futures = {
-                        executor.submit(
-                            self._parse_single_entry, entry, parent
-                        ): (entry, parent)
-                        for entry, parent in files
-                    }
-                    for future in concurrent.futures.as_completed(file_futures):
-                        try:
-                            result = future.result()
-                            if result:
-                                children_entries.append(result)
-                        except Exception as e:
-                            entry_info = file_futures[future]
-                            self.logger.error(
-                                f"Error processing file {entry_info[0].path}: {e}"
-                            )
-            else:
-                for entry, parent in files:
-                    try:
-                        result = self._parse_single_entry(entry, parent)
-                        if result:
-                            children_entries.append(result)
-                    except Exception as e:
-                        self.logger.error(
-                            f"Error processing file {entry.path}: {e}"
-                        )
-
-            if directories and len(directories) > 2:
-                dir_workers = min(MEMORY_WORKERS, len(directories) + 1)
-                with concurrent.futures.ThreadPoolExecutor(
-                    max_workers=dir_workers
-                ) as executor:
-                    dir_futures = {
-                        executor.submit(
-                            self._parse_single_entry, entry, parent
-                        ): (entry, parent)
-                        for entry, parent in directories
-                    }
-                    for future in concurrent.futures.as_completed(dir_futures):
-                        try:
-                            result = future.result()
-                            if result:
-                                children_entries.append(result)
-                        except Exception as e:
-                            entry_info = dir_futures[future]
-                            self.logger.error(
-                                f"Error processing directory {entry_info[0].path}: {e}"
-                            )
-            else:
-                for entry, parent in directories:
-                    try:
-                        result = self._parse_single_entry(entry, parent)
-                        if result:
-                            children_entries.append(result)
-                    except Exception as e:
-                        self.logger.error(
-                            f"Error processing directory {entry.path}: {e}"
-                        )
-        else:
-            for entry, is_dir in filtered_entries:
-                try:
-                    result = self._parse_single_entry(entry, dir_path)
-                    if result:
-                        children_entries.append(result)
-                except Exception as e:
-                    self.logger.error(
-                        f"Error processing entry {entry.path}: {e}"
-                    )
+                stack.extend((subdirectory, rules) for subdirectory in reversed(subdirectories))
 
-        return children_entries
+            while pending:
+                entry = pending.popleft().result()
+                if entry:
+                    yield entry
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def walk_files(self, directory: Optional[str] = None) -> Iterator[DirectoryEntry]:
+        """
+        Yields the file entries of the tree without building the tree.
+
+        Unlike parse(), nothing is kept once an entry has been yielded, so walking a
+        tree of any size or depth takes constant memory apart from the directories
+        still to be listed. After the walk, file_count, dir_count, ignored_count and
+        reused_hashes describe what was seen.
+
+        Args:
+            directory (Optional[str]): Directory below the root to walk. Defaults to the
+                root directory. Ignore rules of the directories above it are not checked.
+
+        Yields:
+            DirectoryEntry: One entry per file that is not ignored, in no particular order.
+
+        Usage:
+            parser = DirectoryParser("/path/to/project", gitignore_path="/path/to/project/.gitignore")
+            for entry in parser.walk_files():
+                print(entry.path, entry.file_hash)
+        """
+        return self._walk(directory)
 
     def parse(self) -> DirectoryEntry:
         """
-        Parses the root directory and its entire tree with performance benchmarking.
+        Parses the root directory and materializes its entire tree with performance benchmarking.
+
+        Prefer walk_files() when only the files are needed; this builds the folder
+        structure around the same walk, e.g. for get_tree_string().
 
         Returns:
             DirectoryEntry: A DirectoryEntry object representing the root of the parsed directory tree.
 
         Performance:
             Traversal is O(N) where N is total number of files/dirs.
-            Each entry involves stat calls, .gitignore checks (cached), and potentially hashing.
+            Each entry involves stat calls, .gitignore checks, and potentially hashing.
             Parallelism can speed up on multi-core systems, especially with I/O bound tasks.
         """
         self.logger.info(
@@ -826,47 +1204,34 @@ class DirectoryParser:
 
         metrics = {
             "start_time": time.monotonic(),
-            "file_count": 0,
-            "dir_count": 0,
             "total_size": 0,
-            "ignored_count": 0,
             "hashed_count": 0,
             "memory_before": psutil.Process().memory_info().rss / (1024 * 1024),
         }
 
-        root_name = os.path.basename(self.root_directory_path)
-        root_parent = os.path.dirname(self.root_directory_path)
-
-        root_children = self._parse_directory_contents(self.root_directory_path)
-
         root_stat = os.stat(self.root_directory_path)
-
         root_entry = DirectoryEntry(
-            name=root_name,
+            name=os.path.basename(self.root_directory_path),
             path=self.root_directory_path,
-            parent=root_parent,
+            parent=os.path.dirname(self.root_directory_path),
             entry_type=EntryType.FOLDER,
             size=0,
             modified_time=root_stat.st_mtime,
-            children=root_children,
         )
 
-        def collect_metrics(entry: DirectoryEntry) -> None:
+        folders: Dict[str, DirectoryEntry] = {self.root_directory_path: root_entry}
+        for entry in self._walk(include_folders=True):
+            folders[entry.parent].children.append(entry)
             if entry.is_folder():
-                metrics["dir_count"] += 1
-                for child in entry.children:
-                    collect_metrics(child)
-            else:
-                metrics["file_count"] += 1
-                metrics["total_size"] += entry.size
-                if (
-                    entry.file_hash
-                    and entry.file_hash != "empty"
-                    and not entry.file_hash.startswith("size:")
-                ):
-                    metrics["hashed_count"] += 1
-
-        collect_metrics(root_entry)
+                folders[entry.path] = entry
+                continue
+            metrics["total_size"] += entry.size
+            if (
+                entry.file_hash
+                and entry.file_hash != "empty"
+                and not entry.file_hash.startswith("size:")
+            ):
+                metrics["hashed_count"] += 1
 
         metrics["end_time"] = time.monotonic()
         metrics["total_time"] = metrics["end_time"] - metrics["start_time"]
@@ -874,23 +1239,18 @@ class DirectoryParser:
             psutil.Process().memory_info().rss / (1024 * 1024)
         )
         metrics["memory_used"] = metrics["memory_after"] - metrics["memory_before"]
-        metrics["ignored_count"] = len(self._ignored_paths_cache) - (
-            metrics["file_count"] + metrics["dir_count"]
-        )
 
         self.logger.info(f"Directory parsing complete in {metrics['total_time']:.3f}s")
         self.logger.info(
-            f"Files: {metrics['file_count']}, Directories: {metrics['dir_count']}, "
-            f"Ignored: {metrics['ignored_count']}"
+            f"Files: {self.file_count}, Directories: {self.dir_count + 1}, "
+            f"Ignored: {self.ignored_count}"
         )
         self.logger.info(
             f"Total size: {metrics['total_size'] / (1024 * 1024):.2f} MB, "
-            f"Hashed files: {metrics['hashed_count']}"
-        )
-        self.logger.info(
-            f"Memory used: {metrics['memory_used']:.2f} MB, "
-            f"Cache entries: {len(self._ignored_paths_cache)}"
+            f"Hashed files: {metrics['hashed_count']}, "
+            f"reused from stat cache: {self.reused_hashes}"
         )
+        self.logger.info(f"Memory used: {metrics['memory_used']:.2f} MB")
 
         if self.use_parallel_processing:
             self.logger.info(f"Parallel processing enabled with max workers: {MAX_WORKERS}")
@@ -929,7 +1289,7 @@ class DirectoryParser:
 
         Args:
             entry (Optional[DirectoryEntry]): The DirectoryEntry to start printing from. If None, parsing is triggered.
-            indent_level (int): The current indentation level (used for recursion).
+            indent_level (int): The indentation level of `entry`.
 
         Returns:
             str: A string representation of the directory tree.
@@ -939,23 +1299,24 @@ class DirectoryParser:
                 "An entry must be provided to get_tree_string. Call parser.parse() first."
             )
 
-        tree_string = ""
-        indent_str: str = "    " * indent_level
-        prefix: str = "+-- " if indent_level > 0 else ""
+        lines: List[str] = []
+        stack: List[Tuple[DirectoryEntry, int]] = [(entry, indent_level)]
+        while stack:
+            current, level = stack.pop()
+            indent_str: str = "    " * level
+            prefix: str = "+-- " if level > 0 else ""
 
-        entry_display_name = f"{entry.name}/" if entry.is_folder() else entry.name
-        hash_display = (
-            f" [hash: {entry.file_hash}]" if entry.is_file() and entry.file_hash else ""
-        )
-        size_display = f" ({entry.size} bytes)" if entry.is_file() else ""
-        tree_string += f"{indent_str}{prefix}{entry_display_name}{size_display}{hash_display}\n"
-
-        sorted_children = sorted(entry.children, key=lambda e: (e.is_file(), e.name.lower()))
+            entry_display_name = f"{current.name}/" if current.is_folder() else current.name
+            hash_display = (
+                f" [hash: {current.file_hash}]" if current.is_file() and current.file_hash else ""
+            )
+            size_display = f" ({current.size} bytes)" if current.is_file() else ""
+            lines.append(f"{indent_str}{prefix}{entry_display_name}{size_display}{hash_display}\n")
 
-        for child in sorted_children:
-            tree_string += self.get_tree_string(child, indent_level + 1)
+            sorted_children = sorted(current.children, key=lambda e: (e.is_file(), e.name.lower()))
+            stack.extend((child, level + 1) for child in reversed(sorted_children))
 
-        return tree_string
+        return "".join(lines)
 
     def print_tree(
         self, entry: Optional[DirectoryEntry] = None, indent_level: int = 0
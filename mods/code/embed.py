@@ -1,17 +1,104 @@
+import hashlib
+import io
 import json
 import logging
 import os
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import numpy as np
 from tree_sitter_language_pack import get_parser
 
-from ..llms import generate_embed
+from ..llms import generate_embed, get_embedding_cache_stats
+from .ann_index import ANN_MIN_ROWS, ANN_NPROBE, IVFIndex
+from .index_store import SEARCH_DTYPES, IndexStore, SearchMatrix
 
 logger = logging.getLogger("VerbalCodeAI.CodeEmbed")
 
+def decode_source(source_bytes: bytes) -> str:
+    """Decode file bytes the way text-mode ``open(..., errors="replace")`` would.
+
+    Args:
+        source_bytes (bytes): Raw file content.
+
+    Returns:
+        str: UTF-8 decoded text with universal newlines.
+    """
+    return io.TextIOWrapper(io.BytesIO(source_bytes), encoding="utf-8", errors="replace").read()
+
+
+def chunk_text_hash(text: str) -> str:
+    """Hash the text of a chunk, ignoring line endings and trailing whitespace.
+
+    The hash identifies a chunk across versions of its file, so chunks that did
+    not change keep their stored embeddings.
+
+    Args:
+        text (str): Chunk text.
+
+    Returns:
+        str: Hex SHA-256 digest of the normalized text.
+    """
+    normalized = "\n".join(line.rstrip() for line in text.splitlines()).strip("\n")
+    return hashlib.sha256(normalized.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+_parser_cache: Dict[str, Any] = {}
+_failed_parsers: Set[str] = set()
+_parser_cache_lock = threading.Lock()
+
+
+def get_language_parser(language: str) -> Optional[Any]:
+    """Return the process-wide tree-sitter parser of a language, creating it on first use.
+
+    Args:
+        language (str): tree-sitter language name, e.g. "python".
+
+    Returns:
+        Optional[Any]: The parser, or None if it cannot be created.
+    """
+    parser = _parser_cache.get(language)
+    if parser is not None or language in _failed_parsers:
+        return parser
+    with _parser_cache_lock:
+        parser = _parser_cache.get(language)
+        if parser is None and language not in _failed_parsers:
+            try:
+                parser = get_parser(language)
+                _parser_cache[language] = parser
+            except Exception as e:
+                logger.warning(f"Failed to initialize parser for {language}: {e}")
+                _failed_parsers.add(language)
+        return parser
+
+
+class _LazyParsers(Mapping):
+    """Read-only view of the parser cache that creates parsers when they are looked up.
+
+    Iterating only yields the parsers created so far.
+    """
+
+    def __init__(self, languages: Iterable[str]):
+        self._languages: Set[str] = set(languages)
+
+    def __getitem__(self, language: str) -> Any:
+        parser = get_language_parser(language) if language in self._languages else None
+        if parser is None:
+            raise KeyError(language)
+        return parser
+
+    def __iter__(self) -> Iterator[str]:
+        return (language for language in list(_parser_cache) if language in self._languages)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 class CodeChunker:
     """
     A class to chunk code files using tree-sitter for intelligent code splitting.
@@ -87,26 +174,25 @@ class CodeChunker:
     }
 
     def __init__(self):
-        """Initialize CodeChunker with parsers."""
-        self.parsers: Dict[str, Any] = {}
-        self._init_parsers()
+        """Initialize CodeChunker.
 
-    def _init_parsers(self):
-        """Initialize tree-sitter parsers for supported languages."""
-        initialized_parsers: set[str] = set()
-        failed_parsers: set[str] = set()
+        Parsers are not created here: they are created on first use per language and
+        shared by every CodeChunker of the process. Call warm_parsers() to create them
+        up front for the languages of a directory scan.
+        """
+        self.parsers: Mapping[str, Any] = _LazyParsers(self.SUPPORTED_LANGUAGES.values())
 
-        for lang in self.SUPPORTED_LANGUAGES.values():
-            if lang in initialized_parsers or lang in failed_parsers:
-                continue
+    def warm_parsers(self, extensions: Iterable[str]) -> List[str]:
+        """Create the parsers of the languages used by the given file extensions.
 
-            try:
-                self.parsers[lang] = get_parser(lang)
-                initialized_parsers.add(lang)
-            except Exception as e:
-                if lang not in failed_parsers:
-                    logger.warning(f"Failed to initialize parser for {lang}: {e}")
-                    failed_parsers.add(lang)
+        Args:
+            extensions (Iterable[str]): File extensions including the dot, e.g. from a directory scan.
+
+        Returns:
+            List[str]: Languages whose parsers are ready.
+        """
+        languages = {self.SUPPORTED_LANGUAGES.get(ext.lower()) for ext in extensions if ext}
+        return sorted(lang for lang in languages if lang and get_language_parser(lang) is not None)
 
     def _detect_language(self, file_path: str) -> Optional[str]:
         """Detect programming language from file extension.
@@ -144,12 +230,14 @@ class CodeChunker:
         ext: str = os.path.splitext(file_path)[1].lower()
         return ext in self.TEXT_FILE_EXTENSIONS
 
-    def chunk_file(self, file_path: str, min_chunk_size: int = 50) -> List[Dict[str, Any]]:
+    def chunk_file(self, file_path: str, min_chunk_size: int = 50,
+                   source_bytes: Optional[bytes] = None) -> List[Dict[str, Any]]:
         """Chunk a code file into semantically meaningful parts using tree-sitter.
 
         Args:
             file_path (str): Path to the code file.
             min_chunk_size (int): Minimum size of a chunk in characters.
+            source_bytes (Optional[bytes]): Already-read file content. If None, the file is read from disk.
 
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing chunk info (text, type, start_line, end_line).
@@ -161,12 +249,13 @@ class CodeChunker:
 
         if not language or language not in self.parsers:
             if self.is_text_file(file_path):
-                return self._chunk_generic_text_file(file_path, min_chunk_size)
+                return self._chunk_generic_text_file(file_path, min_chunk_size, source_bytes)
             else:
                 raise ValueError(f"Unsupported language for file: {file_path}")
 
-        with open(file_path, 'rb') as f:
-            source_bytes: bytes = f.read()
+        if source_bytes is None:
+            with open(file_path, 'rb') as f:
+                source_bytes = f.read()
 
         parser = self.parsers[language]
         tree = parser.parse(source_bytes)
@@ -470,12 +559,14 @@ class CodeChunker:
         end_byte = nodes[-1].end_byte
         return source_bytes[start_byte:end_byte].decode('utf-8', errors='replace')
 
-    def _chunk_generic_text_file(self, file_path: str, min_chunk_size: int = 50) -> List[Dict[str, Any]]:
+    def _chunk_generic_text_file(self, file_path: str, min_chunk_size: int = 50,
+                                 source_bytes: Optional[bytes] = None) -> List[Dict[str, Any]]:
         """Process a generic text file by splitting it into manageable chunks.
 
         Args:
             file_path (str): Path to the text file.
             min_chunk_size (int): Minimum size of a chunk in characters.
+            source_bytes (Optional[bytes]): Already-read file content. If None, the file is read from disk.
 
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing chunk info.
@@ -483,8 +574,11 @@ class CodeChunker:
         chunks: List[Dict[str, Any]] = []
 
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                lines: List[str] = f.readlines()
+            if source_bytes is not None:
+                lines: List[str] = io.StringIO(decode_source(source_bytes)).readlines()
+            else:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    lines = f.readlines()
 
             if not lines:
                 return []
@@ -594,30 +688,51 @@ class CodeEmbedding:
         Returns:
             np.ndarray: Embeddings for the code chunks.
         """
-        start_time = time.time()
-        self.total_chunks += len(chunks)
         texts: List[str] = [chunk['text'] for chunk in chunks]
-        embeddings: List[List[float]] = generate_embed(texts)
-        embeddings_array: np.ndarray = np.array(embeddings)
+        return self.postprocess_embeddings(self.embed_texts(texts))
 
-        if self.use_dimensionality_reduction:
-            embeddings_array = self._apply_dimensionality_reduction(embeddings_array)
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in a single provider call, without dimensionality reduction.
 
-        self.embedding_time += time.time() - start_time
-        self.total_embeddings += len(chunks)
+        This is the unit of work of the indexer's cross-file embedding batcher.
+
+        Args:
+            texts (List[str]): Texts to embed.
 
+        Returns:
+            np.ndarray: (len(texts), dims) float32 embeddings.
+        """
+        start_time = time.time()
+        embeddings_array: np.ndarray = np.array(generate_embed(texts), dtype=np.float32)
+        self.embedding_time += time.time() - start_time
         return embeddings_array
 
-    def process_file(self, file_path: str) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    def postprocess_embeddings(self, embeddings: np.ndarray) -> np.ndarray:
+        """Apply dimensionality reduction (if enabled) to one file's embeddings and count them.
+
+        Args:
+            embeddings (np.ndarray): Raw embeddings from embed_texts().
+
+        Returns:
+            np.ndarray: Embeddings ready to be stored.
+        """
+        self.total_chunks += len(embeddings)
+        if self.use_dimensionality_reduction:
+            embeddings = self._apply_dimensionality_reduction(embeddings)
+        self.total_embeddings += len(embeddings)
+        return embeddings
+
+    def process_file(self, file_path: str, source_bytes: Optional[bytes] = None) -> Tuple[List[Dict[str, Any]], np.ndarray]:
         """Process a file to generate chunks and their embeddings.
 
         Args:
             file_path (str): Path to the file.
+            source_bytes (Optional[bytes]): Already-read file content. If None, the file is read from disk.
 
         Returns:
             Tuple[List[Dict[str, Any]], np.ndarray]: Chunks and their embeddings.
         """
-        chunks: List[Dict[str, Any]] = self.chunker.chunk_file(file_path)
+        chunks: List[Dict[str, Any]] = self.chunker.chunk_file(file_path, source_bytes=source_bytes)
         embeddings: np.ndarray = self.embed_chunks(chunks)
         return chunks, embeddings
 
@@ -714,29 +829,132 @@ class CodeEmbedding:
             "embedding_time": self.embedding_time,
             "avg_embedding_time": avg_embedding_time,
             "dimensionality_reduction": self.use_dimensionality_reduction,
-            "reduced_dims": self.reduced_dims if self.use_dimensionality_reduction else None
+            "reduced_dims": self.reduced_dims if self.use_dimensionality_reduction else None,
+            "embedding_cache": get_embedding_cache_stats(),
         }
 
+@dataclass(frozen=True)
+class _RowUpdates:
+    """Rows changed in memory since the search matrix was loaded.
+
+    Searches read the whole snapshot at once, so an update never shows them a
+    mask and a vector block of different lengths.
+    """
+
+    vectors: np.ndarray
+    """Normalized (U, D) float32 vectors of updated files, stored after the matrix rows."""
+    dead: Optional[np.ndarray]
+    """Boolean mask over matrix and update rows whose file was replaced or removed."""
+
+
+class StoreChunkMap(Mapping):
+    """Read-only mapping of file key to chunk list, loaded lazily from the index store.
+
+    Only the most recently used files are kept in memory, so memory use does not
+    grow with the size of the repository.
+    """
+
+    def __init__(self, index_store: IndexStore, files: List[Dict[str, Any]], cache_size: int = 256):
+        """Initialize the mapping from a search matrix file table.
+
+        Args:
+            index_store (IndexStore): Store to read chunk lists from.
+            files (List[Dict[str, Any]]): File table of a SearchMatrix.
+            cache_size (int): Number of files whose chunks are kept in memory.
+        """
+        self.index_store: IndexStore = index_store
+        self.paths: Dict[str, str] = {entry["key"]: entry["path"] for entry in files}
+        self.cache_size: int = max(1, cache_size)
+        self._cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, file_key: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            if file_key in self._cache:
+                self._cache.move_to_end(file_key)
+                return self._cache[file_key]
+
+        path = self.paths[file_key]
+        record = self.index_store.get_record(path)
+        chunks = record.get("chunks", []) if record else []
+
+        with self._lock:
+            self._cache[file_key] = chunks
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return chunks
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
 class SimilaritySearch:
     """
     A class for efficient similarity search in code embeddings.
     Uses optimized vector search algorithms with caching and performance enhancements.
     """
 
-    def __init__(self, embeddings_dir: str = "embeddings", cache_size: int = None):
+    SCORE_BLOCK_ROWS = 65536
+    # Pending in-place updates larger than this share of the matrix trigger a full reload
+    MAX_UPDATE_RATIO = 0.25
+    MIN_UPDATE_ROWS = 4096
+
+    def __init__(self, embeddings_dir: str = "embeddings", cache_size: int = None,
+                 index_store: Optional[IndexStore] = None):
         """Initialize SimilaritySearch with embeddings directory.
 
         Args:
             embeddings_dir (str): Directory containing the embeddings.
             cache_size (int): Number of recent queries to cache. If None, uses EMBEDDING_CACHE_SIZE from .env.
+            index_store (Optional[IndexStore]): Index store to read from. If None, the store next to
+                embeddings_dir is used when one exists, otherwise the legacy per-file layout is read.
         """
         self.embeddings_dir: str = embeddings_dir
+        index_dir: str = os.path.dirname(os.path.abspath(embeddings_dir))
+        if index_store is None and IndexStore.exists(index_dir):
+            index_store = IndexStore(index_dir)
+        self.index_store: Optional[IndexStore] = index_store
         self.embeddings: Dict[str, np.ndarray] = {}
-        self.chunks: Dict[str, List[Dict[str, Any]]] = {}
+        self.chunks: Mapping = {}
         self.normalized_embeddings: Dict[str, np.ndarray] = {}
+        self.search_matrix: Optional[SearchMatrix] = None
+        self.matrix: Optional[np.ndarray] = None
+        self.dims: int = 0
+        self.row_files: np.ndarray = np.empty(0, dtype=np.int32)
+        self.row_chunks: np.ndarray = np.empty(0, dtype=np.int32)
+        self.file_keys: List[str] = []
+        self.ann_index: Optional[IVFIndex] = None
+        self._base_rows: int = 0
+        self._row_updates: _RowUpdates = _RowUpdates(np.zeros((0, 0), dtype=np.float32), None)
+        self._updated_chunks: Dict[str, List[Dict[str, Any]]] = {}
+        self._removed_keys: Set[str] = set()
+        self._file_index: Dict[str, int] = {}
+        self._update_lock = threading.Lock()
 
         from os import environ
 
+        self.use_ann: bool = environ.get("EMBEDDING_ANN", "TRUE").upper() == "TRUE"
+        self.ann_min_rows: int = ANN_MIN_ROWS
+        self.ann_nprobe: int = ANN_NPROBE
+
+        self.matrix_dtype: str = environ.get("EMBEDDING_MATRIX_DTYPE", "float32").strip().lower()
+        if self.matrix_dtype not in SEARCH_DTYPES:
+            logger.warning(
+                "Invalid EMBEDDING_MATRIX_DTYPE in .env, using default: float32"
+            )
+            self.matrix_dtype = "float32"
+
+        try:
+            self.rerank_factor = int(environ.get("EMBEDDING_RERANK_FACTOR", "4"))
+        except (ValueError, TypeError):
+            self.rerank_factor = 4
+            logger.warning(
+                f"Invalid EMBEDDING_RERANK_FACTOR in .env, using default: {self.rerank_factor}"
+            )
+
         if cache_size is None:
             try:
                 cache_size = int(environ.get("EMBEDDING_CACHE_SIZE", "100"))
@@ -769,7 +987,33 @@ class SimilaritySearch:
         self.search_time: float = 0.0
 
     def load_embeddings(self):
-        """Load all embeddings from the embeddings directory and pre-normalize them."""
+        """Load all embeddings from the index store (or legacy embeddings directory) and pre-normalize them.
+
+        With an index store the pre-normalized search matrix is memory-mapped, so
+        only the pages touched by a search are read from disk. Only the normalized
+        vectors are kept; ``self.embeddings`` refers to the same arrays.
+        """
+        self.embeddings = {}
+        self.chunks = {}
+        self.normalized_embeddings = {}
+        self.search_matrix = None
+        self.matrix = None
+        self.dims = 0
+        self.row_files = np.empty(0, dtype=np.int32)
+        self.row_chunks = np.empty(0, dtype=np.int32)
+        self.file_keys = []
+        self.ann_index = None
+        self.query_cache = {}
+        self._row_updates = _RowUpdates(np.zeros((0, 0), dtype=np.float32), None)
+        self._updated_chunks = {}
+        self._removed_keys = set()
+
+        if self.index_store is not None and IndexStore.exists(self.index_store.index_dir):
+            self._load_from_index_store()
+            self._base_rows = len(self.row_files)
+            self._file_index = {key: idx for idx, key in enumerate(self.file_keys)}
+            return
+
         if not os.path.exists(self.embeddings_dir):
             return
 
@@ -782,13 +1026,7 @@ class SimilaritySearch:
 
                 if os.path.exists(meta_path):
                     try:
-                        self.embeddings[base_name] = np.load(embed_path)["embeddings"]
-                        norms = np.linalg.norm(
-                            self.embeddings[base_name], axis=1, keepdims=True
-                        )
-                        self.normalized_embeddings[base_name] = self.embeddings[
-                            base_name
-                        ] / (norms + 1e-8)
+                        self._add_legacy_embeddings(base_name, np.load(embed_path)["embeddings"])
 
                         with open(meta_path) as f:
                             data = json.load(f)
@@ -814,14 +1052,7 @@ class SimilaritySearch:
                             data = json.load(f)
 
                             if isinstance(data, dict) and "embeddings" in data and isinstance(data["embeddings"], list):
-                                self.embeddings[base_name] = np.array(data["embeddings"])
-
-                                norms = np.linalg.norm(
-                                    self.embeddings[base_name], axis=1, keepdims=True
-                                )
-                                self.normalized_embeddings[base_name] = self.embeddings[
-                                    base_name
-                                ] / (norms + 1e-8)
+                                self._add_legacy_embeddings(base_name, data["embeddings"])
 
                                 if "chunks" in data:
                                     self.chunks[base_name] = data["chunks"]
@@ -836,9 +1067,9 @@ class SimilaritySearch:
 
                                         if len(embeddings_data) > 0:
                                             if isinstance(embeddings_data[0], (list, tuple)) and len(embeddings_data[0]) > 0:
-                                                self.embeddings[base_name] = np.array(embeddings_data)
+                                                file_embeddings = embeddings_data
                                             elif isinstance(embeddings_data[0], (int, float)):
-                                                self.embeddings[base_name] = np.array([embeddings_data])
+                                                file_embeddings = [embeddings_data]
                                             else:
                                                 logger.warning(f"Unknown embedding format in {json_path}: {type(embeddings_data[0])}")
                                                 continue
@@ -846,13 +1077,7 @@ class SimilaritySearch:
                                             logger.warning(f"Empty embeddings list in {json_path}")
                                             continue
 
-                                        norms = np.linalg.norm(
-                                            self.embeddings[base_name], axis=1, keepdims=True
-                                        )
-                                        self.normalized_embeddings[base_name] = self.embeddings[
-                                            base_name
-                                        ] / (norms + 1e-8)
-
+                                        self._add_legacy_embeddings(base_name, file_embeddings)
                                         self.chunks[base_name] = data["chunks"]
 
                                         json_files_loaded += 1
@@ -867,44 +1092,449 @@ class SimilaritySearch:
             else:
                 logger.warning("No embeddings could be loaded from either NPZ or JSON files.")
 
-    def search(
-        self, query: str, top_k: int = 5, threshold: float = None
-    ) -> List[Dict[str, Any]]:
-        """Search for similar code chunks using optimized cosine similarity.
+        self._stack_legacy_embeddings()
+        self._base_rows = len(self.row_files)
+        self._file_index = {key: idx for idx, key in enumerate(self.file_keys)}
+
+    def _add_legacy_embeddings(self, file_key: str, embeddings: Any) -> None:
+        """Normalize one file's legacy embeddings and keep only the normalized copy.
 
         Args:
-            query (str): The search query.
-            top_k (int): The number of results to return.
-            threshold (float): The minimum similarity score threshold. If None, uses the default threshold.
+            file_key (str): Key the embeddings are stored under.
+            embeddings (Any): Array or nested list of chunk vectors.
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.normalized_embeddings[file_key] = vectors / (norms + 1e-8)
+        self.embeddings[file_key] = self.normalized_embeddings[file_key]
+
+    def _stack_legacy_embeddings(self) -> None:
+        """Stack the per-file legacy embeddings into one matrix with a row table.
+
+        Files whose dimensionality differs from the first file are left out of
+        the matrix, as they could never be compared against the same query.
+        """
+        if not self.normalized_embeddings:
+            return
+
+        dims = None
+        blocks: List[np.ndarray] = []
+        for file_key, vectors in self.normalized_embeddings.items():
+            if vectors.ndim < 2:
+                vectors = vectors.reshape(1, -1)
+            if vectors.size == 0:
+                continue
+            if dims is None:
+                dims = vectors.shape[1]
+            elif vectors.shape[1] != dims:
+                logger.warning(f"Skipping {file_key}: embedding dimensions {vectors.shape[1]} != {dims}")
+                continue
+            blocks.append(vectors)
+            self.file_keys.append(file_key)
+
+        if not blocks:
+            return
+
+        counts = [len(block) for block in blocks]
+        self.matrix = np.concatenate(blocks).astype(np.float32, copy=False)
+        self.dims = dims
+        self.row_files = np.repeat(np.arange(len(blocks), dtype=np.int32), counts)
+        self.row_chunks = np.concatenate([np.arange(count, dtype=np.int32) for count in counts])
+
+        start = 0
+        for file_key, count in zip(self.file_keys, counts):
+            self.normalized_embeddings[file_key] = self.matrix[start:start + count]
+            start += count
+        self.embeddings = self.normalized_embeddings
+
+    def _load_from_index_store(self) -> None:
+        """Memory-map the pre-normalized search matrix of the index store.
+
+        Per-file views in ``self.normalized_embeddings`` are only provided for
+        float matrices; quantized matrices are searched through ``self.search_matrix``.
+        """
+        self.index_store.reload()
+        search_matrix = self.index_store.open_search_matrix(
+            self.matrix_dtype, self.ann_min_rows if self.use_ann else None
+        )
+        if search_matrix is None:
+            logger.info("Index store holds no chunk embeddings")
+            return
+
+        self.search_matrix = search_matrix
+        self.matrix = search_matrix.vectors
+        self.dims = search_matrix.dims
+        self.row_files = search_matrix.rows[:, 0]
+        self.row_chunks = search_matrix.rows[:, 1]
+        self.file_keys = [entry["key"] for entry in search_matrix.files]
+        self.ann_index = search_matrix.ann
+        if not search_matrix.quantized:
+            for entry in search_matrix.files:
+                start = entry["start"]
+                self.normalized_embeddings[entry["key"]] = search_matrix.vectors[start:start + entry["count"]]
+            self.embeddings = self.normalized_embeddings
+        self.chunks = StoreChunkMap(self.index_store, search_matrix.files, max(256, self.cache_size))
+
+        logger.info(
+            f"Mapped {search_matrix.vectors.shape[0]} {self.matrix_dtype} chunk embeddings "
+            f"for {len(search_matrix.files)} files from the index store"
+        )
+
+    def update_file(self, file_key: str, chunks: List[Dict[str, Any]], embeddings: Any) -> None:
+        """Replace the rows of one file in memory. See update_files().
+
+        Args:
+            file_key (str): Key of the file (its path relative to the indexed root).
+            chunks (List[Dict[str, Any]]): New chunks of the file.
+            embeddings (Any): (chunks, dims) embeddings of the chunks.
+        """
+        self.update_files([(file_key, chunks, embeddings)])
+
+    def update_files(self, files: Iterable[Tuple[str, List[Dict[str, Any]], Any]]) -> None:
+        """Replace the rows of changed files in memory, without rebuilding the search matrix.
+
+        The old rows of the files are masked out and their new vectors are searched
+        from a float32 block next to the matrix. If the updated rows would exceed
+        MAX_UPDATE_RATIO of the matrix, the index store is reloaded instead.
+
+        Args:
+            files (Iterable[Tuple[str, List[Dict[str, Any]], Any]]): (file key, chunks, embeddings)
+                per changed file; the key is the file path relative to the indexed root.
+        """
+        changed: List[Tuple[str, List[Dict[str, Any]], np.ndarray]] = []
+        for file_key, chunks, embeddings in files:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            if vectors.size == 0:
+                vectors = np.zeros((0, self.dims), dtype=np.float32)
+            elif vectors.ndim == 1:
+                vectors = vectors.reshape(1, -1)
+            if len(vectors) and self.dims and vectors.shape[1] != self.dims:
+                logger.warning(f"Not updating {file_key}: embedding dimensions {vectors.shape[1]} != {self.dims}")
+                continue
+            changed.append((file_key, chunks, vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-8)))
+        if not changed:
+            return
+
+        new_rows = sum(len(vectors) for _, _, vectors in changed)
+        if self.index_store is not None and len(self._row_updates.vectors) + new_rows > max(
+            self.MIN_UPDATE_ROWS, self.MAX_UPDATE_RATIO * self._base_rows
+        ):
+            logger.info(f"Reloading search matrix instead of updating {len(changed)} files in memory")
+            self.load_embeddings()
+            return
+
+        with self._update_lock:
+            file_idxs = [self._file_idx(file_key) for file_key, _, _ in changed]
+            updates = self._row_updates
+            dead = self._dead_rows_of(file_idxs, updates.dead)
+
+            start = len(updates.vectors)
+            blocks = [vectors for _, _, vectors in changed if len(vectors)]
+            update_vectors = updates.vectors
+            if blocks:
+                update_vectors = np.concatenate(([updates.vectors] if start else []) + blocks)
+                # Longer row tables are harmless to searches still using the previous snapshot
+                self.row_files = np.concatenate([self.row_files] + [
+                    np.full(len(vectors), file_idx, dtype=self.row_files.dtype)
+                    for file_idx, (_, _, vectors) in zip(file_idxs, changed)
+                ])
+                self.row_chunks = np.concatenate([self.row_chunks] + [
+                    np.arange(len(vectors), dtype=self.row_chunks.dtype) for _, _, vectors in changed
+                ])
+                if dead is not None:
+                    dead = np.concatenate([dead, np.zeros(len(update_vectors) - start, dtype=bool)])
+                self.dims = self.dims or update_vectors.shape[1]
+            self._row_updates = _RowUpdates(update_vectors, dead)
+
+            keep_views = self.search_matrix is None or not self.search_matrix.quantized
+            for file_key, chunks, vectors in changed:
+                if len(vectors) and keep_views:
+                    self.normalized_embeddings[file_key] = update_vectors[start:start + len(vectors)]
+                else:
+                    self.normalized_embeddings.pop(file_key, None)
+                start += len(vectors)
+                self._updated_chunks[file_key] = chunks
+                self._removed_keys.discard(file_key)
+            self.query_cache = {}
+
+    def remove_files(self, file_keys: Iterable[str]) -> None:
+        """Drop the rows of removed files from the in-memory search.
+
+        Args:
+            file_keys (Iterable[str]): Keys of the files (their paths relative to the indexed root).
+        """
+        with self._update_lock:
+            file_keys = [key for key in file_keys if key in self._file_index]
+            if not file_keys:
+                return
+            updates = self._row_updates
+            dead = self._dead_rows_of([self._file_index[key] for key in file_keys], updates.dead)
+            self._row_updates = _RowUpdates(updates.vectors, dead)
+            for file_key in file_keys:
+                self.normalized_embeddings.pop(file_key, None)
+                self._updated_chunks[file_key] = []
+                self._removed_keys.add(file_key)
+            self.query_cache = {}
+
+    def _file_idx(self, file_key: str) -> int:
+        """Return the index of a file in ``self.file_keys``, adding the file if it is new."""
+        file_idx = self._file_index.get(file_key)
+        if file_idx is None:
+            file_idx = len(self.file_keys)
+            self.file_keys.append(file_key)
+            self._file_index[file_key] = file_idx
+        return file_idx
+
+    def _dead_rows_of(self, file_idxs: List[int], dead: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Return a copy of the dead-row mask with every row of the given files marked.
+
+        Args:
+            file_idxs (List[int]): Indices of the files in ``self.file_keys``.
+            dead (Optional[np.ndarray]): Current mask, None if no row is dead.
 
         Returns:
-            List[Dict[str, Any]]: A list of dictionaries containing matched chunks and their scores.
+            Optional[np.ndarray]: The new mask, None if still no row is dead.
         """
-        if threshold is None:
-            threshold = self.default_threshold
-        self.total_searches += 1
-        start_time = time.time()
-        cache_key = f"{query}:{top_k}:{threshold}"
+        total_rows = self._base_rows + len(self._row_updates.vectors)
+        rows = np.flatnonzero(np.isin(self.row_files[:total_rows], file_idxs))
+        if not len(rows):
+            return dead
+        dead = np.zeros(total_rows, dtype=bool) if dead is None else dead.copy()
+        dead[rows] = True
+        return dead
 
-        if cache_key in self.query_cache:
-            self.cache_hits += 1
-            logger.debug(f"Cache hit for query: {query}")
-            return self.query_cache[cache_key]
+    def _search_rows(self, queries: np.ndarray, top_k: int, threshold: float) -> List[Tuple[int, float]]:
+        """Find the best matrix rows for one or more normalized queries.
 
-        self.cache_misses += 1
-        logger.debug(f"Cache miss for query: {query}, generating embedding")
+        With several queries each row keeps its best score. For quantized matrices
+        the approximate top ``top_k * rerank_factor`` rows are re-scored with the
+        exact float32 vectors before the final selection.
+
+        Args:
+            queries (np.ndarray): A (D,) query vector or a (Q, D) query matrix.
+            top_k (int): Number of rows to return.
+            threshold (float): Minimum similarity score.
+
+        Returns:
+            List[Tuple[int, float]]: (row, score) pairs ordered by descending score.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        updates = self._row_updates
+        row_ids, similarities = self._score_candidates(queries, updates)
+        if similarities.ndim == 2:
+            similarities = similarities.max(axis=0)
+
+        if self.search_matrix is not None and self.search_matrix.quantized and self.rerank_factor > 0:
+            positions = self._select_rows(similarities, top_k * self.rerank_factor, -np.inf)
+            rows = positions if row_ids is None else row_ids[positions]
+            exact = self._exact_scores(queries, rows, updates.vectors)
+            if exact.ndim == 2:
+                exact = exact.max(axis=0)
+            return [(int(rows[i]), float(exact[i])) for i in self._select_rows(exact, top_k, threshold)]
+
+        positions = self._select_rows(similarities, top_k, threshold)
+        if row_ids is not None:
+            return [(int(row_ids[pos]), float(similarities[pos])) for pos in positions]
+        return [(int(pos), float(similarities[pos])) for pos in positions]
+
+    def _score_candidates(self, queries: np.ndarray, updates: _RowUpdates) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """Score normalized queries against the candidate rows of the embedding matrix.
+
+        With an ANN index only the rows of the probed inverted lists are scored;
+        otherwise every row is scored. Rows updated in memory are always candidates
+        and rows of replaced or removed files never are.
+
+        Args:
+            queries (np.ndarray): A (D,) query vector or a (Q, D) query matrix.
+            updates (_RowUpdates): Snapshot of the in-memory row updates.
+
+        Returns:
+            Tuple[Optional[np.ndarray], np.ndarray]: Candidate row ids (None for all rows)
+            and their (C,) or (Q, C) cosine similarities.
+        """
+        if self.ann_index is not None:
+            row_ids = self.ann_index.candidates(queries, self.ann_nprobe)
+            if len(updates.vectors):
+                update_rows = np.arange(self._base_rows, self._base_rows + len(updates.vectors), dtype=row_ids.dtype)
+                row_ids = np.concatenate([row_ids, update_rows])
+            if updates.dead is not None:
+                row_ids = row_ids[~updates.dead[row_ids]]
+            return row_ids, self._score_rows(queries, row_ids, updates.vectors)
+
+        similarities = self._score_rows(queries, None, updates.vectors)
+        if updates.dead is not None:
+            alive = np.flatnonzero(~updates.dead)
+            return alive, similarities[..., alive]
+        return None, similarities
+
+    def _score_rows(self, queries: np.ndarray, row_ids: Optional[np.ndarray] = None,
+                    update_vectors: Optional[np.ndarray] = None) -> np.ndarray:
+        """Score normalized queries against matrix rows and rows updated in memory.
+
+        Args:
+            queries (np.ndarray): A (D,) query vector or a (Q, D) query matrix.
+            row_ids (Optional[np.ndarray]): Rows to score. None scores every row.
+            update_vectors (Optional[np.ndarray]): Vectors of the rows after the matrix rows.
+
+        Returns:
+            np.ndarray: (N,) or (Q, N) float32 cosine similarities.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        if update_vectors is None or not len(update_vectors):
+            return self._score_matrix_rows(queries, row_ids)
+        if row_ids is None:
+            return np.concatenate([self._score_matrix_rows(queries), queries @ update_vectors.T], axis=-1)
+
+        updated = row_ids >= self._base_rows
+        scores = np.empty(queries.shape[:-1] + (len(row_ids),), dtype=np.float32)
+        scores[..., ~updated] = self._score_matrix_rows(queries, row_ids[~updated])
+        scores[..., updated] = queries @ update_vectors[row_ids[updated] - self._base_rows].T
+        return scores
+
+    def _score_matrix_rows(self, queries: np.ndarray, row_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Score normalized queries against rows of the embedding matrix.
+
+        Quantized matrices are scored asymmetrically: the query stays float32 and
+        only the stored codes are approximated.
+
+        Args:
+            queries (np.ndarray): A (D,) query vector or a (Q, D) query matrix.
+            row_ids (Optional[np.ndarray]): Rows to score. None scores every row.
+
+        Returns:
+            np.ndarray: (N,) or (Q, N) float32 cosine similarities.
+        """
+        if self.matrix is None:
+            return np.zeros(queries.shape[:-1] + (0 if row_ids is None else len(row_ids),), dtype=np.float32)
+        if self.search_matrix is None:
+            matrix = self.matrix if row_ids is None else self.matrix[row_ids]
+            return queries @ matrix.T
+        if row_ids is None and self.matrix.dtype == np.float32:
+            return queries @ self.matrix.T
+
+        # Reduced-precision matrices are scored a block at a time to keep memory bounded
+        num_rows = self.matrix.shape[0] if row_ids is None else len(row_ids)
+        scores = np.empty(queries.shape[:-1] + (num_rows,), dtype=np.float32)
+        for start in range(0, num_rows, self.SCORE_BLOCK_ROWS):
+            end = min(start + self.SCORE_BLOCK_ROWS, num_rows)
+            selection = slice(start, end) if row_ids is None else row_ids[start:end]
+            scores[..., start:end] = self.search_matrix.score(queries, selection)
+        return scores
+
+    def _exact_scores(self, queries: np.ndarray, rows: np.ndarray,
+                      update_vectors: Optional[np.ndarray] = None) -> np.ndarray:
+        """Score queries against the float32 vectors of the index store for re-ranking.
 
+        Args:
+            queries (np.ndarray): A (D,) query vector or a (Q, D) query matrix.
+            rows (np.ndarray): Matrix rows to re-score.
+            update_vectors (Optional[np.ndarray]): Vectors of the rows after the matrix rows.
+
+        Returns:
+            np.ndarray: (R,) or (Q, R) float32 cosine similarities.
+        """
+        vectors = np.empty((len(rows), self.dims), dtype=np.float32)
+        positions_by_file: Dict[int, List[int]] = {}
+        for position, row in enumerate(rows):
+            if row >= self._base_rows:
+                # Rows updated in memory are exact already
+                vectors[position] = update_vectors[row - self._base_rows]
+                continue
+            positions_by_file.setdefault(int(self.row_files[row]), []).append(position)
+
+        for file_idx, positions in positions_by_file.items():
+            entry = self.search_matrix.files[file_idx]
+            selected_rows = rows[positions]
+            try:
+                file_vectors = self.index_store.get_vectors(entry["path"])
+            except (OSError, ValueError) as e:
+                logger.debug(f"Falling back to quantized vectors for {entry['path']}: {e}")
+                file_vectors = None
+            if file_vectors is None or len(file_vectors) != entry["count"]:
+                # The file changed since the matrix was built; keep its approximate vectors
+                vectors[positions] = self.search_matrix.decode(selected_rows)
+                continue
+            selected = file_vectors[self.row_chunks[selected_rows]]
+            vectors[positions] = selected / (np.linalg.norm(selected, axis=1, keepdims=True) + 1e-8)
+
+        return queries @ vectors.T
+
+    @staticmethod
+    def _select_rows(similarities: np.ndarray, top_k: int, threshold: float) -> np.ndarray:
+        """Pick the best-scoring rows at or above the threshold.
+
+        Args:
+            similarities (np.ndarray): (N,) similarity per matrix row.
+            top_k (int): Maximum number of rows to return.
+            threshold (float): Minimum similarity score.
+
+        Returns:
+            np.ndarray: Row indices ordered by descending similarity.
+        """
+        k = min(top_k, similarities.shape[0])
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+
+        if k < similarities.shape[0]:
+            candidates = np.argpartition(similarities, -k)[-k:]
+        else:
+            candidates = np.arange(similarities.shape[0])
+
+        candidates = candidates[similarities[candidates] >= threshold]
+        return candidates[np.argsort(similarities[candidates])[::-1]]
+
+    def _build_result(self, row: int, score: float) -> Dict[str, Any]:
+        """Materialize a search result for one matrix row.
+
+        Args:
+            row (int): Row index in the embedding matrix.
+            score (float): Similarity score of the row.
+
+        Returns:
+            Dict[str, Any]: Result with ``file``, ``chunk`` and ``score`` keys.
+        """
+        file_name = self.file_keys[int(self.row_files[row])]
+        chunk_idx = int(self.row_chunks[row])
+        chunk = None
+        try:
+            chunk_data = self._updated_chunks.get(file_name)
+            if chunk_data is None:
+                chunk_data = self.chunks[file_name]
+            if isinstance(chunk_data, list) and chunk_idx < len(chunk_data):
+                chunk = chunk_data[chunk_idx]
+        except (IndexError, KeyError) as e:
+            logger.warning(f"Error accessing chunk {chunk_idx} for file {file_name}: {e}")
+
+        if chunk is None:
+            chunk = {
+                "text": f"Chunk from {file_name}",
+                "start_line": 0,
+                "end_line": 0,
+                "type": "unknown",
+            }
+
+        return {"file": file_name, "chunk": chunk, "score": score}
+
+    def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query and normalize it to unit length.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            Optional[np.ndarray]: The normalized query vector, or None if it could not be embedded.
+        """
         try:
             query_emb_result = generate_embed(query)
             if not query_emb_result or len(query_emb_result) == 0:
                 logger.warning(f"Failed to generate embedding for query: {query}")
-                return []
+                return None
 
             query_emb: np.ndarray = np.array(query_emb_result[0])
 
             if query_emb.size == 0:
                 logger.warning(f"Query embedding is empty for query: {query}")
-                return []
+                return None
 
             if len(query_emb.shape) == 0:
                 logger.warning(f"Query embedding has wrong shape: {query_emb.shape}")
@@ -912,91 +1542,93 @@ class SimilaritySearch:
                     query_emb = np.array([float(query_emb)])
                     logger.debug(f"Reshaped scalar embedding to 1D array: {query_emb.shape}")
                 except:
-                    return []
+                    return None
 
             query_norm: float = np.linalg.norm(query_emb)
 
             if query_norm < 1e-10:
                 logger.warning(f"Query embedding has near-zero norm: {query_norm}")
-                return []
+                return None
 
-            normalized_query: np.ndarray = query_emb / query_norm
+            return query_emb / query_norm
         except Exception as e:
             logger.error(f"Error generating embedding for query '{query}': {e}")
-            return []
+            return None
 
-        all_results: List[Dict[str, Any]] = []
+    def search_chunks(
+        self, query: str, top_k: int = 10, threshold: float = None
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Search for similar chunks and return them as arrays, without materializing chunk text.
 
-        batch_size = 10
-        file_names = list(self.normalized_embeddings.keys())
+        Used by hybrid retrieval, which fuses rankings by chunk id and only reads the
+        chunks of the final results.
 
-        for i in range(0, len(file_names), batch_size):
-            batch_files = file_names[i : i + batch_size]
+        Args:
+            query (str): The search query.
+            top_k (int): The number of results to return.
+            threshold (float): The minimum similarity score threshold. If None, uses the default threshold.
 
-            for file_name in batch_files:
-                normalized_file_embeddings = self.normalized_embeddings[file_name]
+        Returns:
+            Tuple[List[str], np.ndarray, np.ndarray]: File key, chunk index and score of each
+            result, best first.
+        """
+        if threshold is None:
+            threshold = self.default_threshold
+        empty = ([], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+        if not len(self.row_files):
+            return empty
 
-                if normalized_file_embeddings.size == 0:
-                    logger.warning(f"File embeddings are empty for file: {file_name}")
-                    continue
+        normalized_query: Optional[np.ndarray] = self._embed_query(query)
+        if normalized_query is None or self.dims != normalized_query.shape[0]:
+            return empty
 
-                if len(normalized_file_embeddings.shape) < 2:
-                    normalized_file_embeddings = normalized_file_embeddings.reshape(1, -1)
+        results: List[Tuple[int, float]] = self._search_rows(normalized_query, top_k, threshold)
+        rows = np.array([row for row, _ in results], dtype=np.int64)
+        scores = np.array([score for _, score in results], dtype=np.float64)
+        keys = [self.file_keys[file_idx] for file_idx in self.row_files[rows].tolist()]
+        return keys, self.row_chunks[rows].astype(np.int64), scores
 
-                if normalized_file_embeddings.shape[1] != normalized_query.shape[0]:
-                    logger.warning(f"Incompatible dimensions for matrix multiplication: file embeddings shape {normalized_file_embeddings.shape}, query shape {normalized_query.shape}")
-                    continue
+    def search(
+        self, query: str, top_k: int = 5, threshold: float = None
+    ) -> List[Dict[str, Any]]:
+        """Search for similar code chunks using optimized cosine similarity.
 
-                try:
-                    similarities: np.ndarray = normalized_file_embeddings @ normalized_query
-                except Exception as e:
-                    logger.error(f"Error computing similarities for file {file_name}: {e}")
-                    continue
-
-                if threshold > 0:
-                    mask = similarities >= threshold
-                    if not np.any(mask):
-                        continue
-
-                    indices = np.where(mask)[0]
-                    if len(indices) == 0:
-                        continue
-
-                    top_indices = indices[
-                        np.argsort(similarities[indices])[
-                            -min(top_k, len(indices)) :
-                        ][::-1]
-                    ]
-                else:
-                    top_indices: np.ndarray = np.argsort(similarities)[
-                        -min(top_k, len(similarities)) :
-                    ][::-1]
-
-                for idx in top_indices:
-                    score = float(similarities[idx])
-                    if score >= threshold:
-                        try:
-                            chunk_data = self.chunks[file_name]
-                            if isinstance(chunk_data, list) and idx < len(chunk_data):
-                                chunk = chunk_data[idx]
-                            else:
-                                chunk = {
-                                    "text": f"Chunk from {file_name}",
-                                    "start_line": 0,
-                                    "end_line": 0,
-                                    "type": "unknown",
-                                }
-
-                            all_results.append(
-                                {"file": file_name, "chunk": chunk, "score": score}
-                            )
-                        except (IndexError, KeyError) as e:
-                            logger.warning(
-                                f"Error accessing chunk {idx} for file {file_name}: {e}"
-                            )
-
-        all_results.sort(key=lambda x: x["score"], reverse=True)
-        top_results = all_results[:top_k]
+        Args:
+            query (str): The search query.
+            top_k (int): The number of results to return.
+            threshold (float): The minimum similarity score threshold. If None, uses the default threshold.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries containing matched chunks and their scores.
+        """
+        if threshold is None:
+            threshold = self.default_threshold
+        self.total_searches += 1
+        start_time = time.time()
+        cache_key = f"{query}:{top_k}:{threshold}"
+
+        if cache_key in self.query_cache:
+            self.cache_hits += 1
+            logger.debug(f"Cache hit for query: {query}")
+            return self.query_cache[cache_key]
+
+        self.cache_misses += 1
+        logger.debug(f"Cache miss for query: {query}, generating embedding")
+
+        normalized_query: Optional[np.ndarray] = self._embed_query(query)
+        if normalized_query is None:
+            return []
+
+        top_results: List[Dict[str, Any]] = []
+
+        if len(self.row_files) > 0:
+            if self.dims != normalized_query.shape[0]:
+                logger.warning(f"Incompatible dimensions for matrix multiplication: embedding dimensions {self.dims}, query shape {normalized_query.shape}")
+            else:
+                top_results = [
+                    self._build_result(row, score)
+                    for row, score in self._search_rows(normalized_query, top_k, threshold)
+                ]
 
         search_duration = time.time() - start_time
         self.search_time += search_duration
@@ -1016,6 +1648,8 @@ class SimilaritySearch:
         """Search using multiple queries and combine results.
 
         This is useful when using query optimization to try multiple search terms.
+        All variations are embedded in one call and scored with a single matrix
+        product; each chunk is ranked by its best score across the variations.
 
         Args:
             queries (List[str]): List of search queries.
@@ -1033,56 +1667,56 @@ class SimilaritySearch:
         if len(queries) == 1:
             return self.search(queries[0], top_k, threshold)
 
-        logger.debug(f"Performing multi-query search with {len(queries)} variations")
+        self.total_searches += 1
         start_time = time.time()
+        cache_key = f"{'|'.join(queries)}:{top_k}:{threshold}:multi"
 
-        per_query_top_k = min(top_k * 2, 20)
-
-        all_results: Dict[Tuple[str, int], Dict[str, Any]] = {}
-
-        query_contributions = {}
-
-        for i, query in enumerate(queries):
-            try:
-                results = self.search(query, per_query_top_k, threshold)
-
-                for result in results:
-                    file_name = result["file"]
-
-                    try:
-                        chunk = result["chunk"]
-                        chunk_idx = self.chunks[file_name].index(chunk)
-                    except (ValueError, KeyError, IndexError):
-                        start_line = chunk.get("start_line", 0)
-                        end_line = chunk.get("end_line", 0)
-                        chunk_idx = f"{start_line}-{end_line}"
-
-                    key = (file_name, chunk_idx)
+        if cache_key in self.query_cache:
+            self.cache_hits += 1
+            logger.debug(f"Cache hit for {len(queries)} query variations")
+            return self.query_cache[cache_key]
 
-                    if key not in query_contributions:
-                        query_contributions[key] = []
-                    query_contributions[key].append(i)
+        self.cache_misses += 1
+        logger.debug(f"Performing multi-query search with {len(queries)} variations")
 
-                    if (
-                        key not in all_results
-                        or result["score"] > all_results[key]["score"]
-                    ):
-                        all_results[key] = result
+        try:
+            query_embeddings = generate_embed(list(queries))
+        except Exception as e:
+            logger.error(f"Error generating embeddings for {len(queries)} query variations: {e}")
+            return []
 
-            except Exception as e:
-                logger.error(f"Error processing query variation '{query}': {e}")
+        normalized_queries: List[np.ndarray] = []
+        for query, query_emb_result in zip(queries, query_embeddings or []):
+            query_emb = np.asarray(query_emb_result, dtype=np.float32).reshape(-1)
+            query_norm = np.linalg.norm(query_emb)
+            if query_emb.size == 0 or query_norm < 1e-10:
+                logger.warning(f"Skipping query variation with empty embedding: {query}")
                 continue
+            normalized_queries.append(query_emb / query_norm)
 
-        combined_results = list(all_results.values())
-        combined_results.sort(key=lambda x: x["score"], reverse=True)
+        final_results: List[Dict[str, Any]] = []
 
-        final_results = combined_results[:top_k]
+        if normalized_queries and len(self.row_files) > 0:
+            query_matrix = np.vstack(normalized_queries)
+            if self.dims != query_matrix.shape[1]:
+                logger.warning(f"Incompatible dimensions for matrix multiplication: embedding dimensions {self.dims}, query shape {query_matrix.shape}")
+            else:
+                # Each chunk keeps its best score over all variations
+                final_results = [
+                    self._build_result(row, score)
+                    for row, score in self._search_rows(query_matrix, top_k, threshold)
+                ]
 
         search_duration = time.time() - start_time
+        self.search_time += search_duration
         logger.debug(
             f"Multi-query search completed in {search_duration:.4f}s with {len(final_results)} results"
         )
 
+        if len(self.query_cache) >= self.cache_size:
+            self.query_cache.pop(next(iter(self.query_cache)))
+        self.query_cache[cache_key] = final_results
+
         return final_results
 
     def get_performance_stats(self) -> Dict[str, Any]:
@@ -1091,6 +1725,7 @@ class SimilaritySearch:
         Returns:
             Dict[str, Any]: Dictionary with performance metrics.
         """
+        updates = self._row_updates
         avg_search_time = self.search_time / max(1, self.total_searches)
         cache_hit_rate = self.cache_hits / max(1, self.total_searches) * 100
 
@@ -1101,6 +1736,9 @@ class SimilaritySearch:
             "cache_hit_rate": cache_hit_rate,
             "avg_search_time": avg_search_time,
             "total_search_time": self.search_time,
-            "num_files": len(self.embeddings),
-            "total_chunks": sum(len(chunks) for chunks in self.chunks.values()),
+            "num_files": len(self.file_keys) - len(self._removed_keys),
+            "total_chunks": len(self.row_files) - (0 if updates.dead is None else int(updates.dead.sum())),
+            "updated_chunks": len(updates.vectors),
+            "matrix_dtype": self.matrix_dtype if self.search_matrix is not None else "float32",
+            "ann_enabled": self.ann_index is not None,
         }
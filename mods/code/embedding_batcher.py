@@ -0,0 +1,214 @@
+"""Cross-file batching of embedding requests.
+
+Indexing workers submit the chunk texts of one file at a time. The batcher
+packs texts from many files into token-budgeted provider requests, keeps up
+to ``max_in_flight`` of them running concurrently, and scatters the returned
+vectors back to the future of the file each text came from.
+"""
+
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("TaskHeroAI.EmbeddingBatcher")
+
+BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "8000"))
+BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "100"))
+MAX_IN_FLIGHT = int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", "4"))
+BATCH_LINGER_MS = int(os.getenv("EMBEDDING_BATCH_LINGER_MS", "50"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text (about four characters per token).
+
+    Args:
+        text (str): Text to estimate.
+
+    Returns:
+        int: Estimated number of tokens, at least 1.
+    """
+    return len(text) // 4 + 1
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    future: concurrent.futures.Future
+    vectors: List[Optional[np.ndarray]] = field(default_factory=list)
+    remaining: int = 0
+
+
+class EmbeddingBatcher:
+    """Collects texts from many callers into token-budgeted embedding batches.
+
+    Usage:
+        with EmbeddingBatcher(code_embedder.embed_texts) as batcher:
+            future = batcher.submit([chunk["text"] for chunk in chunks])
+            embeddings = future.result()
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_tokens: int = BATCH_MAX_TOKENS,
+                 max_batch_items: int = BATCH_MAX_ITEMS,
+                 max_in_flight: int = MAX_IN_FLIGHT,
+                 linger_ms: int = BATCH_LINGER_MS):
+        """Initialize the batcher and start its dispatcher thread.
+
+        Args:
+            embed_fn (Callable[[List[str]], np.ndarray]): Embeds a list of texts in one provider call.
+            max_batch_tokens (int): Estimated token budget of one batch.
+            max_batch_items (int): Maximum number of texts in one batch.
+            max_in_flight (int): Maximum number of batches sent concurrently.
+            linger_ms (int): How long a partial batch waits for more texts before it is sent.
+        """
+        self.embed_fn = embed_fn
+        self.max_batch_tokens: int = max(1, max_batch_tokens)
+        self.max_batch_items: int = max(1, max_batch_items)
+        self.max_in_flight: int = max(1, max_in_flight)
+        self.linger: float = max(0, linger_ms) / 1000.0
+
+        self._pending: Deque[Tuple[_Request, int, int]] = deque()
+        self._pending_tokens: int = 0
+        self._condition = threading.Condition()
+        self._scatter_lock = threading.Lock()
+        self._closed: bool = False
+        self._flush_requested: bool = False
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="embed-batch"
+        )
+
+        self.batches_sent: int = 0
+        self.texts_sent: int = 0
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="embed-batcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, texts: List[str]) -> concurrent.futures.Future:
+        """Queue texts for embedding.
+
+        Args:
+            texts (List[str]): Texts of one caller, e.g. the chunks of one file.
+
+        Returns:
+            concurrent.futures.Future: Resolves to a (len(texts), dims) float32 array.
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+
+        request = _Request(texts=list(texts), future=future, vectors=[None] * len(texts), remaining=len(texts))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            for index, text in enumerate(request.texts):
+                tokens = estimate_tokens(text)
+                self._pending.append((request, index, tokens))
+                self._pending_tokens += tokens
+            self._condition.notify()
+        return future
+
+    def flush(self) -> None:
+        """Send queued texts without waiting for a full batch."""
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify()
+
+    def cancel(self) -> None:
+        """Drop queued texts that have not been sent yet and cancel their futures."""
+        with self._condition:
+            for request, _, _ in self._pending:
+                request.future.cancel()
+            self._pending.clear()
+            self._pending_tokens = 0
+
+    def close(self) -> None:
+        """Send everything still queued and wait for all batches to finish."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "EmbeddingBatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _batch_ready(self) -> bool:
+        return (
+            self._pending_tokens >= self.max_batch_tokens
+            or len(self._pending) >= self.max_batch_items
+            or self._flush_requested
+            or self._closed
+        )
+
+    def _take_batch(self) -> List[Tuple[_Request, int, int]]:
+        batch: List[Tuple[_Request, int, int]] = []
+        tokens = 0
+        while self._pending and len(batch) < self.max_batch_items:
+            item_tokens = self._pending[0][2]
+            # An oversized text still goes out, alone
+            if batch and tokens + item_tokens > self.max_batch_tokens:
+                break
+            batch.append(self._pending.popleft())
+            tokens += item_tokens
+        self._pending_tokens -= tokens
+        if not self._pending:
+            self._flush_requested = False
+        return batch
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending and self._closed:
+                    return
+                if not self._batch_ready():
+                    deadline = time.monotonic() + self.linger
+                    while not self._batch_ready():
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                batch = self._take_batch()
+
+            self._in_flight.acquire()
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[_Request, int, int]]) -> None:
+        try:
+            texts = [item[0].texts[item[1]] for item in batch]
+            try:
+                vectors = np.asarray(self.embed_fn(texts), dtype=np.float32)
+                if vectors.ndim != 2 or vectors.shape[0] != len(texts):
+                    raise ValueError(f"Expected {len(texts)} embeddings, got shape {vectors.shape}")
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+                for request in {id(item[0]): item[0] for item in batch}.values():
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                return
+
+            with self._scatter_lock:
+                self.batches_sent += 1
+                self.texts_sent += len(texts)
+                for (request, index, _), vector in zip(batch, vectors):
+                    if request.future.done():
+                        continue
+                    request.vectors[index] = vector
+                    request.remaining -= 1
+                    if request.remaining == 0:
+                        request.future.set_result(np.vstack(request.vectors))
+        finally:
+            self._in_flight.release()
@@ -0,0 +1,225 @@
+"""Shared snapshot of the indexable text files of a project.
+
+Search tools (grep, regex search, find_functions, ...) used to walk the whole
+tree on every call. A FileSnapshot walks it once and keeps the indexable text
+files with their extension and size, so a tool call can start reading file
+contents immediately. The snapshot is owned by the FileIndexer and stays
+current in two ways:
+
+- it is rebuilt when it is older than FILE_SNAPSHOT_TTL_SECONDS, which covers
+  changes nobody reported;
+- paths reported by watch mode (FileIndexer.apply_file_changes) are updated in
+  place on the next access, without walking the tree.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from .directory import DirectoryEntry, DirectoryParser, EntryType
+
+logger = logging.getLogger("TaskHeroAI.FileSnapshot")
+
+try:
+    FILE_SNAPSHOT_TTL_SECONDS = float(os.getenv("FILE_SNAPSHOT_TTL_SECONDS", "30"))
+except ValueError:
+    FILE_SNAPSHOT_TTL_SECONDS = 30.0
+    logger.warning(f"Invalid FILE_SNAPSHOT_TTL_SECONDS in .env, using default: {FILE_SNAPSHOT_TTL_SECONDS}")
+
+
+@dataclass(frozen=True)
+class SnapshotFile:
+    """
+    An indexable text file of the snapshot.
+
+    Attributes:
+        path (str): Absolute path.
+        rel_path (str): Path relative to the project root, '/'-separated.
+        name (str): File name.
+        extension (str): Lower-case extension with the dot (".py"), or "" if none.
+        size (int): Size in bytes when the file was last seen.
+        modified_time (float): Last modified timestamp when the file was last seen.
+    """
+
+    path: str
+    rel_path: str
+    name: str
+    extension: str
+    size: int
+    modified_time: float
+
+
+class FileSnapshot:
+    """Cached list of the indexable text files below an indexer's root.
+
+    Usage:
+        snapshot = FileSnapshot(indexer)
+        for file in snapshot.files():
+            print(file.rel_path, file.size)
+        snapshot.invalidate([changed_path])  # updated on the next files() call
+    """
+
+    def __init__(self, indexer: Any, ttl_seconds: Optional[float] = None):
+        """Initialize the snapshot. The tree is not walked until files() is called.
+
+        Args:
+            indexer (FileIndexer): Indexer whose root, .gitignore and file filters are used.
+            ttl_seconds (Optional[float]): Age after which the snapshot is rebuilt. Zero or
+                less rebuilds it on every call. If None, uses FILE_SNAPSHOT_TTL_SECONDS from .env.
+        """
+        self.indexer: Any = indexer
+        self.ttl_seconds: float = FILE_SNAPSHOT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+
+        self.version: int = 0
+        self.rebuilds: int = 0
+        self.updated_paths: int = 0
+
+        self._files: Dict[str, SnapshotFile] = {}
+        self._sorted: Optional[Tuple[SnapshotFile, ...]] = None
+        self._built_at: Optional[float] = None
+        self._dirty: Set[str] = set()
+        self._parser: Optional[DirectoryParser] = None
+        self._lock = threading.RLock()
+
+    def files(self) -> Tuple[SnapshotFile, ...]:
+        """Get the indexable text files, rebuilding or updating the snapshot if needed.
+
+        Concurrent callers wait for a single rebuild instead of each walking the tree.
+
+        Returns:
+            Tuple[SnapshotFile, ...]: Files sorted by relative path. The tuple is never
+            modified, so it can be iterated while the snapshot changes.
+        """
+        with self._lock:
+            if self._built_at is None or time.monotonic() - self._built_at >= self.ttl_seconds:
+                self._rebuild()
+            elif self._dirty:
+                self._update_dirty_paths()
+            if self._sorted is None:
+                self._sorted = tuple(sorted(self._files.values(), key=lambda file: file.rel_path))
+            return self._sorted
+
+    def invalidate(self, paths: Optional[Iterable[str]] = None) -> None:
+        """Mark paths as changed, or the whole snapshot as stale.
+
+        Args:
+            paths (Optional[Iterable[str]]): Created, modified or deleted files or
+                directories. If None, the tree is walked again on the next access.
+        """
+        with self._lock:
+            if paths is None:
+                self._built_at = None
+                return
+            for path in paths:
+                path = os.path.abspath(path)
+                if os.path.basename(path) == ".gitignore":
+                    self._built_at = None
+                self._dirty.add(path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot statistics.
+
+        Returns:
+            Dict[str, Any]: Dictionary with snapshot metrics.
+        """
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "version": self.version,
+                "rebuilds": self.rebuilds,
+                "updated_paths": self.updated_paths,
+                "pending_paths": len(self._dirty),
+                "age_seconds": None if self._built_at is None else time.monotonic() - self._built_at,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _create_parser(self) -> DirectoryParser:
+        return DirectoryParser(
+            self.indexer.root_path,
+            gitignore_path=self.indexer.gitignore_path,
+            parallel=False,
+            hash_files=False,
+        )
+
+    def _rebuild(self) -> None:
+        """Walk the tree and replace the snapshot."""
+        start = time.monotonic()
+        self._parser = self._create_parser()
+        files: Dict[str, SnapshotFile] = {}
+        for entry in self._parser.walk_files():
+            snapshot_file = self._snapshot_file(entry)
+            if snapshot_file is not None:
+                files[entry.path] = snapshot_file
+
+        self._files = files
+        self._sorted = None
+        self._dirty.clear()
+        self._built_at = time.monotonic()
+        self.rebuilds += 1
+        self.version += 1
+        logger.info(
+            f"File snapshot of {self.indexer.root_path}: {len(files)} of "
+            f"{self._parser.file_count} files in {self._built_at - start:.2f}s"
+        )
+
+    def _update_dirty_paths(self) -> None:
+        """Bring the reported paths up to date without walking the tree."""
+        dirty, self._dirty = self._dirty, set()
+        for path in dirty:
+            self._files.pop(path, None)
+            if os.path.isfile(path):
+                if not self._parser.is_path_ignored(path):
+                    entry = self._file_entry(path)
+                    snapshot_file = self._snapshot_file(entry) if entry is not None else None
+                    if snapshot_file is not None:
+                        self._files[path] = snapshot_file
+                continue
+
+            # A deleted, moved or replaced directory takes its files with it
+            prefix = path + os.sep
+            for stale_path in [p for p in self._files if p.startswith(prefix)]:
+                del self._files[stale_path]
+            if os.path.isdir(path) and not self._parser.is_path_ignored(path, True):
+                for entry in self._parser.walk_files(path):
+                    snapshot_file = self._snapshot_file(entry)
+                    if snapshot_file is not None:
+                        self._files[entry.path] = snapshot_file
+
+        self._sorted = None
+        self.updated_paths += len(dirty)
+        self.version += 1
+
+    def _file_entry(self, path: str) -> Optional[DirectoryEntry]:
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+        return DirectoryEntry(
+            name=os.path.basename(path),
+            path=path,
+            parent=os.path.dirname(path),
+            entry_type=EntryType.FILE,
+            size=file_stat.st_size,
+            extension=os.path.splitext(path)[1].lstrip("."),
+            modified_time=file_stat.st_mtime,
+        )
+
+    def _snapshot_file(self, entry: DirectoryEntry) -> Optional[SnapshotFile]:
+        """Turn a walked file into a snapshot file, or None if it is not indexable text."""
+        try:
+            if not self.indexer._should_index_file(entry):
+                return None
+        except Exception as e:
+            logger.debug(f"Leaving {entry.path} out of the file snapshot: {e}")
+            return None
+        return SnapshotFile(
+            path=entry.path,
+            rel_path=os.path.relpath(entry.path, self.indexer.root_path).replace(os.sep, "/"),
+            name=entry.name,
+            extension=os.path.splitext(entry.name)[1].lower(),
+            size=entry.size,
+            modified_time=entry.modified_time,
+        )
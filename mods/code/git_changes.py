@@ -0,0 +1,149 @@
+"""Git-based change detection for indexed repositories.
+
+A full change check stats every file of the project. In a git repository,
+git already tracks what changed: ``git diff --name-only <commit>`` lists the
+tracked files that differ between the last indexed commit and the working
+tree, and ``git status --porcelain`` lists untracked and locally modified
+files. Together with the files that were dirty when the index was written,
+they are the only files whose indexed version can be out of date, so the
+check costs O(changes) instead of O(repository size).
+
+Every git call returns None when git is missing, the directory is not a work
+tree, or the recorded commit no longer exists, and callers then fall back to
+scanning the file system.
+
+Git does not report every file the indexer may have indexed. The indexer
+honours .gitignore files and .git/info/exclude but not the global excludes
+file (core.excludesFile), so files ignored only there are indexed yet never
+listed. Changes inside submodules and nested repositories show up only as the
+submodule or directory path, and files marked assume-unchanged or
+skip-worktree are not listed at all. This is why the detection is opt-in.
+"""
+
+import logging
+import os
+import subprocess
+from typing import List, Optional, Set
+
+logger = logging.getLogger("TaskHeroAI.GitChanges")
+
+GIT_TIMEOUT_SECONDS = 60
+
+
+class GitChangeDetector:
+    """Lists the files of a directory that git reports as changed.
+
+    Usage:
+        detector = GitChangeDetector("/path/to/project")
+        commit = detector.head_commit()
+        ...
+        paths = detector.changed_since(commit)
+    """
+
+    def __init__(self, root_path: str):
+        """Initialize the detector. Git is not called until it is needed.
+
+        Args:
+            root_path (str): Directory to report changes for; may be a subdirectory of the repository.
+        """
+        self.root_path: str = os.path.abspath(root_path)
+        self._prefix: Optional[str] = None
+        self._available: Optional[bool] = None
+
+    def is_available(self) -> bool:
+        """Check whether git is installed and the root directory is inside a work tree.
+
+        Returns:
+            bool: True if changes can be read from git.
+        """
+        if self._available is None:
+            output = self._run("rev-parse", "--is-inside-work-tree", "--show-prefix")
+            lines = output.splitlines() if output is not None else []
+            self._available = bool(lines) and lines[0] == "true"
+            # Paths in git output are relative to the repository root, not to root_path
+            self._prefix = lines[1] if self._available and len(lines) > 1 else ""
+            if not self._available:
+                logger.debug(f"Git change detection unavailable for {self.root_path}")
+        return self._available
+
+    def head_commit(self) -> Optional[str]:
+        """Get the commit checked out in the work tree.
+
+        Returns:
+            Optional[str]: The commit id, or None without git or before the first commit.
+        """
+        if not self.is_available():
+            return None
+        output = self._run("rev-parse", "--verify", "--quiet", "HEAD^{commit}")
+        if not output:
+            return None
+        return output.strip()
+
+    def dirty_paths(self) -> Optional[Set[str]]:
+        """List files that are modified, staged, deleted or untracked (excluding ignored files).
+
+        Returns:
+            Optional[Set[str]]: Absolute paths, or None if git cannot tell.
+        """
+        if not self.is_available():
+            return None
+        output = self._run("status", "--porcelain=v1", "-z", "--untracked-files=all", "--no-renames", "--", ".")
+        if output is None:
+            return None
+        # Records are "XY <path>"; with --no-renames there is no second path
+        return self._absolute_paths(record[3:] for record in output.split("\0") if len(record) > 3)
+
+    def changed_since(self, commit: str) -> Optional[Set[str]]:
+        """List files whose working tree content may differ from a commit.
+
+        Args:
+            commit (str): Commit the index was last brought up to date with.
+
+        Returns:
+            Optional[Set[str]]: Absolute paths of changed, added and deleted files, or None if
+            git is unavailable or the commit is unknown (e.g. after a rebase and gc).
+        """
+        if not commit or not self.is_available():
+            return None
+        if self._run("cat-file", "-e", f"{commit}^{{commit}}") is None:
+            logger.info(f"Last indexed commit {commit[:12]} is not in the repository")
+            return None
+
+        diff = self._run("diff", "--name-only", "-z", "--no-renames", commit, "--", ".")
+        dirty = self.dirty_paths()
+        if diff is None or dirty is None:
+            return None
+        return self._absolute_paths(diff.split("\0")) | dirty
+
+    def _absolute_paths(self, repo_paths) -> Set[str]:
+        paths: Set[str] = set()
+        for repo_path in repo_paths:
+            if not repo_path or not repo_path.startswith(self._prefix):
+                continue
+            paths.add(os.path.join(self.root_path, *repo_path[len(self._prefix):].split("/")))
+        return paths
+
+    def _run(self, *args: str) -> Optional[str]:
+        """Run a git command in the root directory.
+
+        Args:
+            *args (str): Git arguments.
+
+        Returns:
+            Optional[str]: Standard output, or None if git is missing or the command failed.
+        """
+        command: List[str] = ["git", "-c", "core.quotepath=off", *args]
+        try:
+            result = subprocess.run(
+                command,
+                cwd=self.root_path,
+                capture_output=True,
+                timeout=GIT_TIMEOUT_SECONDS,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"git {' '.join(args)} failed: {e}")
+            return None
+        if result.returncode != 0:
+            logger.debug(f"git {' '.join(args)} exited with {result.returncode}: {result.stderr.decode(errors='replace').strip()}")
+            return None
+        return os.fsdecode(result.stdout)
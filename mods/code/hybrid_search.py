@@ -0,0 +1,342 @@
+"""Hybrid retrieval: several rankings of the indexed chunks fused into one.
+
+Search front-ends used to merge semantic and BM25 results through
+dictionaries keyed by "path:start:end" strings, building a ContextChunk per
+candidate and sorting after every merge. HybridSearch instead asks each
+ranker (TF-IDF semantic search, BM25 keyword search, embedding similarity,
+...) for its top candidates concurrently, as arrays of integer chunk ids, and
+fuses them with NumPy in one pass:
+
+- "rrf" (reciprocal rank fusion): a chunk scores sum(weight * (k + 1) /
+  (k + rank)) over the rankings it appears in, so rankers whose scores live on
+  different scales mix safely;
+- "weighted": a chunk scores sum(weight * score / best score of the ranking).
+
+Fused scores are divided by the best attainable score, so a chunk ranked
+first by every ranker scores 1.0. Only the chunks of the final ids have to be
+materialized by the caller.
+
+Chunk ids are shared by every ranker in the process: ``chunk_ids`` numbers
+each file path once and a chunk id is ``file id << CHUNK_INDEX_BITS | chunk
+index``.
+"""
+
+import concurrent.futures
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("TaskHeroAI.HybridSearch")
+
+FUSION_METHODS = ("rrf", "weighted")
+CHUNK_INDEX_BITS = 24
+
+HYBRID_FUSION: str = os.getenv("HYBRID_FUSION", "rrf").lower()
+if HYBRID_FUSION not in FUSION_METHODS:
+    logger.warning(f"Invalid HYBRID_FUSION in .env: {HYBRID_FUSION}, using rrf")
+    HYBRID_FUSION = "rrf"
+
+try:
+    HYBRID_RRF_K = float(os.getenv("HYBRID_RRF_K", "60"))
+except ValueError:
+    HYBRID_RRF_K = 60.0
+    logger.warning(f"Invalid HYBRID_RRF_K in .env, using default: {HYBRID_RRF_K}")
+
+try:
+    HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "50"))
+except ValueError:
+    HYBRID_CANDIDATES = 50
+    logger.warning(f"Invalid HYBRID_CANDIDATES in .env, using default: {HYBRID_CANDIDATES}")
+
+
+class ChunkIds:
+    """Integer ids for indexed chunks, shared by all rankers of the process.
+
+    Usage:
+        ids = chunk_ids.encode(chunk_ids.file_ids(paths), chunk_indexes)
+        paths, chunk_indexes = chunk_ids.decode(ids)
+    """
+
+    def __init__(self):
+        """Initialize an empty id space."""
+        self._file_ids: Dict[str, int] = {}
+        self._paths: List[str] = []
+        self._lock = threading.Lock()
+
+    def file_ids(self, paths: Sequence[str]) -> np.ndarray:
+        """Get the ids of files, numbering files seen for the first time.
+
+        Args:
+            paths (Sequence[str]): File paths.
+
+        Returns:
+            np.ndarray: int64 id of each path.
+        """
+        file_ids = self._file_ids
+        with self._lock:
+            for path in paths:
+                if path not in file_ids:
+                    file_ids[path] = len(self._paths)
+                    self._paths.append(path)
+            return np.fromiter((file_ids[path] for path in paths), dtype=np.int64, count=len(paths))
+
+    @staticmethod
+    def encode(file_ids: np.ndarray, chunk_indexes: np.ndarray) -> np.ndarray:
+        """Combine file ids and chunk indexes into chunk ids.
+
+        Args:
+            file_ids (np.ndarray): File id of each chunk.
+            chunk_indexes (np.ndarray): Index of each chunk within its file.
+
+        Returns:
+            np.ndarray: int64 chunk ids.
+        """
+        return (np.asarray(file_ids, dtype=np.int64) << CHUNK_INDEX_BITS) | np.asarray(chunk_indexes, dtype=np.int64)
+
+    def decode(self, ids: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """Split chunk ids into file paths and chunk indexes.
+
+        Args:
+            ids (np.ndarray): Chunk ids from encode().
+
+        Returns:
+            Tuple[List[str], np.ndarray]: File path and chunk index of each id.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        paths = [self._paths[file_id] for file_id in (ids >> CHUNK_INDEX_BITS).tolist()]
+        return paths, ids & ((1 << CHUNK_INDEX_BITS) - 1)
+
+    def chunk_ids(self, paths: Sequence[str], chunk_indexes: Any) -> np.ndarray:
+        """Get the ids of chunks given by file path and chunk index.
+
+        Args:
+            paths (Sequence[str]): File path of each chunk.
+            chunk_indexes (Any): Array-like index of each chunk within its file.
+
+        Returns:
+            np.ndarray: int64 chunk ids.
+        """
+        return self.encode(self.file_ids(paths), chunk_indexes)
+
+
+# Id space shared by every ranker in the process
+chunk_ids = ChunkIds()
+
+
+@dataclass
+class Ranking:
+    """Chunks ranked by one retriever, or fused, best first.
+
+    Attributes:
+        ids (np.ndarray): int64 chunk ids.
+        scores (np.ndarray): float64 score of each chunk.
+    """
+
+    ids: np.ndarray
+    scores: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "Ranking":
+        """Ranking without chunks."""
+        return cls(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+# ranker(query, top_k) -> Ranking
+Ranker = Callable[[str, int], Ranking]
+
+
+@dataclass
+class HybridSearchConfig:
+    """How HybridSearch fuses its rankers; each caller can pass its own.
+
+    Attributes:
+        fusion (str): "rrf" or "weighted".
+        rrf_k (float): Rank offset of reciprocal rank fusion; larger values flatten the rank weights.
+        weights (Dict[str, float]): Weight of each ranker by name; rankers not listed weigh 1.0.
+            A weight of 0 skips the ranker.
+        candidates (int): Number of candidates taken from each ranker.
+        concurrent (bool): Run the rankers in parallel threads.
+    """
+
+    fusion: str = HYBRID_FUSION
+    rrf_k: float = HYBRID_RRF_K
+    weights: Dict[str, float] = field(default_factory=dict)
+    candidates: int = HYBRID_CANDIDATES
+    concurrent: bool = True
+
+
+def fuse_rankings(rankings: Sequence[Tuple[Ranking, float]], top_k: int, fusion: str = "rrf",
+                  rrf_k: float = HYBRID_RRF_K) -> Ranking:
+    """Fuse rankings of chunk ids into one ranking.
+
+    Ties are broken by chunk id, so the result does not depend on the order of the rankings.
+
+    Args:
+        rankings (Sequence[Tuple[Ranking, float]]): (ranking, weight) pairs; each ranking best first.
+        top_k (int): Number of fused results.
+        fusion (str): "rrf" or "weighted".
+        rrf_k (float): Rank offset of reciprocal rank fusion.
+
+    Returns:
+        Ranking: The best ``top_k`` chunks, with fused scores between 0 and 1.
+    """
+    if fusion not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method: {fusion}")
+    rankings = [(ranking, weight) for ranking, weight in rankings if weight > 0]
+    total_weight = sum(weight for _, weight in rankings)
+    if top_k <= 0 or not any(len(ranking) for ranking, _ in rankings):
+        return Ranking.empty()
+
+    contributions = []
+    for ranking, weight in rankings:
+        if not len(ranking):
+            continue
+        if fusion == "rrf":
+            contributions.append(weight * (rrf_k + 1.0) / (rrf_k + np.arange(1, len(ranking) + 1, dtype=np.float64)))
+        else:
+            best = float(ranking.scores.max())
+            scores = np.asarray(ranking.scores, dtype=np.float64)
+            contributions.append(weight * scores / best if best > 0 else np.zeros(len(ranking)))
+
+    ids = np.concatenate([ranking.ids for ranking, _ in rankings if len(ranking)])
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    fused = np.bincount(inverse, weights=np.concatenate(contributions), minlength=len(unique_ids)) / total_weight
+
+    order = np.arange(len(unique_ids))
+    if len(order) > top_k:
+        # Keep everything tied with the k-th score so ties are broken by id below
+        kth = np.partition(fused, len(fused) - top_k)[len(fused) - top_k]
+        order = np.flatnonzero(fused >= kth)
+    order = order[np.argsort(-fused[order], kind="stable")][:top_k]
+    return Ranking(unique_ids[order], fused[order])
+
+
+class HybridSearch:
+    """Runs several rankers concurrently and fuses their rankings.
+
+    Usage:
+        search = HybridSearch({
+            "semantic": engine.rank_chunks,
+            "bm25": keyword_ranker(service.get_keyword_index),
+        })
+        ranking = search.search("parse gitignore", top_k=10, config=HybridSearchConfig(fusion="weighted"))
+        paths, chunk_indexes = chunk_ids.decode(ranking.ids)
+    """
+
+    def __init__(self, rankers: Dict[str, Ranker], config: Optional[HybridSearchConfig] = None):
+        """Initialize the search.
+
+        Args:
+            rankers (Dict[str, Ranker]): Rankers by name; each returns the top chunks for a query.
+            config (Optional[HybridSearchConfig]): Default configuration. If None, uses the .env settings.
+        """
+        self.rankers: Dict[str, Ranker] = dict(rankers)
+        self.config: HybridSearchConfig = config or HybridSearchConfig()
+
+    def rank(self, query: str, config: Optional[HybridSearchConfig] = None) -> Dict[str, Ranking]:
+        """Get the candidates of every ranker with a positive weight.
+
+        Args:
+            query (str): The search query.
+            config (Optional[HybridSearchConfig]): Configuration for this call.
+
+        Returns:
+            Dict[str, Ranking]: Ranking of each ranker that ran; failed rankers are left out.
+        """
+        config = config or self.config
+        rankers = {name: ranker for name, ranker in self.rankers.items() if config.weights.get(name, 1.0) > 0}
+        if config.concurrent and len(rankers) > 1:
+            executor = _get_executor()
+            futures = {name: executor.submit(ranker, query, config.candidates) for name, ranker in rankers.items()}
+            results = {}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Ranker {name} failed: {e}", exc_info=True)
+            return results
+
+        results = {}
+        for name, ranker in rankers.items():
+            try:
+                results[name] = ranker(query, config.candidates)
+            except Exception as e:
+                logger.error(f"Ranker {name} failed: {e}", exc_info=True)
+        return results
+
+    def search(self, query: str, top_k: int = 10, config: Optional[HybridSearchConfig] = None) -> Ranking:
+        """Rank chunks for a query with every ranker and fuse the rankings.
+
+        Args:
+            query (str): The search query.
+            top_k (int): Number of results.
+            config (Optional[HybridSearchConfig]): Configuration for this call. If None, uses the default.
+
+        Returns:
+            Ranking: The fused top ``top_k`` chunks.
+        """
+        config = config or self.config
+        rankings = self.rank(query, config)
+        return fuse_rankings(
+            [(ranking, config.weights.get(name, 1.0)) for name, ranking in rankings.items()],
+            top_k, config.fusion, config.rrf_k
+        )
+
+
+def keyword_ranker(get_keyword_index: Callable[[], Any]) -> Ranker:
+    """Create a ranker searching a BM25 keyword index.
+
+    Args:
+        get_keyword_index (Callable[[], Any]): Returns the current KeywordIndex, or None.
+
+    Returns:
+        Ranker: The ranker.
+    """
+    def rank(query: str, top_k: int) -> Ranking:
+        keyword_index = get_keyword_index()
+        if keyword_index is None:
+            return Ranking.empty()
+        paths, chunk_indexes, scores = keyword_index.search_chunks(query, top_k)
+        return Ranking(chunk_ids.chunk_ids(paths, chunk_indexes), scores)
+
+    return rank
+
+
+def similarity_ranker(get_similarity_search: Callable[[], Any], root_path: str) -> Ranker:
+    """Create a ranker searching chunk embeddings.
+
+    Args:
+        get_similarity_search (Callable[[], Any]): Returns the current SimilaritySearch, or None.
+        root_path (str): Indexed root; SimilaritySearch keys files by their path relative to it.
+
+    Returns:
+        Ranker: The ranker.
+    """
+    def rank(query: str, top_k: int) -> Ranking:
+        similarity_search = get_similarity_search()
+        if similarity_search is None:
+            return Ranking.empty()
+        keys, chunk_indexes, scores = similarity_search.search_chunks(query, top_k)
+        paths = [os.path.normpath(os.path.join(root_path, key)) for key in keys]
+        return Ranking(chunk_ids.chunk_ids(paths, chunk_indexes), scores)
+
+    return rank
+
+
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="HybridSearch")
+        return _executor
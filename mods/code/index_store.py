@@ -0,0 +1,1001 @@
+"""Segment-based index store for file metadata, descriptions and embeddings.
+
+The store replaces the per-file ``metadata/*.json``, ``descriptions/*.txt`` and
+``embeddings/*.json`` triples with a handful of files:
+
+    <index_dir>/store/
+        manifest.json              live file table and segment list
+        segments/
+            000001.rows.jsonl      one JSON record per indexed file
+            000001.vectors.f32     contiguous float32 chunk vectors (row-major)
+
+Every indexing run appends a single immutable segment. The manifest maps each
+indexed path to the segment, byte offset and vector rows of its newest record,
+so superseded records simply become unreachable. Segments that no longer hold
+any live record are deleted, and the store is compacted into one segment once
+too many segments or too many dead rows accumulate.
+
+For search, the live vectors are additionally materialized as one
+pre-normalized matrix that is opened with ``np.memmap``:
+
+    <index_dir>/store/search/
+        info.json                  generation, dtype and file names of the snapshot
+        vectors-<gen>.npy          (rows, dims) L2-normalized float32/float16 matrix, int8
+                                   codes, or (rows, subvectors) product-quantized codes
+        scales-<gen>.npy           per-row float32 scales of int8 codes
+        pq-<gen>.npy               product quantizer codebooks
+        rows-<gen>.npy             (rows, 2) int32 table: row -> (file index, chunk index)
+        files-<gen>.json           per-file key, path, hash, first row and row count
+        ivf-<gen>.npz              optional IVF approximate nearest neighbour index
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .ann_index import IVFIndex
+from .quantization import PQ_TRAIN_SAMPLES, ProductQuantizer, quantize_int8
+
+logger = logging.getLogger("TaskHeroAI.IndexStore")
+
+STORE_VERSION = 1
+STORE_DIRNAME = "store"
+MANIFEST_NAME = "manifest.json"
+SEGMENTS_DIRNAME = "segments"
+ROWS_SUFFIX = ".rows.jsonl"
+VECTORS_SUFFIX = ".vectors.f32"
+VECTOR_DTYPE = np.float32
+SEARCH_DIRNAME = "search"
+SEARCH_INFO_NAME = "info.json"
+SEARCH_DTYPES = ("float32", "float16", "int8", "pq")
+
+MAX_SEGMENTS = int(os.getenv("INDEX_STORE_MAX_SEGMENTS", "16"))
+MAX_DEAD_RATIO = float(os.getenv("INDEX_STORE_MAX_DEAD_RATIO", "0.5"))
+
+
+class IndexStoreError(Exception):
+    """Exception raised for index store consistency errors."""
+
+    pass
+
+
+@dataclass
+class SearchMatrix:
+    """Memory-mapped, pre-normalized snapshot of all live vectors.
+
+    Attributes:
+        vectors: Read-only matrix of unit-length vectors, or their quantized codes.
+        rows: Read-only (rows, 2) int32 table mapping each row to (file index, chunk index).
+        files: Per-file dicts with ``key``, ``path``, ``hash``, ``start`` and ``count``.
+        generation: Store vector generation the snapshot was built from.
+        ann: IVF index over the rows, or None when only exact search is available.
+        scales: Per-row scales of int8 codes, or None.
+        quantizer: Product quantizer of ``pq`` codes, or None.
+    """
+
+    vectors: np.ndarray
+    rows: np.ndarray
+    files: List[Dict[str, Any]]
+    generation: int
+    ann: Optional[IVFIndex] = None
+    scales: Optional[np.ndarray] = None
+    quantizer: Optional[ProductQuantizer] = None
+
+    @property
+    def dims(self) -> int:
+        """Dimensionality of the encoded vectors."""
+        return self.quantizer.dims if self.quantizer is not None else self.vectors.shape[1]
+
+    @property
+    def quantized(self) -> bool:
+        """Whether rows are stored as int8 or product-quantized codes."""
+        return self.scales is not None or self.quantizer is not None
+
+    def decode(self, selection: Any) -> np.ndarray:
+        """Return float32 (approximate) vectors for a row slice or index array.
+
+        Args:
+            selection (Any): Slice or integer array selecting rows.
+
+        Returns:
+            np.ndarray: (selected rows, dims) float32 vectors.
+        """
+        block = self.vectors[selection]
+        if self.quantizer is not None:
+            return self.quantizer.decode(block)
+        block = np.asarray(block, dtype=np.float32)
+        if self.scales is not None:
+            block = block * self.scales[selection][:, None]
+        return block
+
+    def score(self, queries: np.ndarray, selection: Any) -> np.ndarray:
+        """Score float32 queries against selected rows without decoding product codes.
+
+        Args:
+            queries (np.ndarray): A (dims,) query or a (Q, dims) query matrix.
+            selection (Any): Slice or integer array selecting rows.
+
+        Returns:
+            np.ndarray: (selected rows,) or (Q, selected rows) float32 scores.
+        """
+        if self.quantizer is not None:
+            return self.quantizer.score(queries, self.vectors[selection])
+        scores = queries @ np.asarray(self.vectors[selection], dtype=np.float32).T
+        if self.scales is not None:
+            scores *= self.scales[selection]
+        return scores
+
+
+class DecodedRows:
+    """Float32 row view over a possibly quantized search matrix."""
+
+    def __init__(self, matrix: SearchMatrix):
+        self.matrix = matrix
+        self.shape = (matrix.vectors.shape[0], matrix.dims)
+
+    def __getitem__(self, selection: Any) -> np.ndarray:
+        return self.matrix.decode(selection)
+
+
+class SegmentWriter:
+    """Appends file records and their chunk vectors to a new segment.
+
+    A writer is safe to share between indexing threads. Nothing becomes
+    visible to readers until :meth:`commit` is called.
+    """
+
+    def __init__(self, store: "IndexStore", segment_id: str) -> None:
+        """Initialize the segment writer.
+
+        Args:
+            store (IndexStore): The store this segment belongs to.
+            segment_id (str): Identifier of the segment being written.
+        """
+        self.store = store
+        self.segment_id = segment_id
+        self.dims: Optional[int] = store.dims
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._num_records = 0
+        self._num_vectors = 0
+        self._closed = False
+        self.vectors_changed = True
+
+        rows_path, vectors_path = store._segment_paths(segment_id)
+        self._rows_file = open(rows_path, "wb")
+        self._vectors_file = open(vectors_path, "wb")
+
+    def __enter__(self) -> "SegmentWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    @property
+    def record_count(self) -> int:
+        """int: Number of records appended so far."""
+        return self._num_records
+
+    def add(self, record: Dict[str, Any], embeddings: Any) -> None:
+        """Append a file record and its chunk vectors.
+
+        Args:
+            record (Dict[str, Any]): JSON-serializable record. Must contain ``path``.
+            embeddings (Any): Chunk vectors as an array-like of shape (chunks, dims).
+
+        Raises:
+            IndexStoreError: If the writer is closed or the vector width does not match the store.
+        """
+        vectors = np.asarray(embeddings, dtype=VECTOR_DTYPE)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1) if vectors.size else vectors.reshape(0, self.dims or 0)
+
+        with self._lock:
+            if self._closed:
+                raise IndexStoreError(f"Segment {self.segment_id} is already closed")
+
+            if len(vectors):
+                if self.dims is None:
+                    self.dims = int(vectors.shape[1])
+                elif vectors.shape[1] != self.dims:
+                    raise IndexStoreError(
+                        f"Embedding width {vectors.shape[1]} for {record.get('path')} "
+                        f"does not match index width {self.dims}"
+                    )
+
+            stored = dict(record)
+            stored["vector_offset"] = self._num_vectors
+            stored["vector_count"] = int(len(vectors))
+            line = (json.dumps(stored, ensure_ascii=False) + "\n").encode("utf-8")
+
+            offset = self._rows_file.tell()
+            self._rows_file.write(line)
+            if len(vectors):
+                self._vectors_file.write(np.ascontiguousarray(vectors).tobytes())
+
+            self._entries[record["path"]] = {
+                "segment": self.segment_id,
+                "offset": offset,
+                "hash": record.get("hash"),
+                "modified_time": record.get("modified_time"),
+                "vector_offset": self._num_vectors,
+                "vector_count": int(len(vectors)),
+            }
+            for key in ("description_status", "stat"):
+                if record.get(key) is not None:
+                    self._entries[record["path"]][key] = record[key]
+            self._num_records += 1
+            self._num_vectors += int(len(vectors))
+
+    def commit(self) -> int:
+        """Flush the segment to disk and publish it in the manifest.
+
+        Returns:
+            int: Number of file records published.
+        """
+        with self._lock:
+            if self._closed:
+                return 0
+            self._closed = True
+            self._close_files()
+
+        if not self._entries:
+            self.store._discard_segment_files(self.segment_id)
+            return 0
+
+        self.store._publish_segment(
+            self.segment_id,
+            self._entries,
+            {
+                "records": self._num_records,
+                "vectors": self._num_vectors,
+                "dims": self.dims,
+                "created": time.time(),
+            },
+            vectors_changed=self.vectors_changed,
+        )
+        return len(self._entries)
+
+    def abort(self) -> None:
+        """Discard everything written to this segment."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._close_files()
+        self.store._discard_segment_files(self.segment_id)
+
+    def _close_files(self) -> None:
+        for handle in (self._rows_file, self._vectors_file):
+            try:
+                handle.flush()
+                os.fsync(handle.fileno())
+            except OSError:
+                pass
+            handle.close()
+
+
+class IndexStore:
+    """Consolidated on-disk store for indexed file records and embeddings."""
+
+    def __init__(self, index_dir: str) -> None:
+        """Open (or lazily create) the store inside an index directory.
+
+        Args:
+            index_dir (str): The ``.index`` directory that holds the store.
+        """
+        self.index_dir = index_dir
+        self.store_dir = os.path.join(index_dir, STORE_DIRNAME)
+        self.segments_dir = os.path.join(self.store_dir, SEGMENTS_DIRNAME)
+        self.manifest_path = os.path.join(self.store_dir, MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._manifest = self._load_manifest()
+
+    @staticmethod
+    def exists(index_dir: str) -> bool:
+        """Check whether an index directory contains a store manifest.
+
+        Args:
+            index_dir (str): The ``.index`` directory to check.
+
+        Returns:
+            bool: True if a store manifest exists.
+        """
+        return os.path.isfile(os.path.join(index_dir, STORE_DIRNAME, MANIFEST_NAME))
+
+    @staticmethod
+    def _empty_manifest() -> Dict[str, Any]:
+        return {
+            "version": STORE_VERSION,
+            "generation": 0,
+            "vector_generation": 0,
+            "next_segment": 1,
+            "dims": None,
+            "segments": {},
+            "files": {},
+        }
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if not os.path.exists(self.manifest_path):
+            return self._empty_manifest()
+
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading index store manifest {self.manifest_path}: {e}")
+            return self._empty_manifest()
+
+        if manifest.get("version") != STORE_VERSION:
+            logger.warning(
+                f"Index store version {manifest.get('version')} is not supported "
+                f"(expected {STORE_VERSION}); starting with an empty store"
+            )
+            return self._empty_manifest()
+
+        return manifest
+
+    def _write_manifest(self) -> None:
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, separators=(",", ":"))
+        os.replace(tmp_path, self.manifest_path)
+
+    def _segment_paths(self, segment_id: str) -> Tuple[str, str]:
+        base = os.path.join(self.segments_dir, segment_id)
+        return base + ROWS_SUFFIX, base + VECTORS_SUFFIX
+
+    def _discard_segment_files(self, segment_id: str) -> None:
+        for path in self._segment_paths(segment_id):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove segment file {path}: {e}")
+
+    @property
+    def dims(self) -> Optional[int]:
+        """Optional[int]: Embedding width shared by all vectors in the store."""
+        return self._manifest.get("dims")
+
+    @property
+    def generation(self) -> int:
+        """int: Counter bumped on every change to the set of live records."""
+        return self._manifest.get("generation", 0)
+
+    @property
+    def vector_generation(self) -> int:
+        """int: Generation at which the set of live vectors last changed.
+
+        Rewrites that keep every vector (compaction, record updates) bump
+        :attr:`generation` only, so the search matrix stays valid.
+        """
+        return self._manifest.get("vector_generation", self.generation)
+
+    @property
+    def file_count(self) -> int:
+        """int: Number of live file records."""
+        return len(self._manifest["files"])
+
+    def reload(self) -> None:
+        """Re-read the manifest from disk."""
+        with self._lock:
+            next_segment = self._manifest["next_segment"]
+            self._manifest = self._load_manifest()
+            # Keep ids handed out to still-open writers reserved
+            self._manifest["next_segment"] = max(self._manifest["next_segment"], next_segment)
+
+    def begin_segment(self) -> SegmentWriter:
+        """Start a new segment for an indexing run.
+
+        Returns:
+            SegmentWriter: Writer for the new segment.
+        """
+        with self._lock:
+            os.makedirs(self.segments_dir, exist_ok=True)
+            segment_id = f"{self._manifest['next_segment']:06d}"
+            self._manifest["next_segment"] += 1
+        return SegmentWriter(self, segment_id)
+
+    def put(self, record: Dict[str, Any], embeddings: Any) -> None:
+        """Store a single file record in its own segment.
+
+        Args:
+            record (Dict[str, Any]): JSON-serializable record. Must contain ``path``.
+            embeddings (Any): Chunk vectors as an array-like of shape (chunks, dims).
+        """
+        with self.begin_segment() as writer:
+            writer.add(record, embeddings)
+
+    def update_records(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Replace fields of live records, keeping their vectors.
+
+        The updated records are rewritten into a new segment. A record whose
+        ``hash`` differs from a ``hash`` given in its update is left alone, so
+        updates computed for an older version of a file are dropped.
+
+        Args:
+            updates (Dict[str, Dict[str, Any]]): Fields to set, keyed by file path.
+
+        Returns:
+            int: Number of records updated.
+        """
+        with self._lock:
+            writer = self.begin_segment()
+            writer.vectors_changed = False
+            try:
+                for path, fields in updates.items():
+                    record = self.get_record(path)
+                    if record is None or fields.get("hash", record.get("hash")) != record.get("hash"):
+                        continue
+                    vectors = self.get_vectors(path)
+                    record.pop("vector_offset", None)
+                    record.pop("vector_count", None)
+                    record.update(fields)
+                    writer.add(record, vectors)
+            except Exception:
+                writer.abort()
+                raise
+            return writer.commit()
+
+    def update_entries(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Set fields of live manifest entries without rewriting their records.
+
+        Meant for bookkeeping that is not part of a record, such as refreshed stat
+        signatures. The generation is not bumped, since no record changes.
+
+        Args:
+            updates (Dict[str, Dict[str, Any]]): Fields to set, keyed by file path.
+
+        Returns:
+            int: Number of entries updated.
+        """
+        with self._lock:
+            updated = 0
+            for path, fields in updates.items():
+                entry = self._manifest["files"].get(path)
+                if entry is not None:
+                    entry.update(fields)
+                    updated += 1
+            if updated:
+                self._write_manifest()
+            return updated
+
+    def get_property(self, name: str) -> Any:
+        """Get a value stored in the manifest with :meth:`set_property`.
+
+        Args:
+            name (str): Property name.
+
+        Returns:
+            Any: The stored value, or None.
+        """
+        with self._lock:
+            return self._manifest.get("properties", {}).get(name)
+
+    def set_property(self, name: str, value: Any) -> None:
+        """Store a JSON-serializable value about the index as a whole in the manifest.
+
+        Properties are dropped when the store is cleared.
+
+        Args:
+            name (str): Property name.
+            value (Any): Value to store; None removes the property.
+        """
+        with self._lock:
+            properties = self._manifest.setdefault("properties", {})
+            if value is None:
+                properties.pop(name, None)
+            else:
+                properties[name] = value
+            self._write_manifest()
+
+    def _publish_segment(
+        self, segment_id: str, entries: Dict[str, Dict[str, Any]], info: Dict[str, Any],
+        vectors_changed: bool = True,
+    ) -> None:
+        with self._lock:
+            if info.get("dims") is not None:
+                if self._manifest["dims"] is None:
+                    self._manifest["dims"] = info["dims"]
+                elif self._manifest["dims"] != info["dims"]:
+                    self._discard_segment_files(segment_id)
+                    raise IndexStoreError(
+                        f"Segment {segment_id} has width {info['dims']}, "
+                        f"index has width {self._manifest['dims']}"
+                    )
+
+            self._manifest["segments"][segment_id] = info
+            self._manifest["files"].update(entries)
+            self._manifest["vector_generation"] = self.vector_generation
+            self._manifest["generation"] = self.generation + 1
+            if vectors_changed:
+                self._manifest["vector_generation"] = self.generation
+            self._drop_unreferenced_segments()
+            self._write_manifest()
+            logger.info(f"Published index segment {segment_id} with {len(entries)} files")
+
+            if self._needs_compaction():
+                self.compact()
+
+    def _drop_unreferenced_segments(self) -> None:
+        live_segments = {entry["segment"] for entry in self._manifest["files"].values()}
+        for segment_id in list(self._manifest["segments"]):
+            if segment_id not in live_segments:
+                del self._manifest["segments"][segment_id]
+                self._discard_segment_files(segment_id)
+
+    def _needs_compaction(self) -> bool:
+        segments = self._manifest["segments"]
+        if len(segments) > MAX_SEGMENTS:
+            return True
+        total_records = sum(info.get("records", 0) for info in segments.values())
+        if total_records == 0:
+            return False
+        return 1.0 - self.file_count / total_records > MAX_DEAD_RATIO
+
+    def remove(self, paths: Iterable[str]) -> int:
+        """Remove file records from the store.
+
+        Args:
+            paths (Iterable[str]): Paths of the files to remove.
+
+        Returns:
+            int: Number of records removed.
+        """
+        with self._lock:
+            removed = 0
+            for path in paths:
+                if self._manifest["files"].pop(path, None) is not None:
+                    removed += 1
+            if removed:
+                self._manifest["generation"] = self.generation + 1
+                self._manifest["vector_generation"] = self.generation
+                self._drop_unreferenced_segments()
+                if not self._manifest["files"]:
+                    self._manifest["dims"] = None
+                self._write_manifest()
+            return removed
+
+    def clear(self) -> None:
+        """Delete every segment and reset the manifest."""
+        with self._lock:
+            generation = self.generation
+            if os.path.exists(self.store_dir):
+                shutil.rmtree(self.store_dir, ignore_errors=True)
+            self._manifest = self._empty_manifest()
+            self._manifest["generation"] = generation + 1
+            self._manifest["vector_generation"] = generation + 1
+            self._write_manifest()
+
+    def has_file(self, path: str) -> bool:
+        """Check whether a file has a live record."""
+        return path in self._manifest["files"]
+
+    def list_files(self) -> List[str]:
+        """Get the paths of all live records."""
+        return list(self._manifest["files"].keys())
+
+    def iter_entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over manifest entries without touching segment files.
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: The file path and its entry (segment, hash, modified_time, ...).
+        """
+        with self._lock:
+            items = list(self._manifest["files"].items())
+        yield from items
+
+    def get_record(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read the live record for a file.
+
+        Args:
+            path (str): Path of the indexed file.
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored record, or None if the file is not indexed.
+        """
+        entry = self._manifest["files"].get(path)
+        if entry is None:
+            return None
+
+        rows_path, _ = self._segment_paths(entry["segment"])
+        try:
+            with open(rows_path, "rb") as f:
+                f.seek(entry["offset"])
+                return json.loads(f.readline().decode("utf-8"))
+        except Exception as e:
+            logger.error(f"Error reading index record for {path}: {e}")
+            return None
+
+    def get_vectors(self, path: str) -> np.ndarray:
+        """Read the chunk vectors for a file.
+
+        Args:
+            path (str): Path of the indexed file.
+
+        Returns:
+            np.ndarray: Array of shape (chunks, dims); empty if the file is not indexed.
+        """
+        entry = self._manifest["files"].get(path)
+        dims = self.dims or 0
+        if entry is None or not entry["vector_count"] or not dims:
+            return np.zeros((0, dims), dtype=VECTOR_DTYPE)
+
+        _, vectors_path = self._segment_paths(entry["segment"])
+        itemsize = np.dtype(VECTOR_DTYPE).itemsize
+        data = np.fromfile(
+            vectors_path,
+            dtype=VECTOR_DTYPE,
+            count=entry["vector_count"] * dims,
+            offset=entry["vector_offset"] * dims * itemsize,
+        )
+        return data.reshape(entry["vector_count"], dims)
+
+    def _segment_vectors(self, segment_id: str) -> np.ndarray:
+        info = self._manifest["segments"][segment_id]
+        _, vectors_path = self._segment_paths(segment_id)
+        dims = self.dims or 0
+        if not info.get("vectors") or not dims:
+            return np.zeros((0, dims), dtype=VECTOR_DTYPE)
+        return np.fromfile(vectors_path, dtype=VECTOR_DTYPE).reshape(-1, dims)
+
+    def iter_records(self, with_vectors: bool = False) -> Iterator[Tuple[Dict[str, Any], Optional[np.ndarray]]]:
+        """Iterate over all live records, reading each segment sequentially.
+
+        Args:
+            with_vectors (bool): Whether to also yield each record's chunk vectors.
+
+        Yields:
+            Tuple[Dict[str, Any], Optional[np.ndarray]]: The record and its vectors (None unless requested).
+        """
+        with self._lock:
+            files = dict(self._manifest["files"])
+            segment_ids = sorted(self._manifest["segments"])
+
+        live_offsets: Dict[str, set] = {}
+        for path, entry in files.items():
+            live_offsets.setdefault(entry["segment"], set()).add(entry["offset"])
+
+        for segment_id in segment_ids:
+            offsets = live_offsets.get(segment_id)
+            if not offsets:
+                continue
+
+            rows_path, _ = self._segment_paths(segment_id)
+            try:
+                vectors = self._segment_vectors(segment_id) if with_vectors else None
+                with open(rows_path, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        line_offset = offset
+                        offset += len(line)
+                        if line_offset not in offsets:
+                            continue
+                        record = json.loads(line.decode("utf-8"))
+                        record_vectors = None
+                        if vectors is not None:
+                            start = record["vector_offset"]
+                            record_vectors = vectors[start:start + record["vector_count"]]
+                        yield record, record_vectors
+            except Exception as e:
+                logger.error(f"Error reading index segment {segment_id}: {e}")
+
+    def load_matrix(self) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Load every live record together with one stacked vector matrix.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], np.ndarray]: Records (with ``vector_offset`` rewritten
+            to point into the stacked matrix) and the float32 matrix of shape (rows, dims).
+        """
+        records: List[Dict[str, Any]] = []
+        blocks: List[np.ndarray] = []
+        row = 0
+        for record, vectors in self.iter_records(with_vectors=True):
+            record["vector_offset"] = row
+            records.append(record)
+            if vectors is not None and len(vectors):
+                blocks.append(vectors)
+                row += len(vectors)
+
+        dims = self.dims or 0
+        matrix = np.concatenate(blocks) if blocks else np.zeros((0, dims), dtype=VECTOR_DTYPE)
+        return records, matrix
+
+    def compact(self) -> None:
+        """Rewrite all live records into a single fresh segment."""
+        with self._lock:
+            if not self._manifest["files"]:
+                return
+
+            old_segments = list(self._manifest["segments"])
+            writer = self.begin_segment()
+            writer.vectors_changed = False
+            try:
+                for record, vectors in self.iter_records(with_vectors=True):
+                    record.pop("vector_offset", None)
+                    record.pop("vector_count", None)
+                    writer.add(record, vectors)
+            except Exception:
+                writer.abort()
+                raise
+
+            writer.commit()
+            logger.info(
+                f"Compacted {len(old_segments)} index segments into {writer.segment_id} "
+                f"({writer.record_count} files)"
+            )
+
+    def _search_paths(self, generation: int) -> Dict[str, str]:
+        search_dir = os.path.join(self.store_dir, SEARCH_DIRNAME)
+        return {
+            "vectors": os.path.join(search_dir, f"vectors-{generation}.npy"),
+            "rows": os.path.join(search_dir, f"rows-{generation}.npy"),
+            "files": os.path.join(search_dir, f"files-{generation}.json"),
+            "ivf": os.path.join(search_dir, f"ivf-{generation}.npz"),
+            "scales": os.path.join(search_dir, f"scales-{generation}.npy"),
+            "pq": os.path.join(search_dir, f"pq-{generation}.npy"),
+        }
+
+    def _read_search_info(self) -> Optional[Dict[str, Any]]:
+        info_path = os.path.join(self.store_dir, SEARCH_DIRNAME, SEARCH_INFO_NAME)
+        if not os.path.exists(info_path):
+            return None
+        try:
+            with open(info_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading search matrix info {info_path}: {e}")
+            return None
+
+    def build_search_matrix(self, dtype: str = "float32", ann_min_rows: Optional[int] = None) -> None:
+        """Write a pre-normalized matrix of all live vectors plus its row table.
+
+        Vectors are streamed segment by segment into a memory-mapped ``.npy``
+        file, so building never holds more than one segment in memory.
+
+        Args:
+            dtype (str): Storage format of the matrix: ``"float32"``, ``"float16"``,
+                ``"int8"`` (scalar quantized) or ``"pq"`` (product quantized).
+            ann_min_rows (Optional[int]): Also build an IVF index when the matrix has at
+                least this many rows. None disables the index.
+        """
+        if dtype not in SEARCH_DTYPES:
+            raise ValueError(f"Unsupported search matrix dtype: {dtype}")
+
+        with self._lock:
+            generation = self.vector_generation
+            dims = self.dims or 0
+            total_rows = sum(entry["vector_count"] for _, entry in self.iter_entries())
+            paths = self._search_paths(generation)
+            os.makedirs(os.path.dirname(paths["vectors"]), exist_ok=True)
+
+            previous_info = self._read_search_info()
+            files: List[Dict[str, Any]] = []
+            row = 0
+            if total_rows:
+                row = self._write_search_arrays(paths, files, total_rows, dims, dtype)
+
+            with open(paths["files"], "w", encoding="utf-8") as f:
+                json.dump(files, f, separators=(",", ":"))
+
+            info = {"generation": generation, "dtype": dtype, "dims": dims, "rows": row, "ann": False}
+            if ann_min_rows is not None and row and row >= ann_min_rows:
+                self._build_ann_index(self._map_search_matrix(paths, files, generation, dtype),
+                                      previous_info)
+                info["ann"] = True
+
+            info_path = os.path.join(self.store_dir, SEARCH_DIRNAME, SEARCH_INFO_NAME)
+            tmp_path = info_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(info, f)
+            os.replace(tmp_path, info_path)
+
+            self._discard_stale_search_files(generation, info)
+            logger.info(f"Built {dtype} search matrix with {row} rows for generation {generation}")
+
+    def _write_search_arrays(self, paths: Dict[str, str], files: List[Dict[str, Any]],
+                             total_rows: int, dims: int, dtype: str) -> int:
+        quantizer = None
+        if dtype == "pq":
+            quantizer = ProductQuantizer.train(self._sample_normalized_vectors(total_rows))
+            quantizer.save(paths["pq"])
+            code_shape, code_dtype = (total_rows, quantizer.num_subvectors), np.uint8
+        else:
+            code_shape, code_dtype = (total_rows, dims), dtype
+
+        vectors = np.lib.format.open_memmap(
+            paths["vectors"], mode="w+", dtype=code_dtype, shape=code_shape
+        )
+        rows = np.lib.format.open_memmap(
+            paths["rows"], mode="w+", dtype=np.int32, shape=(total_rows, 2)
+        )
+        scales = None
+        if dtype == "int8":
+            scales = np.lib.format.open_memmap(
+                paths["scales"], mode="w+", dtype=np.float32, shape=(total_rows,)
+            )
+
+        row = 0
+        for record, record_vectors in self.iter_records(with_vectors=True):
+            count = record["vector_count"]
+            if not count:
+                continue
+            norms = np.linalg.norm(record_vectors, axis=1, keepdims=True)
+            normalized = record_vectors / (norms + 1e-8)
+            if quantizer is not None:
+                vectors[row:row + count] = quantizer.encode(normalized)
+            elif scales is not None:
+                vectors[row:row + count], scales[row:row + count] = quantize_int8(normalized)
+            else:
+                vectors[row:row + count] = normalized
+            rows[row:row + count, 0] = len(files)
+            rows[row:row + count, 1] = np.arange(count, dtype=np.int32)
+            files.append({
+                "key": record.get("rel_path") or record["path"],
+                "path": record["path"],
+                "hash": record.get("hash"),
+                "start": row,
+                "count": count,
+            })
+            row += count
+
+        vectors.flush()
+        rows.flush()
+        if scales is not None:
+            scales.flush()
+        del vectors, rows, scales
+        return row
+
+    def _sample_normalized_vectors(self, total_rows: int, sample_size: int = PQ_TRAIN_SAMPLES) -> np.ndarray:
+        rng = np.random.default_rng(0)
+        picked = np.zeros(total_rows, dtype=bool)
+        picked[rng.choice(total_rows, min(sample_size, total_rows), replace=False)] = True
+
+        sample: List[np.ndarray] = []
+        row = 0
+        for record, record_vectors in self.iter_records(with_vectors=True):
+            count = record["vector_count"]
+            if not count:
+                continue
+            selected = record_vectors[picked[row:row + count]]
+            if len(selected):
+                sample.append(selected / (np.linalg.norm(selected, axis=1, keepdims=True) + 1e-8))
+            row += count
+        return np.concatenate(sample)
+
+    def _map_search_matrix(self, paths: Dict[str, str], files: List[Dict[str, Any]],
+                           generation: int, dtype: str) -> SearchMatrix:
+        return SearchMatrix(
+            vectors=np.load(paths["vectors"], mmap_mode="r"),
+            rows=np.load(paths["rows"], mmap_mode="r"),
+            files=files,
+            generation=generation,
+            scales=np.load(paths["scales"], mmap_mode="r") if dtype == "int8" else None,
+            quantizer=ProductQuantizer.load(paths["pq"]) if dtype == "pq" else None,
+        )
+
+    def _build_ann_index(self, search_matrix: SearchMatrix,
+                         previous_info: Optional[Dict[str, Any]]) -> None:
+        previous = previous_files = None
+        if previous_info and previous_info.get("ann") and previous_info.get("dims") == self.dims:
+            previous_paths = self._search_paths(previous_info["generation"])
+            previous = IVFIndex.load(previous_paths["ivf"])
+            if previous is not None and os.path.exists(previous_paths["files"]):
+                with open(previous_paths["files"], "r", encoding="utf-8") as f:
+                    previous_files = json.load(f)
+
+        index = IVFIndex.build(DecodedRows(search_matrix), search_matrix.files, previous, previous_files)
+        index.save(self._search_paths(search_matrix.generation)["ivf"])
+
+    def _discard_stale_search_files(self, generation: int, info: Dict[str, Any]) -> None:
+        search_dir = os.path.join(self.store_dir, SEARCH_DIRNAME)
+        paths = self._search_paths(generation)
+        keep = ["vectors", "rows", "files"]
+        if info["dtype"] == "int8":
+            keep.append("scales")
+        elif info["dtype"] == "pq":
+            keep.append("pq")
+        if info["ann"]:
+            keep.append("ivf")
+        current = set(os.path.basename(paths[name]) for name in keep)
+        for name in os.listdir(search_dir):
+            if name == SEARCH_INFO_NAME or name in current:
+                continue
+            try:
+                os.remove(os.path.join(search_dir, name))
+            except OSError:
+                # Still mapped by another reader (Windows); removed on a later build
+                pass
+
+    def open_search_matrix(self, dtype: str = "float32",
+                           ann_min_rows: Optional[int] = None) -> Optional[SearchMatrix]:
+        """Open the memory-mapped search matrix, rebuilding it if it is stale.
+
+        Args:
+            dtype (str): Required storage format, one of ``SEARCH_DTYPES``.
+            ann_min_rows (Optional[int]): Require an IVF index when the matrix has at
+                least this many rows. None opens the matrix for exact search only.
+
+        Returns:
+            Optional[SearchMatrix]: The snapshot, or None if the store holds no vectors.
+        """
+        with self._lock:
+            if not self.file_count:
+                return None
+
+            info = self._read_search_info()
+            stale = not info or info.get("generation") != self.vector_generation or info.get("dtype") != dtype
+            if not stale and ann_min_rows is not None:
+                stale = info["rows"] >= ann_min_rows and not info.get("ann")
+            if stale:
+                self.build_search_matrix(dtype, ann_min_rows)
+                info = self._read_search_info()
+
+            paths = self._search_paths(info["generation"])
+            if not info["rows"]:
+                return None
+
+            with open(paths["files"], "r", encoding="utf-8") as f:
+                files = json.load(f)
+
+            search_matrix = self._map_search_matrix(paths, files, info["generation"], dtype)
+            if ann_min_rows is not None and info["rows"] >= ann_min_rows and info.get("ann"):
+                search_matrix.ann = IVFIndex.load(paths["ivf"])
+            return search_matrix
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get size and layout statistics for the store.
+
+        Returns:
+            Dict[str, Any]: File, segment, vector and byte counts.
+        """
+        with self._lock:
+            segments = dict(self._manifest["segments"])
+
+        total_bytes = os.path.getsize(self.manifest_path) if os.path.exists(self.manifest_path) else 0
+        for segment_id in segments:
+            for path in self._segment_paths(segment_id):
+                if os.path.exists(path):
+                    total_bytes += os.path.getsize(path)
+
+        return {
+            "files": self.file_count,
+            "segments": len(segments),
+            "vectors": sum(entry["vector_count"] for _, entry in self.iter_entries()),
+            "dims": self.dims,
+            "generation": self.generation,
+            "size_bytes": total_bytes,
+        }
+
+
+def count_indexed_files(index_dir: str) -> int:
+    """Count indexed files in an index directory.
+
+    Reads the store manifest when present and falls back to counting the
+    legacy ``metadata/*.json`` files otherwise.
+
+    Args:
+        index_dir (str): The ``.index`` directory.
+
+    Returns:
+        int: Number of indexed files.
+    """
+    if IndexStore.exists(index_dir):
+        return IndexStore(index_dir).file_count
+
+    metadata_dir = os.path.join(index_dir, "metadata")
+    if os.path.exists(metadata_dir):
+        return len([f for f in os.listdir(metadata_dir) if f.endswith(".json")])
+    return 0
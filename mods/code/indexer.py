@@ -11,17 +11,28 @@ import ast
 import concurrent.futures
 import datetime
 import hashlib
-import json
 import logging
+import multiprocessing
 import os
 import re
+import threading
 import time
 import traceback
-from dataclasses import dataclass
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from ..llms import generate_description, generate_embed
+import numpy as np
+
+from ..description_cache import get_description_cache, make_description_keys
+from ..llms import (
+    AI_DESCRIPTION_PROVIDER,
+    DESCRIPTION_MODEL,
+    generate_description,
+    generate_embed,
+    get_embedding_model_id,
+)
 from .directory import (
     DirectoryEntry,
     DirectoryParser,
@@ -33,11 +44,51 @@ from .analyzers import (
     BaseAnalyzer, PythonAnalyzer, JavaScriptAnalyzer, TypeScriptAnalyzer,
     PHPAnalyzer, HTMLAnalyzer, CSSAnalyzer, SQLAnalyzer, MarkdownAnalyzer
 )
-from .embed import CodeEmbedding, SimilaritySearch
+from .description_queue import (
+    DESCRIPTION_STATUS_COMPLETE,
+    DESCRIPTION_STATUS_FAILED,
+    DESCRIPTION_STATUS_PENDING,
+    DescriptionJob,
+    DescriptionQueue,
+    description_concurrency,
+)
+from .embed import CodeEmbedding, SimilaritySearch, chunk_text_hash, decode_source
+from .embedding_batcher import EmbeddingBatcher
+from .file_snapshot import FileSnapshot
+from .git_changes import GitChangeDetector
+from .index_store import IndexStore, SegmentWriter
+from .keyword_index import KeywordIndex
+from .retrieval_service import RetrievalService
 
 logger = logging.getLogger("TaskHeroAI.Indexer")
 logger.info("[INDEXER] LOGGER WORKING")
 
+# Bump whenever the description prompt changes, so cached descriptions are regenerated
+DESCRIPTION_PROMPT_VERSION = 1
+DESCRIPTION_CACHE_IGNORE_TRIVIA: bool = os.getenv("DESCRIPTION_CACHE_IGNORE_TRIVIA", "FALSE").upper() == "TRUE"
+DESCRIPTION_QUEUE_ENABLED: bool = os.getenv("DESCRIPTION_QUEUE", "TRUE").upper() == "TRUE"
+DESCRIPTION_PUBLISH_BATCH = 50
+
+# Parsing, chunking and analysis run in worker processes for large runs, so they scale past the GIL
+INDEX_PROCESS_POOL: bool = os.getenv("INDEX_PROCESS_POOL", "TRUE").upper() == "TRUE"
+INDEX_PROCESS_POOL_MIN_FILES: int = int(os.getenv("INDEX_PROCESS_POOL_MIN_FILES", "200"))
+INDEX_PARSE_WORKERS: int = max(1, int(os.getenv("INDEX_PARSE_WORKERS", str(os.cpu_count() or 1))))
+INDEX_MAX_PENDING_FILES: int = max(1, int(os.getenv("INDEX_MAX_PENDING_FILES", "256")))
+# Unchanged chunks of a re-indexed file keep their stored embeddings instead of being embedded again
+CHUNK_EMBEDDING_REUSE: bool = os.getenv("CHUNK_EMBEDDING_REUSE", "TRUE").upper() == "TRUE"
+# Create the tree-sitter parsers of the scanned file types before parsing starts
+INDEX_PREWARM_PARSERS: bool = os.getenv("INDEX_PREWARM_PARSERS", "TRUE").upper() == "TRUE"
+# Files whose (size, mtime_ns, inode) matches the index are not read again to detect changes
+INDEX_STAT_CHANGE_DETECTION: bool = os.getenv("INDEX_STAT_CHANGE_DETECTION", "TRUE").upper() == "TRUE"
+# Ask git which files changed since the last indexed commit instead of checking every file.
+# Off by default: see git_changes for the indexed files git does not report.
+INDEX_GIT_CHANGE_DETECTION: bool = os.getenv("INDEX_GIT_CHANGE_DETECTION", "FALSE").upper() == "TRUE"
+# Keep the BM25 inverted index next to the store up to date as files are (re)indexed
+INDEX_KEYWORD_INDEX: bool = os.getenv("INDEX_KEYWORD_INDEX", "TRUE").upper() == "TRUE"
+# A file modified this recently may change again within the same timestamp tick,
+# so its stat signature is not trusted until it is older
+RACY_STAT_SECONDS: float = 2.0
+
 
 def _get_ai_provider_info() -> Dict[str, str]:
     """Get current AI provider information for display purposes.
@@ -95,7 +146,8 @@ class DirectIndexerLogger:
         self.filename = logs_dir / f"indexer_direct_{timestamp}.log"
 
         try:
-            with open(self.filename, "w") as f:
+            # Append: parse worker processes started in the same second share the file
+            with open(self.filename, "a") as f:
                 f.write(f"=== DirectIndexerLogger started at {datetime.datetime.now()} ===\n")
         except Exception as e:
             logger.error(f"ERROR setting up DirectIndexerLogger: {e}")
@@ -217,6 +269,12 @@ class FileMetadata:
     """File relationship and dependency information."""
     metadata_version: int = 2
     """Version of the metadata format for migration purposes."""
+    description_status: str = DESCRIPTION_STATUS_COMPLETE
+    """Whether the description is complete, still pending in the description queue, or failed."""
+    stat_signature: Optional[Tuple[int, int, int]] = None
+    """(size, mtime_ns, inode) the hash was computed for, or None if it cannot be trusted yet."""
+    description_job: Optional[DescriptionJob] = field(default=None, repr=False)
+    """Queued description request while the status is pending (not stored)."""
 
 
 class FileIndexer:
@@ -446,50 +504,30 @@ class FileIndexer:
             self.metadata_cache: Dict[str, Any] = {}
             direct_logger.log("Initialized empty metadata_cache")
 
-            self.similarity_search: Optional[SimilaritySearch] = None
+            # Index store, SimilaritySearch and BM25 keyword index shared with the
+            # other search front-ends of this index directory
+            self.retrieval: Optional[RetrievalService] = None
+            self.index_store: Optional[IndexStore] = None
+            self._segment_writer: Optional[SegmentWriter] = None
+            self.git_detector: GitChangeDetector = GitChangeDetector(self.root_path)
+            # Indexable text files for CodebaseTools, shared across tool calls
+            self.file_snapshot: FileSnapshot = FileSnapshot(self)
 
-            # Enhanced metadata functionality
-            self.enable_enhanced_metadata: bool = True
-            self.analyzers: List[BaseAnalyzer] = []
-            if self.enable_enhanced_metadata:
-                self.analyzers = [
-                    PythonAnalyzer(),
-                    JavaScriptAnalyzer(),
-                    TypeScriptAnalyzer(),
-                    PHPAnalyzer(),
-                    HTMLAnalyzer(),
-                    CSSAnalyzer(),
-                    SQLAnalyzer(),
-                    MarkdownAnalyzer()
-                ]
-                direct_logger.log("Enhanced metadata analyzers initialized")
-
-            # Language detection mapping
-            self.language_map = {
-                # Python
-                '.py': 'python', '.pyw': 'python',
-                # JavaScript/TypeScript
-                '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript',
-                '.ts': 'typescript', '.tsx': 'typescript',
-                # PHP
-                '.php': 'php', '.phtml': 'php', '.php3': 'php', '.php4': 'php', '.php5': 'php', '.phps': 'php',
-                # HTML
-                '.html': 'html', '.htm': 'html', '.xhtml': 'html', '.shtml': 'html',
-                # CSS and preprocessors
-                '.css': 'css', '.scss': 'scss', '.sass': 'sass', '.less': 'less', '.styl': 'stylus', '.stylus': 'stylus',
-                # SQL
-                '.sql': 'sql', '.ddl': 'sql', '.dml': 'sql', '.pgsql': 'postgresql', '.mysql': 'mysql', '.sqlite': 'sqlite',
-                # Markdown
-                '.md': 'markdown', '.markdown': 'markdown', '.mdown': 'markdown', '.mkd': 'markdown',
-                # Other common formats
-                '.json': 'json', '.yaml': 'yaml', '.yml': 'yaml', '.xml': 'xml',
-                '.sh': 'bash', '.bash': 'bash', '.dockerfile': 'dockerfile', '.makefile': 'makefile'
-            }
+            # Descriptions generated in the background while embeddings are already searchable
+            self._description_queue: Optional[DescriptionQueue] = None
+            self._description_updates: Dict[str, Dict[str, Any]] = {}
+            self._description_lock = threading.Lock()
+
+            self._setup_file_analysis()
 
             direct_logger.log("Calling _create_index_structure()")
             self._create_index_structure()
             direct_logger.log("_create_index_structure() completed")
 
+            self.retrieval = RetrievalService.acquire(self.index_dir)
+            self.index_store = self.retrieval.store
+            self._migrate_legacy_layout()
+
             direct_logger.log("Calling _load_metadata_cache()")
             self._load_metadata_cache()
             direct_logger.log("_load_metadata_cache() completed")
@@ -505,6 +543,72 @@ class FileIndexer:
             direct_logger.log(f"Traceback: {error_details}")
             raise
 
+    def _setup_file_analysis(self) -> None:
+        """Create the analyzers and language map used to analyze individual files."""
+        # Enhanced metadata functionality
+        self.enable_enhanced_metadata: bool = True
+        self.analyzers: List[BaseAnalyzer] = []
+        if self.enable_enhanced_metadata:
+            self.analyzers = [
+                PythonAnalyzer(),
+                JavaScriptAnalyzer(),
+                TypeScriptAnalyzer(),
+                PHPAnalyzer(),
+                HTMLAnalyzer(),
+                CSSAnalyzer(),
+                SQLAnalyzer(),
+                MarkdownAnalyzer()
+            ]
+            direct_logger.log("Enhanced metadata analyzers initialized")
+
+        # Language detection mapping
+        self.language_map = {
+            # Python
+            '.py': 'python', '.pyw': 'python',
+            # JavaScript/TypeScript
+            '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript',
+            '.ts': 'typescript', '.tsx': 'typescript',
+            # PHP
+            '.php': 'php', '.phtml': 'php', '.php3': 'php', '.php4': 'php', '.php5': 'php', '.phps': 'php',
+            # HTML
+            '.html': 'html', '.htm': 'html', '.xhtml': 'html', '.shtml': 'html',
+            # CSS and preprocessors
+            '.css': 'css', '.scss': 'scss', '.sass': 'sass', '.less': 'less', '.styl': 'stylus', '.stylus': 'stylus',
+            # SQL
+            '.sql': 'sql', '.ddl': 'sql', '.dml': 'sql', '.pgsql': 'postgresql', '.mysql': 'mysql', '.sqlite': 'sqlite',
+            # Markdown
+            '.md': 'markdown', '.markdown': 'markdown', '.mdown': 'markdown', '.mkd': 'markdown',
+            # Other common formats
+            '.json': 'json', '.yaml': 'yaml', '.yml': 'yaml', '.xml': 'xml',
+            '.sh': 'bash', '.bash': 'bash', '.dockerfile': 'dockerfile', '.makefile': 'makefile'
+        }
+
+    @classmethod
+    def _for_worker(cls, root_path: str, excluded_extensions: Set[str]) -> "FileIndexer":
+        """Create a lightweight indexer that can only prepare files.
+
+        Used inside parse worker processes: it owns its own CodeChunker parsers and
+        analyzers but does not open the index store or the similarity search.
+
+        Args:
+            root_path (str): Absolute root directory being indexed.
+            excluded_extensions (Set[str]): File extensions excluded from indexing.
+
+        Returns:
+            FileIndexer: Indexer whose _prepare_file() can be called.
+        """
+        indexer = cls.__new__(cls)
+        indexer.root_path = root_path
+        indexer.excluded_extensions = excluded_extensions
+        indexer.code_embedder = CodeEmbedding()
+        indexer.metadata_cache = {}
+        indexer.retrieval = None
+        indexer._description_queue = None
+        indexer._description_updates = {}
+        indexer._description_lock = threading.Lock()
+        indexer._setup_file_analysis()
+        return indexer
+
     def _create_index_structure(self) -> None:
         """Create the directory structure for storing index files."""
         direct_logger.log(f"_create_index_structure() ENTRY: index_dir={self.index_dir}")
@@ -525,7 +629,7 @@ class FileIndexer:
             logger.debug(f"CHECKPOINT: [DIR.4] Parent directory is writable: {parent_dir}")
             direct_logger.log(f"CHECKPOINT: [DIR.4] Parent directory is writable: {parent_dir}")
 
-        index_subdirs = ["", "metadata", "embeddings", "descriptions"]
+        index_subdirs = ["", "store"]
         logger.debug(f"CHECKPOINT: [DIR.5] Will create the following subdirectories: {index_subdirs}")
         direct_logger.log(f"CHECKPOINT: [DIR.5] Will create the following subdirectories: {index_subdirs}")
 
@@ -668,13 +772,16 @@ class FileIndexer:
             )
         return is_text
 
-    def _extract_signatures(self, file_path: str) -> List[FileSignature]:
+    def _extract_signatures(self, file_path: str, chunks: Optional[List[Dict[str, Any]]] = None,
+                            content: Optional[str] = None) -> List[FileSignature]:
         """Extract function and class signatures from a file.
 
         Uses tree-sitter for supported languages and falls back to regex for others.
 
         Args:
             file_path (str): Path to the file to analyze.
+            chunks (Optional[List[Dict[str, Any]]]): Tree-sitter chunks of the file, if already computed.
+            content (Optional[str]): File content, if already read.
 
         Returns:
             List[FileSignature]: List of extracted signatures.
@@ -684,7 +791,8 @@ class FileIndexer:
         try:
             ext: str = os.path.splitext(file_path)[1].lower()
             if ext in self.code_embedder.chunker.SUPPORTED_LANGUAGES:
-                chunks: List[Dict[str, Any]] = self.code_embedder.chunker.chunk_file(file_path)
+                if chunks is None:
+                    chunks = self.code_embedder.chunker.chunk_file(file_path)
                 for chunk in chunks:
                     signatures.append(
                         FileSignature(
@@ -695,8 +803,9 @@ class FileIndexer:
                         )
                     )
             elif ext == ".py":
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content: str = f.read()
+                if content is None:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        content = f.read()
 
                 tree: ast.AST = ast.parse(content)
 
@@ -732,8 +841,9 @@ class FileIndexer:
                             )
                         )
             else:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
+                if content is None:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        content = f.read()
 
                 patterns = [
                     r"(?:function|const)\s+(\w+)\s*\([^)]*\)",
@@ -1017,31 +1127,45 @@ class FileIndexer:
 
         return f"def {node.name}({', '.join(args)}){returns}"
 
-    def _generate_description(
-        self, file_path: str, signatures: List[FileSignature]
-    ) -> str:
-        """Generate a description of the file using AI by sampling from multiple parts.
+    def _description_cache_keys(self, file_path: str, content: str) -> List[str]:
+        """Build the description cache keys of a file's content.
+
+        Args:
+            file_path (str): Path to the file.
+            content (str): File content.
+
+        Returns:
+            List[str]: Cache keys, most specific first.
+        """
+        return make_description_keys(
+            content,
+            os.path.splitext(file_path)[1],
+            AI_DESCRIPTION_PROVIDER,
+            DESCRIPTION_MODEL or "",
+            DESCRIPTION_PROMPT_VERSION,
+            ignore_trivia=DESCRIPTION_CACHE_IGNORE_TRIVIA,
+        )
+
+    def _build_description_prompt(self, file_path: str, signatures: List[FileSignature], content: str) -> str:
+        """Build the description prompt from signatures and samples of several parts of the file.
 
         Args:
             file_path (str): Path to the file to describe.
             signatures (List[FileSignature]): List of extracted signatures from the file.
+            content (str): File content.
 
         Returns:
-            str: Generated description.
+            str: The prompt.
         """
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content: str = f.read()
-
-            file_size: int = len(content)
-            sample_size: int = min(1000, file_size // 3)
+        file_size: int = len(content)
+        sample_size: int = min(1000, file_size // 3)
 
-            start_sample: str = content[:sample_size]
-            mid_point: int = file_size // 2
-            mid_sample: str = content[mid_point - sample_size // 2 : mid_point + sample_size // 2]
-            end_sample: str = content[-sample_size :]
+        start_sample: str = content[:sample_size]
+        mid_point: int = file_size // 2
+        mid_sample: str = content[mid_point - sample_size // 2 : mid_point + sample_size // 2]
+        end_sample: str = content[-sample_size :]
 
-            prompt: str = f"""Please provide a concise description (max 5 lines) of this code file. Include:
+        return f"""Please provide a concise description (max 5 lines) of this code file. Include:
 1. The file's main purpose
 2. Key functionality
 3. Important classes/functions
@@ -1064,231 +1188,507 @@ END OF FILE:
 {end_sample}
 """
 
-            return generate_description(prompt)
+    def _generate_description(
+        self, file_path: str, signatures: List[FileSignature], content: Optional[str] = None
+    ) -> str:
+        """Generate a description of the file using AI by sampling from multiple parts.
+
+        Descriptions are looked up in the persistent description cache first, keyed
+        by the file content, the description model and DESCRIPTION_PROMPT_VERSION.
+
+        Args:
+            file_path (str): Path to the file to describe.
+            signatures (List[FileSignature]): List of extracted signatures from the file.
+            content (Optional[str]): File content, if already read.
+
+        Returns:
+            str: Generated description.
+        """
+        try:
+            if content is None:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    content = f.read()
+
+            description_cache = get_description_cache()
+            cache_keys: List[str] = []
+            if description_cache is not None:
+                cache_keys = self._description_cache_keys(file_path, content)
+                cached_description = description_cache.get(cache_keys)
+                if cached_description is not None:
+                    logger.debug(f"Reusing cached description for {file_path}")
+                    return cached_description
+
+            description = generate_description(self._build_description_prompt(file_path, signatures, content))
+            if description_cache is not None and description:
+                description_cache.put(cache_keys, description)
+            return description
 
         except Exception as e:
             return f"Error generating description: {str(e)}"
 
-    def _save_file_metadata(self, metadata: FileMetadata) -> None:
-        """Save file metadata to the index directory.
+    def _prepare_description(
+        self, file_path: str, file_hash: str, signatures: List[FileSignature], content: str
+    ) -> Tuple[str, Optional[DescriptionJob]]:
+        """Take a description from the cache, or build a job for the description queue.
 
         Args:
-            metadata (FileMetadata): FileMetadata object to save.
+            file_path (str): Path to the file to describe.
+            file_hash (str): Hash of the file content.
+            signatures (List[FileSignature]): List of extracted signatures from the file.
+            content (str): File content.
+
+        Returns:
+            Tuple[str, Optional[DescriptionJob]]: The cached description and no job, or an
+            empty description and the job that will generate it.
         """
-        try:
-            logger.debug(f"CHECKPOINT: [SAVE.1] Starting to save metadata for file: {metadata.path}")
+        cache_keys: List[str] = []
+        description_cache = get_description_cache()
+        if description_cache is not None:
+            cache_keys = self._description_cache_keys(file_path, content)
+            cached_description = description_cache.get(cache_keys)
+            if cached_description is not None:
+                return cached_description, None
 
-            if not os.path.exists(self.index_dir):
-                logger.warning(f"CHECKPOINT: [SAVE.2] Index directory does not exist, creating it: {self.index_dir}")
-                self._create_index_structure()
-                logger.debug(f"CHECKPOINT: [SAVE.3] Index directory structure created")
-            else:
-                logger.debug(f"CHECKPOINT: [SAVE.4] Index directory exists: {self.index_dir}")
+        prompt = self._build_description_prompt(file_path, signatures, content)
+        return "", DescriptionJob(path=file_path, file_hash=file_hash, prompt=prompt, cache_keys=cache_keys)
 
-            rel_path = os.path.relpath(metadata.path, self.root_path)
-            safe_path = re.sub(r"[^\w\-_\.]", "_", rel_path)
-            logger.debug(f"CHECKPOINT: [SAVE.5] Generated safe path: {safe_path}")
+    def _generate_job_description(self, job: DescriptionJob) -> Optional[str]:
+        """Generate the description of a deferred job right away, without the queue.
 
-            try:
-                metadata_dir = os.path.join(self.index_dir, "metadata")
-                logger.debug(f"CHECKPOINT: [SAVE.6] Metadata directory path: {metadata_dir}")
+        Args:
+            job (DescriptionJob): Job from _prepare_description().
 
-                if not os.path.exists(metadata_dir):
-                    logger.warning(f"CHECKPOINT: [SAVE.7] Metadata directory does not exist, creating it")
-                    os.makedirs(metadata_dir, exist_ok=True)
-                    logger.debug(f"CHECKPOINT: [SAVE.8] Metadata directory created")
-                else:
-                    logger.debug(f"CHECKPOINT: [SAVE.9] Metadata directory exists")
-
-                metadata_path = os.path.join(metadata_dir, f"{safe_path}.json")
-                logger.debug(f"CHECKPOINT: [SAVE.10] Saving metadata JSON to: {metadata_path}")
-
-                with open(metadata_path, "w", encoding="utf-8") as f:
-                    json.dump(
-                        {
-                            "name": metadata.name,
-                            "path": metadata.path,
-                            "hash": metadata.hash,
-                            "size": metadata.size,
-                            "extension": metadata.extension,
-                            "modified_time": metadata.modified_time,
-                            "description": metadata.description,
-                            "signatures": [vars(sig) for sig in metadata.signatures],
-                        },
-                        f,
-                        indent=2,
-                    )
-                logger.debug(f"CHECKPOINT: [SAVE.11] Saved metadata JSON to {metadata_path}")
+        Returns:
+            Optional[str]: Generated description, or None if generation failed.
+        """
+        try:
+            description = generate_description(job.prompt)
+        except Exception as e:
+            logger.warning(f"Error generating description for {job.path}: {e}")
+            return None
+        if not description:
+            return None
+        description_cache = get_description_cache()
+        if description_cache is not None and job.cache_keys:
+            description_cache.put(job.cache_keys, description)
+        return description
 
-                if os.path.exists(metadata_path):
-                    file_size = os.path.getsize(metadata_path)
-                    logger.debug(f"CHECKPOINT: [SAVE.12] Verified metadata file exists, size: {file_size} bytes")
-                else:
-                    logger.error(f"CHECKPOINT: [SAVE.13] Metadata file was not created: {metadata_path}")
+    def _get_description_queue(self) -> DescriptionQueue:
+        """Get the background description queue, starting it on first use.
 
-            except Exception as e:
-                logger.error(
-                    f"CHECKPOINT: [SAVE.14] Failed to save metadata JSON for {metadata.path}: {str(e)}",
-                    exc_info=True,
+        Returns:
+            DescriptionQueue: The queue shared by all indexing runs of this indexer.
+        """
+        with self._description_lock:
+            if self._description_queue is None:
+                self._description_queue = DescriptionQueue(
+                    generate_description, self._on_description_done, provider=AI_DESCRIPTION_PROVIDER
                 )
-                raise
+            return self._description_queue
 
-            try:
-                descriptions_dir = os.path.join(self.index_dir, "descriptions")
-                logger.debug(f"CHECKPOINT: [SAVE.15] Descriptions directory path: {descriptions_dir}")
+    def _on_description_done(
+        self, job: DescriptionJob, description: Optional[str], error: Optional[BaseException]
+    ) -> None:
+        """Record a finished description and publish finished descriptions in batches.
 
-                if not os.path.exists(descriptions_dir):
-                    logger.warning(f"CHECKPOINT: [SAVE.16] Descriptions directory does not exist, creating it")
-                    os.makedirs(descriptions_dir, exist_ok=True)
-                    logger.debug(f"CHECKPOINT: [SAVE.17] Descriptions directory created")
-                else:
-                    logger.debug(f"CHECKPOINT: [SAVE.18] Descriptions directory exists")
+        Args:
+            job (DescriptionJob): The finished job.
+            description (Optional[str]): Generated description, if successful.
+            error (Optional[BaseException]): Error, if the job failed after all retries.
+        """
+        if error is None and description:
+            description_cache = get_description_cache()
+            if description_cache is not None and job.cache_keys:
+                description_cache.put(job.cache_keys, description)
+            ready = self._buffer_description_update(job.path, job.file_hash, description)
+        else:
+            # Leave the description empty so the failure is not persisted as one; retried next run
+            ready = self._buffer_description_update(job.path, job.file_hash, None)
 
-                description_path = os.path.join(descriptions_dir, f"{safe_path}.txt")
-                logger.debug(f"CHECKPOINT: [SAVE.19] Saving description to: {description_path}")
+        queue = self._description_queue
+        if ready or (queue is not None and queue.pending <= 1):
+            self._publish_description_updates()
 
-                with open(description_path, "w", encoding="utf-8") as f:
-                    f.write(metadata.description)
-                logger.debug(f"CHECKPOINT: [SAVE.20] Saved description to {description_path}")
+    def _buffer_description_update(self, path: str, file_hash: str, description: Optional[str]) -> bool:
+        """Buffer a finished description until the next publish.
 
-                if os.path.exists(description_path):
-                    file_size = os.path.getsize(description_path)
-                    logger.debug(f"CHECKPOINT: [SAVE.21] Verified description file exists, size: {file_size} bytes")
-                else:
-                    logger.error(f"CHECKPOINT: [SAVE.22] Description file was not created: {description_path}")
+        Args:
+            path (str): Path of the described file.
+            file_hash (str): Hash of the content the description was generated for.
+            description (Optional[str]): The description, or None if generation failed.
 
-            except Exception as e:
-                logger.error(
-                    f"CHECKPOINT: [SAVE.23] Failed to save description for {metadata.path}: {str(e)}",
-                    exc_info=True,
-                )
+        Returns:
+            bool: True if enough updates are buffered to publish them.
+        """
+        if description is not None:
+            update = {"hash": file_hash, "description": description,
+                      "description_status": DESCRIPTION_STATUS_COMPLETE}
+        else:
+            update = {"hash": file_hash, "description_status": DESCRIPTION_STATUS_FAILED}
+        with self._description_lock:
+            self._description_updates[path] = update
+            return len(self._description_updates) >= DESCRIPTION_PUBLISH_BATCH
+
+    def _publish_description_updates(self) -> int:
+        """Write finished descriptions into the index store.
+
+        Nothing is written while index_directory() has its segment open; the run
+        publishes the buffered descriptions after committing its segment.
+
+        Returns:
+            int: Number of records updated.
+        """
+        with self._description_lock:
+            if self._segment_writer is not None or not self._description_updates:
+                return 0
+            updates, self._description_updates = self._description_updates, {}
 
             try:
-                embeddings_dir = os.path.join(self.index_dir, "embeddings")
-                logger.debug(f"CHECKPOINT: [SAVE.24] Embeddings directory path: {embeddings_dir}")
+                updated = self.index_store.update_records(updates)
+            except Exception as e:
+                logger.error(f"Error publishing {len(updates)} file descriptions: {e}", exc_info=True)
+                return 0
 
-                if not os.path.exists(embeddings_dir):
-                    logger.warning(f"CHECKPOINT: [SAVE.25] Embeddings directory does not exist, creating it")
-                    os.makedirs(embeddings_dir, exist_ok=True)
-                    logger.debug(f"CHECKPOINT: [SAVE.26] Embeddings directory created")
-                else:
-                    logger.debug(f"CHECKPOINT: [SAVE.27] Embeddings directory exists")
-
-                embedding_path = os.path.join(embeddings_dir, f"{safe_path}.json")
-                logger.debug(f"CHECKPOINT: [SAVE.28] Saving embeddings to: {embedding_path}")
-
-                # Enhanced embedding format with Graphiti-compatible metadata
-                embedding_data = {
-                    "path": metadata.path,
-                    "chunks": metadata.chunks,
-                    "embeddings": metadata.embeddings,
-                    "metadata": {
-                        "version": metadata.metadata_version,
-                        "timestamp": time.time(),
-                        "file_path": metadata.path,
-                        "file_name": metadata.name,
-                        "file_extension": metadata.extension,
-                        "file_size": metadata.size,
-                        "file_hash": metadata.hash,
-                        "modified_time": metadata.modified_time,
-                        "description": metadata.description,
-                        "chunks_count": len(metadata.chunks),
-                        "embeddings_count": len(metadata.embeddings),
-                        "signatures_count": len(metadata.signatures),
-                        "file_type": self._determine_file_type(metadata.extension),
-                        "language": self._determine_language(metadata.extension),
-                        "graphiti_compatible": True,
-                        # Enhanced metadata fields
-                        "enhanced_metadata": metadata.metadata_version >= 2,
-                        "enhanced_info": self._serialize_enhanced_info(metadata.enhanced_info) if metadata.enhanced_info else None,
-                        "code_analysis": self._serialize_code_analysis(metadata.code_analysis) if metadata.code_analysis else None,
-                        "relationships": self._serialize_relationships(metadata.relationships) if metadata.relationships else None
-                    }
-                }
+            for path, update in updates.items():
+                cached = self.metadata_cache.get(path)
+                if cached is not None and cached.get("hash") == update["hash"]:
+                    cached["description_status"] = update["description_status"]
+            self.retrieval.notify_changed(list(updates))
+            logger.info(f"Published {updated} file descriptions")
+            return updated
 
-                with open(embedding_path, "w", encoding="utf-8") as f:
-                    json.dump(embedding_data, f, indent=2)
-                logger.debug(f"CHECKPOINT: [SAVE.29] Saved embeddings to {embedding_path}")
+    def wait_for_descriptions(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued descriptions are generated and stored.
 
-                if os.path.exists(embedding_path):
-                    file_size = os.path.getsize(embedding_path)
-                    logger.debug(f"CHECKPOINT: [SAVE.30] Verified embeddings file exists, size: {file_size} bytes")
-                else:
-                    logger.error(f"CHECKPOINT: [SAVE.31] Embeddings file was not created: {embedding_path}")
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait; None waits forever.
+
+        Returns:
+            bool: True if no descriptions are pending anymore.
+        """
+        queue = self._description_queue
+        drained = queue.wait(timeout) if queue is not None else True
+        self._publish_description_updates()
+        return drained
+
+    def _requeue_pending_descriptions(self, skip: Set[str]) -> int:
+        """Queue descriptions left pending or failed by earlier runs.
+
+        Without the description queue they are generated here instead.
 
+        Args:
+            skip (Set[str]): Paths that are re-indexed in this run anyway.
+
+        Returns:
+            int: Number of files queued.
+        """
+        queued = 0
+        for path, cached in list(self.metadata_cache.items()):
+            if path in skip or cached.get("description_status", DESCRIPTION_STATUS_COMPLETE) == DESCRIPTION_STATUS_COMPLETE:
+                continue
+            record = self.index_store.get_record(path)
+            if record is None or not os.path.exists(path):
+                continue
+            try:
+                with open(path, "rb") as f:
+                    content = decode_source(f.read())
+                signatures = [FileSignature(**sig) for sig in record.get("signatures", [])]
+                description, job = self._prepare_description(path, record.get("hash"), signatures, content)
+                if job is None:
+                    self._buffer_description_update(path, record.get("hash"), description)
+                elif DESCRIPTION_QUEUE_ENABLED:
+                    self._get_description_queue().submit(job)
+                else:
+                    self._buffer_description_update(path, job.file_hash, self._generate_job_description(job))
+                queued += 1
             except Exception as e:
-                logger.error(
-                    f"CHECKPOINT: [SAVE.32] Failed to save embeddings for {metadata.path}: {str(e)}",
-                    exc_info=True,
-                )
-                raise
+                logger.warning(f"Could not queue description for {path}: {e}")
+        return queued
+
+    def _rel_path(self, file_path: str) -> str:
+        """Return the path of a file relative to the indexed root, with forward slashes.
+
+        This is also the key of the file in SimilaritySearch.
+
+        Args:
+            file_path (str): Absolute path of the file.
+
+        Returns:
+            str: The relative path.
+        """
+        return os.path.relpath(file_path, self.root_path).replace("\\", "/")
+
+    def _embedding_model_id(self) -> str:
+        """Identify the model (and reduction) that produced the stored embeddings.
+
+        Returns:
+            str: Model identifier saved with every record.
+        """
+        model_id = get_embedding_model_id()
+        if self.code_embedder.use_dimensionality_reduction:
+            model_id += f"+pca{self.code_embedder.reduced_dims}"
+        return model_id
+
+    def _build_store_record(self, metadata: FileMetadata) -> Dict[str, Any]:
+        """Build the index store record for a file.
+
+        Args:
+            metadata (FileMetadata): FileMetadata object to convert.
+
+        Returns:
+            Dict[str, Any]: JSON-serializable record (embeddings are stored separately).
+        """
+        return {
+            "name": metadata.name,
+            "path": metadata.path,
+            "rel_path": self._rel_path(metadata.path),
+            "hash": metadata.hash,
+            "size": metadata.size,
+            "extension": metadata.extension,
+            "modified_time": metadata.modified_time,
+            "stat": list(metadata.stat_signature) if metadata.stat_signature else None,
+            "description": metadata.description,
+            "description_status": metadata.description_status,
+            "embedding_model": self._embedding_model_id(),
+            "signatures": [vars(sig) for sig in metadata.signatures],
+            "chunks": metadata.chunks,
+            "metadata": {
+                "version": metadata.metadata_version,
+                "timestamp": time.time(),
+                "file_path": metadata.path,
+                "file_name": metadata.name,
+                "file_extension": metadata.extension,
+                "file_size": metadata.size,
+                "file_hash": metadata.hash,
+                "modified_time": metadata.modified_time,
+                "chunks_count": len(metadata.chunks),
+                "embeddings_count": len(metadata.embeddings),
+                "signatures_count": len(metadata.signatures),
+                "file_type": self._determine_file_type(metadata.extension),
+                "language": self._determine_language(metadata.extension),
+                "graphiti_compatible": True,
+                # Enhanced metadata fields
+                "enhanced_metadata": metadata.metadata_version >= 2,
+                "enhanced_info": self._serialize_enhanced_info(metadata.enhanced_info) if metadata.enhanced_info else None,
+                "code_analysis": self._serialize_code_analysis(metadata.code_analysis) if metadata.code_analysis else None,
+                "relationships": self._serialize_relationships(metadata.relationships) if metadata.relationships else None
+            }
+        }
+
+    def _save_file_metadata(self, metadata: FileMetadata) -> None:
+        """Save file metadata, description and embeddings to the index store.
 
-            logger.debug(f"CHECKPOINT: [SAVE.33] Successfully saved all metadata for {metadata.path}")
+        During index_directory() records are appended to the run's open segment;
+        outside of a run each call publishes a single-file segment.
+
+        Args:
+            metadata (FileMetadata): FileMetadata object to save.
+        """
+        try:
+            logger.debug(f"CHECKPOINT: [SAVE.1] Starting to save metadata for file: {metadata.path}")
+
+            if not os.path.exists(self.index_dir):
+                logger.warning(f"CHECKPOINT: [SAVE.2] Index directory does not exist, creating it: {self.index_dir}")
+                self._create_index_structure()
+                logger.debug(f"CHECKPOINT: [SAVE.3] Index directory structure created")
+
+            record = self._build_store_record(metadata)
+
+            writer = self._segment_writer
+            if writer is not None:
+                writer.add(record, metadata.embeddings)
+                logger.debug(f"CHECKPOINT: [SAVE.4] Appended {metadata.path} to segment {writer.segment_id}")
+            else:
+                self.index_store.put(record, metadata.embeddings)
+                logger.debug(f"CHECKPOINT: [SAVE.5] Stored {metadata.path} in a single-file segment")
 
         except Exception as e:
             logger.error(
-                f"CHECKPOINT: [SAVE.34] Failed to save file metadata for {metadata.path}: {str(e)}",
+                f"CHECKPOINT: [SAVE.6] Failed to save file metadata for {metadata.path}: {str(e)}",
                 exc_info=True,
             )
             raise
 
+    def _migrate_legacy_layout(self) -> None:
+        """Move an existing per-file JSON index into the index store (one-shot)."""
+        legacy_embeddings_dir = os.path.join(self.index_dir, "embeddings")
+        if IndexStore.exists(self.index_dir) or not os.path.isdir(legacy_embeddings_dir):
+            return
+
+        try:
+            from .migration import migrate_legacy_index
+
+            results = migrate_legacy_index(self.index_dir, store=self.index_store)
+            logger.info(
+                f"Migrated legacy index layout: {results['migrated']} files, {results['errors']} errors"
+            )
+        except Exception as e:
+            logger.error(f"Error migrating legacy index layout: {e}", exc_info=True)
+
+    @property
+    def similarity_search(self) -> Optional[SimilaritySearch]:
+        """Optional[SimilaritySearch]: Vector search shared through the retrieval service."""
+        return self.retrieval.similarity_search if self.retrieval is not None else None
+
+    @similarity_search.setter
+    def similarity_search(self, value: Optional[SimilaritySearch]) -> None:
+        self.retrieval.similarity_search = value
+
+    @property
+    def keyword_index(self) -> Optional[KeywordIndex]:
+        """Optional[KeywordIndex]: BM25 inverted index shared through the retrieval service."""
+        return self.retrieval.keyword_index if self.retrieval is not None else None
+
+    @keyword_index.setter
+    def keyword_index(self, value: Optional[KeywordIndex]) -> None:
+        self.retrieval.keyword_index = value
+
+    def close(self) -> None:
+        """Release the retrieval service shared with the other users of the index directory."""
+        retrieval, self.retrieval = self.retrieval, None
+        if retrieval is not None:
+            retrieval.release()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def _initialize_similarity_search(self) -> None:
         """Initialize the SimilaritySearch instance.
 
-        This creates a SimilaritySearch object that can be used by both the agent mode
-        and chat features to ensure they're using the same embeddings.
+        The instance is shared through the retrieval service, so agent mode, chat and
+        the other search front-ends of this index directory use the same embeddings.
+        It is only loaded if no other user of the service has loaded it yet.
+        """
+        logger.debug(f"Initializing SimilaritySearch from index store: {self.index_dir}")
+
+        similarity_search = self.retrieval.get_similarity_search()
+        if similarity_search is not None:
+            logger.info(f"SimilaritySearch initialized successfully with {len(similarity_search.file_keys)} embedding files")
+        elif not IndexStore.exists(self.index_dir):
+            logger.warning(f"No index store found in: {self.index_dir}")
+
+    def _refresh_similarity_search(self, updated: Optional[List[FileMetadata]] = None,
+                                   removed: Optional[List[str]] = None) -> None:
+        """Bring the shared SimilaritySearch up to date after the index store changed.
+
+        Changed files are applied to the loaded search in place. Without a list of
+        changes (or without a loaded search) it is reloaded from the index store.
+
+        Args:
+            updated (Optional[List[FileMetadata]]): Files that were (re)indexed.
+            removed (Optional[List[str]]): Paths of files that were removed from the index.
+        """
+        if self.similarity_search is None:
+            self._initialize_similarity_search()
+            return
+        try:
+            if updated is None and removed is None:
+                self.similarity_search.load_embeddings()
+                return
+            if removed:
+                self.similarity_search.remove_files([self._rel_path(path) for path in removed])
+            if updated:
+                self.similarity_search.update_files(
+                    (self._rel_path(metadata.path), metadata.chunks, metadata.embeddings) for metadata in updated
+                )
+        except Exception as e:
+            logger.error(f"Error updating SimilaritySearch: {e}", exc_info=True)
+
+    def _publish_index_changes(self, keyword_generation: int, updated: Optional[List[FileMetadata]] = None,
+                               removed: Optional[List[str]] = None) -> None:
+        """Apply a change to the index store to the shared search structures and notify their users.
+
+        Args:
+            keyword_generation (int): Store vector generation before the change, from _begin_keyword_update().
+            updated (Optional[List[FileMetadata]]): Files that were (re)indexed.
+            removed (Optional[List[str]]): Paths of files that were removed from the index.
         """
-        embeddings_dir = os.path.join(self.index_dir, "embeddings")
-        logger.debug(f"Initializing SimilaritySearch with embeddings directory: {embeddings_dir}")
+        self._refresh_similarity_search(updated, removed)
+        self._update_keyword_index(keyword_generation, updated, removed)
+        self.retrieval.notify_changed([metadata.path for metadata in updated or []], removed)
+
+    def _begin_keyword_update(self) -> int:
+        """Load the BM25 keyword index before the index store changes.
 
-        if os.path.exists(embeddings_dir):
+        A keyword index loaded while it still matches the store can take the
+        change in place instead of being rebuilt from every store record.
+
+        Returns:
+            int: Store vector generation before the change.
+        """
+        if INDEX_KEYWORD_INDEX and self.keyword_index is None:
             try:
-                self.similarity_search = SimilaritySearch(embeddings_dir=embeddings_dir)
-                logger.info(f"SimilaritySearch initialized successfully with {len(self.similarity_search.embeddings)} embedding files")
+                self.keyword_index = KeywordIndex.open(self.index_store)
             except Exception as e:
-                logger.error(f"Error initializing SimilaritySearch: {e}", exc_info=True)
-                self.similarity_search = None
-        else:
-            logger.warning(f"Embeddings directory does not exist: {embeddings_dir}")
-            self.similarity_search = None
+                logger.error(f"Error loading keyword index: {e}", exc_info=True)
+        return self.index_store.vector_generation
 
-    def _load_metadata_cache(self) -> None:
-        """Load all existing metadata into cache."""
-        metadata_dir: str = os.path.join(self.index_dir, "metadata")
-        logger.debug(f"Loading metadata cache from {metadata_dir}")
+    def _update_keyword_index(self, base_generation: int, updated: Optional[List[FileMetadata]] = None,
+                              removed: Optional[List[str]] = None) -> None:
+        """Apply a change to the index store to the BM25 keyword index and save it.
 
-        if not os.path.exists(metadata_dir):
-            logger.warning(f"Metadata directory does not exist: {metadata_dir}")
-            return
+        The changed files are applied in place when the loaded keyword index matched
+        the store before the change; otherwise it is loaded or rebuilt from the store.
 
+        Args:
+            base_generation (int): Store vector generation before the change.
+            updated (Optional[List[FileMetadata]]): Files that were (re)indexed.
+            removed (Optional[List[str]]): Paths of files that were removed from the index.
+        """
+        if not INDEX_KEYWORD_INDEX:
+            return
         try:
-            metadata_files: List[str] = os.listdir(metadata_dir)
-            logger.debug(f"Found {len(metadata_files)} files in metadata directory")
+            keyword_index = self.keyword_index
+            if keyword_index is None or keyword_index.generation != base_generation:
+                self.keyword_index = KeywordIndex.open(self.index_store)
+                return
+            if removed:
+                keyword_index.remove_files(removed)
+            if updated:
+                keyword_index.update_files((metadata.path, metadata.chunks) for metadata in updated)
+            keyword_index.save_for(self.index_store)
         except Exception as e:
-            logger.error(f"Error listing metadata directory {metadata_dir}: {str(e)}", exc_info=True)
-            return
+            logger.error(f"Error updating keyword index: {e}", exc_info=True)
+            self.keyword_index = None
+
+    def _load_metadata_cache(self) -> None:
+        """Load all existing metadata into cache from the index store manifest."""
+        logger.debug(f"Loading metadata cache from index store in {self.index_dir}")
 
         loaded_count: int = 0
-        error_count: int = 0
+        for file_path, entry in self.index_store.iter_entries():
+            self.metadata_cache[file_path] = {
+                "hash": entry.get("hash"),
+                "modified_time": entry.get("modified_time"),
+                "stat": tuple(entry["stat"]) if entry.get("stat") else None,
+                "description_status": entry.get("description_status", DESCRIPTION_STATUS_COMPLETE),
+            }
+            loaded_count += 1
 
-        for metadata_file in metadata_files:
-            if metadata_file.endswith(".json"):
-                file_path: str = os.path.join(metadata_dir, metadata_file)
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        data: Dict[str, Any] = json.load(f)
-                        self.metadata_cache[data["path"]] = {
-                            "hash": data["hash"],
-                            "modified_time": data["modified_time"],
-                        }
-                        loaded_count += 1
-                        if loaded_count % 100 == 0:
-                            logger.debug(f"Loaded {loaded_count} metadata files so far")
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Error loading metadata cache from {file_path}: {str(e)}", exc_info=True)
+        logger.info(f"Loaded {loaded_count} index entries into metadata cache")
+
+    def get_file_record(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the stored index record (metadata, description, signatures, chunks) for a file.
 
-        logger.info(f"Loaded {loaded_count} metadata files into cache (with {error_count} errors)")
+        Args:
+            file_path (str): Absolute path of the indexed file.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the file is not indexed.
+        """
+        return self.index_store.get_record(file_path)
+
+    def iter_file_records(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the stored index records of all indexed files.
+
+        Yields:
+            Dict[str, Any]: One record per indexed file (embeddings excluded).
+        """
+        for record, _ in self.index_store.iter_records():
+            yield record
 
     def _should_update_file(self, entry: DirectoryEntry) -> bool:
         """Check if a file needs to be updated in the index.
@@ -1299,10 +1699,13 @@ END OF FILE:
         Returns:
             bool: True if the file needs to be indexed/updated.
         """
+        cached_data: Optional[Dict[str, Any]] = self.metadata_cache.get(entry.path)
+        if self._stat_unchanged(entry, cached_data):
+            return False
+
         if not self._should_index_file(entry):
             return False
 
-        cached_data: Optional[Dict[str, Any]] = self.metadata_cache.get(entry.path)
         if not cached_data:
             return True
 
@@ -1314,6 +1717,79 @@ END OF FILE:
 
         return False
 
+    def _stat_unchanged(self, entry: DirectoryEntry, cached_data: Optional[Dict[str, Any]]) -> bool:
+        """Check whether an indexed file still has the stat signature its hash was computed for.
+
+        Args:
+            entry (DirectoryEntry): DirectoryEntry for the file to check.
+            cached_data (Optional[Dict[str, Any]]): The file's metadata cache entry.
+
+        Returns:
+            bool: True if the file is known to be unchanged without reading it.
+        """
+        return bool(
+            INDEX_STAT_CHANGE_DETECTION
+            and cached_data
+            and cached_data.get("stat")
+            and entry.mtime_ns
+            and cached_data["stat"] == entry.stat_signature()
+        )
+
+    def _stat_cache(self) -> Dict[str, Tuple[Tuple[int, int, int], str]]:
+        """Known (stat signature, hash) per indexed file, for DirectoryParser's lazy hashing.
+
+        Returns:
+            Dict[str, Tuple[Tuple[int, int, int], str]]: Empty if stat change detection is disabled.
+        """
+        if not INDEX_STAT_CHANGE_DETECTION:
+            return {}
+        return {
+            path: (cached["stat"], cached["hash"])
+            for path, cached in self.metadata_cache.items()
+            if cached.get("stat") and cached.get("hash")
+        }
+
+    def _create_directory_parser(self) -> DirectoryParser:
+        """Create a DirectoryParser for the root that only hashes files whose stat changed.
+
+        Returns:
+            DirectoryParser: Parser applying the indexer's .gitignore rules.
+        """
+        return DirectoryParser(
+            self.root_path, gitignore_path=self.gitignore_path, stat_cache=self._stat_cache()
+        )
+
+    def _note_stat_signature(self, entry: DirectoryEntry, stat_updates: Dict[str, Dict[str, Any]]) -> None:
+        """Remember the stat signature of an unchanged file whose indexed signature is missing or stale.
+
+        Indexes written before stat change detection, and files that were indexed
+        right after being modified, get their signature filled in this way, so the
+        next scan does not hash them again.
+
+        Args:
+            entry (DirectoryEntry): Unchanged indexed file.
+            stat_updates (Dict[str, Dict[str, Any]]): Manifest updates, keyed by path.
+        """
+        cached_data: Dict[str, Any] = self.metadata_cache[entry.path]
+        signature: Optional[Tuple[int, int, int]] = self._trusted_stat_signature(entry)
+        if signature and cached_data.get("stat") != signature and cached_data.get("hash") == entry.file_hash:
+            cached_data["stat"] = signature
+            stat_updates[entry.path] = {"stat": list(signature)}
+
+    @staticmethod
+    def _trusted_stat_signature(entry: DirectoryEntry) -> Optional[Tuple[int, int, int]]:
+        """Return the entry's stat signature unless the file was modified too recently to trust it.
+
+        Args:
+            entry (DirectoryEntry): DirectoryEntry with the stat the hash was computed for.
+
+        Returns:
+            Optional[Tuple[int, int, int]]: (size, mtime_ns, inode), or None.
+        """
+        if not entry.mtime_ns or time.time() - entry.mtime_ns / 1e9 < RACY_STAT_SECONDS:
+            return None
+        return entry.stat_signature()
+
     def index_directory(
         self, cancel_check_callback: Optional[Callable[[], bool]] = None
     ) -> List[FileMetadata]:
@@ -1358,9 +1834,7 @@ END OF FILE:
         try:
             logger.debug(f"CHECKPOINT: [2] Creating DirectoryParser for {self.root_path}")
             direct_logger.log(f"CHECKPOINT: [2] Creating DirectoryParser for {self.root_path}")
-            parser: DirectoryParser = DirectoryParser(
-                self.root_path, gitignore_path=self.gitignore_path
-            )
+            parser: DirectoryParser = self._create_directory_parser()
             logger.debug(f"CHECKPOINT: [2.1] DirectoryParser created successfully")
             direct_logger.log(f"CHECKPOINT: [2.1] DirectoryParser created successfully")
         except Exception as e:
@@ -1369,51 +1843,51 @@ END OF FILE:
             direct_logger.log(f"CHECKPOINT: Returning empty indexed_files list due to error")
             return indexed_files
 
-        try:
-            logger.debug(f"CHECKPOINT: [3] Starting directory tree parsing")
-            direct_logger.log(f"CHECKPOINT: [3] Starting directory tree parsing")
-            root_entry: DirectoryEntry = parser.parse()
-            logger.debug(f"CHECKPOINT: [3.1] Directory tree parsing complete")
-            direct_logger.log(f"CHECKPOINT: [3.1] Directory tree parsing complete")
-        except Exception as e:
-            logger.error(f"CHECKPOINT: [3.2] Failed to parse directory tree: {str(e)}", exc_info=True)
-            direct_logger.log(f"CHECKPOINT: [3.2] Failed to parse directory tree: {str(e)}")
-            direct_logger.log(f"CHECKPOINT: Returning empty indexed_files list due to error")
-            return indexed_files
-
-        files_to_index: List[DirectoryEntry] = []
+        files_to_index: List[DirectoryEntry] = []
+        stat_updates: Dict[str, Dict[str, Any]] = {}
         try:
             logger.debug(f"CHECKPOINT: [4] Starting file collection process")
             direct_logger.log(f"CHECKPOINT: [4] Starting file collection process")
 
-            def collect_files(entry: DirectoryEntry):
+            logger.debug(f"CHECKPOINT: [4.3] Walking directory tree")
+            direct_logger.log(f"CHECKPOINT: [4.3] Walking directory tree")
+            for entry in parser.walk_files():
                 try:
                     if self._should_update_file(entry):
                         files_to_index.append(entry)
                         if len(files_to_index) % 100 == 0:
                             logger.debug(f"CHECKPOINT: [4.1] Collected {len(files_to_index)} files so far")
                             direct_logger.log(f"CHECKPOINT: [4.1] Collected {len(files_to_index)} files so far")
+                    elif INDEX_STAT_CHANGE_DETECTION and entry.path in self.metadata_cache:
+                        self._note_stat_signature(entry, stat_updates)
                 except Exception as e:
                     logger.error(f"CHECKPOINT: [4.2] Error checking if file should be updated {entry.path}: {str(e)}", exc_info=True)
                     direct_logger.log(f"CHECKPOINT: [4.2] Error checking if file should be updated {entry.path}: {str(e)}")
-
-                for child in entry.children:
-                    collect_files(child)
-
-            logger.debug(f"CHECKPOINT: [4.3] Starting recursive file collection")
-            direct_logger.log(f"CHECKPOINT: [4.3] Starting recursive file collection")
-            collect_files(root_entry)
+            logger.debug(f"CHECKPOINT: [4.3.1] Walked {parser.file_count} files in {parser.dir_count} directories, {parser.ignored_count} paths ignored")
+            direct_logger.log(f"CHECKPOINT: [4.3.1] Walked {parser.file_count} files in {parser.dir_count} directories, {parser.ignored_count} paths ignored")
             logger.info(f"CHECKPOINT: [4.4] Found {len(files_to_index)} files to index")
             direct_logger.log(f"CHECKPOINT: [4.4] Found {len(files_to_index)} files to index")
+            if parser.reused_hashes:
+                logger.info(f"CHECKPOINT: [4.4.2] {parser.reused_hashes} files were unchanged by stat and not hashed")
+                direct_logger.log(f"CHECKPOINT: [4.4.2] {parser.reused_hashes} files were unchanged by stat and not hashed")
+            if stat_updates:
+                self.index_store.update_entries(stat_updates)
         except Exception as e:
             logger.error(f"CHECKPOINT: [4.5] Failed to collect files to index: {str(e)}", exc_info=True)
             direct_logger.log(f"CHECKPOINT: [4.5] Failed to collect files to index: {str(e)}")
             direct_logger.log(f"CHECKPOINT: Returning empty indexed_files list due to error")
             return indexed_files
 
+        requeued: int = self._requeue_pending_descriptions({entry.path for entry in files_to_index})
+        if requeued:
+            logger.info(f"CHECKPOINT: [4.4.1] Retrying {requeued} descriptions left pending or failed by earlier runs")
+            direct_logger.log(f"CHECKPOINT: [4.4.1] Retrying {requeued} descriptions left pending or failed by earlier runs")
+
         if not files_to_index:
             logger.info("CHECKPOINT: [4.6] No files need updating in the index.")
             direct_logger.log("CHECKPOINT: [4.6] No files need updating in the index.")
+            self._publish_description_updates()
+            self._record_git_state()
             return indexed_files
 
         if files_to_index:
@@ -1423,58 +1897,165 @@ END OF FILE:
 
         indexed_files = []
         failed_files = []
+        segment_committed: bool = False
 
+        keyword_generation: int = self._begin_keyword_update()
+        self._segment_writer = self.index_store.begin_segment()
         try:
-            logger.debug(f"CHECKPOINT: [5] Creating thread pool with {os.cpu_count()} workers")
-            direct_logger.log(f"CHECKPOINT: [5] Creating thread pool with {os.cpu_count()} workers")
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=os.cpu_count()
-            ) as executor:
-                logger.debug(f"CHECKPOINT: [5.1] Submitting {len(files_to_index)} files for processing")
-                direct_logger.log(f"CHECKPOINT: [5.1] Submitting {len(files_to_index)} files for processing")
-                future_to_file = {
-                    executor.submit(self._process_single_file, entry): entry
-                    for entry in files_to_index
-                }
-                logger.debug(f"CHECKPOINT: [5.2] All files submitted to thread pool")
-                direct_logger.log(f"CHECKPOINT: [5.2] All files submitted to thread pool")
-
-                completed_count: int = 0
-                for future in concurrent.futures.as_completed(future_to_file):
-                    completed_count += 1
-                    if completed_count % 10 == 0 or completed_count == len(files_to_index):
-                        logger.debug(f"CHECKPOINT: [5.3] Processed {completed_count}/{len(files_to_index)} files")
-                        direct_logger.log(f"CHECKPOINT: [5.3] Processed {completed_count}/{len(files_to_index)} files")
-
-                    if cancel_check_callback and cancel_check_callback():
-                        logger.info("CHECKPOINT: [5.4] Indexing cancelled by user")
-                        direct_logger.log("CHECKPOINT: [5.4] Indexing cancelled by user")
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        return indexed_files
-
-                    entry: DirectoryEntry = future_to_file[future]
-                    try:
-                        metadata: Optional[FileMetadata] = future.result()
-                        if metadata:
-                            indexed_files.append(metadata)
-                            self.metadata_cache[entry.path] = {
-                                "hash": entry.file_hash,
-                                "modified_time": entry.modified_time,
-                            }
-                            if len(indexed_files) % 50 == 0:
-                                logger.debug(f"CHECKPOINT: [5.5] Successfully indexed {len(indexed_files)} files so far")
-                                direct_logger.log(f"CHECKPOINT: [5.5] Successfully indexed {len(indexed_files)} files so far")
-                        else:
-                            failed_files.append(entry.path)
-                            logger.warning(f"CHECKPOINT: [5.6] Failed to index {os.path.basename(entry.path)}")
-                            direct_logger.log(f"CHECKPOINT: [5.6] Failed to index {os.path.basename(entry.path)}")
-                    except Exception as e:
-                        failed_files.append(entry.path)
-                        logger.error(f"CHECKPOINT: [5.7] Error processing file {entry.path}: {str(e)}", exc_info=True)
-                        direct_logger.log(f"CHECKPOINT: [5.7] Error processing file {entry.path}: {str(e)}")
-        except Exception as e:
-            logger.error(f"CHECKPOINT: [5.8] Error during parallel file processing: {str(e)}", exc_info=True)
-            direct_logger.log(f"CHECKPOINT: [5.8] Error during parallel file processing: {str(e)}")
+            try:
+                use_processes: bool = (
+                    INDEX_PROCESS_POOL and INDEX_PARSE_WORKERS > 1
+                    and len(files_to_index) >= INDEX_PROCESS_POOL_MIN_FILES
+                )
+                warm_extensions: List[str] = []
+                if INDEX_PREWARM_PARSERS:
+                    warm_extensions = sorted({os.path.splitext(entry.path)[1].lower() for entry in files_to_index})
+                    if not use_processes:
+                        warmed: List[str] = self.code_embedder.chunker.warm_parsers(warm_extensions)
+                        logger.debug(f"CHECKPOINT: [4.8] Pre-warmed parsers: {', '.join(warmed) or 'none'}")
+                        direct_logger.log(f"CHECKPOINT: [4.8] Pre-warmed parsers: {', '.join(warmed) or 'none'}")
+                pool_kind: str = "process" if use_processes else "thread"
+                logger.debug(f"CHECKPOINT: [5] Creating {pool_kind} pool with {INDEX_PARSE_WORKERS} workers")
+                direct_logger.log(f"CHECKPOINT: [5] Creating {pool_kind} pool with {INDEX_PARSE_WORKERS} workers")
+                with self._create_prepare_executor(use_processes, warm_extensions) as executor, \
+                        EmbeddingBatcher(self.code_embedder.embed_texts) as batcher, \
+                        concurrent.futures.ThreadPoolExecutor(
+                            max_workers=description_concurrency(AI_DESCRIPTION_PROVIDER),
+                            thread_name_prefix="describe",
+                        ) as description_executor:
+                    # Parsing (CPU) feeds the embedding batcher and description queue (I/O). Only a bounded
+                    # number of files is in flight between the stages, so a slow provider throttles parsing.
+                    # Parse worker processes never call the provider: without the description queue, their
+                    # descriptions are generated here on I/O threads before the file is saved.
+                    max_prepare_in_flight: int = INDEX_PARSE_WORKERS * 2
+                    entries: Iterator[DirectoryEntry] = iter(files_to_index)
+                    prepare_futures: Dict[concurrent.futures.Future, DirectoryEntry] = {}
+                    embedding_to_metadata: Dict[
+                        concurrent.futures.Future,
+                        Tuple[FileMetadata, Dict[int, np.ndarray], Optional[concurrent.futures.Future]],
+                    ] = {}
+                    reused_count: int = 0
+
+                    def submit_prepare_work() -> None:
+                        while (len(prepare_futures) < max_prepare_in_flight
+                               and len(embedding_to_metadata) < INDEX_MAX_PENDING_FILES):
+                            entry = next(entries, None)
+                            if entry is None:
+                                return
+                            prepare_futures[self._submit_prepare(executor, use_processes, entry)] = entry
+
+                    logger.debug(f"CHECKPOINT: [5.1] Submitting {len(files_to_index)} files for processing")
+                    direct_logger.log(f"CHECKPOINT: [5.1] Submitting {len(files_to_index)} files for processing")
+                    submit_prepare_work()
+
+                    completed_count: int = 0
+                    while prepare_futures or embedding_to_metadata:
+                        if cancel_check_callback and cancel_check_callback():
+                            logger.info("CHECKPOINT: [5.4] Indexing cancelled by user")
+                            direct_logger.log("CHECKPOINT: [5.4] Indexing cancelled by user")
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            batcher.cancel()
+                            return indexed_files
+
+                        if not prepare_futures:
+                            batcher.flush()
+                        done, _ = concurrent.futures.wait(
+                            list(prepare_futures) + list(embedding_to_metadata),
+                            return_when=concurrent.futures.FIRST_COMPLETED,
+                        )
+
+                        for future in done:
+                            if future in prepare_futures:
+                                entry: DirectoryEntry = prepare_futures.pop(future)
+                                completed_count += 1
+                                if completed_count % 10 == 0 or completed_count == len(files_to_index):
+                                    logger.debug(f"CHECKPOINT: [5.3] Prepared {completed_count}/{len(files_to_index)} files")
+                                    direct_logger.log(f"CHECKPOINT: [5.3] Prepared {completed_count}/{len(files_to_index)} files")
+                                try:
+                                    prepared: Optional[FileMetadata] = self._prepared_result(future, entry)
+                                    if prepared:
+                                        description_future: Optional[concurrent.futures.Future] = None
+                                        if prepared.description_job is not None:
+                                            if DESCRIPTION_QUEUE_ENABLED:
+                                                self._get_description_queue().submit(prepared.description_job)
+                                            else:
+                                                description_future = description_executor.submit(
+                                                    self._generate_job_description, prepared.description_job
+                                                )
+                                            prepared.description_job = None
+                                        reused: Dict[int, np.ndarray] = self._reusable_chunk_embeddings(prepared)
+                                        reused_count += len(reused)
+                                        embedding_future = batcher.submit([
+                                            chunk["text"] for i, chunk in enumerate(prepared.chunks) if i not in reused
+                                        ])
+                                        embedding_to_metadata[embedding_future] = (prepared, reused, description_future)
+                                    else:
+                                        failed_files.append(entry.path)
+                                        logger.warning(f"CHECKPOINT: [5.6] Failed to index {os.path.basename(entry.path)}")
+                                        direct_logger.log(f"CHECKPOINT: [5.6] Failed to index {os.path.basename(entry.path)}")
+                                except Exception as e:
+                                    failed_files.append(entry.path)
+                                    logger.error(f"CHECKPOINT: [5.7] Error processing file {entry.path}: {str(e)}", exc_info=True)
+                                    direct_logger.log(f"CHECKPOINT: [5.7] Error processing file {entry.path}: {str(e)}")
+                                continue
+
+                            prepared, reused, description_future = embedding_to_metadata.pop(future)
+                            try:
+                                if description_future is not None:
+                                    # A failed description is stored empty and retried by the next run
+                                    description: Optional[str] = description_future.result()
+                                    prepared.description = description or ""
+                                    prepared.description_status = (
+                                        DESCRIPTION_STATUS_COMPLETE if description else DESCRIPTION_STATUS_FAILED
+                                    )
+                                embeddings = self._merge_chunk_embeddings(
+                                    prepared, reused, self.code_embedder.postprocess_embeddings(future.result())
+                                )
+                                metadata: Optional[FileMetadata] = self._finish_file(prepared, embeddings)
+                                if metadata:
+                                    indexed_files.append(metadata)
+                                    self._update_metadata_cache(metadata)
+                                    if len(indexed_files) % 50 == 0:
+                                        logger.debug(f"CHECKPOINT: [5.5] Successfully indexed {len(indexed_files)} files so far")
+                                        direct_logger.log(f"CHECKPOINT: [5.5] Successfully indexed {len(indexed_files)} files so far")
+                                else:
+                                    failed_files.append(prepared.path)
+                                    logger.warning(f"CHECKPOINT: [5.6] Failed to index {os.path.basename(prepared.path)}")
+                                    direct_logger.log(f"CHECKPOINT: [5.6] Failed to index {os.path.basename(prepared.path)}")
+                            except Exception as e:
+                                failed_files.append(prepared.path)
+                                logger.error(f"CHECKPOINT: [5.7] Error embedding file {prepared.path}: {str(e)}", exc_info=True)
+                                direct_logger.log(f"CHECKPOINT: [5.7] Error embedding file {prepared.path}: {str(e)}")
+
+                        submit_prepare_work()
+
+                    logger.info(
+                        f"CHECKPOINT: [5.7.1] Embedded {batcher.texts_sent} chunks in {batcher.batches_sent} batches, "
+                        f"reused {reused_count} stored chunk embeddings"
+                    )
+            except Exception as e:
+                logger.error(f"CHECKPOINT: [5.8] Error during parallel file processing: {str(e)}", exc_info=True)
+                direct_logger.log(f"CHECKPOINT: [5.8] Error during parallel file processing: {str(e)}")
+        finally:
+            writer = self._segment_writer
+            try:
+                committed: int = writer.commit()
+                segment_committed = True
+                logger.info(f"CHECKPOINT: [5.9] Committed {committed} files to index segment {writer.segment_id}")
+                direct_logger.log(f"CHECKPOINT: [5.9] Committed {committed} files to index segment {writer.segment_id}")
+                if committed:
+                    self._publish_index_changes(keyword_generation, updated=indexed_files)
+            except Exception as e:
+                logger.error(f"CHECKPOINT: [5.10] Failed to commit index segment: {str(e)}", exc_info=True)
+                direct_logger.log(f"CHECKPOINT: [5.10] Failed to commit index segment: {str(e)}")
+            finally:
+                # Descriptions finished during the run were buffered until the segment was committed
+                self._segment_writer = None
+                self._publish_description_updates()
+
+        if self._description_queue is not None and self._description_queue.pending:
+            logger.info(f"CHECKPOINT: [5.11] {self._description_queue.pending} descriptions are still being generated")
+            direct_logger.log(f"CHECKPOINT: [5.11] {self._description_queue.pending} descriptions are still being generated")
 
         logger.info(f"CHECKPOINT: [6] Indexing process completed, generating summary")
         direct_logger.log(f"CHECKPOINT: [6] Indexing process completed, generating summary")
@@ -1493,34 +2074,131 @@ END OF FILE:
         direct_logger.log(f"CHECKPOINT: [6.4] Index directory exists: {index_dir_exists}")
 
         if index_dir_exists:
-            metadata_dir: str = os.path.join(self.index_dir, "metadata")
-            metadata_dir_exists: bool = os.path.exists(metadata_dir)
-            logger.info(f"CHECKPOINT: [6.5] Metadata directory exists: {metadata_dir_exists}")
-            direct_logger.log(f"CHECKPOINT: [6.5] Metadata directory exists: {metadata_dir_exists}")
+            store_stats: Dict[str, Any] = self.index_store.get_stats()
+            logger.info(
+                f"CHECKPOINT: [6.5] Index store holds {store_stats['files']} files in {store_stats['segments']} segments"
+            )
+            direct_logger.log(
+                f"CHECKPOINT: [6.5] Index store holds {store_stats['files']} files in {store_stats['segments']} segments"
+            )
 
-            if metadata_dir_exists:
-                try:
-                    metadata_files: List[str] = os.listdir(metadata_dir)
-                    logger.info(f"CHECKPOINT: [6.6] Metadata directory contains {len(metadata_files)} files")
-                    direct_logger.log(f"CHECKPOINT: [6.6] Metadata directory contains {len(metadata_files)} files")
-                except Exception as e:
-                    logger.error(f"CHECKPOINT: [6.7] Error listing metadata directory: {str(e)}", exc_info=True)
-                    direct_logger.log(f"CHECKPOINT: [6.7] Error listing metadata directory: {str(e)}")
+        if segment_committed:
+            indexed_paths: Set[str] = {metadata.path for metadata in indexed_files}
+            self._record_git_state(entry.path for entry in files_to_index if entry.path not in indexed_paths)
 
         logger.info(f"CHECKPOINT: [7] Indexing complete. Successfully indexed {len(indexed_files)} files")
         direct_logger.log(f"CHECKPOINT: [7] Indexing complete. Successfully indexed {len(indexed_files)} files")
 
         return indexed_files
 
-    def _process_single_file(self, entry: DirectoryEntry) -> Optional[FileMetadata]:
+    def _create_prepare_executor(self, use_processes: bool,
+                                 warm_extensions: Optional[List[str]] = None) -> concurrent.futures.Executor:
+        """Create the pool that runs _prepare_file() during index_directory().
+
+        Args:
+            use_processes (bool): Use worker processes, each with its own parsers and analyzers.
+            warm_extensions (Optional[List[str]]): File extensions whose parsers worker
+                processes create when they start.
+
+        Returns:
+            concurrent.futures.Executor: A process or thread pool with INDEX_PARSE_WORKERS workers.
+        """
+        self._prepare_pool_broken = False
+        if use_processes:
+            return concurrent.futures.ProcessPoolExecutor(
+                max_workers=INDEX_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_prepare_worker,
+                initargs=(self.root_path, self.excluded_extensions, warm_extensions or []),
+            )
+        return concurrent.futures.ThreadPoolExecutor(max_workers=INDEX_PARSE_WORKERS)
+
+    def _submit_prepare(self, executor: concurrent.futures.Executor, use_processes: bool,
+                        entry: DirectoryEntry) -> concurrent.futures.Future:
+        """Submit one file to the prepare pool.
+
+        Args:
+            executor (concurrent.futures.Executor): Pool from _create_prepare_executor().
+            use_processes (bool): Whether the pool is a process pool.
+            entry (DirectoryEntry): File to prepare.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the prepared FileMetadata or None.
+        """
+        if not use_processes:
+            return executor.submit(self._prepare_file, entry, DESCRIPTION_QUEUE_ENABLED)
+
+        # Descriptions are always deferred here, so the parse pool never waits on the provider
+        if not self._prepare_pool_broken:
+            try:
+                return executor.submit(_prepare_file_in_worker, entry)
+            except (BrokenProcessPool, RuntimeError) as e:
+                # e.g. spawning from a main module without an ``if __name__ == "__main__"`` guard
+                self._prepare_pool_broken = True
+                logger.warning(f"Parse worker processes unavailable, preparing files in-process: {str(e).strip().splitlines()[0]}")
+
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_result(self._prepare_file(entry, defer_description=True))
+        return future
+
+    def _prepared_result(self, future: concurrent.futures.Future, entry: DirectoryEntry) -> Optional[FileMetadata]:
+        """Get the result of a prepare future, preparing the file here if its worker process died.
+
+        Args:
+            future (concurrent.futures.Future): Future from _submit_prepare().
+            entry (DirectoryEntry): The file the future prepares.
+
+        Returns:
+            Optional[FileMetadata]: Prepared metadata, or None if preparing failed.
+        """
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            logger.warning(f"Parse worker process failed ({e}), preparing {entry.path} in-process")
+            return self._prepare_file(entry, defer_description=True)
+
+    def _process_single_file(self, entry: DirectoryEntry, defer_description: bool = False) -> Optional[FileMetadata]:
         """Process a single file for indexing.
 
         Args:
             entry (DirectoryEntry): DirectoryEntry for the file to process.
+            defer_description (bool): Hand the description to the description queue
+                instead of generating it before the file is saved.
 
         Returns:
             Optional[FileMetadata]: Metadata for the processed file, or None if processing failed.
         """
+        metadata: Optional[FileMetadata] = self._prepare_file(entry, defer_description)
+        if metadata is None:
+            return None
+        if metadata.description_job is not None:
+            self._get_description_queue().submit(metadata.description_job)
+            metadata.description_job = None
+
+        try:
+            reused: Dict[int, np.ndarray] = self._reusable_chunk_embeddings(metadata)
+            missing: List[Dict[str, Any]] = [chunk for i, chunk in enumerate(metadata.chunks) if i not in reused]
+            logger.debug(f"CHECKPOINT: [FILE.20] Embedding {len(missing)} of {len(metadata.chunks)} chunks for {entry.path}")
+            new_embeddings = self.code_embedder.embed_chunks(missing) if missing else np.zeros((0, 0), dtype=np.float32)
+            embeddings = self._merge_chunk_embeddings(metadata, reused, new_embeddings)
+            logger.debug(f"CHECKPOINT: [FILE.21] Embeddings generated successfully for {entry.path}")
+        except Exception as e:
+            logger.error(f"CHECKPOINT: [FILE.22] Error embedding chunks for {entry.path}: {str(e)}", exc_info=True)
+            return None
+
+        return self._finish_file(metadata, embeddings)
+
+    def _prepare_file(self, entry: DirectoryEntry, defer_description: bool = False) -> Optional[FileMetadata]:
+        """Read, chunk, describe and analyze a file, leaving embeddings to the caller.
+
+        Args:
+            entry (DirectoryEntry): DirectoryEntry for the file to process.
+            defer_description (bool): Leave the description pending and attach a job for
+                the description queue instead of generating it here (unless it is cached).
+
+        Returns:
+            Optional[FileMetadata]: Metadata with empty embeddings, or None if processing failed.
+        """
         try:
             logger.debug(f"CHECKPOINT: [FILE.1] Starting to process file: {entry.path}")
 
@@ -1534,64 +2212,69 @@ END OF FILE:
 
             logger.debug(f"CHECKPOINT: [FILE.4] File exists and is readable: {entry.path}")
 
+            # Read and parse the file once; every later stage works on the same bytes, text and chunks
             try:
-                logger.debug(f"CHECKPOINT: [FILE.5] Extracting signatures from {entry.path}")
-                signatures: List[FileSignature] = self._extract_signatures(entry.path)
-                logger.debug(f"CHECKPOINT: [FILE.6] Found {len(signatures)} signatures in {entry.path}")
+                logger.debug(f"CHECKPOINT: [FILE.5] Reading file content: {entry.path}")
+                with open(entry.path, "rb") as f:
+                    source_bytes: bytes = f.read()
+                content: str = decode_source(source_bytes)
+                logger.debug(f"CHECKPOINT: [FILE.6] Read {len(source_bytes)} bytes from {entry.path}")
             except Exception as e:
-                logger.error(f"CHECKPOINT: [FILE.7] Error extracting signatures from {entry.path}: {str(e)}", exc_info=True)
-                signatures = []
-                logger.debug(f"CHECKPOINT: [FILE.8] Continuing with empty signatures list")
+                logger.error(f"CHECKPOINT: [FILE.7] Error reading {entry.path}: {str(e)}", exc_info=True)
+                return None
 
+            parsed_chunks: Optional[List[Dict[str, Any]]] = None
             try:
-                logger.debug(f"CHECKPOINT: [FILE.9] Generating description for {entry.path}")
-                description: str = self._generate_description(entry.path, signatures)
-                logger.debug(f"CHECKPOINT: [FILE.10] Description generated successfully for {entry.path}")
+                logger.debug(f"CHECKPOINT: [FILE.8] Chunking file: {entry.path}")
+                chunks: List[Dict[str, Any]] = self.code_embedder.chunker.chunk_file(
+                    entry.path, source_bytes=source_bytes
+                )
+                parsed_chunks = chunks
+                logger.debug(f"CHECKPOINT: [FILE.9] Generated {len(chunks)} chunks for {entry.path}")
+            except ValueError as e:
+                if "Unsupported language for file" not in str(e):
+                    logger.error(f"CHECKPOINT: [FILE.23] Error processing file: {str(e)}")
+                    return None
+                logger.info(f"CHECKPOINT: [FILE.16] Using generic text processing for unsupported file type: {entry.path}")
+                chunks = [
+                    {
+                        "text": content,
+                        "type": "generic_text",
+                        "start_line": 1,
+                        "end_line": content.count("\n") + 1,
+                    }
+                ]
             except Exception as e:
-                logger.error(f"CHECKPOINT: [FILE.11] Error generating description for {entry.path}: {str(e)}", exc_info=True)
-                description = f"File: {os.path.basename(entry.path)}"
-                logger.debug(f"CHECKPOINT: [FILE.12] Using fallback description: {description}")
+                logger.error(f"CHECKPOINT: [FILE.24] Failed to process file content for {entry.path}: {str(e)}", exc_info=True)
+                return None
+
+            for chunk in chunks:
+                chunk["hash"] = chunk_text_hash(chunk["text"])
 
             try:
-                logger.debug(f"CHECKPOINT: [FILE.13] Processing file with code_embedder: {entry.path}")
-                chunks: List[Dict[str, Any]] = []
-                embeddings: Optional[List[List[float]]] = None
+                logger.debug(f"CHECKPOINT: [FILE.10] Extracting signatures from {entry.path}")
+                signatures: List[FileSignature] = self._extract_signatures(
+                    entry.path, chunks=parsed_chunks if parsed_chunks is not None else [], content=content
+                )
+                logger.debug(f"CHECKPOINT: [FILE.11] Found {len(signatures)} signatures in {entry.path}")
+            except Exception as e:
+                logger.error(f"CHECKPOINT: [FILE.12] Error extracting signatures from {entry.path}: {str(e)}", exc_info=True)
+                signatures = []
 
-                try:
-                    logger.debug(f"CHECKPOINT: [FILE.14] Calling code_embedder.process_file for {entry.path}")
-                    chunks, embeddings = self.code_embedder.process_file(entry.path)
-                    logger.debug(f"CHECKPOINT: [FILE.15] Generated {len(chunks)} chunks and embeddings for {entry.path}")
-                except ValueError as e:
-                    if "Unsupported language for file" in str(e):
-                        logger.info(f"CHECKPOINT: [FILE.16] Using generic text processing for unsupported file type: {entry.path}")
-                        try:
-                            logger.debug(f"CHECKPOINT: [FILE.17] Reading file content for generic processing: {entry.path}")
-                            with open(entry.path, "r", encoding="utf-8", errors="replace") as f:
-                                content: str = f.read()
-                            logger.debug(f"CHECKPOINT: [FILE.18] Successfully read file content, length: {len(content)} chars")
-
-                            chunks = [
-                                {
-                                    "text": content,
-                                    "type": "generic_text",
-                                    "start_line": 1,
-                                    "end_line": content.count("\n") + 1,
-                                }
-                            ]
-                            logger.debug(f"CHECKPOINT: [FILE.19] Created generic text chunk")
-
-                            logger.debug(f"CHECKPOINT: [FILE.20] Embedding generic text chunk")
-                            embeddings = self.code_embedder.embed_chunks(chunks)
-                            logger.debug(f"CHECKPOINT: [FILE.21] Generic text embedding generated successfully")
-                        except Exception as inner_e:
-                            logger.error(f"CHECKPOINT: [FILE.22] Error processing generic text for {entry.path}: {str(inner_e)}", exc_info=True)
-                            raise
-                    else:
-                        logger.error(f"CHECKPOINT: [FILE.23] Error processing file: {str(e)}")
-                        raise
+            description_job: Optional[DescriptionJob] = None
+            try:
+                if defer_description:
+                    description, description_job = self._prepare_description(
+                        entry.path, entry.file_hash, signatures, content
+                    )
+                    logger.debug(f"CHECKPOINT: [FILE.13.1] Description of {entry.path} is {'queued' if description_job else 'cached'}")
+                else:
+                    logger.debug(f"CHECKPOINT: [FILE.13] Generating description for {entry.path}")
+                    description: str = self._generate_description(entry.path, signatures, content)
+                    logger.debug(f"CHECKPOINT: [FILE.14] Description generated successfully for {entry.path}")
             except Exception as e:
-                logger.error(f"CHECKPOINT: [FILE.24] Failed to process file content for {entry.path}: {str(e)}", exc_info=True)
-                return None
+                logger.error(f"CHECKPOINT: [FILE.15] Error generating description for {entry.path}: {str(e)}", exc_info=True)
+                description = f"File: {os.path.basename(entry.path)}"
 
             # Enhanced metadata analysis
             enhanced_info = None
@@ -1601,47 +2284,139 @@ END OF FILE:
             if self.enable_enhanced_metadata:
                 try:
                     logger.debug(f"CHECKPOINT: [FILE.24.5] Performing enhanced metadata analysis for {entry.path}")
-                    with open(entry.path, "r", encoding="utf-8", errors="replace") as f:
-                        content = f.read()
-
                     enhanced_info, code_analysis, relationships = self._analyze_enhanced_metadata(entry.path, content)
                     logger.debug(f"CHECKPOINT: [FILE.24.6] Enhanced metadata analysis completed for {entry.path}")
                 except Exception as e:
                     logger.warning(f"CHECKPOINT: [FILE.24.7] Enhanced metadata analysis failed for {entry.path}: {e}")
                     # Continue with basic metadata
 
-            try:
-                logger.debug(f"CHECKPOINT: [FILE.25] Creating FileMetadata object for {entry.path}")
-                metadata: FileMetadata = FileMetadata(
-                    name=entry.name,
-                    path=entry.path,
-                    hash=entry.file_hash,
-                    size=entry.size,
-                    extension=entry.extension,
-                    modified_time=entry.modified_time,
-                    description=description,
-                    signatures=signatures,
-                    chunks=chunks,
-                    embeddings=embeddings.tolist(),
-                    enhanced_info=enhanced_info,
-                    code_analysis=code_analysis,
-                    relationships=relationships,
-                    metadata_version=2
-                )
-                logger.debug(f"CHECKPOINT: [FILE.26] FileMetadata object created successfully")
-
-                logger.debug(f"CHECKPOINT: [FILE.27] Saving file metadata for {entry.path}")
-                self._save_file_metadata(metadata)
-                logger.debug(f"CHECKPOINT: [FILE.28] File metadata saved successfully for {entry.path}")
-                return metadata
-            except Exception as e:
-                logger.error(f"CHECKPOINT: [FILE.29] Error saving metadata for {entry.path}: {str(e)}", exc_info=True)
-                return None
+            logger.debug(f"CHECKPOINT: [FILE.25] Creating FileMetadata object for {entry.path}")
+            return FileMetadata(
+                name=entry.name,
+                path=entry.path,
+                hash=entry.file_hash,
+                size=entry.size,
+                extension=entry.extension,
+                modified_time=entry.modified_time,
+                description=description,
+                signatures=signatures,
+                chunks=chunks,
+                embeddings=[],
+                enhanced_info=enhanced_info,
+                code_analysis=code_analysis,
+                relationships=relationships,
+                metadata_version=2,
+                description_status=DESCRIPTION_STATUS_PENDING if description_job else DESCRIPTION_STATUS_COMPLETE,
+                stat_signature=self._trusted_stat_signature(entry),
+                description_job=description_job,
+            )
 
         except Exception as e:
             logger.error(f"CHECKPOINT: [FILE.30] Unexpected error processing file {entry.path}: {str(e)}", exc_info=True)
             return None
 
+    def _reusable_chunk_embeddings(self, metadata: FileMetadata) -> Dict[int, np.ndarray]:
+        """Find the chunks of a prepared file whose stored embeddings are still valid.
+
+        New chunks are matched against the file's stored chunks by the hash of
+        their normalized text, so only new or changed chunks need to be embedded.
+
+        Args:
+            metadata (FileMetadata): Metadata returned by _prepare_file().
+
+        Returns:
+            Dict[int, np.ndarray]: Stored embedding per reusable chunk index.
+        """
+        if (not CHUNK_EMBEDDING_REUSE or self.code_embedder.use_dimensionality_reduction
+                or not self.index_store.has_file(metadata.path)):
+            return {}
+        try:
+            record: Optional[Dict[str, Any]] = self.index_store.get_record(metadata.path)
+            if not record or record.get("embedding_model") != self._embedding_model_id():
+                return {}
+            stored_chunks: List[Dict[str, Any]] = record.get("chunks", [])
+            stored_vectors: np.ndarray = self.index_store.get_vectors(metadata.path)
+            if len(stored_vectors) != len(stored_chunks):
+                return {}
+
+            stored_by_hash: Dict[str, np.ndarray] = {}
+            for chunk, vector in zip(stored_chunks, stored_vectors):
+                # All-zero vectors are failed embeddings and are retried
+                if np.any(vector):
+                    stored_by_hash.setdefault(chunk.get("hash") or chunk_text_hash(chunk.get("text", "")), vector)
+
+            reused: Dict[int, np.ndarray] = {}
+            for i, chunk in enumerate(metadata.chunks):
+                vector = stored_by_hash.get(chunk.get("hash") or chunk_text_hash(chunk["text"]))
+                if vector is not None:
+                    reused[i] = vector
+            return reused
+        except Exception as e:
+            logger.warning(f"Could not reuse stored embeddings of {metadata.path}: {e}")
+            return {}
+
+    def _merge_chunk_embeddings(self, metadata: FileMetadata, reused: Dict[int, np.ndarray],
+                                embeddings: np.ndarray) -> np.ndarray:
+        """Combine reused stored embeddings with the embeddings of the other chunks.
+
+        Args:
+            metadata (FileMetadata): Metadata returned by _prepare_file().
+            reused (Dict[int, np.ndarray]): Result of _reusable_chunk_embeddings().
+            embeddings (np.ndarray): Embeddings of the chunks not in ``reused``, in chunk order.
+
+        Returns:
+            np.ndarray: (chunks, dims) embeddings of all chunks.
+        """
+        if not reused:
+            return embeddings
+
+        dims: int = len(next(iter(reused.values())))
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(embeddings) and embeddings.shape[1] != dims:
+            logger.warning(f"Embedding dimensions of {metadata.path} changed, embedding all chunks again")
+            return self.code_embedder.embed_chunks(metadata.chunks)
+
+        merged = np.empty((len(metadata.chunks), dims), dtype=np.float32)
+        reused_rows = np.fromiter(reused.keys(), dtype=np.intp, count=len(reused))
+        merged[reused_rows] = np.stack(list(reused.values()))
+        missing_rows = np.setdiff1d(np.arange(len(metadata.chunks)), reused_rows)
+        if len(missing_rows):
+            merged[missing_rows] = embeddings
+        return merged
+
+    def _update_metadata_cache(self, metadata: FileMetadata) -> None:
+        """Remember the state of a freshly indexed file for change detection.
+
+        Args:
+            metadata (FileMetadata): Metadata of the indexed file.
+        """
+        self.metadata_cache[metadata.path] = {
+            "hash": metadata.hash,
+            "modified_time": metadata.modified_time,
+            "stat": metadata.stat_signature,
+            "description_status": metadata.description_status,
+        }
+
+    def _finish_file(self, metadata: FileMetadata, embeddings: Any) -> Optional[FileMetadata]:
+        """Attach chunk embeddings to prepared metadata and save it.
+
+        Args:
+            metadata (FileMetadata): Metadata returned by _prepare_file().
+            embeddings (Any): np.ndarray of shape (chunks, dims) for the metadata's chunks.
+
+        Returns:
+            Optional[FileMetadata]: The saved metadata, or None if saving failed.
+        """
+        try:
+            metadata.embeddings = embeddings.tolist()
+            logger.debug(f"CHECKPOINT: [FILE.27] Saving file metadata for {metadata.path}")
+            self._save_file_metadata(metadata)
+            logger.debug(f"CHECKPOINT: [FILE.28] File metadata saved successfully for {metadata.path}")
+            return metadata
+        except Exception as e:
+            logger.error(f"CHECKPOINT: [FILE.29] Error saving metadata for {metadata.path}: {str(e)}", exc_info=True)
+            return None
+
     def load_file_metadata(self, file_path: str) -> Optional[FileMetadata]:
         """Load metadata for a specific file.
 
@@ -1660,47 +2435,12 @@ END OF FILE:
         if rel_path.startswith(".index"):
             return None
 
-        safe_path: str = re.sub(r"[^\w\-_\.]", "_", rel_path)
-        metadata_path: str = os.path.join(
-            self.index_dir, "metadata", f"{safe_path}.json"
-        )
-
         try:
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                data: Dict[str, Any] = json.load(f)
-
-            embedding_path: str = os.path.join(
-                self.index_dir, "embeddings", f"{safe_path}.json"
-            )
-            with open(embedding_path, "r", encoding="utf-8") as f:
-                embedding_data: Dict[str, Any] = json.load(f)
-
-            description: Optional[str] = None
-
-            if "description" in data:
-                description = data["description"]
-            else:
-                try:
-                    description_path: str = os.path.join(
-                        self.index_dir, "descriptions", f"{safe_path}.txt"
-                    )
-                    if os.path.exists(description_path):
-                        with open(
-                            description_path, "r", encoding="utf-8"
-                        ) as f:
-                            description = f.read().strip()
-                except Exception:
-                    pass
-
-                if not description:
-                    description = f"File: {os.path.basename(file_path)}"
+            data: Optional[Dict[str, Any]] = self.index_store.get_record(file_path)
+            if data is None:
+                return None
 
-                data["description"] = description
-                try:
-                    with open(metadata_path, "w", encoding="utf-8") as f:
-                        json.dump(data, f, indent=2)
-                except Exception:
-                    pass
+            description: str = data.get("description") or f"File: {os.path.basename(file_path)}"
 
             # Load enhanced metadata if available
             enhanced_info = None
@@ -1708,7 +2448,7 @@ END OF FILE:
             relationships = None
             metadata_version = 1
 
-            metadata_info = embedding_data.get("metadata", {})
+            metadata_info = data.get("metadata", {})
             if metadata_info.get("enhanced_metadata", False):
                 metadata_version = metadata_info.get("version", 2)
 
@@ -1753,15 +2493,14 @@ END OF FILE:
                 signatures=[
                     FileSignature(**sig) for sig in data.get("signatures", [])
                 ],
-                chunks=embedding_data.get("chunks", []),
-                embeddings=embedding_data.get("embeddings", []),
+                chunks=data.get("chunks", []),
+                embeddings=self.index_store.get_vectors(file_path).tolist(),
                 enhanced_info=enhanced_info,
                 code_analysis=code_analysis,
                 relationships=relationships,
-                metadata_version=metadata_version
+                metadata_version=metadata_version,
+                description_status=data.get("description_status", DESCRIPTION_STATUS_COMPLETE),
             )
-        except FileNotFoundError:
-            return None
         except Exception as e:
             logger.error(f"Error loading metadata for {file_path}: {e}")
             return None
@@ -1843,30 +2582,129 @@ END OF FILE:
             Optional[FileMetadata]: Updated metadata for the file, or None if processing failed.
         """
         try:
-            file_stat: os.stat_result = os.stat(file_path)
-            entry: DirectoryEntry = DirectoryEntry(
-                name=os.path.basename(file_path),
-                path=file_path,
-                parent=os.path.dirname(file_path),
-                entry_type=EntryType.FILE,
-                size=file_stat.st_size,
-                extension=os.path.splitext(file_path)[1].lstrip("."),
-                modified_time=file_stat.st_mtime,
-            )
-
-            hasher = hashlib.new(HASH_ALGORITHM)
-            with open(file_path, "rb") as f:
-                buffer = f.read(HASH_BUFFER_SIZE)
-                while buffer:
-                    hasher.update(buffer)
-                    buffer = f.read(HASH_BUFFER_SIZE)
-            entry.file_hash = hasher.hexdigest()
-
-            return self._process_single_file(entry)
+            keyword_generation: int = self._begin_keyword_update()
+            metadata: Optional[FileMetadata] = self._process_single_file(self._entry_for_path(file_path))
+            if metadata is not None:
+                self._update_metadata_cache(metadata)
+                self._publish_index_changes(keyword_generation, [metadata])
+            return metadata
         except Exception as e:
             logger.error(f"Error reindexing file {file_path}: {e}")
             return None
 
+    def _entry_for_path(self, file_path: str) -> DirectoryEntry:
+        """Build the DirectoryEntry of a single file, including its content hash.
+
+        The file is only read if its stat signature differs from the indexed one.
+
+        Args:
+            file_path (str): Path to the file.
+
+        Returns:
+            DirectoryEntry: Entry as DirectoryParser would have produced it.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        file_stat: os.stat_result = os.stat(file_path)
+        entry: DirectoryEntry = DirectoryEntry(
+            name=os.path.basename(file_path),
+            path=file_path,
+            parent=os.path.dirname(file_path),
+            entry_type=EntryType.FILE,
+            size=file_stat.st_size,
+            extension=os.path.splitext(file_path)[1].lstrip("."),
+            modified_time=file_stat.st_mtime,
+            mtime_ns=file_stat.st_mtime_ns,
+            inode=file_stat.st_ino,
+        )
+
+        cached_data: Optional[Dict[str, Any]] = self.metadata_cache.get(file_path)
+        if self._stat_unchanged(entry, cached_data):
+            entry.file_hash = cached_data["hash"]
+            return entry
+
+        hasher = hashlib.new(HASH_ALGORITHM)
+        with open(file_path, "rb") as f:
+            buffer = f.read(HASH_BUFFER_SIZE)
+            while buffer:
+                hasher.update(buffer)
+                buffer = f.read(HASH_BUFFER_SIZE)
+        entry.file_hash = hasher.hexdigest()
+        return entry
+
+    @property
+    def is_indexing(self) -> bool:
+        """Whether index_directory() or apply_file_changes() is currently writing a segment."""
+        return self._segment_writer is not None
+
+    def apply_file_changes(self, changed: Iterable[str], deleted: Iterable[str] = ()) -> Dict[str, int]:
+        """Index changed files and drop deleted ones without scanning the directory tree.
+
+        This is the entry point of watch mode. Changed files that differ from the
+        index go through the single-file indexing path into one new segment, and
+        the loaded SimilaritySearch is updated in place.
+
+        Args:
+            changed (Iterable[str]): Absolute paths of created or modified files.
+            deleted (Iterable[str]): Absolute paths of deleted files.
+
+        Returns:
+            Dict[str, int]: Number of files ``indexed``, ``removed``, ``skipped`` (unchanged
+            or not indexable) and ``failed``.
+        """
+        counts: Dict[str, int] = {"indexed": 0, "removed": 0, "skipped": 0, "failed": 0}
+        changed = list(dict.fromkeys(changed))
+        deleted = list(dict.fromkeys(deleted))
+        self.file_snapshot.invalidate(changed + deleted)
+
+        keyword_generation: int = self._begin_keyword_update()
+        removed: List[str] = [path for path in deleted if path in self.metadata_cache]
+        if removed:
+            for path in removed:
+                self.metadata_cache.pop(path, None)
+            counts["removed"] = self.index_store.remove(removed)
+
+        entries: List[DirectoryEntry] = []
+        for path in changed:
+            try:
+                entry: DirectoryEntry = self._entry_for_path(path)
+            except OSError as e:
+                logger.debug(f"Skipping {path}, it cannot be read: {e}")
+                counts["skipped"] += 1
+                continue
+            if self._should_update_file(entry):
+                entries.append(entry)
+            else:
+                counts["skipped"] += 1
+
+        updated: List[FileMetadata] = []
+        if entries:
+            self._segment_writer = self.index_store.begin_segment()
+            try:
+                for entry in entries:
+                    metadata: Optional[FileMetadata] = self._process_single_file(entry, DESCRIPTION_QUEUE_ENABLED)
+                    if metadata is None:
+                        counts["failed"] += 1
+                        continue
+                    updated.append(metadata)
+                self._segment_writer.commit()
+            except Exception as e:
+                logger.error(f"Error indexing changed files: {e}", exc_info=True)
+                self._segment_writer.abort()
+                counts["failed"] += len(updated)
+                updated = []
+            finally:
+                self._segment_writer = None
+                self._publish_description_updates()
+
+        for metadata in updated:
+            self._update_metadata_cache(metadata)
+        counts["indexed"] = len(updated)
+        if updated or removed:
+            self._publish_index_changes(keyword_generation, updated, removed)
+        return counts
+
     def update_outdated(self) -> List[FileMetadata]:
         """Update only files that are outdated (have mismatched hashes or modified times).
 
@@ -1894,6 +2732,86 @@ END OF FILE:
 
         return valid_files
 
+    def _record_git_state(self, pending: Iterable[str] = ()) -> None:
+        """Remember the commit the index is now up to date with, for git change detection.
+
+        Files that are dirty in the work tree, and files that could not be indexed,
+        are recorded too: git would not report them as changed if they went back to
+        their committed content.
+
+        Args:
+            pending (Iterable[str]): Absolute paths of files that still need indexing.
+        """
+        if not INDEX_GIT_CHANGE_DETECTION:
+            return
+        try:
+            commit: Optional[str] = self.git_detector.head_commit()
+            dirty: Optional[Set[str]] = self.git_detector.dirty_paths()
+            if commit is None or dirty is None:
+                self.index_store.set_property("git", None)
+                return
+            dirty.update(pending)
+            index_dir_abs: str = os.path.abspath(self.index_dir) + os.sep
+            pending_paths: List[str] = sorted(
+                self._rel_path(path) for path in dirty if not path.startswith(index_dir_abs)
+            )
+            self.index_store.set_property("git", {"commit": commit, "pending": pending_paths})
+            logger.debug(f"Recorded git state {commit[:12]} with {len(pending_paths)} pending files")
+        except Exception as e:
+            logger.warning(f"Could not record git state of the index: {e}")
+
+    def _git_changed_paths(self) -> Optional[Set[str]]:
+        """List the files that may differ from the index according to git.
+
+        Returns:
+            Optional[Set[str]]: Absolute paths of changed, added and deleted files, or None if
+            git change detection is disabled or unavailable and the file system must be scanned.
+        """
+        if not INDEX_GIT_CHANGE_DETECTION or not self.metadata_cache:
+            return None
+        state: Optional[Dict[str, Any]] = self.index_store.get_property("git")
+        if not state:
+            return None
+        paths: Optional[Set[str]] = self.git_detector.changed_since(state.get("commit"))
+        if paths is None:
+            return None
+        paths.update(os.path.join(self.root_path, *rel_path.split("/")) for rel_path in state.get("pending", []))
+        return paths
+
+    def _get_outdated_files_from_git(self, cleanup_deleted: bool = True) -> Optional[List[str]]:
+        """Get the files that need updating by asking git, without scanning the directory tree.
+
+        Args:
+            cleanup_deleted (bool): Whether to also remove deleted files from the index.
+
+        Returns:
+            Optional[List[str]]: Absolute paths of new and changed files that need indexing,
+            or None if git cannot be used and the caller should scan instead.
+        """
+        paths: Optional[Set[str]] = self._git_changed_paths()
+        if paths is None:
+            return None
+
+        if cleanup_deleted:
+            deleted: List[str] = [path for path in paths if path in self.metadata_cache and not os.path.exists(path)]
+            if deleted:
+                removed_count: int = self._remove_deleted_files(deleted)
+                logger.info(f"Removed {removed_count} files deleted since the last indexed commit")
+
+        parser: DirectoryParser = DirectoryParser(self.root_path, gitignore_path=self.gitignore_path)
+        outdated: List[str] = []
+        for path in sorted(paths):
+            if not os.path.isfile(path) or parser.is_path_ignored(path):
+                continue
+            try:
+                if self._should_update_file(self._entry_for_path(path)):
+                    outdated.append(path)
+            except OSError as e:
+                logger.debug(f"Skipping {path}, it cannot be read: {e}")
+
+        logger.info(f"Git reported {len(paths)} changed paths, {len(outdated)} files need updating")
+        return outdated
+
     def get_outdated_files(self, cleanup_deleted: bool = True) -> List[str]:
         """Get a list of files that need to be updated.
 
@@ -1915,6 +2833,11 @@ END OF FILE:
                 print(f"{Fore.YELLOW}📁 No existing index found - will index all eligible files{Style.RESET_ALL}")
                 return self._get_all_indexable_files()
 
+            git_outdated: Optional[List[str]] = self._get_outdated_files_from_git(cleanup_deleted)
+            if git_outdated is not None:
+                print(f"{Fore.GREEN}✅ Git change check complete - found {len(git_outdated)} files to update{Style.RESET_ALL}")
+                return git_outdated
+
             # First, cleanup deleted files if requested
             if cleanup_deleted:
                 deleted_count = self.cleanup_deleted_files()
@@ -1924,27 +2847,16 @@ END OF FILE:
             try:
                 logger.debug(f"Creating DirectoryParser")
                 print(f"{Fore.YELLOW}🔍 Checking for files that need updating...{Style.RESET_ALL}")
-                parser: DirectoryParser = DirectoryParser(
-                    self.root_path, gitignore_path=self.gitignore_path
-                )
+                parser: DirectoryParser = self._create_directory_parser()
             except Exception as e:
                 logger.error(f"Failed to create DirectoryParser: {str(e)}", exc_info=True)
                 raise
 
-            try:
-                logger.debug(f"Parsing directory tree")
-                root_entry: DirectoryEntry = parser.parse()
-                logger.debug(f"Directory tree parsing complete")
-            except Exception as e:
-                logger.error(f"Failed to parse directory tree: {str(e)}", exc_info=True)
-                raise
-
             checked_count = 0
             last_progress_time = time.time()
 
-            def check_entry(entry: DirectoryEntry):
-                nonlocal checked_count, last_progress_time
-
+            logger.debug(f"Checking for outdated files")
+            for entry in parser.walk_files():
                 checked_count += 1
                 current_time = time.time()
 
@@ -1961,12 +2873,6 @@ END OF FILE:
                     logger.error(f"Error checking if file should be updated {entry.path}: {str(e)}", exc_info=True)
                     outdated.append(entry.path)
 
-                for child in entry.children:
-                    check_entry(child)
-
-            logger.debug(f"Checking for outdated files")
-            check_entry(root_entry)
-
             print(f"\r{Fore.GREEN}✅ Scan complete - checked {checked_count} items, found {len(outdated)} files to update{Style.RESET_ALL}")
             logger.info(f"Found {len(outdated)} outdated files")
 
@@ -2000,14 +2906,10 @@ END OF FILE:
                 self.root_path, gitignore_path=self.gitignore_path
             )
 
-            root_entry: DirectoryEntry = parser.parse()
-
             checked_count = 0
             last_progress_time = time.time()
 
-            def collect_files(entry: DirectoryEntry):
-                nonlocal checked_count, last_progress_time
-
+            for entry in parser.walk_files():
                 checked_count += 1
                 current_time = time.time()
 
@@ -2022,11 +2924,6 @@ END OF FILE:
                 except Exception as e:
                     logger.error(f"Error checking if file should be indexed {entry.path}: {str(e)}", exc_info=True)
 
-                for child in entry.children:
-                    collect_files(child)
-
-            collect_files(root_entry)
-
             print(f"\r{Fore.GREEN}✅ Scan complete - checked {checked_count} items, found {len(indexable_files)} files to index{Style.RESET_ALL}")
             logger.info(f"Found {len(indexable_files)} indexable files")
 
@@ -2049,23 +2946,8 @@ END OF FILE:
             List[str]: List of file paths.
         """
         logger.debug(f"Getting sample of {count} indexed files")
-        metadata_dir: str = os.path.join(self.index_dir, "metadata")
-        if not os.path.exists(metadata_dir):
-            logger.warning(f"Metadata directory does not exist: {metadata_dir}")
-            return []
-
-        files: List[str] = [f for f in os.listdir(metadata_dir) if f.endswith('.json')]
-        sample: List[str] = files[:count] if len(files) > count else files
-
-        result: List[str] = []
-        for file in sample:
-            try:
-                with open(os.path.join(metadata_dir, file), 'r', encoding='utf-8') as f:
-                    data: Dict[str, Any] = json.load(f)
-                    result.append(data.get('path', file))
-            except Exception as e:
-                logger.error(f"Error reading metadata file {file}: {str(e)}", exc_info=True)
-                result.append(file)
+        files: List[str] = self.index_store.list_files()
+        result: List[str] = files[:count]
 
         logger.debug(f"Returning {len(result)} sample files")
         return result
@@ -2105,33 +2987,10 @@ END OF FILE:
             # Remove from metadata cache
             self.metadata_cache.pop(file_path, None)
 
-            # Generate safe path for file operations
-            rel_path: str = os.path.relpath(file_path, self.root_path)
-            safe_path: str = re.sub(r"[^\w\-_\.]", "_", rel_path)
-
-            # Remove metadata file
-            metadata_path: str = os.path.join(
-                self.index_dir, "metadata", f"{safe_path}.json"
-            )
-            if os.path.exists(metadata_path):
-                os.remove(metadata_path)
-                logger.debug(f"Removed metadata file: {metadata_path}")
-
-            # Remove embedding file
-            embedding_path: str = os.path.join(
-                self.index_dir, "embeddings", f"{safe_path}.json"
-            )
-            if os.path.exists(embedding_path):
-                os.remove(embedding_path)
-                logger.debug(f"Removed embedding file: {embedding_path}")
-
-            # Remove description file
-            description_path: str = os.path.join(
-                self.index_dir, "descriptions", f"{safe_path}.txt"
-            )
-            if os.path.exists(description_path):
-                os.remove(description_path)
-                logger.debug(f"Removed description file: {description_path}")
+            # Drop the live record from the index store
+            keyword_generation: int = self._begin_keyword_update()
+            if self.index_store.remove([file_path]):
+                self._publish_index_changes(keyword_generation, removed=[file_path])
 
             logger.info(f"Successfully removed file from index: {file_path}")
             return True
@@ -2140,6 +2999,27 @@ END OF FILE:
             logger.error(f"Error removing file from index {file_path}: {e}")
             return False
 
+    def _remove_deleted_files(self, deleted_files: List[str]) -> int:
+        """Drop files that no longer exist from the index and the loaded SimilaritySearch.
+
+        Args:
+            deleted_files (List[str]): Absolute paths of indexed files that were deleted.
+
+        Returns:
+            int: Number of records removed.
+        """
+        removed_count: int = 0
+        try:
+            for file_path in deleted_files:
+                self.metadata_cache.pop(file_path, None)
+            keyword_generation: int = self._begin_keyword_update()
+            removed_count = self.index_store.remove(deleted_files)
+            if removed_count:
+                self._publish_index_changes(keyword_generation, removed=deleted_files)
+        except Exception as e:
+            logger.error(f"Error removing deleted files from index: {e}")
+        return removed_count
+
     def cleanup_deleted_files(self) -> int:
         """Remove deleted files from the index.
 
@@ -2173,15 +3053,8 @@ END OF FILE:
             return 0
 
         # Remove deleted files from index
-        removed_count: int = 0
         print(f"{Fore.YELLOW}🗑️  Removing {len(deleted_files)} deleted files from index...{Style.RESET_ALL}")
-
-        for i, file_path in enumerate(deleted_files):
-            if i % 10 == 0 and i > 0:
-                print(f"\r{Fore.CYAN}🗑️  Removed {i}/{len(deleted_files)} deleted files{Style.RESET_ALL}", end="", flush=True)
-
-            if self._remove_file_from_index(file_path):
-                removed_count += 1
+        removed_count: int = self._remove_deleted_files(deleted_files)
 
         print(f"\r{Fore.GREEN}✅ Successfully removed {removed_count} deleted files from index{Style.RESET_ALL}")
         logger.info(f"Cleanup complete: removed {removed_count} deleted files from index")
@@ -2221,60 +3094,30 @@ END OF FILE:
             result["reason"] = "Index directory does not exist"
             return result
 
-        metadata_dir = os.path.join(self.index_dir, "metadata")
-        embeddings_dir = os.path.join(self.index_dir, "embeddings")
-        descriptions_dir = os.path.join(self.index_dir, "descriptions")
-
-        logger.debug(f"Checking index directory structure:")
-        logger.debug(f"- metadata_dir exists: {os.path.exists(metadata_dir)}")
-        logger.debug(f"- embeddings_dir exists: {os.path.exists(embeddings_dir)}")
-        logger.debug(f"- descriptions_dir exists: {os.path.exists(descriptions_dir)}")
-
-        if not all(
-            os.path.exists(d) for d in [metadata_dir, embeddings_dir, descriptions_dir]
-        ):
-            result["reason"] = "Index directory structure is incomplete"
+        if not IndexStore.exists(self.index_dir):
+            result["reason"] = "Index store does not exist"
             return result
 
         logger.debug(f"Creating DirectoryParser for {self.root_path}")
-        parser = DirectoryParser(
-            self.root_path, gitignore_path=self.gitignore_path
-        )
-        logger.debug(f"Parsing directory tree")
-        root_entry = parser.parse()
-        logger.debug(f"Directory tree parsing complete")
+        parser = self._create_directory_parser()
+        cached_paths = {os.path.normpath(path).lower(): path for path in self.metadata_cache}
 
         current_files = []
         missing_files = []
-        ignored_files = []
-
-        def collect_files(entry: DirectoryEntry):
-            if parser._is_ignored(entry.path, entry.is_folder()):
-                ignored_files.append(entry.path)
-                return
 
+        logger.debug(f"Collecting files to index")
+        for entry in parser.walk_files():
             if self._should_index_file(entry):
                 current_files.append(entry)
-                norm_path = os.path.normpath(entry.path).lower()
-                found = False
-                for cache_path in self.metadata_cache.keys():
-                    if os.path.normpath(cache_path).lower() == norm_path:
-                        found = True
-                        break
-                if not found:
+                if os.path.normpath(entry.path).lower() not in cached_paths:
                     missing_files.append(entry.path)
-            for child in entry.children:
-                collect_files(child)
-
-        logger.debug(f"Collecting files to index")
-        collect_files(root_entry)
         logger.debug(f"File collection complete")
 
         result["missing_count"] = len(missing_files)
-        result["ignored_count"] = len(ignored_files)
+        result["ignored_count"] = parser.ignored_count
 
         logger.info(
-            f"Found {len(current_files)} indexable files, {len(ignored_files)} ignored files, {len(missing_files)} missing from index"
+            f"Found {len(current_files)} indexable files, {parser.ignored_count} ignored paths, {len(missing_files)} missing from index"
         )
 
         if missing_files:
@@ -2286,14 +3129,7 @@ END OF FILE:
         logger.debug(f"Checking for outdated files")
         outdated_files = []
         for entry in current_files:
-            norm_path = os.path.normpath(entry.path).lower()
-            matched_cache_path = None
-
-            for cache_path in self.metadata_cache.keys():
-                if os.path.normpath(cache_path).lower() == norm_path:
-                    matched_cache_path = cache_path
-                    break
-
+            matched_cache_path = cached_paths.get(os.path.normpath(entry.path).lower())
             if not matched_cache_path:
                 logger.debug(f"No matched cache path for {entry.path}")
                 continue
@@ -2340,4 +3176,36 @@ END OF FILE:
 
         logger.info(f"Index is complete!")
         result['complete'] = True
-        return result
\ No newline at end of file
+        return result
+
+
+_worker_indexer: Optional[FileIndexer] = None
+
+
+def _init_prepare_worker(root_path: str, excluded_extensions: Set[str],
+                         warm_extensions: List[str]) -> None:
+    """Initialize a parse worker process with its own parsers and analyzers.
+
+    Args:
+        root_path (str): Absolute root directory being indexed.
+        excluded_extensions (Set[str]): File extensions excluded from indexing.
+        warm_extensions (List[str]): File extensions whose parsers are created up front.
+    """
+    global _worker_indexer
+    _worker_indexer = FileIndexer._for_worker(root_path, excluded_extensions)
+    _worker_indexer.code_embedder.chunker.warm_parsers(warm_extensions)
+
+
+def _prepare_file_in_worker(entry: DirectoryEntry) -> Optional[FileMetadata]:
+    """Run FileIndexer._prepare_file() inside a parse worker process.
+
+    The description is always deferred, so workers never block on the description provider.
+
+    Args:
+        entry (DirectoryEntry): File to prepare.
+
+    Returns:
+        Optional[FileMetadata]: Prepared metadata with a description job unless the
+        description was cached, or None if preparing failed.
+    """
+    return _worker_indexer._prepare_file(entry, defer_description=True)
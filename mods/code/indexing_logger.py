@@ -216,6 +216,7 @@ class PreIndexingAnalyzer:
         import time
         from colorama import Fore, Style
         from .directory import DirectoryParser
+        from .indexer import FileIndexer
         
         print(f"{Fore.YELLOW}🔍 Scanning directory structure...{Style.RESET_ALL}")
         print(f"{Fore.CYAN}📂 Root: {self.root_path}{Style.RESET_ALL}")
@@ -226,29 +227,6 @@ class PreIndexingAnalyzer:
         print(f"{Fore.YELLOW}⚙️  Initializing directory parser...{Style.RESET_ALL}")
         parser = DirectoryParser(self.root_path, self.gitignore_path)
         
-        print(f"{Fore.YELLOW}📁 Parsing directory tree (this may take a moment for large projects)...{Style.RESET_ALL}")
-        
-        # Create a custom progress callback for directory parsing
-        self._parse_progress_count = 0
-        self._parse_last_time = time.time()
-        
-        # Monkey patch the parser to show progress during parsing
-        original_parse_single = parser._parse_single_entry
-        def progress_parse_single(dir_entry, current_parent_path):
-            self._parse_progress_count += 1
-            current_time = time.time()
-            if self._parse_progress_count % 50 == 0 or (current_time - self._parse_last_time) >= 1.5:
-                print(f"\r{Fore.CYAN}📁 Scanning... {self._parse_progress_count} items found{Style.RESET_ALL}", end="", flush=True)
-                self._parse_last_time = current_time
-            return original_parse_single(dir_entry, current_parent_path)
-        
-        parser._parse_single_entry = progress_parse_single
-        
-        root_entry = parser.parse()
-        
-        parse_time = time.time() - start_time
-        print(f"\r{Fore.GREEN}✅ Directory tree parsed in {parse_time:.2f} seconds - found {self._parse_progress_count} items{Style.RESET_ALL}")
-        
         analysis = {
             "total_files": 0,
             "files_to_index": 0,
@@ -269,25 +247,25 @@ class PreIndexingAnalyzer:
             except Exception:
                 pass
         
-        # Reset counters for analysis phase
         self.processed_count = 0
         self.last_progress_time = time.time()
         
-        print(f"{Fore.YELLOW}🔍 Analyzing files for indexing eligibility...{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}🔍 Scanning and analyzing files for indexing eligibility...{Style.RESET_ALL}")
         
-        # Analyze directory structure with progress
-        self._analyze_entry(root_entry, parser, analysis, "")
+        # One streaming pass over the files; the directory tree is never built
+        indexer = FileIndexer(self.root_path)
+        for entry in parser.walk_files():
+            self._analyze_file(entry, indexer, analysis)
         
         analysis_time = time.time() - start_time
-        print(f"\r{Fore.GREEN}✅ Analysis completed in {analysis_time:.2f} seconds - processed {self.processed_count} items{Style.RESET_ALL}")
+        print(f"\r{Fore.GREEN}✅ Analysis completed in {analysis_time:.2f} seconds - processed {self.processed_count} files in {parser.dir_count + 1} directories{Style.RESET_ALL}")
         
         return analysis
     
-    def _analyze_entry(self, entry, parser, analysis: Dict[str, Any], rel_path: str) -> None:
-        """Recursively analyze directory entry."""
+    def _analyze_file(self, entry, indexer, analysis: Dict[str, Any]) -> None:
+        """Add one file entry to the analysis."""
         import time
         from colorama import Fore, Style
-        from .indexer import FileIndexer
         
         # Update progress counter
         self.processed_count += 1
@@ -295,47 +273,34 @@ class PreIndexingAnalyzer:
         # Show progress every 100 items or every 2 seconds
         current_time = time.time()
         if self.processed_count % 100 == 0 or (current_time - self.last_progress_time) >= 2.0:
-            print(f"\r{Fore.CYAN}📊 Analyzing... {self.processed_count} items processed{Style.RESET_ALL}", end="", flush=True)
+            print(f"\r{Fore.CYAN}📊 Analyzing... {self.processed_count} files processed{Style.RESET_ALL}", end="", flush=True)
             self.last_progress_time = current_time
         
-        if entry.is_file():
-            analysis["total_files"] += 1
-            
-            # Check if file would be indexed
-            dummy_indexer = FileIndexer(self.root_path)
-            should_index = dummy_indexer._should_index_file(entry)
-            is_ignored = parser._is_ignored(entry.path, False)
+        analysis["total_files"] += 1
+        rel_path = os.path.relpath(entry.path, self.root_path)
+        
+        # Track directory stats (files directly inside each directory)
+        directory = analysis["directories"].setdefault(
+            os.path.dirname(rel_path) or ".", {"file_count": 0, "total_files": 0}
+        )
+        directory["file_count"] += 1
+        directory["total_files"] += 1  # Could be expanded to include subdirectories
+        
+        # Check if file would be indexed
+        if indexer._should_index_file(entry):
+            analysis["files_to_index"] += 1
+            analysis["total_size"] += entry.size
             
-            if should_index and not is_ignored:
-                analysis["files_to_index"] += 1
-                analysis["total_size"] += entry.size
-                
-                # Track file types
-                file_ext = os.path.splitext(entry.name)[1].lower()
-                if file_ext:
-                    analysis["file_types"][file_ext] = analysis["file_types"].get(file_ext, 0) + 1
-                
-                # Track large files
-                if entry.size > 1024 * 1024:  # > 1MB
-                    analysis["large_files"].append({
-                        "path": rel_path,
-                        "size": entry.size
-                    })
-            else:
-                analysis["files_to_ignore"] += 1
-        
-        # Process children and track directory stats
-        dir_file_count = 0
-        for child in entry.children:
-            child_rel_path = os.path.join(rel_path, child.name) if rel_path else child.name
-            self._analyze_entry(child, parser, analysis, child_rel_path)
+            # Track file types
+            file_ext = os.path.splitext(entry.name)[1].lower()
+            if file_ext:
+                analysis["file_types"][file_ext] = analysis["file_types"].get(file_ext, 0) + 1
             
-            if child.is_file():
-                dir_file_count += 1
-        
-        # Store directory information
-        if entry.is_folder() and dir_file_count > 0:
-            analysis["directories"][rel_path if rel_path else "."] = {
-                "file_count": dir_file_count,
-                "total_files": dir_file_count  # Could be expanded to include subdirectories
-            } 
\ No newline at end of file
+            # Track large files
+            if entry.size > 1024 * 1024:  # > 1MB
+                analysis["large_files"].append({
+                    "path": rel_path,
+                    "size": entry.size
+                })
+        else:
+            analysis["files_to_ignore"] += 1
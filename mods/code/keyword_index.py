@@ -0,0 +1,494 @@
+"""Persistent inverted index for BM25 keyword search over indexed chunks.
+
+Every non-empty chunk of every indexed file is one BM25 document. The index
+maps each term to postings (document id, term frequency) held in NumPy arrays
+in CSR layout, so a query only touches the postings of its own terms:
+
+    offsets[t] .. offsets[t + 1]   slice of post_docs / post_tfs for term id t
+
+Re-indexed and removed files are applied incrementally. Their old documents
+are marked dead in an ``alive`` mask, and the postings of new documents go to
+a small per-term delta until the index is compacted back into CSR arrays,
+which happens once dead documents or delta postings make up too large a
+share of it.
+
+The index is saved next to the index store as ``<index_dir>/store/keywords.npz``
+and tagged with the store's vector generation. Chunks only change together
+with their vectors, so an index whose generation differs from the store's is
+out of date and is rebuilt from the store records.
+"""
+
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .index_store import IndexStore
+
+logger = logging.getLogger("TaskHeroAI.KeywordIndex")
+
+KEYWORD_INDEX_VERSION = 1
+KEYWORD_INDEX_NAME = "keywords.npz"
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Compact once dead documents or delta postings exceed this share of the index
+COMPACT_RATIO = 0.25
+COMPACT_MIN_POSTINGS = 65536
+
+TOKEN_PATTERN = re.compile(r"\b[a-zA-Z_][a-zA-Z0-9_]*\b")
+STOP_WORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by",
+    "is", "are", "was", "were", "be", "been", "have", "has", "had", "do", "does", "did",
+    "will", "would", "could", "should", "may", "might", "can", "this", "that", "these",
+    "those", "i", "you", "he", "she", "it", "we", "they", "me", "him", "her", "us", "them",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-case identifier tokens for keyword search.
+
+    Tokens of two characters or less and common English stop words are dropped.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        List[str]: Tokens in order of appearance.
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 2 and token not in STOP_WORDS]
+
+
+class KeywordIndex:
+    """BM25 inverted index over the chunks of indexed files.
+
+    Usage:
+        index = KeywordIndex.open(index_store)
+        for path, chunk_index, score in index.search("parse gitignore", top_k=10):
+            ...
+        index.update_files([(path, chunks)])
+        index.save_for(index_store)
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        """Initialize an empty index.
+
+        Args:
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 document length normalization.
+        """
+        self.k1: float = k1
+        self.b: float = b
+        self.generation: Optional[int] = None
+
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._post_docs: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._post_tfs: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._delta: Dict[int, Tuple[List[int], List[int]]] = {}
+        self._delta_size: int = 0
+
+        self._doc_lengths: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._doc_files: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._doc_chunks: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._alive: np.ndarray = np.zeros(0, dtype=bool)
+        self._live_docs: int = 0
+        self._live_length: float = 0.0
+        self._length_norm: Optional[np.ndarray] = None
+
+        self._paths: List[Optional[str]] = []
+        self._file_docs: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def doc_count(self) -> int:
+        """int: Number of live documents (non-empty chunks)."""
+        return self._live_docs
+
+    @property
+    def file_count(self) -> int:
+        """int: Number of indexed files."""
+        return len(self._file_docs)
+
+    def update_files(self, files: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> int:
+        """Index files, replacing the documents of files that are already indexed.
+
+        Args:
+            files (Iterable[Tuple[str, List[Dict[str, Any]]]]): (path, chunks) pairs; each
+                chunk is a dict with a ``text`` field.
+
+        Returns:
+            int: Number of documents added.
+        """
+        with self._lock:
+            term_ids = self._term_ids
+            lengths: List[int] = []
+            doc_files: List[int] = []
+            doc_chunks: List[int] = []
+            # Postings of the new documents, flattened: term ids and tfs, and the number per document
+            batch_terms: List[int] = []
+            batch_tfs: List[int] = []
+            doc_sizes: List[int] = []
+            next_doc = len(self._doc_lengths)
+
+            for path, chunks in dict(files).items():
+                self._remove_file(path)
+                file_id = len(self._paths)
+                self._paths.append(path)
+                start = next_doc + len(lengths)
+                for chunk_index, chunk in enumerate(chunks or []):
+                    text = chunk.get("text", "") if isinstance(chunk, dict) else ""
+                    if not text.strip():
+                        continue
+                    tokens = tokenize(text)
+                    counts = Counter(tokens)
+                    batch_terms.extend([term_ids.setdefault(term, len(term_ids)) for term in counts])
+                    batch_tfs.extend(counts.values())
+                    doc_sizes.append(len(counts))
+                    lengths.append(len(tokens))
+                    doc_files.append(file_id)
+                    doc_chunks.append(chunk_index)
+                self._file_docs[path] = (start, next_doc + len(lengths) - start)
+
+            if lengths:
+                self._doc_lengths = np.concatenate([self._doc_lengths, np.asarray(lengths, dtype=np.float32)])
+                self._doc_files = np.concatenate([self._doc_files, np.asarray(doc_files, dtype=np.int32)])
+                self._doc_chunks = np.concatenate([self._doc_chunks, np.asarray(doc_chunks, dtype=np.int32)])
+                self._alive = np.concatenate([self._alive, np.ones(len(lengths), dtype=bool)])
+                self._live_docs += len(lengths)
+                self._live_length += float(sum(lengths))
+            if len(term_ids) > len(self._terms):
+                self._terms.extend(itertools.islice(term_ids, len(self._terms), None))
+
+            if batch_terms:
+                docs = np.repeat(np.arange(next_doc, next_doc + len(lengths), dtype=np.int32), doc_sizes)
+                if self._delta_size + len(batch_terms) > self._delta_limit():
+                    # Large batches (such as a full build) go straight into the CSR arrays
+                    self._compact(np.asarray(batch_terms, dtype=np.int64), docs,
+                                  np.asarray(batch_tfs, dtype=np.float32))
+                else:
+                    for term_id, doc_id, tf in zip(batch_terms, docs.tolist(), batch_tfs):
+                        postings = self._delta.get(term_id)
+                        if postings is None:
+                            postings = self._delta[term_id] = ([], [])
+                        postings[0].append(doc_id)
+                        postings[1].append(tf)
+                    self._delta_size += len(batch_terms)
+            self._length_norm = None
+            self._maybe_compact()
+            return len(lengths)
+
+    def remove_files(self, paths: Iterable[str]) -> int:
+        """Remove the documents of files from the index.
+
+        Args:
+            paths (Iterable[str]): Paths of the removed files.
+
+        Returns:
+            int: Number of files that were indexed.
+        """
+        with self._lock:
+            removed = sum(1 for path in paths if self._remove_file(path))
+            if removed:
+                self._length_norm = None
+                self._maybe_compact()
+            return removed
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, int, float]]:
+        """Score documents against a query with BM25.
+
+        Args:
+            query (str): Query text; tokenized like the documents.
+            top_k (int): Maximum number of results.
+
+        Returns:
+            List[Tuple[str, int, float]]: (file path, chunk index, score) of the documents
+            with a positive score, best first.
+        """
+        paths, chunk_indexes, scores = self.search_chunks(query, top_k)
+        return list(zip(paths, chunk_indexes.tolist(), scores.tolist()))
+
+    def search_chunks(self, query: str, top_k: int = 10) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Score documents against a query with BM25 and return the best ones as arrays.
+
+        Args:
+            query (str): Query text; tokenized like the documents.
+            top_k (int): Maximum number of results.
+
+        Returns:
+            Tuple[List[str], np.ndarray, np.ndarray]: File path, chunk index and score of
+            the documents with a positive score, best first.
+        """
+        query_terms = Counter(tokenize(query))
+        with self._lock:
+            if not query_terms or not self._live_docs or top_k <= 0:
+                return [], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+            if self._length_norm is None:
+                average_length = self._live_length / self._live_docs or 1.0
+                self._length_norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths / average_length)
+
+            scores = np.zeros(len(self._doc_lengths), dtype=np.float32)
+            for term, query_tf in query_terms.items():
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    continue
+                docs, tfs = self._postings(term_id)
+                live = self._alive[docs]
+                docs, tfs = docs[live], tfs[live]
+                df = len(docs)
+                if not df:
+                    continue
+                idf = np.log((self._live_docs - df + 0.5) / (df + 0.5))
+                scores[docs] += query_tf * idf * tfs * (self.k1 + 1.0) / (tfs + self._length_norm[docs])
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(scores[candidates], -top_k)[-top_k:]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            paths = [self._paths[file_id] for file_id in self._doc_files[candidates].tolist()]
+            return paths, self._doc_chunks[candidates].astype(np.int64), scores[candidates].astype(np.float64)
+
+    def compact(self) -> None:
+        """Merge the delta into the CSR postings and drop dead documents."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self, *extra: np.ndarray) -> None:
+        """Rebuild the CSR postings from the current ones, the delta and ``extra`` (terms, docs, tfs)."""
+        base_terms = np.repeat(np.arange(len(self._offsets) - 1, dtype=np.int64), np.diff(self._offsets))
+        parts = [(base_terms, self._post_docs, self._post_tfs), self._flatten_delta()]
+        if extra:
+            parts.append(extra)
+        terms = np.concatenate([part[0] for part in parts])
+        docs = np.concatenate([part[1] for part in parts])
+        tfs = np.concatenate([part[2] for part in parts])
+
+        keep = self._alive[docs]
+        new_doc_ids = np.cumsum(self._alive, dtype=np.int64) - 1
+        terms, docs, tfs = terms[keep], new_doc_ids[docs[keep]], tfs[keep]
+        # A stable sort keeps the doc ids of each term ascending
+        order = np.argsort(terms, kind="stable")
+        counts = np.bincount(terms, minlength=len(self._terms))
+        self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._post_docs = docs[order].astype(np.int32)
+        self._post_tfs = tfs[order].astype(np.float32)
+        self._delta = {}
+        self._delta_size = 0
+
+        live_files = np.unique(self._doc_files[self._alive])
+        new_file_ids = np.zeros(len(self._paths), dtype=np.int32)
+        new_file_ids[live_files] = np.arange(len(live_files), dtype=np.int32)
+        self._doc_files = new_file_ids[self._doc_files[self._alive]]
+        self._doc_lengths = self._doc_lengths[self._alive]
+        self._doc_chunks = self._doc_chunks[self._alive]
+        self._alive = np.ones(len(self._doc_lengths), dtype=bool)
+        self._file_docs = {
+            path: (int(new_doc_ids[start]) if count else 0, count)
+            for path, (start, count) in self._file_docs.items()
+        }
+        self._paths = [self._paths[file_id] for file_id in live_files.tolist()]
+        self._length_norm = None
+
+    def save(self, path: str) -> None:
+        """Write the index to a .npz file, replacing it atomically.
+
+        Args:
+            path (str): Destination file.
+        """
+        with self._lock:
+            delta_terms, delta_docs, delta_tfs = self._flatten_delta()
+            meta = {
+                "version": KEYWORD_INDEX_VERSION,
+                "generation": self.generation,
+                "k1": self.k1,
+                "b": self.b,
+                "paths": self._paths,
+                "file_docs": self._file_docs,
+            }
+            arrays = {
+                "meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+                "terms": np.frombuffer("\n".join(self._terms).encode("utf-8"), dtype=np.uint8),
+                "offsets": self._offsets,
+                "post_docs": self._post_docs,
+                "post_tfs": self._post_tfs,
+                "delta_terms": delta_terms,
+                "delta_docs": delta_docs,
+                "delta_tfs": delta_tfs,
+                "doc_lengths": self._doc_lengths,
+                "doc_files": self._doc_files,
+                "doc_chunks": self._doc_chunks,
+                "alive": self._alive,
+            }
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+
+    def save_for(self, store: IndexStore) -> None:
+        """Tag the index with the store's vector generation and save it next to the store.
+
+        Call this after the index has been brought up to date with the store.
+
+        Args:
+            store (IndexStore): Store whose chunks the index now reflects.
+        """
+        self.generation = store.vector_generation
+        self.save(self.path_for(store))
+
+    @staticmethod
+    def path_for(store: IndexStore) -> str:
+        """Get the file a store's keyword index is saved to.
+
+        Args:
+            store (IndexStore): The index store.
+
+        Returns:
+            str: Path of the .npz file.
+        """
+        return os.path.join(store.store_dir, KEYWORD_INDEX_NAME)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["KeywordIndex"]:
+        """Load an index written by :meth:`save`.
+
+        Args:
+            path (str): File to load.
+
+        Returns:
+            Optional[KeywordIndex]: The index, or None if the file is missing, unreadable
+            or from another format version.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                if meta.get("version") != KEYWORD_INDEX_VERSION:
+                    logger.info(f"Ignoring keyword index {path} with version {meta.get('version')}")
+                    return None
+                index = cls(k1=meta["k1"], b=meta["b"])
+                index.generation = meta.get("generation")
+                terms = data["terms"].tobytes().decode("utf-8")
+                index._terms = terms.split("\n") if terms else []
+                index._term_ids = {term: term_id for term_id, term in enumerate(index._terms)}
+                index._offsets = data["offsets"]
+                index._post_docs = data["post_docs"]
+                index._post_tfs = data["post_tfs"]
+                for term_id, doc_id, tf in zip(data["delta_terms"].tolist(), data["delta_docs"].tolist(),
+                                               data["delta_tfs"].tolist()):
+                    postings = index._delta.setdefault(term_id, ([], []))
+                    postings[0].append(doc_id)
+                    postings[1].append(tf)
+                index._delta_size = len(data["delta_terms"])
+                index._doc_lengths = data["doc_lengths"]
+                index._doc_files = data["doc_files"]
+                index._doc_chunks = data["doc_chunks"]
+                index._alive = data["alive"]
+            index._paths = meta["paths"]
+            index._file_docs = {path: (start, count) for path, (start, count) in meta["file_docs"].items()}
+            index._live_docs = int(index._alive.sum())
+            index._live_length = float(index._doc_lengths[index._alive].sum())
+            return index
+        except Exception as e:
+            logger.warning(f"Could not load keyword index {path}: {e}")
+            return None
+
+    @classmethod
+    def open(cls, store: IndexStore) -> "KeywordIndex":
+        """Load the saved keyword index of a store, rebuilding it if it is out of date.
+
+        Args:
+            store (IndexStore): The index store.
+
+        Returns:
+            KeywordIndex: An index matching the store's current chunks.
+        """
+        path = cls.path_for(store)
+        generation = store.vector_generation
+        index = cls.load(path)
+        if index is not None and index.generation == generation:
+            logger.debug(f"Loaded keyword index with {index.doc_count} documents from {path}")
+            return index
+
+        index = cls()
+        index.update_files((record["path"], record.get("chunks") or []) for record, _ in store.iter_records())
+        index.compact()
+        index.generation = generation
+        try:
+            index.save(path)
+        except OSError as e:
+            logger.warning(f"Could not save keyword index to {path}: {e}")
+        logger.info(f"Built keyword index with {index.doc_count} documents from {index.file_count} files")
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics.
+
+        Returns:
+            Dict[str, Any]: Dictionary with index metrics.
+        """
+        with self._lock:
+            return {
+                "files": len(self._file_docs),
+                "documents": self._live_docs,
+                "dead_documents": int(len(self._alive) - self._live_docs),
+                "terms": len(self._terms),
+                "postings": int(len(self._post_docs)),
+                "delta_postings": self._delta_size,
+                "avg_doc_length": self._live_length / self._live_docs if self._live_docs else 0.0,
+                "generation": self.generation,
+            }
+
+    def _remove_file(self, path: str) -> bool:
+        entry = self._file_docs.pop(path, None)
+        if entry is None:
+            return False
+        start, count = entry
+        if count:
+            self._alive[start:start + count] = False
+            self._live_docs -= count
+            self._live_length -= float(self._doc_lengths[start:start + count].sum())
+        return True
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        if term_id < len(self._offsets) - 1:
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            docs, tfs = self._post_docs[start:end], self._post_tfs[start:end]
+        else:
+            docs, tfs = self._post_docs[:0], self._post_tfs[:0]
+        delta = self._delta.get(term_id)
+        if delta is not None:
+            docs = np.concatenate([docs, np.asarray(delta[0], dtype=np.int32)])
+            tfs = np.concatenate([tfs, np.asarray(delta[1], dtype=np.float32)])
+        return docs, tfs
+
+    def _flatten_delta(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        terms = np.zeros(self._delta_size, dtype=np.int64)
+        docs = np.zeros(self._delta_size, dtype=np.int32)
+        tfs = np.zeros(self._delta_size, dtype=np.float32)
+        position = 0
+        for term_id, (term_docs, term_tfs) in self._delta.items():
+            end = position + len(term_docs)
+            terms[position:end] = term_id
+            docs[position:end] = term_docs
+            tfs[position:end] = term_tfs
+            position = end
+        return terms, docs, tfs
+
+    def _delta_limit(self) -> float:
+        return max(COMPACT_MIN_POSTINGS, COMPACT_RATIO * len(self._post_docs))
+
+    def _maybe_compact(self) -> None:
+        dead_docs = len(self._alive) - self._live_docs
+        if (self._delta_size > self._delta_limit()
+                or dead_docs > max(COMPACT_MIN_POSTINGS // 64, COMPACT_RATIO * len(self._alive))):
+            self.compact()
@@ -1,8 +1,10 @@
-"""Migration script for upgrading existing embeddings to enhanced metadata format.
+"""Migration scripts for upgrading existing index data.
 
-This module provides functionality to migrate existing embedding files from
-version 1 (basic metadata) to version 2 (enhanced metadata) while maintaining
-backward compatibility.
+This module provides functionality to:
+1. Migrate existing embedding files from version 1 (basic metadata) to
+   version 2 (enhanced metadata) while maintaining backward compatibility
+2. Move the legacy per-file ``metadata``/``descriptions``/``embeddings``
+   layout into the consolidated index store
 """
 
 import json
@@ -13,6 +15,7 @@ import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .index_store import IndexStore
 from .indexer import FileIndexer
 
 logger = logging.getLogger("TaskHeroAI.Migration")
@@ -299,3 +302,141 @@ def run_migration(project_root: str, embeddings_dir: Optional[str] = None) -> Di
 
     migration = EmbeddingMigration(Path(embeddings_dir))
     return migration.migrate_embeddings(project_root)
+
+
+LEGACY_INDEX_SUBDIRS = ("metadata", "embeddings", "descriptions")
+
+
+class IndexStoreMigration:
+    """Moves a legacy per-file JSON index into the consolidated index store."""
+
+    def __init__(self, index_dir: str, store: Optional[IndexStore] = None):
+        """Initialize the migration handler.
+
+        Args:
+            index_dir: The ``.index`` directory holding the legacy layout
+            store: Store to migrate into (defaults to the store inside index_dir)
+        """
+        self.index_dir = index_dir
+        self.root_path = os.path.dirname(os.path.abspath(index_dir))
+        self.store = store or IndexStore(index_dir)
+
+    def _legacy_path(self, subdir: str, name: str) -> str:
+        return os.path.join(self.index_dir, subdir, name)
+
+    def _build_record(self, safe_name: str) -> Optional[tuple]:
+        """Merge the legacy triple for one file into a store record.
+
+        Args:
+            safe_name: The sanitized file name shared by the three legacy files
+
+        Returns:
+            Tuple of (record, embeddings), or None if there is no usable data
+        """
+        with open(self._legacy_path("embeddings", f"{safe_name}.json"), 'r', encoding='utf-8') as f:
+            embedding_data = json.load(f)
+
+        path = embedding_data.get('path')
+        if not path:
+            return None
+
+        metadata = dict(embedding_data.get('metadata') or {})
+        file_metadata: Dict[str, Any] = {}
+        metadata_path = self._legacy_path("metadata", f"{safe_name}.json")
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                file_metadata = json.load(f)
+
+        description = file_metadata.get('description') or metadata.pop('description', None)
+        description_path = self._legacy_path("descriptions", f"{safe_name}.txt")
+        if not description and os.path.exists(description_path):
+            with open(description_path, 'r', encoding='utf-8') as f:
+                description = f.read().strip()
+        metadata.pop('description', None)
+
+        record = {
+            'name': file_metadata.get('name') or metadata.get('file_name') or os.path.basename(path),
+            'path': path,
+            'rel_path': os.path.relpath(path, self.root_path).replace("\\", "/"),
+            'hash': file_metadata.get('hash') or metadata.get('file_hash'),
+            'size': file_metadata.get('size', metadata.get('file_size', 0)),
+            'extension': file_metadata.get('extension', metadata.get('file_extension', '')),
+            'modified_time': file_metadata.get('modified_time', metadata.get('modified_time', 0.0)),
+            'description': description or f"File: {os.path.basename(path)}",
+            'signatures': file_metadata.get('signatures', []),
+            'chunks': embedding_data.get('chunks', []),
+            'metadata': metadata,
+        }
+        return record, embedding_data.get('embeddings', [])
+
+    def migrate(self, remove_legacy: bool = True) -> Dict[str, Any]:
+        """Write every legacy file into one store segment.
+
+        Args:
+            remove_legacy: Delete the legacy directories once all files migrated cleanly
+
+        Returns:
+            Dictionary with migration results and statistics
+        """
+        results = {
+            'migrated': 0,
+            'skipped': 0,
+            'errors': 0,
+            'legacy_removed': False,
+            'start_time': time.time()
+        }
+
+        embeddings_dir = os.path.join(self.index_dir, "embeddings")
+        if not os.path.isdir(embeddings_dir):
+            logger.info("No legacy embeddings directory found - nothing to migrate")
+            results['end_time'] = time.time()
+            results['duration'] = results['end_time'] - results['start_time']
+            return results
+
+        safe_names = [name[:-len(".json")] for name in os.listdir(embeddings_dir) if name.endswith(".json")]
+        logger.info(f"Migrating {len(safe_names)} legacy index files into the index store")
+
+        writer = self.store.begin_segment()
+        try:
+            for safe_name in safe_names:
+                try:
+                    built = self._build_record(safe_name)
+                    if built is None:
+                        results['skipped'] += 1
+                        continue
+                    record, embeddings = built
+                    writer.add(record, embeddings)
+                    results['migrated'] += 1
+                except Exception as e:
+                    results['errors'] += 1
+                    logger.error(f"Error migrating legacy index file {safe_name}: {e}")
+            writer.commit()
+        except Exception:
+            writer.abort()
+            raise
+
+        if remove_legacy and results['errors'] == 0:
+            for subdir in LEGACY_INDEX_SUBDIRS:
+                shutil.rmtree(os.path.join(self.index_dir, subdir), ignore_errors=True)
+            results['legacy_removed'] = True
+
+        results['end_time'] = time.time()
+        results['duration'] = results['end_time'] - results['start_time']
+        logger.info(f"Index store migration completed: {results['migrated']} migrated, "
+                    f"{results['skipped']} skipped, {results['errors']} errors")
+        return results
+
+
+def migrate_legacy_index(index_dir: str, store: Optional[IndexStore] = None,
+                         remove_legacy: bool = True) -> Dict[str, Any]:
+    """Migrate a legacy ``.index`` layout into the consolidated index store.
+
+    Args:
+        index_dir: The ``.index`` directory holding the legacy layout
+        store: Store to migrate into (defaults to the store inside index_dir)
+        remove_legacy: Delete the legacy directories once all files migrated cleanly
+
+    Returns:
+        Migration results dictionary
+    """
+    return IndexStoreMigration(index_dir, store).migrate(remove_legacy=remove_legacy)
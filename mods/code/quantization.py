@@ -0,0 +1,214 @@
+"""Scalar and product quantization of unit-length embedding vectors.
+
+Two compressed formats are supported for the search matrix:
+
+* ``int8`` scalar quantization stores every vector as int8 codes with one
+  float32 scale per row (about 4x smaller than float32).
+* ``pq`` product quantization splits every vector into sub-vectors and stores
+  the index of the nearest of 256 trained centroids per sub-vector, one byte
+  each (16x smaller than float32 with the default 4-dimensional sub-vectors).
+
+Both are scored asymmetrically: the query stays in float32 and only the
+stored side is approximated.
+"""
+
+import logging
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("TaskHeroAI.Quantization")
+
+PQ_CENTROIDS = 256
+PQ_SUBVECTOR_DIMS = int(os.getenv("EMBEDDING_PQ_SUBVECTOR_DIMS", "4"))
+PQ_TRAIN_SAMPLES = 16384
+PQ_TRAIN_ITERATIONS = 10
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize vectors to int8 with a symmetric scale per row.
+
+    Args:
+        vectors (np.ndarray): (rows, dims) float vectors.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (rows, dims) int8 codes and (rows,) float32 scales,
+        such that ``codes * scales[:, None]`` approximates ``vectors``.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class ProductQuantizer:
+    """Product quantizer with 256 centroids per sub-vector."""
+
+    def __init__(self, codebooks: np.ndarray):
+        """Initialize the quantizer from trained codebooks.
+
+        Args:
+            codebooks (np.ndarray): (subvectors, 256, subvector_dims) float32 centroids.
+        """
+        self.codebooks: np.ndarray = np.asarray(codebooks, dtype=np.float32)
+
+    @property
+    def num_subvectors(self) -> int:
+        """Number of sub-vectors (bytes per code)."""
+        return self.codebooks.shape[0]
+
+    @property
+    def dims(self) -> int:
+        """Dimensionality of the original vectors."""
+        return self.codebooks.shape[0] * self.codebooks.shape[2]
+
+    @staticmethod
+    def subvector_dims_for(dims: int) -> int:
+        """Pick the largest sub-vector size not above the configured one that divides dims.
+
+        Args:
+            dims (int): Vector dimensionality.
+
+        Returns:
+            int: Sub-vector dimensionality.
+        """
+        for size in range(max(1, PQ_SUBVECTOR_DIMS), 0, -1):
+            if dims % size == 0:
+                return size
+        return 1
+
+    @classmethod
+    def train(cls, sample: np.ndarray, seed: int = 0) -> "ProductQuantizer":
+        """Train the codebooks with k-means on every sub-space of a sample.
+
+        Args:
+            sample (np.ndarray): (rows, dims) training vectors.
+            seed (int): Seed for centroid initialization.
+
+        Returns:
+            ProductQuantizer: The trained quantizer.
+        """
+        sample = np.asarray(sample, dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        if sample.shape[0] > PQ_TRAIN_SAMPLES:
+            sample = sample[rng.choice(sample.shape[0], PQ_TRAIN_SAMPLES, replace=False)]
+
+        sub_dims = cls.subvector_dims_for(sample.shape[1])
+        num_sub = sample.shape[1] // sub_dims
+        codebooks = np.zeros((num_sub, PQ_CENTROIDS, sub_dims), dtype=np.float32)
+        for j in range(num_sub):
+            codebooks[j] = _kmeans(sample[:, j * sub_dims:(j + 1) * sub_dims], PQ_CENTROIDS, rng)
+
+        logger.info(f"Trained product quantizer with {num_sub} sub-vectors of {sub_dims} dims")
+        return cls(codebooks)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode vectors as one centroid index per sub-vector.
+
+        Args:
+            vectors (np.ndarray): (rows, dims) float vectors.
+
+        Returns:
+            np.ndarray: (rows, subvectors) uint8 codes.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        sub_dims = self.codebooks.shape[2]
+        codes = np.empty((vectors.shape[0], self.num_subvectors), dtype=np.uint8)
+        for j in range(self.num_subvectors):
+            sub = vectors[:, j * sub_dims:(j + 1) * sub_dims]
+            codes[:, j] = _nearest(sub, self.codebooks[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstruct approximate vectors from codes.
+
+        Args:
+            codes (np.ndarray): (rows, subvectors) uint8 codes.
+
+        Returns:
+            np.ndarray: (rows, dims) float32 vectors.
+        """
+        codes = np.asarray(codes)
+        parts = [self.codebooks[j][codes[:, j]] for j in range(self.num_subvectors)]
+        return np.concatenate(parts, axis=1)
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Compute asymmetric inner products between float queries and encoded rows.
+
+        Args:
+            queries (np.ndarray): A (dims,) query or a (Q, dims) query matrix.
+            codes (np.ndarray): (rows, subvectors) uint8 codes.
+
+        Returns:
+            np.ndarray: (rows,) or (Q, rows) float32 scores.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries)
+
+        sub_dims = self.codebooks.shape[2]
+        # Lookup table of query/centroid products: (Q, subvectors * 256)
+        tables = np.einsum(
+            "qjd,jkd->qjk",
+            queries.reshape(queries.shape[0], self.num_subvectors, sub_dims),
+            self.codebooks,
+        ).reshape(queries.shape[0], -1)
+        flat_codes = np.asarray(codes, dtype=np.intp) + np.arange(self.num_subvectors) * PQ_CENTROIDS
+
+        scores = np.empty((queries.shape[0], flat_codes.shape[0]), dtype=np.float32)
+        for qi in range(queries.shape[0]):
+            scores[qi] = tables[qi][flat_codes].sum(axis=1)
+        return scores[0] if single else scores
+
+    def save(self, path: str) -> None:
+        """Persist the codebooks to an ``.npy`` file.
+
+        Args:
+            path (str): Destination path.
+        """
+        np.save(path, self.codebooks)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ProductQuantizer"]:
+        """Load codebooks written by :meth:`save`.
+
+        Args:
+            path (str): Path of the ``.npy`` file.
+
+        Returns:
+            Optional[ProductQuantizer]: The quantizer, or None if it cannot be read.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(np.load(path))
+        except Exception as e:
+            logger.warning(f"Error loading product quantizer {path}: {e}")
+            return None
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    distances = (
+        np.sum(centroids * centroids, axis=1)[None, :]
+        - 2.0 * (vectors @ centroids.T)
+    )
+    return np.argmin(distances, axis=1)
+
+
+def _kmeans(vectors: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    if vectors.shape[0] <= k:
+        centroids = np.zeros((k, vectors.shape[1]), dtype=np.float32)
+        centroids[:vectors.shape[0]] = vectors
+        return centroids
+
+    centroids = vectors[rng.choice(vectors.shape[0], k, replace=False)].copy()
+    for _ in range(PQ_TRAIN_ITERATIONS):
+        labels = _nearest(vectors, centroids)
+        counts = np.bincount(labels, minlength=k).astype(np.float32)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
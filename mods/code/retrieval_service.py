@@ -0,0 +1,355 @@
+"""Process-wide retrieval service shared by the search front-ends of an index.
+
+SimilaritySearch, the BM25 keyword index, SemanticSearchEngine and
+GraphitiContextRetriever used to open the same index directory on their own,
+each parsing the store manifest and keeping a private copy of the indexed
+chunks. A RetrievalService is created once per index directory and reference
+counted: the FileIndexer and every search front-end acquire it, read through
+its IndexStore and the search structures loaded into it, and release it when
+they are done. The service is dropped with the last reference.
+
+Consumers keep derived state (a TF-IDF model, metadata caches) current by
+subscribing to changes:
+
+- the indexer calls notify_changed() with the paths it wrote or removed, which
+  is pushed to every listener right away;
+- refresh() picks up writes made by other processes from the manifest and
+  notifies listeners with None, meaning any file may have changed.
+"""
+
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .embed import SimilaritySearch
+from .index_store import IndexStore
+from .keyword_index import KeywordIndex
+
+logger = logging.getLogger("TaskHeroAI.RetrievalService")
+
+# listener(updated paths, removed paths); both are None when any file may have changed
+ChangeListener = Callable[[Optional[List[str]], Optional[List[str]]], None]
+
+_services: Dict[str, "RetrievalService"] = {}
+_services_lock = threading.Lock()
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class RetrievalService:
+    """Shared index store, vector search and keyword search of one index directory.
+
+    Usage:
+        service = RetrievalService.acquire(index_dir)
+        try:
+            hits = service.keyword_search("parse gitignore", top_k=5)
+            record = service.get_record(hits[0][0])
+        finally:
+            service.release()
+    """
+
+    def __init__(self, index_dir: str):
+        """Open the index store of an index directory.
+
+        Use acquire() to get the instance shared by the whole process; a service
+        created directly is private to its owner.
+
+        Args:
+            index_dir (str): The ``.index`` directory to serve.
+        """
+        self.index_dir: str = os.path.abspath(index_dir)
+        self.store: IndexStore = IndexStore(self.index_dir)
+        self.similarity_search: Optional[SimilaritySearch] = None
+        self.keyword_index: Optional[KeywordIndex] = None
+
+        self._refs: int = 0
+        self._lock = threading.RLock()
+        self._listeners: List[Any] = []
+        self._shared: Dict[Any, Any] = {}
+        self._manifest_signature: Optional[Tuple[int, int]] = _file_signature(self.store.manifest_path)
+        self._generation: int = self.store.generation
+        self._vector_generation: int = self.store.vector_generation
+
+    @staticmethod
+    def _key(index_dir: str) -> str:
+        return os.path.normcase(os.path.abspath(index_dir))
+
+    @classmethod
+    def acquire(cls, index_dir: str) -> "RetrievalService":
+        """Get the service of an index directory, creating it on first use.
+
+        Every call must be paired with a call to release().
+
+        Args:
+            index_dir (str): The ``.index`` directory to serve.
+
+        Returns:
+            RetrievalService: The service shared by every user of the directory.
+        """
+        key = cls._key(index_dir)
+        with _services_lock:
+            service = _services.get(key)
+            if service is None:
+                service = cls(index_dir)
+                _services[key] = service
+                logger.debug(f"Opened retrieval service for {service.index_dir}")
+            service._refs += 1
+        return service
+
+    def release(self) -> None:
+        """Drop a reference taken by acquire(); the last one closes the service."""
+        with _services_lock:
+            if self._refs <= 0:
+                return
+            self._refs -= 1
+            if self._refs:
+                return
+            if _services.get(self._key(self.index_dir)) is self:
+                del _services[self._key(self.index_dir)]
+
+        with self._lock:
+            self.similarity_search = None
+            self.keyword_index = None
+            self._shared.clear()
+            self._listeners.clear()
+        logger.debug(f"Closed retrieval service for {self.index_dir}")
+
+    @property
+    def ref_count(self) -> int:
+        """int: Number of acquire() calls not yet released."""
+        return self._refs
+
+    def exists(self) -> bool:
+        """Check whether the index directory holds a store manifest.
+
+        Returns:
+            bool: True if something was indexed into the store.
+        """
+        return IndexStore.exists(self.index_dir)
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        """Register a callable to be told about changes to the index.
+
+        Bound methods are held weakly, so subscribing does not keep their object alive.
+
+        Args:
+            listener (ChangeListener): Called with (updated paths, removed paths), or
+                with (None, None) when any file may have changed.
+        """
+        reference = weakref.WeakMethod(listener) if hasattr(listener, "__self__") else (lambda: listener)
+        with self._lock:
+            self._listeners.append(reference)
+
+    def unsubscribe(self, listener: ChangeListener) -> None:
+        """Stop telling a listener about changes.
+
+        Args:
+            listener (ChangeListener): A listener passed to subscribe().
+        """
+        with self._lock:
+            self._listeners = [reference for reference in self._listeners if reference() not in (None, listener)]
+
+    def notify_changed(self, updated: Optional[List[str]] = None, removed: Optional[List[str]] = None) -> None:
+        """Push a change the indexer made to the store to every listener.
+
+        The indexer applies the change to the shared similarity search and keyword
+        index itself before calling this.
+
+        Args:
+            updated (Optional[List[str]]): Paths of files that were (re)indexed.
+            removed (Optional[List[str]]): Paths of files that were removed from the index.
+        """
+        with self._lock:
+            self._manifest_signature = _file_signature(self.store.manifest_path)
+            self._generation = self.store.generation
+            self._vector_generation = self.store.vector_generation
+        self._notify(list(updated or []), list(removed or []))
+
+    def refresh(self) -> bool:
+        """Pick up changes to the store that nobody pushed, such as writes by another process.
+
+        Only the manifest is checked while it is unchanged on disk. Stale search
+        structures are reloaded and listeners are told that any file may have changed.
+
+        Returns:
+            bool: True if the index changed since it was last seen.
+        """
+        with self._lock:
+            signature = _file_signature(self.store.manifest_path)
+            if signature != self._manifest_signature:
+                self._manifest_signature = signature
+                self.store.reload()
+            if self.store.generation == self._generation:
+                return False
+            self._generation = self.store.generation
+
+            if self.store.vector_generation != self._vector_generation:
+                self._vector_generation = self.store.vector_generation
+                if self.keyword_index is not None and self.keyword_index.generation != self._vector_generation:
+                    self.keyword_index = None
+                if self.similarity_search is not None:
+                    try:
+                        self.similarity_search.load_embeddings()
+                    except Exception as e:
+                        logger.error(f"Error reloading SimilaritySearch: {e}", exc_info=True)
+                        self.similarity_search = None
+
+        logger.debug(f"Index store {self.index_dir} changed outside this process")
+        self._notify(None, None)
+        return True
+
+    def _notify(self, updated: Optional[List[str]], removed: Optional[List[str]]) -> None:
+        with self._lock:
+            self._listeners = [reference for reference in self._listeners if reference() is not None]
+            listeners = [reference() for reference in self._listeners]
+        for listener in listeners:
+            if listener is None:
+                continue
+            try:
+                listener(updated, removed)
+            except Exception as e:
+                logger.error(f"Error notifying index change listener: {e}", exc_info=True)
+
+    def shared(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """Get an object shared by every consumer of the service, creating it on first use.
+
+        Lets front-ends that build the same derived structure (for example a
+        SemanticSearchEngine with its TF-IDF model) build it once per process.
+
+        Args:
+            key (Any): Hashable key of the object.
+            factory (Callable[[], Any]): Creates the object.
+
+        Returns:
+            Any: The shared object.
+        """
+        with self._lock:
+            if key not in self._shared:
+                self._shared[key] = factory()
+            return self._shared[key]
+
+    def get_similarity_search(self) -> Optional[SimilaritySearch]:
+        """Get the shared vector search, loading it on first use.
+
+        Returns:
+            Optional[SimilaritySearch]: The vector search, or None if nothing is indexed.
+        """
+        with self._lock:
+            if self.similarity_search is None:
+                embeddings_dir = os.path.join(self.index_dir, "embeddings")
+                if not self.exists() and not os.path.exists(embeddings_dir):
+                    return None
+                try:
+                    self.similarity_search = SimilaritySearch(embeddings_dir=embeddings_dir, index_store=self.store)
+                    self._vector_generation = self.store.vector_generation
+                except Exception as e:
+                    logger.error(f"Error initializing SimilaritySearch: {e}", exc_info=True)
+            return self.similarity_search
+
+    def get_keyword_index(self) -> Optional[KeywordIndex]:
+        """Get the shared BM25 keyword index, loading (or rebuilding) it on first use.
+
+        Returns:
+            Optional[KeywordIndex]: The keyword index, or None if there is no index store.
+        """
+        with self._lock:
+            if self.keyword_index is None and self.exists():
+                try:
+                    self.keyword_index = KeywordIndex.open(self.store)
+                except Exception as e:
+                    logger.error(f"Error loading keyword index: {e}", exc_info=True)
+            return self.keyword_index
+
+    def vector_search(self, query: str, top_k: int = 5, threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Search chunks by embedding similarity. See SimilaritySearch.search().
+
+        Args:
+            query (str): The search query.
+            top_k (int): Number of results to return.
+            threshold (Optional[float]): Minimum similarity. If None, uses the search default.
+
+        Returns:
+            List[Dict[str, Any]]: Matched chunks with their scores.
+        """
+        self.refresh()
+        similarity_search = self.get_similarity_search()
+        if similarity_search is None:
+            return []
+        return similarity_search.search(query, top_k=top_k, threshold=threshold)
+
+    def keyword_search(self, query: str, top_k: int = 10) -> List[Tuple[str, int, float]]:
+        """Search chunks with BM25. See KeywordIndex.search().
+
+        Args:
+            query (str): The search query.
+            top_k (int): Number of results to return.
+
+        Returns:
+            List[Tuple[str, int, float]]: (file path, chunk index, score), best first.
+        """
+        self.refresh()
+        keyword_index = self.get_keyword_index()
+        if keyword_index is None:
+            return []
+        return keyword_index.search(query, top_k)
+
+    @property
+    def file_count(self) -> int:
+        """int: Number of indexed files."""
+        return self.store.file_count
+
+    def get_record(self, path: str) -> Optional[Dict[str, Any]]:
+        """Get the stored record of an indexed file.
+
+        Args:
+            path (str): Absolute path of the file.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the file is not indexed.
+        """
+        return self.store.get_record(path)
+
+    def iter_entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over the manifest entries (hash, modified time, ...) of all indexed files.
+
+        Returns:
+            Iterator[Tuple[str, Dict[str, Any]]]: (path, entry) pairs.
+        """
+        return self.store.iter_entries()
+
+    def iter_records(self, with_vectors: bool = False) -> Iterator[Tuple[Dict[str, Any], Any]]:
+        """Iterate over the stored records of all indexed files.
+
+        Args:
+            with_vectors (bool): Also read the chunk embeddings of every file.
+
+        Returns:
+            Iterator[Tuple[Dict[str, Any], Any]]: (record, vectors or None) pairs.
+        """
+        return self.store.iter_records(with_vectors=with_vectors)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get service statistics.
+
+        Returns:
+            Dict[str, Any]: Dictionary with service metrics.
+        """
+        with self._lock:
+            return {
+                "index_dir": self.index_dir,
+                "references": self._refs,
+                "listeners": sum(1 for reference in self._listeners if reference() is not None),
+                "files": self.store.file_count,
+                "generation": self._generation,
+                "similarity_search_loaded": self.similarity_search is not None,
+                "keyword_index_loaded": self.keyword_index is not None,
+                "shared_objects": len(self._shared),
+            }
@@ -14,6 +14,7 @@ from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
 import logging
 
+from .index_store import count_indexed_files
 from .indexer import FileIndexer
 from .indexing_logger import IndexingLogger
 
@@ -239,17 +240,11 @@ class SmartIndexer:
 
         # Check if we have existing index data (even without recent logs)
         index_dir = os.path.join(self.root_path, '.index')
-        metadata_dir = os.path.join(index_dir, 'metadata')
-        has_existing_index = os.path.exists(metadata_dir)
-
-        if has_existing_index:
-            try:
-                metadata_files = [f for f in os.listdir(metadata_dir) if f.endswith('.json')]
-                metadata_count = len(metadata_files)
-            except Exception:
-                metadata_count = 0
-        else:
+        try:
+            metadata_count = count_indexed_files(index_dir)
+        except Exception:
             metadata_count = 0
+        has_existing_index = metadata_count > 0
 
         # If we have recent complete indexing, check for missing and outdated files
         if analysis['indexing_complete'] and analysis['has_recent_indexing']:
@@ -285,12 +280,19 @@ class SmartIndexer:
 
         This method combines the logic from get_outdated_files() and is_index_complete()
         to find all files that need to be indexed or re-indexed. It also cleans up
-        deleted files from the index.
+        deleted files from the index. With INDEX_GIT_CHANGE_DETECTION enabled, git's
+        list of changed files replaces the directory scan when it is available.
 
         Returns:
             List of file paths that need indexing
         """
         try:
+            # In a git repository, only the files git reports as changed need checking
+            git_files = self.indexer._get_outdated_files_from_git()
+            if git_files is not None:
+                logger.info(f"Found {len(git_files)} files needing indexing from git changes")
+                return git_files
+
             # Get the complete index status which includes both missing and outdated files
             index_status = self.indexer.is_index_complete()
 
@@ -494,21 +496,20 @@ class SmartIndexer:
 
         # Check if index directory exists and has content
         index_dir = os.path.join(self.root_path, '.index')
-        metadata_dir = os.path.join(index_dir, 'metadata')
 
         status = {
             'index_exists': os.path.exists(index_dir),
-            'metadata_exists': os.path.exists(metadata_dir),
+            'metadata_exists': False,
             'metadata_files': 0,
             'analysis': analysis
         }
 
-        if status['metadata_exists']:
+        if status['index_exists']:
             try:
-                metadata_files = [f for f in os.listdir(metadata_dir) if f.endswith('.json')]
-                status['metadata_files'] = len(metadata_files)
+                status['metadata_files'] = count_indexed_files(index_dir)
+                status['metadata_exists'] = status['metadata_files'] > 0
             except Exception as e:
-                logger.warning(f"Error counting metadata files: {e}")
+                logger.warning(f"Error counting indexed files: {e}")
 
         # Determine overall status
         if analysis['indexing_complete'] and status['metadata_files'] > 0:
@@ -18,7 +18,6 @@ and powerful capabilities for exploring and understanding codebases.
 
 import ast
 import fnmatch
-import json
 import logging
 import os
 import platform
@@ -28,7 +27,7 @@ import sys
 from dotenv import load_dotenv
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 import numpy as np
 import pytz
@@ -49,6 +48,8 @@ except ImportError:
 
 from .directory import DirectoryEntry, DirectoryParser, EntryType
 from .embed import SimilaritySearch
+from .file_snapshot import SnapshotFile
+from .index_store import IndexStore
 from .instructions import instructions_manager
 from .memory import memory_manager
 from .terminal import terminal_manager
@@ -81,9 +82,12 @@ class CodebaseTools:
         if self.indexer and hasattr(self.indexer, "similarity_search") and self.indexer.similarity_search:
             self.logger.info("Using shared SimilaritySearch instance from indexer")
             self.similarity_search = self.indexer.similarity_search
+        elif self.indexer and getattr(self.indexer, "retrieval", None) is not None:
+            # Loaded once per index directory and shared with every other search front-end
+            self.similarity_search = self.indexer.retrieval.get_similarity_search()
         elif self.indexer and self.indexer.index_dir:
             embeddings_dir = os.path.join(self.indexer.index_dir, "embeddings")
-            if os.path.exists(embeddings_dir):
+            if IndexStore.exists(self.indexer.index_dir) or os.path.exists(embeddings_dir):
                 self.logger.warning("Creating new SimilaritySearch instance (not using shared instance)")
                 self.similarity_search = SimilaritySearch(embeddings_dir=embeddings_dir)
 
@@ -96,24 +100,6 @@ class CodebaseTools:
 
             memory_manager.load_memories()
 
-    def _collect_file_paths_recursive_from_entry(
-        self, entry: DirectoryEntry, current_path_prefix: str, file_list: List[str]
-    ):
-        """Recursively collects file paths from DirectoryEntry objects.
-
-        Args:
-            entry (DirectoryEntry): The directory entry to collect file paths from.
-            current_path_prefix (str): The path leading up to the parent of `entry`.
-            file_list (List[str]): The list to store the collected file paths.
-        """
-        entry_full_relative_path = os.path.join(current_path_prefix, entry.name).replace("\\\\", "/")
-
-        if entry.is_file():
-            file_list.append(entry_full_relative_path)
-        elif entry.is_folder() and entry.children:
-            for child_entry in entry.children:
-                self._collect_file_paths_recursive_from_entry(child_entry, entry_full_relative_path, file_list)
-
     def find_closest_file_match(self, user_path: str) -> Optional[str]:
         """Finds the closest match for a given user_path in the indexed files.
 
@@ -144,49 +130,14 @@ class CodebaseTools:
             except Exception as e:
                 self.logger.error(f"Error calling self.indexer.get_all_indexed_relative_files: {e}", exc_info=True)
 
-        if not all_relative_files and hasattr(self.indexer, "_get_all_indexable_files") and callable(
-            getattr(self.indexer, "_get_all_indexable_files")
-        ):
-            self.logger.warning("find_closest_file_match: Falling back to self.indexer._get_all_indexable_files.")
-            try:
-                full_paths: List[str] = self.indexer._get_all_indexable_files()
-                temp_relative_files = []
-                for fp in full_paths:
-                    if isinstance(fp, str):
-                        temp_relative_files.append(os.path.relpath(fp, self.indexer.root_path).replace("\\\\", "/"))
-                if temp_relative_files:
-                    all_relative_files = temp_relative_files
-                elif not full_paths:
-                    self.logger.warning("_get_all_indexable_files returned no files.")
-                elif full_paths and not temp_relative_files:
-                    self.logger.error("_get_all_indexable_files provided paths but conversion to relative failed.")
-            except Exception as e:
-                self.logger.error(f"Error calling or processing self.indexer._get_all_indexable_files: {e}", exc_info=True)
-
         if not all_relative_files:
-            self.logger.warning("find_closest_file_match: Falling back to DirectoryParser.")
+            self.logger.debug("find_closest_file_match: Falling back to the file snapshot")
             try:
-                default_excludes = getattr(self.indexer, "DEFAULT_EXCLUDED_EXTENSIONS", [])
-                parser = DirectoryParser(
-                    directory_path=self.indexer.root_path,
-                    gitignore_path=os.path.join(self.indexer.root_path, ".gitignore")
-                    if os.path.exists(os.path.join(self.indexer.root_path, ".gitignore"))
-                    else None,
-                    parallel=False,
-                    hash_files=False,
-                    extra_exclude_patterns=default_excludes,
-                )
-                root_entry = parser.parse()
-                parsed_paths: List[str] = []
-                if root_entry.is_folder() and root_entry.children:
-                    for top_level_child in root_entry.children:
-                        self._collect_file_paths_recursive_from_entry(top_level_child, "", parsed_paths)
-                if parsed_paths:
-                    all_relative_files = parsed_paths
-                else:
-                    self.logger.warning("DirectoryParser also found no files for find_closest_file_match.")
-            except Exception as e_parser:
-                self.logger.error(f"Error using DirectoryParser in find_closest_file_match: {e_parser}", exc_info=True)
+                all_relative_files = [snapshot_file.rel_path for snapshot_file in self._snapshot_files()]
+                if not all_relative_files:
+                    self.logger.warning("File snapshot has no files for find_closest_file_match.")
+            except Exception as e:
+                self.logger.error(f"Error reading the file snapshot in find_closest_file_match: {e}", exc_info=True)
 
         if not all_relative_files:
             self.logger.error("find_closest_file_match: Critically failed to obtain list of indexed files.")
@@ -419,43 +370,12 @@ class CodebaseTools:
                 return [{"error": f"Invalid regex pattern: {str(e)}"}]
 
             results = []
-            root_path = self.indexer.root_path
-
-            gitignore_path = os.path.join(root_path, ".gitignore") if os.path.exists(os.path.join(root_path, ".gitignore")) else None
-            parser = DirectoryParser(
-                directory_path=root_path,
-                gitignore_path=gitignore_path,
-                parallel=False,
-                hash_files=False,
-                extra_exclude_patterns=self.indexer.DEFAULT_EXCLUDED_EXTENSIONS,
-            )
-
-            root_entry = parser.parse()
-            all_files = []
-
-            def collect_files(entry):
-                if entry.is_file():
-                    if file_pattern and not fnmatch.fnmatch(entry.name, file_pattern):
-                        return
-
-                    file_ext = os.path.splitext(entry.name)[1].lower()
-                    if file_ext in self.indexer.DEFAULT_EXCLUDED_EXTENSIONS:
-                        return
-
-                    all_files.append(entry.path)
-                else:
-                    for child in entry.children:
-                        collect_files(child)
-
-            collect_files(root_entry)
 
-            for file_path in all_files:
-                rel_path = os.path.relpath(file_path, root_path)
+            for snapshot_file in self._snapshot_files(file_pattern):
+                file_path = snapshot_file.path
+                rel_path = snapshot_file.rel_path
 
                 try:
-                    if not self.indexer._is_text_file(file_path):
-                        continue
-
                     with open(file_path, "r", encoding="utf-8", errors="replace") as f:
                         lines = f.readlines()
 
@@ -545,44 +465,12 @@ class CodebaseTools:
                 return [{"error": f"Invalid regex pattern: {str(e)}"}]
 
             results = []
-            root_path = self.indexer.root_path
-
-            gitignore_path = os.path.join(root_path, ".gitignore") if os.path.exists(os.path.join(root_path, ".gitignore")) else None
-            parser = DirectoryParser(
-                directory_path=root_path,
-                gitignore_path=gitignore_path,
-                parallel=False,
-                hash_files=False,
-                extra_exclude_patterns=self.indexer.DEFAULT_EXCLUDED_EXTENSIONS,
-            )
-
-            root_entry = parser.parse()
-
-            all_files = []
-
-            def collect_files(entry):
-                if entry.is_file():
-                    if file_pattern and not fnmatch.fnmatch(entry.name, file_pattern):
-                        return
-
-                    file_ext = os.path.splitext(entry.name)[1].lower()
-                    if file_ext in self.indexer.DEFAULT_EXCLUDED_EXTENSIONS:
-                        return
-
-                    all_files.append(entry.path)
-                else:
-                    for child in entry.children:
-                        collect_files(child)
 
-            collect_files(root_entry)
-
-            for file_path in all_files:
-                rel_path = os.path.relpath(file_path, root_path)
+            for snapshot_file in self._snapshot_files(file_pattern):
+                file_path = snapshot_file.path
+                rel_path = snapshot_file.rel_path
 
                 try:
-                    if not self.indexer._is_text_file(file_path):
-                        continue
-
                     with open(file_path, "r", encoding="utf-8", errors="replace") as f:
                         for i, line in enumerate(f, 1):
                             if regex.search(line):
@@ -836,26 +724,23 @@ class CodebaseTools:
         try:
             self.logger.info("Analyzing project languages")
 
-            root_path: str = self.indexer.root_path
             extension_counts: Dict[str, int] = {}
             language_counts: Dict[str, int] = {}
             language_to_extensions: Dict[str, List[str]] = {}
 
-            for root, _, files in os.walk(root_path):
-                for file in files:
-                    _, ext = os.path.splitext(file)
-                    if ext:
-                        ext = ext.lower()
-                        extension_counts[ext] = extension_counts.get(ext, 0) + 1
+            for snapshot_file in self._snapshot_files():
+                ext = snapshot_file.extension
+                if ext:
+                    extension_counts[ext] = extension_counts.get(ext, 0) + 1
 
-                        language: str = self._map_extension_to_language(ext)
-                        if language != 'Unknown':
-                            language_counts[language] = language_counts.get(language, 0) + 1
+                    language: str = self._map_extension_to_language(ext)
+                    if language != 'Unknown':
+                        language_counts[language] = language_counts.get(language, 0) + 1
 
-                            if language not in language_to_extensions:
-                                language_to_extensions[language] = []
-                            if ext not in language_to_extensions[language]:
-                                language_to_extensions[language].append(ext)
+                        if language not in language_to_extensions:
+                            language_to_extensions[language] = []
+                        if ext not in language_to_extensions[language]:
+                            language_to_extensions[language].append(ext)
 
             languages = sorted(language_counts.items(), key=lambda x: x[1], reverse=True)
             language_list: List[str] = [lang for lang, _ in languages]
@@ -903,19 +788,14 @@ class CodebaseTools:
                 root_path: str = self.indexer.root_path
                 project_name: str = os.path.basename(root_path)
 
-                file_count: int = 0
-                dir_count: int = 0
+                snapshot_files = self._snapshot_files()
+                file_count: int = len(snapshot_files)
+                dir_count: int = len({os.path.dirname(file.rel_path) for file in snapshot_files} - {""})
                 file_types: Dict[str, int] = {}
 
-                for root, dirs, files in os.walk(root_path):
-                    dir_count += len(dirs)
-                    file_count += len(files)
-
-                    for file in files:
-                        _, ext = os.path.splitext(file)
-                        if ext:
-                            ext = ext.lower()
-                            file_types[ext] = file_types.get(ext, 0) + 1
+                for snapshot_file in snapshot_files:
+                    if snapshot_file.extension:
+                        file_types[snapshot_file.extension] = file_types.get(snapshot_file.extension, 0) + 1
 
                 project_info = {
                     "project_name": project_name,
@@ -1249,8 +1129,8 @@ class CodebaseTools:
             return {
                 "tree": tree_str,
                 "root_path": root_path,
-                "file_count": self._count_files(root_entry),
-                "dir_count": self._count_dirs(root_entry),
+                "file_count": parser.file_count,
+                "dir_count": parser.dir_count + 1,
             }
         except Exception as e:
             self.logger.error(f"Error generating directory tree: {e}", exc_info=True)
@@ -1297,34 +1177,6 @@ class CodebaseTools:
                     child, new_prefix, is_last_child, lines, current_depth + 1, max_depth
                 )
 
-    def _count_files(self, entry: DirectoryEntry) -> int:
-        """Count the number of files in a directory tree.
-
-        Args:
-            entry (DirectoryEntry): The root DirectoryEntry.
-
-        Returns:
-            int: The number of files in the tree.
-        """
-        if entry.is_file():
-            return 1
-
-        return sum(self._count_files(child) for child in entry.children)
-
-    def _count_dirs(self, entry: DirectoryEntry) -> int:
-        """Count the number of directories in a directory tree.
-
-        Args:
-            entry (DirectoryEntry): The root DirectoryEntry.
-
-        Returns:
-            int: The number of directories in the tree.
-        """
-        if entry.is_file():
-            return 0
-
-        return 1 + sum(self._count_dirs(child) for child in entry.children)
-
     def find_functions(self, pattern: str, file_pattern: str = None) -> List[Dict[str, Any]]:
         """Find function definitions matching a pattern.
 
@@ -1347,7 +1199,6 @@ class CodebaseTools:
                 return [{"error": f"Invalid regex pattern: {str(e)}"}]
 
             results = []
-            root_path = self.indexer.root_path
             language_info = self.get_project_languages()
             python_extensions = ['.py']
 
@@ -1355,46 +1206,38 @@ class CodebaseTools:
                 if "Python" in language_info["extensions"]:
                     python_extensions = language_info["extensions"]["Python"]
 
-            for root, _, files in os.walk(root_path):
-                for filename in files:
-                    _, ext = os.path.splitext(filename)
-                    if ext.lower() not in python_extensions:
-                        continue
-
-                    if file_pattern and not fnmatch.fnmatch(filename, file_pattern):
-                        continue
+            for snapshot_file in self._snapshot_files(file_pattern, python_extensions):
+                file_path = snapshot_file.path
+                rel_path = snapshot_file.rel_path
 
-                    file_path = os.path.join(root, filename)
-                    rel_path = os.path.relpath(file_path, root_path)
+                try:
+                    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                        file_content = f.read()
 
                     try:
-                        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                            file_content = f.read()
-
-                        try:
-                            tree = ast.parse(file_content)
+                        tree = ast.parse(file_content)
 
-                            for node in ast.walk(tree):
-                                if isinstance(node, ast.FunctionDef) and regex.search(node.name):
-                                    args = []
-                                    for arg in node.args.args:
-                                        args.append(arg.arg)
+                        for node in ast.walk(tree):
+                            if isinstance(node, ast.FunctionDef) and regex.search(node.name):
+                                args = []
+                                for arg in node.args.args:
+                                    args.append(arg.arg)
 
-                                    docstring = ast.get_docstring(node)
+                                docstring = ast.get_docstring(node)
 
-                                    results.append(
-                                        {
-                                            "file_path": rel_path,
-                                            "line_number": node.lineno,
-                                            "function_name": node.name,
-                                            "arguments": args,
-                                            "docstring": docstring,
-                                        }
-                                    )
-                        except SyntaxError:
-                            self.logger.debug(f"Syntax error in {file_path}, skipping")
-                    except (IOError, UnicodeDecodeError) as e:
-                        self.logger.debug(f"Could not read file {file_path}: {e}")
+                                results.append(
+                                    {
+                                        "file_path": rel_path,
+                                        "line_number": node.lineno,
+                                        "function_name": node.name,
+                                        "arguments": args,
+                                        "docstring": docstring,
+                                    }
+                                )
+                    except SyntaxError:
+                        self.logger.debug(f"Syntax error in {file_path}, skipping")
+                except (IOError, UnicodeDecodeError) as e:
+                    self.logger.debug(f"Could not read file {file_path}: {e}")
 
             return results
         except Exception as e:
@@ -1424,7 +1267,6 @@ class CodebaseTools:
                 return [{"error": f"Invalid regex pattern: {str(e)}"}]
 
             results = []
-            root_path = self.indexer.root_path
 
             language_info = self.get_project_languages()
             python_extensions = ['.py']
@@ -1433,61 +1275,73 @@ class CodebaseTools:
                 if "Python" in language_info["extensions"]:
                     python_extensions = language_info["extensions"]["Python"]
 
-            for root, _, files in os.walk(root_path):
-                for filename in files:
-                    _, ext = os.path.splitext(filename)
-                    if ext.lower() not in python_extensions:
-                        continue
-
-                    if file_pattern and not fnmatch.fnmatch(filename, file_pattern):
-                        continue
+            for snapshot_file in self._snapshot_files(file_pattern, python_extensions):
+                file_path = snapshot_file.path
+                rel_path = snapshot_file.rel_path
 
-                    file_path = os.path.join(root, filename)
-                    rel_path = os.path.relpath(file_path, root_path)
+                try:
+                    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                        file_content = f.read()
 
                     try:
-                        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                            file_content = f.read()
+                        tree = ast.parse(file_content)
 
-                        try:
-                            tree = ast.parse(file_content)
+                        for node in ast.walk(tree):
+                            if isinstance(node, ast.ClassDef) and regex.search(node.name):
+                                bases = []
+                                for base in node.bases:
+                                    if isinstance(base, ast.Name):
+                                        bases.append(base.id)
+                                    elif isinstance(base, ast.Attribute):
+                                        bases.append(f"{base.value.id}.{base.attr}")
 
-                            for node in ast.walk(tree):
-                                if isinstance(node, ast.ClassDef) and regex.search(node.name):
-                                    bases = []
-                                    for base in node.bases:
-                                        if isinstance(base, ast.Name):
-                                            bases.append(base.id)
-                                        elif isinstance(base, ast.Attribute):
-                                            bases.append(f"{base.value.id}.{base.attr}")
+                                docstring = ast.get_docstring(node)
 
-                                    docstring = ast.get_docstring(node)
+                                methods = []
+                                for child_node in ast.iter_child_nodes(node):
+                                    if isinstance(child_node, ast.FunctionDef):
+                                        methods.append(child_node.name)
 
-                                    methods = []
-                                    for child_node in ast.iter_child_nodes(node):
-                                        if isinstance(child_node, ast.FunctionDef):
-                                            methods.append(child_node.name)
-
-                                    results.append(
-                                        {
-                                            "file_path": rel_path,
-                                            "line_number": node.lineno,
-                                            "class_name": node.name,
-                                            "base_classes": bases,
-                                            "methods": methods,
-                                            "docstring": docstring,
-                                        }
-                                    )
-                        except SyntaxError:
-                            self.logger.debug(f"Syntax error in {file_path}, skipping")
-                    except (IOError, UnicodeDecodeError) as e:
-                        self.logger.debug(f"Could not read file {file_path}: {e}")
+                                results.append(
+                                    {
+                                        "file_path": rel_path,
+                                        "line_number": node.lineno,
+                                        "class_name": node.name,
+                                        "base_classes": bases,
+                                        "methods": methods,
+                                        "docstring": docstring,
+                                    }
+                                )
+                    except SyntaxError:
+                        self.logger.debug(f"Syntax error in {file_path}, skipping")
+                except (IOError, UnicodeDecodeError) as e:
+                    self.logger.debug(f"Could not read file {file_path}: {e}")
 
             return results
         except Exception as e:
             self.logger.error(f"Error in find_classes: {e}", exc_info=True)
             return [{"error": f"Error finding classes: {str(e)}"}]
 
+    def _snapshot_files(
+        self, file_pattern: Optional[str] = None, extensions: Optional[Iterable[str]] = None
+    ) -> List[SnapshotFile]:
+        """Get the indexable text files from the indexer's shared file snapshot.
+
+        Args:
+            file_pattern (str, optional): Glob the file name must match. Defaults to None.
+            extensions (Iterable[str], optional): Lower-case extensions with the dot to keep. Defaults to None.
+
+        Returns:
+            List[SnapshotFile]: Matching files sorted by relative path.
+        """
+        allowed_extensions = {ext.lower() for ext in extensions} if extensions is not None else None
+        return [
+            snapshot_file
+            for snapshot_file in self.indexer.file_snapshot.files()
+            if (allowed_extensions is None or snapshot_file.extension in allowed_extensions)
+            and (not file_pattern or fnmatch.fnmatch(snapshot_file.name, file_pattern))
+        ]
+
     def _resolve_path(self, path: str) -> Optional[str]:
         """Resolve a user-provided path to a valid path in the indexed codebase.
 
@@ -1995,7 +1849,6 @@ class CodebaseTools:
                 return [{"error": f"Invalid regex pattern: {str(e)}"}]
 
             results = []
-            root_path = self.indexer.root_path
 
             language_info = self.get_project_languages()
             language_extensions = {}
@@ -2039,45 +1892,33 @@ class CodebaseTools:
                 if ext not in extension_to_language:
                     extension_to_language[ext] = lang
 
-            for root, _, files in os.walk(root_path):
-                for filename in files:
-                    _, ext = os.path.splitext(filename)
-                    ext = ext.lower()
-
-                    if ext not in normalized_extensions:
-                        continue
-
-                    file_path = os.path.join(root, filename)
-                    rel_path = os.path.relpath(file_path, root_path)
-
-                    try:
-                        if not self.indexer._is_text_file(file_path):
-                            continue
-
-                        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                            for i, line in enumerate(f, 1):
-                                if regex.search(line):
-                                    language = extension_to_language.get(ext, "Unknown")
-
-                                    results.append({
-                                        "file_path": rel_path,
-                                        "line_number": i,
-                                        "line_text": line.strip(),
-                                        "file_extension": ext,
-                                        "language": language
-                                    })
+            for snapshot_file in self._snapshot_files(extensions=normalized_extensions):
+                file_path = snapshot_file.path
+                rel_path = snapshot_file.rel_path
+                ext = snapshot_file.extension
 
-                                    if len(results) >= max_results:
-                                        break
+                try:
+                    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                        for i, line in enumerate(f, 1):
+                            if regex.search(line):
+                                language = extension_to_language.get(ext, "Unknown")
+
+                                results.append({
+                                    "file_path": rel_path,
+                                    "line_number": i,
+                                    "line_text": line.strip(),
+                                    "file_extension": ext,
+                                    "language": language
+                                })
 
-                        if len(results) >= max_results:
-                            break
+                                if len(results) >= max_results:
+                                    break
 
-                    except (IOError, UnicodeDecodeError) as e:
-                        self.logger.debug(f"Could not read file {file_path}: {e}")
+                    if len(results) >= max_results:
+                        break
 
-                if len(results) >= max_results:
-                    break
+                except (IOError, UnicodeDecodeError) as e:
+                    self.logger.debug(f"Could not read file {file_path}: {e}")
 
             if results:
                 extension_counts = {}
@@ -2135,34 +1976,26 @@ class CodebaseTools:
             ]
 
             results = []
-            root_path = self.indexer.root_path
-
-            for root, _, files in os.walk(root_path):
-                for filename in files:
-                    if not filename.endswith(".py"):
-                        continue
-
-                    if file_pattern and not fnmatch.fnmatch(filename, file_pattern):
-                        continue
 
-                    file_path = os.path.join(root, filename)
-                    rel_path = os.path.relpath(file_path, root_path)
+            for snapshot_file in self._snapshot_files(file_pattern, (".py",)):
+                file_path = snapshot_file.path
+                rel_path = snapshot_file.rel_path
 
-                    try:
-                        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                            for i, line in enumerate(f, 1):
-                                for pattern in import_patterns:
-                                    if re.search(pattern, line):
-                                        results.append(
-                                            {
-                                                "file_path": rel_path,
-                                                "line_number": i,
-                                                "import_statement": line.strip(),
-                                            }
-                                        )
-                                        break
-                    except (IOError, UnicodeDecodeError) as e:
-                        self.logger.debug(f"Could not read file {file_path}: {e}")
+                try:
+                    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                        for i, line in enumerate(f, 1):
+                            for pattern in import_patterns:
+                                if re.search(pattern, line):
+                                    results.append(
+                                        {
+                                            "file_path": rel_path,
+                                            "line_number": i,
+                                            "import_statement": line.strip(),
+                                        }
+                                    )
+                                    break
+                except (IOError, UnicodeDecodeError) as e:
+                    self.logger.debug(f"Could not read file {file_path}: {e}")
 
             return results
         except Exception as e:
@@ -2423,32 +2256,24 @@ class CodebaseTools:
                 return [{"error": f"Invalid regex pattern: {str(e)}"}]
 
             results = []
-            root_path = self.indexer.root_path
-
-            for root, _, files in os.walk(root_path):
-                for filename in files:
-                    if not filename.endswith(".py"):
-                        continue
-
-                    if file_pattern and not fnmatch.fnmatch(filename, file_pattern):
-                        continue
 
-                    file_path = os.path.join(root, filename)
-                    rel_path = os.path.relpath(file_path, root_path)
+            for snapshot_file in self._snapshot_files(file_pattern, (".py",)):
+                file_path = snapshot_file.path
+                rel_path = snapshot_file.rel_path
 
-                    try:
-                        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                            for i, line in enumerate(f, 1):
-                                if regex.search(line):
-                                    results.append(
-                                        {
-                                            "file_path": rel_path,
-                                            "line_number": i,
-                                            "line_text": line.strip(),
-                                        }
-                                    )
-                    except (IOError, UnicodeDecodeError) as e:
-                        self.logger.debug(f"Could not read file {file_path}: {e}")
+                try:
+                    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                        for i, line in enumerate(f, 1):
+                            if regex.search(line):
+                                results.append(
+                                    {
+                                        "file_path": rel_path,
+                                        "line_number": i,
+                                        "line_text": line.strip(),
+                                    }
+                                )
+                except (IOError, UnicodeDecodeError) as e:
+                    self.logger.debug(f"Could not read file {file_path}: {e}")
 
             return results
         except Exception as e:
@@ -2572,7 +2397,7 @@ class CodebaseTools:
             return {"error": f"Error analyzing code: {str(e)}"}
 
     def get_file_description(self, file_path: str) -> str:
-        """Get the description of a file from the descriptions directory.
+        """Get the description of a file from the index store.
 
         Args:
             file_path (str): Path to the file (can be imprecise, partial, or full path).
@@ -2591,31 +2416,20 @@ class CodebaseTools:
             if not resolved_path:
                 return f"Error: File not found: {file_path}"
 
-            description_file_name = resolved_path.replace('/', '_').replace('\\', '_') + '.txt'
-            descriptions_dir = os.path.join(self.indexer.index_dir, "descriptions")
-
-            if not os.path.exists(descriptions_dir):
-                return f"Error: Descriptions directory does not exist: {descriptions_dir}"
-
-            description_file_path = os.path.join(descriptions_dir, description_file_name)
-
-            if not os.path.exists(description_file_path):
+            record = self.indexer.get_file_record(
+                os.path.normpath(os.path.join(self.indexer.root_path, resolved_path))
+            )
+            if not record:
                 return f"No description found for file: {resolved_path}"
 
-            try:
-                with open(description_file_path, 'r', encoding='utf-8') as f:
-                    description = f.read()
-                return description
-            except Exception as e:
-                self.logger.error(f"Error reading description file {description_file_path}: {e}")
-                return f"Error reading description file: {str(e)}"
+            return record.get("description", "")
 
         except Exception as e:
             self.logger.error(f"Error in get_file_description: {e}", exc_info=True)
             return f"Error getting file description: {str(e)}"
 
     def get_file_metadata(self, file_path: str) -> Dict[str, Any]:
-        """Get the metadata of a file from the metadata directory.
+        """Get the metadata of a file from the index store.
 
         Args:
             file_path (str): Path to the file (can be imprecise, partial, or full path).
@@ -2634,24 +2448,16 @@ class CodebaseTools:
             if not resolved_path:
                 return {"error": f"File not found: {file_path}"}
 
-            metadata_file_name = resolved_path.replace('/', '_').replace('\\', '_') + '.json'
-            metadata_dir = os.path.join(self.indexer.index_dir, "metadata")
-
-            if not os.path.exists(metadata_dir):
-                return {"error": f"Metadata directory does not exist: {metadata_dir}"}
-
-            metadata_file_path = os.path.join(metadata_dir, metadata_file_name)
-
-            if not os.path.exists(metadata_file_path):
+            record = self.indexer.get_file_record(
+                os.path.normpath(os.path.join(self.indexer.root_path, resolved_path))
+            )
+            if not record:
                 return {"error": f"No metadata found for file: {resolved_path}"}
 
-            try:
-                with open(metadata_file_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                return metadata
-            except Exception as e:
-                self.logger.error(f"Error reading metadata file {metadata_file_path}: {e}")
-                return {"error": f"Error reading metadata file: {str(e)}"}
+            return {
+                key: record.get(key)
+                for key in ("name", "path", "hash", "size", "extension", "modified_time", "description", "signatures")
+            }
 
         except Exception as e:
             self.logger.error(f"Error in get_file_metadata: {e}", exc_info=True)
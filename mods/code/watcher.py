@@ -0,0 +1,334 @@
+"""Filesystem watch mode for continuous incremental indexing.
+
+An IndexWatcher keeps an index fresh without rescanning the tree. File events
+come from watchdog (inotify, FSEvents or ReadDirectoryChangesW) when it is
+installed, otherwise from polling file stats. Events are debounced, filtered
+with the same .gitignore rules as DirectoryParser, and handed to
+FileIndexer.apply_file_changes(), which indexes the changed files one by one
+and updates the indexer's SimilaritySearch in place.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from .directory import DirectoryParser
+from .indexer import FileIndexer
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger("TaskHeroAI.IndexWatcher")
+
+WATCH_BACKENDS = ("auto", "watchdog", "polling")
+
+try:
+    WATCH_DEBOUNCE_MS = int(os.getenv("INDEX_WATCH_DEBOUNCE_MS", "500"))
+except ValueError:
+    WATCH_DEBOUNCE_MS = 500
+    logger.warning(f"Invalid INDEX_WATCH_DEBOUNCE_MS in .env, using default: {WATCH_DEBOUNCE_MS}")
+
+try:
+    WATCH_POLL_SECONDS = float(os.getenv("INDEX_WATCH_POLL_SECONDS", "2"))
+except ValueError:
+    WATCH_POLL_SECONDS = 2.0
+    logger.warning(f"Invalid INDEX_WATCH_POLL_SECONDS in .env, using default: {WATCH_POLL_SECONDS}")
+
+WATCH_BACKEND = os.getenv("INDEX_WATCH_BACKEND", "auto").strip().lower()
+if WATCH_BACKEND not in WATCH_BACKENDS:
+    logger.warning("Invalid INDEX_WATCH_BACKEND in .env, using default: auto")
+    WATCH_BACKEND = "auto"
+
+# A file that keeps changing is still indexed after this many debounce periods
+MAX_DEBOUNCE_PERIODS = 10
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Forwards watchdog events to an IndexWatcher."""
+
+    def __init__(self, watcher: "IndexWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event: Any) -> None:
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        self.watcher.notify(os.fsdecode(event.src_path))
+        dest_path = getattr(event, "dest_path", None)
+        if dest_path:
+            self.watcher.notify(os.fsdecode(dest_path))
+
+
+class IndexWatcher:
+    """Watches an indexed directory and re-indexes changed files as they change.
+
+    Usage:
+        watcher = IndexWatcher(indexer)
+        watcher.start()
+        ...
+        watcher.stop()
+    """
+
+    def __init__(self, indexer: FileIndexer, backend: Optional[str] = None,
+                 debounce_ms: Optional[int] = None, poll_seconds: Optional[float] = None):
+        """Initialize the watcher. Nothing is watched until start() is called.
+
+        Args:
+            indexer (FileIndexer): Indexer of the watched directory.
+            backend (Optional[str]): "watchdog", "polling" or "auto" (watchdog when installed).
+                If None, uses INDEX_WATCH_BACKEND from .env.
+            debounce_ms (Optional[int]): Quiet period before changes are indexed. If None,
+                uses INDEX_WATCH_DEBOUNCE_MS from .env.
+            poll_seconds (Optional[float]): Interval of the polling backend. If None, uses
+                INDEX_WATCH_POLL_SECONDS from .env.
+        """
+        self.indexer: FileIndexer = indexer
+        self.root_path: str = indexer.root_path
+        backend = (backend or WATCH_BACKEND).lower()
+        if backend not in WATCH_BACKENDS:
+            raise ValueError(f"Unsupported watch backend: {backend}")
+        if backend == "watchdog" and not WATCHDOG_AVAILABLE:
+            logger.warning("watchdog is not installed, falling back to polling")
+        self.backend: str = "watchdog" if backend != "polling" and WATCHDOG_AVAILABLE else "polling"
+        self.debounce: float = max(0, WATCH_DEBOUNCE_MS if debounce_ms is None else debounce_ms) / 1000.0
+        self.poll_seconds: float = max(0.1, WATCH_POLL_SECONDS if poll_seconds is None else poll_seconds)
+
+        self.events: int = 0
+        self.flushes: int = 0
+        self.files_indexed: int = 0
+        self.files_removed: int = 0
+        self.last_flush: Optional[float] = None
+
+        self._index_dir: str = os.path.abspath(indexer.index_dir)
+        self._parser: DirectoryParser = self._create_parser()
+        self._pending: Set[str] = set()
+        self._first_event: float = 0.0
+        self._last_event: float = 0.0
+        self._condition = threading.Condition()
+        self._stopping: bool = False
+        self._observer: Any = None
+        self._threads: list = []
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the watcher has been started and not stopped."""
+        return bool(self._threads) and not self._stopping
+
+    def start(self) -> None:
+        """Start watching in background threads."""
+        if self.is_running:
+            return
+        self._stopping = False
+        if self.backend == "watchdog":
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.root_path, recursive=True)
+            self._observer.start()
+        else:
+            self._snapshot = self._scan()
+            self._threads.append(threading.Thread(target=self._poll_loop, name="index-watch-poll", daemon=True))
+        self._threads.append(threading.Thread(target=self._flush_loop, name="index-watch", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Watching {self.root_path} for changes ({self.backend})")
+
+    def stop(self, flush: bool = True) -> None:
+        """Stop watching.
+
+        Args:
+            flush (bool): Index changes that are still waiting for the debounce period.
+        """
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if flush:
+            self.flush()
+        logger.info(f"Stopped watching {self.root_path}")
+
+    def __enter__(self) -> "IndexWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def notify(self, path: str) -> None:
+        """Record that a path changed. Called by the backends.
+
+        Args:
+            path (str): Absolute path of a created, modified, moved or deleted file or directory.
+        """
+        path = os.path.abspath(path)
+        if path == self._index_dir or path.startswith(self._index_dir + os.sep):
+            return
+        with self._condition:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_event = now
+            self._last_event = now
+            self._pending.add(path)
+            self.events += 1
+            self._condition.notify_all()
+
+    def flush(self) -> Dict[str, int]:
+        """Index everything that changed so far, without waiting for the debounce period.
+
+        Returns:
+            Dict[str, int]: Counts returned by FileIndexer.apply_file_changes().
+        """
+        with self._condition:
+            paths, self._pending = self._pending, set()
+        if not paths:
+            return {"indexed": 0, "removed": 0, "skipped": 0, "failed": 0}
+
+        changed, deleted = self._classify(paths)
+        counts = self.indexer.apply_file_changes(changed, deleted)
+        self.flushes += 1
+        self.files_indexed += counts["indexed"]
+        self.files_removed += counts["removed"]
+        self.last_flush = time.time()
+        if counts["indexed"] or counts["removed"] or counts["failed"]:
+            logger.info(
+                f"Watch: indexed {counts['indexed']}, removed {counts['removed']}, "
+                f"failed {counts['failed']} of {len(paths)} changed paths"
+            )
+        return counts
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get watcher statistics.
+
+        Returns:
+            Dict[str, Any]: Dictionary with watcher metrics.
+        """
+        return {
+            "root_path": self.root_path,
+            "backend": self.backend,
+            "running": self.is_running,
+            "pending": len(self._pending),
+            "events": self.events,
+            "flushes": self.flushes,
+            "files_indexed": self.files_indexed,
+            "files_removed": self.files_removed,
+            "last_flush": self.last_flush,
+        }
+
+    def _create_parser(self) -> DirectoryParser:
+        """Create a DirectoryParser for its .gitignore rules (it never parses the tree here)."""
+        return DirectoryParser(self.root_path, gitignore_path=self.indexer.gitignore_path,
+                               parallel=False, hash_files=False)
+
+    def _classify(self, paths: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Turn changed paths into files to index and indexed files to remove.
+
+        Directories are expanded: a new or moved-in directory contributes its files,
+        and a deleted or moved-away one removes every indexed file below it.
+
+        Args:
+            paths (Iterable[str]): Paths reported since the last flush.
+
+        Returns:
+            Tuple[Set[str], Set[str]]: Changed files and deleted files.
+        """
+        changed: Set[str] = set()
+        deleted: Set[str] = set()
+        for path in paths:
+            if path == self.indexer.gitignore_path or os.path.basename(path) == ".gitignore":
+                self._parser = self._create_parser()
+            if os.path.isfile(path):
+                if not self._parser.is_path_ignored(path):
+                    changed.add(path)
+            elif os.path.isdir(path):
+                if not self._parser.is_path_ignored(path, True):
+                    changed.update(self._scan(path))
+                prefix = path + os.sep
+                deleted.update(p for p in self.indexer.metadata_cache
+                               if p.startswith(prefix) and not os.path.exists(p))
+            else:
+                deleted.add(path)
+                prefix = path + os.sep
+                deleted.update(p for p in self.indexer.metadata_cache if p.startswith(prefix))
+        return changed, deleted
+
+    def _scan(self, directory: Optional[str] = None) -> Dict[str, Tuple[int, int]]:
+        """Stat every file below a directory that the .gitignore rules let through.
+
+        Args:
+            directory (Optional[str]): Directory to scan. Defaults to the watched root.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: (mtime in ns, size) per file path.
+        """
+        stats: Dict[str, Tuple[int, int]] = {}
+        stack = [directory or self.root_path]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for dir_entry in it:
+                        try:
+                            is_dir = dir_entry.is_dir(follow_symlinks=False)
+                            if dir_entry.path == self._index_dir or self._parser._is_ignored(dir_entry.path, is_dir):
+                                continue
+                            if is_dir:
+                                stack.append(dir_entry.path)
+                            elif dir_entry.is_file():
+                                stat = dir_entry.stat()
+                                stats[dir_entry.path] = (stat.st_mtime_ns, stat.st_size)
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.debug(f"Cannot list {current}: {e}")
+        return stats
+
+    def _poll_loop(self) -> None:
+        while True:
+            with self._condition:
+                if self._condition.wait_for(lambda: self._stopping, self.poll_seconds):
+                    return
+            try:
+                snapshot = self._scan()
+            except Exception as e:
+                logger.error(f"Error polling {self.root_path}: {e}", exc_info=True)
+                continue
+            previous, self._snapshot = self._snapshot, snapshot
+            for path, stat in snapshot.items():
+                if previous.get(path) != stat:
+                    self.notify(path)
+            for path in previous.keys() - snapshot.keys():
+                self.notify(path)
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    if self._pending:
+                        now = time.monotonic()
+                        due = min(self._last_event + self.debounce,
+                                  self._first_event + self.debounce * MAX_DEBOUNCE_PERIODS)
+                        if now >= due and not self.indexer.is_indexing:
+                            break
+                        self._condition.wait(max(due - now, self.debounce, 0.05))
+                    else:
+                        self._condition.wait()
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error indexing changes in {self.root_path}: {e}", exc_info=True)
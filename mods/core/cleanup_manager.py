@@ -88,10 +88,9 @@ class ProjectCleanupManager(BaseManager):
             Number of indexed files
         """
         try:
-            metadata_dir = os.path.join(index_dir, "metadata")
-            if os.path.exists(metadata_dir):
-                return len([f for f in os.listdir(metadata_dir) if f.endswith(".json")])
-            return 0
+            from ..code.index_store import count_indexed_files
+
+            return count_indexed_files(index_dir)
         except Exception as e:
             self.logger.error(f"Error counting indexed files in {index_dir}: {e}")
             return 0
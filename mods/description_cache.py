@@ -0,0 +1,270 @@
+"""Persistent cache of AI-generated file descriptions.
+
+Descriptions are memoized by (content hash, description provider and model,
+prompt version) in an SQLite file next to the embedding cache, so a file whose
+contents were described before - after a revert, a branch switch or a copy -
+does not cost another LLM round-trip.
+
+Optionally, a Python or C-family file's description is also stored under a hash
+of the file with comments and insignificant whitespace removed, so that edits
+touching only those reuse the previous description.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import tokenize
+from typing import Any, Dict, List, Optional, Sequence
+
+from .embedding_cache import default_cache_dir
+
+logger = logging.getLogger("TaskHeroAI.DescriptionCache")
+
+CACHE_FILENAME = "descriptions.sqlite3"
+
+# C-family languages whose string literals and comments a simple scanner can
+# delimit; languages with nested block comments, raw or verbatim strings, JSX
+# text or significant indentation are only ever hashed exactly.
+SLASH_COMMENT_EXTENSIONS = {
+    ".js", ".mjs", ".cjs", ".ts", ".java", ".c", ".h", ".cpp", ".hpp", ".cc", ".go", ".m", ".mm",
+}
+
+_C_LIKE_TOKEN = re.compile(
+    r"""
+    (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`)
+    |(?P<comment>//[^\n]*|/\*.*?\*/)
+    |(?P<space>\s+)
+    |(?P<code>[^"'`/\s]+|/)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_PYTHON_LAYOUT_TOKENS = {
+    tokenize.NEWLINE: "<NEWLINE>",
+    tokenize.INDENT: "<INDENT>",
+    tokenize.DEDENT: "<DEDENT>",
+}
+
+
+def _normalize_python(content: str) -> Optional[str]:
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(content).readline)
+        return " ".join(
+            _PYTHON_LAYOUT_TOKENS.get(token.type, token.string) for token in tokens
+            if token.type not in (tokenize.COMMENT, tokenize.NL, tokenize.ENDMARKER)
+        )
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+
+
+def _normalize_c_like(content: str) -> Optional[str]:
+    parts: List[str] = []
+    pending_space = ""
+    position = 0
+    while position < len(content):
+        match = _C_LIKE_TOKEN.match(content, position)
+        if match is None:
+            # Unterminated string literal - the scanner cannot tell code from text
+            return None
+        text = match.group()
+        if match.lastgroup in ("comment", "space"):
+            # A line break can end a statement, so keep it distinct from a space
+            pending_space = "\n" if pending_space == "\n" or "\n" in text else " "
+        else:
+            if pending_space and parts:
+                parts.append(pending_space)
+            pending_space = ""
+            parts.append(text)
+        position = match.end()
+    return "".join(parts)
+
+
+def normalize_source(content: str, extension: str) -> Optional[str]:
+    """Strip comments and insignificant whitespace so that trivia-only edits hash the same.
+
+    Python is tokenized, keeping line and indentation structure. C-family
+    sources are scanned so that string literals are kept verbatim and line
+    breaks stay distinct from spaces. Other file types are not normalized.
+
+    Args:
+        content (str): File content.
+        extension (str): File extension including the dot.
+
+    Returns:
+        Optional[str]: Normalized content, or None if the file cannot be normalized safely.
+    """
+    extension = extension.lower()
+    if extension in (".py", ".pyw"):
+        return _normalize_python(content)
+    if extension in SLASH_COMMENT_EXTENSIONS:
+        return _normalize_c_like(content)
+    return None
+
+
+def make_description_keys(content: str, extension: str, provider: str, model: str,
+                          prompt_version: int, ignore_trivia: bool = False) -> List[str]:
+    """Build the cache keys of a file description, most specific first.
+
+    Args:
+        content (str): File content.
+        extension (str): File extension including the dot.
+        provider (str): Description provider name.
+        model (str): Description model name.
+        prompt_version (int): Version of the description prompt.
+        ignore_trivia (bool): Also return a key that ignores comments and whitespace,
+            for file types :func:`normalize_source` supports.
+
+    Returns:
+        List[str]: Hex SHA-256 keys.
+    """
+    prefix = f"{provider}\0{model}\0{prompt_version}\0"
+    keys = [hashlib.sha256((prefix + "exact\0" + content).encode("utf-8", errors="surrogatepass")).hexdigest()]
+    normalized = normalize_source(content, extension) if ignore_trivia else None
+    if normalized is not None:
+        keys.append(hashlib.sha256((prefix + "trivia\0" + normalized).encode("utf-8", errors="surrogatepass")).hexdigest())
+    return keys
+
+
+class DescriptionCache:
+    """Size-bounded LRU store of file descriptions backed by SQLite."""
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        """Open (or create) the cache file.
+
+        Args:
+            path (Optional[str]): Path of the SQLite file. Defaults to the user cache directory.
+            max_entries (Optional[int]): Maximum number of descriptions. If None, uses
+                DESCRIPTION_CACHE_MAX_ENTRIES from .env.
+        """
+        self.path: str = path or os.path.join(default_cache_dir(), CACHE_FILENAME)
+        if max_entries is None:
+            try:
+                max_entries = int(os.getenv("DESCRIPTION_CACHE_MAX_ENTRIES", "100000"))
+            except ValueError:
+                max_entries = 100000
+                logger.warning(f"Invalid DESCRIPTION_CACHE_MAX_ENTRIES in .env, using default: {max_entries}")
+        self.max_entries: int = max_entries
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.writes: int = 0
+
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS descriptions ("
+            "key TEXT PRIMARY KEY, description TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS descriptions_last_used ON descriptions (last_used)")
+        self._conn.commit()
+
+    def get(self, keys: Sequence[str]) -> Optional[str]:
+        """Return the description stored under the first matching key.
+
+        Args:
+            keys (Sequence[str]): Keys from :func:`make_description_keys`.
+
+        Returns:
+            Optional[str]: The cached description, or None on a miss.
+        """
+        with self._lock:
+            try:
+                for key in keys:
+                    row = self._conn.execute(
+                        "SELECT description FROM descriptions WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row:
+                        self._conn.execute(
+                            "UPDATE descriptions SET last_used = ? WHERE key = ?", (time.time(), key)
+                        )
+                        self._conn.commit()
+                        self.hits += 1
+                        return row[0]
+            except sqlite3.Error as e:
+                logger.warning(f"Error reading description cache {self.path}: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, keys: Sequence[str], description: str) -> None:
+        """Store a description under every given key.
+
+        Args:
+            keys (Sequence[str]): Keys from :func:`make_description_keys`.
+            description (str): Generated description.
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO descriptions (key, description, last_used) VALUES (?, ?, ?)",
+                    [(key, description, now) for key in keys],
+                )
+                self.writes += 1
+                if self.writes % 100 == 0:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Error writing description cache {self.path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics of the cache.
+
+        Returns:
+            Dict[str, Any]: Dictionary with cache metrics.
+        """
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / max(1, self.hits + self.misses) * 100,
+            "writes": self.writes,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM descriptions").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM descriptions WHERE key IN "
+                "(SELECT key FROM descriptions ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            logger.info(f"Evicted {excess} descriptions from {self.path}")
+
+
+_shared_cache: Optional[DescriptionCache] = None
+_shared_cache_failed: bool = False
+_shared_cache_lock = threading.Lock()
+
+
+def get_description_cache() -> Optional[DescriptionCache]:
+    """Return the process-wide description cache, opening it on first use.
+
+    Returns:
+        Optional[DescriptionCache]: The cache, or None if it is disabled with
+        DESCRIPTION_CACHE=FALSE or cannot be opened.
+    """
+    global _shared_cache, _shared_cache_failed
+    if _shared_cache_failed or os.getenv("DESCRIPTION_CACHE", "TRUE").upper() != "TRUE":
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = DescriptionCache()
+                logger.info(f"Using description cache at {_shared_cache.path}")
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Description cache unavailable: {e}")
+                _shared_cache_failed = True
+                return None
+        return _shared_cache
@@ -0,0 +1,260 @@
+"""Persistent, content-addressed embedding cache.
+
+Embeddings are stored in a single SQLite file under the user cache directory
+and keyed by the SHA-256 of provider, model, dimensions and text. The cache is
+therefore shared by every project and survives restarts, so re-indexing after
+a branch switch or indexing a fork of an indexed repository only embeds text
+that has never been seen before.
+
+The file is bounded in size: once it grows past the configured limit, the
+least recently used entries are evicted.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("TaskHeroAI.EmbeddingCache")
+
+CACHE_FILENAME = "embeddings.sqlite3"
+EVICT_TARGET_RATIO = 0.9
+
+
+def default_cache_dir() -> str:
+    """Return the per-user cache directory shared by all projects.
+
+    Returns:
+        str: ``EMBEDDING_CACHE_DIR`` if set, otherwise the platform cache directory.
+    """
+    configured = os.getenv("EMBEDDING_CACHE_DIR")
+    if configured:
+        return os.path.expanduser(configured)
+    if os.name == "nt":
+        base = os.getenv("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return os.path.join(base, "taskheroai")
+
+
+def make_cache_key(provider: str, model: str, dims: int, text: str) -> str:
+    """Build the content address of an embedding.
+
+    Args:
+        provider (str): Embedding provider name.
+        model (str): Embedding model name.
+        dims (int): Expected embedding dimensions.
+        text (str): Embedded text.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{provider}\0{model}\0{dims}\0".encode("utf-8"))
+    digest.update(text.encode("utf-8", errors="surrogatepass"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Size-bounded LRU key-value store of embedding vectors backed by SQLite."""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """Open (or create) the cache file.
+
+        Args:
+            path (Optional[str]): Path of the SQLite file. Defaults to the user cache directory.
+            max_bytes (Optional[int]): Size limit of the stored vectors. If None, uses
+                EMBEDDING_PERSISTENT_CACHE_MB from .env.
+        """
+        self.path: str = path or os.path.join(default_cache_dir(), CACHE_FILENAME)
+        if max_bytes is None:
+            try:
+                max_bytes = int(os.getenv("EMBEDDING_PERSISTENT_CACHE_MB", "1024")) * 1024 * 1024
+            except ValueError:
+                max_bytes = 1024 * 1024 * 1024
+                logger.warning(f"Invalid EMBEDDING_PERSISTENT_CACHE_MB in .env, using default: {max_bytes}")
+        self.max_bytes: int = max_bytes
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.writes: int = 0
+        self.evictions: int = 0
+
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, dims INTEGER NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._total_bytes: int = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Look up several embeddings and mark the hits as recently used.
+
+        Args:
+            keys (Sequence[str]): Content addresses from :func:`make_cache_key`.
+
+        Returns:
+            Dict[str, List[float]]: Embeddings of the keys that were found.
+        """
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            try:
+                # Stay well below SQLite's host parameter limit
+                for start in range(0, len(unique_keys), 500):
+                    block = unique_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(block))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", block
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+                if found:
+                    now = time.time()
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Error reading embedding cache {self.path}: {e}")
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items: Sequence[Tuple[str, Sequence[float]]]) -> None:
+        """Store embeddings, evicting the least recently used ones if the cache is full.
+
+        All-zero vectors are skipped: the providers return them on failure.
+
+        Args:
+            items (Sequence[Tuple[str, Sequence[float]]]): (key, embedding) pairs.
+        """
+        now = time.time()
+        rows = []
+        for key, embedding in items:
+            vector = np.asarray(embedding, dtype=np.float32).ravel()
+            if vector.size == 0 or not np.any(vector):
+                continue
+            rows.append((key, vector.size, vector.tobytes(), now))
+        if not rows:
+            return
+
+        with self._lock:
+            try:
+                existing = self._existing_sizes([row[0] for row in rows])
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dims, vector, last_used) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._total_bytes += sum(len(row[2]) for row in rows) - sum(existing.values())
+                self.writes += len(rows)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Error writing embedding cache {self.path}: {e}")
+
+    def clear(self) -> None:
+        """Remove every cached embedding."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics of the cache.
+
+        Returns:
+            Dict[str, Any]: Dictionary with cache metrics.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / max(1, lookups) * 100,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _existing_sizes(self, keys: List[str]) -> Dict[str, int]:
+        sizes: Dict[str, int] = {}
+        for start in range(0, len(keys), 500):
+            block = keys[start:start + 500]
+            placeholders = ",".join("?" * len(block))
+            sizes.update(self._conn.execute(
+                f"SELECT key, LENGTH(vector) FROM embeddings WHERE key IN ({placeholders})", block
+            ).fetchall())
+        return sizes
+
+    def _evict(self) -> None:
+        # Other processes share the file, so refresh the size before evicting
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        target = int(self.max_bytes * EVICT_TARGET_RATIO)
+        victims = []
+        freed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used ASC"
+        ):
+            if self._total_bytes - freed <= target:
+                break
+            victims.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+        self._total_bytes -= freed
+        self.evictions += len(victims)
+        logger.info(f"Evicted {len(victims)} embeddings ({freed} bytes) from {self.path}")
+
+
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_cache_failed: bool = False
+_shared_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the process-wide persistent cache, opening it on first use.
+
+    Returns:
+        Optional[EmbeddingCache]: The cache, or None if it is disabled with
+        EMBEDDING_PERSISTENT_CACHE=FALSE or cannot be opened.
+    """
+    global _shared_cache, _shared_cache_failed
+    if _shared_cache_failed or os.getenv("EMBEDDING_PERSISTENT_CACHE", "TRUE").upper() != "TRUE":
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = EmbeddingCache()
+                logger.info(f"Using persistent embedding cache at {_shared_cache.path}")
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Persistent embedding cache unavailable: {e}")
+                _shared_cache_failed = True
+                return None
+        return _shared_cache
@@ -22,6 +22,7 @@ from starlette.routing import Route
 from mods.code.agent_mode import AgentMode
 from mods.code.indexer import FileIndexer
 from mods.code.memory import MemoryManager
+from mods.code.watcher import IndexWatcher
 from mods.project_management.task_manager import TaskManager, TaskStatus, TaskPriority
 from mods.project_management.kanban_board import KanbanBoard
 
@@ -33,6 +34,7 @@ agent_mode: Optional[AgentMode] = None
 memory_manager: Optional[MemoryManager] = None
 task_manager: Optional[TaskManager] = None
 kanban_board: Optional[KanbanBoard] = None
+index_watcher: Optional[IndexWatcher] = None
 indexing_status: Dict[str, Any] = {
     "in_progress": False,
     "directory": None,
@@ -68,6 +70,15 @@ def _initialize_task_management() -> bool:
         return False
 
 
+def _stop_index_watcher() -> None:
+    """Stop the watcher of the current indexer, if one is running."""
+    global index_watcher
+
+    if index_watcher:
+        index_watcher.stop(flush=False)
+        index_watcher = None
+
+
 def _get_env_bool(key: str, default: bool = False) -> bool:
     """Get a boolean value from environment variables.
 
@@ -106,6 +117,7 @@ async def initialize_directory(request: Request) -> JSONResponse:
                 "error": f"Directory not found: {directory_path}"
             }, status_code=404)
 
+        _stop_index_watcher()
         indexer = FileIndexer(directory_path)
         agent_mode = AgentMode(indexer)
         memory_manager = MemoryManager(root_path=directory_path, indexer=indexer)
@@ -229,6 +241,7 @@ async def start_indexing(request: Request) -> JSONResponse:
             }, status_code=409)
 
         if not indexer or indexer.root_path != directory_path:
+            _stop_index_watcher()
             indexer = FileIndexer(directory_path)
 
         indexing_status = {
@@ -277,6 +290,7 @@ async def get_indexing_status(request: Request) -> JSONResponse:
 
             # Update global status
             indexing_status.update(current_status)
+        indexing_status["watch"] = index_watcher.get_stats() if index_watcher else None
 
         return JSONResponse({
             "success": True,
@@ -290,6 +304,78 @@ async def get_indexing_status(request: Request) -> JSONResponse:
         }, status_code=500)
 
 
+async def start_watching(request: Request) -> JSONResponse:
+    """Start re-indexing changed files of the indexed directory as they change.
+
+    Args:
+        request (Request): HTTP request with an optional backend ("auto", "watchdog" or
+            "polling") and debounce_ms in the JSON body
+
+    Returns:
+        JSONResponse: Watcher status
+    """
+    global index_watcher
+
+    try:
+        if not indexer:
+            return JSONResponse({"success": False, "error": "Indexer not initialized"}, status_code=400)
+
+        if index_watcher and index_watcher.is_running:
+            return JSONResponse({
+                "success": False,
+                "error": "Watch mode already running",
+                "watch": index_watcher.get_stats()
+            }, status_code=409)
+
+        data = await request.json() if await request.body() else {}
+        try:
+            index_watcher = IndexWatcher(indexer, backend=data.get("backend"), debounce_ms=data.get("debounce_ms"))
+        except ValueError as e:
+            return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+        index_watcher.start()
+
+        return JSONResponse({
+            "success": True,
+            "watch": index_watcher.get_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error starting watch mode: {e}", exc_info=True)
+        return JSONResponse({
+            "success": False,
+            "error": str(e)
+        }, status_code=500)
+
+
+async def stop_watching(request: Request) -> JSONResponse:
+    """Stop watch mode, indexing the changes that are still pending.
+
+    Args:
+        request (Request): The HTTP request.
+
+    Returns:
+        JSONResponse: Final watcher statistics
+    """
+    global index_watcher
+
+    try:
+        if not index_watcher:
+            return JSONResponse({"success": False, "error": "Watch mode not running"}, status_code=404)
+
+        watcher, index_watcher = index_watcher, None
+        await asyncio.to_thread(watcher.stop)
+
+        return JSONResponse({
+            "success": True,
+            "watch": watcher.get_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error stopping watch mode: {e}", exc_info=True)
+        return JSONResponse({
+            "success": False,
+            "error": str(e)
+        }, status_code=500)
+
+
 async def health_check(request: Request) -> JSONResponse:
     """Simple health check endpoint.
 
@@ -658,6 +744,8 @@ routes = [
     # Indexing endpoints
     Route("/api/index/start", start_indexing, methods=["POST"]),
     Route("/api/index/status", get_indexing_status, methods=["GET"]),
+    Route("/api/index/watch", start_watching, methods=["POST"]),
+    Route("/api/index/watch", stop_watching, methods=["DELETE"]),
 
     # Task management endpoints
     Route("/api/tasks", get_all_tasks, methods=["GET"]),
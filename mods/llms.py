@@ -30,6 +30,7 @@ import logging
 import os
 import re
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import wraps
 from pathlib import Path
@@ -54,6 +55,8 @@ import openai
 from anthropic import Anthropic, AsyncAnthropic
 from groq import Groq, AsyncGroq
 
+from .embedding_cache import EmbeddingCache, get_embedding_cache, make_cache_key
+
 logger = logging.getLogger("VerbalCodeAI.LLMs")
 
 load_dotenv(dotenv_path=Path(__file__).parent.parent / ".env", override=True)
@@ -94,6 +97,7 @@ MAX_MEMORY_ITEMS: int = int(os.getenv("MAX_MEMORY_ITEMS", "10"))
 
 EMBEDDING_API_DELAY_MS: int = int(os.getenv("EMBEDDING_API_DELAY_MS", "100"))
 DESCRIPTION_API_DELAY_MS: int = int(os.getenv("DESCRIPTION_API_DELAY_MS", "100"))
+EMBEDDING_MEMORY_CACHE_SIZE: int = 1000
 
 def get_current_provider() -> Tuple[str, str]:
     """Get the current AI provider and Model based on environment variables."""
@@ -618,6 +622,64 @@ def _get_embedding_dimensions() -> int:
         return 384
 
 
+def _lookup_cached_embeddings(cache_keys: List[str],
+                              persistent_cache: Optional[EmbeddingCache]) -> Dict[str, List[float]]:
+    """Look up embeddings in the persistent cache, or the in-process LRU if it is disabled."""
+    if persistent_cache is not None:
+        return persistent_cache.get_many(cache_keys)
+
+    memory_cache = generate_embed._embedding_cache
+    found = {}
+    for key in cache_keys:
+        if key in memory_cache:
+            memory_cache.move_to_end(key)
+            found[key] = memory_cache[key]
+    return found
+
+
+def _store_cached_embeddings(items: List[Tuple[str, List[float]]],
+                             persistent_cache: Optional[EmbeddingCache]) -> None:
+    """Store new embeddings in the persistent cache, or the in-process LRU if it is disabled."""
+    if persistent_cache is not None:
+        persistent_cache.put_many(items)
+        return
+
+    memory_cache = generate_embed._embedding_cache
+    for key, embedding in items:
+        if any(embedding):
+            memory_cache[key] = embedding
+            memory_cache.move_to_end(key)
+    while len(memory_cache) > EMBEDDING_MEMORY_CACHE_SIZE:
+        memory_cache.popitem(last=False)
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss statistics of the embedding cache used by generate_embed.
+
+    Returns:
+        Dict[str, Any]: Cache metrics, with ``persistent`` telling which cache is in use.
+    """
+    persistent_cache = get_embedding_cache()
+    if persistent_cache is not None:
+        return {"persistent": True, **persistent_cache.get_stats()}
+    return {
+        "persistent": False,
+        "entries": len(getattr(generate_embed, '_embedding_cache', {})),
+        "max_entries": EMBEDDING_MEMORY_CACHE_SIZE,
+    }
+
+
+def get_embedding_model_id() -> str:
+    """Identify the embedding provider and model that generate_embed uses.
+
+    Stored embeddings are only reused for new text if they came from the same model.
+
+    Returns:
+        str: ``"<provider>:<model>"``.
+    """
+    return f"{AI_EMBEDDING_PROVIDER}:{EMBEDDING_MODEL}"
+
+
 def generate_embed(text: Union[str, List[str]]) -> List[List[float]]:
     """Generate embeddings for a single text or list of texts.
 
@@ -663,20 +725,20 @@ def generate_embed(text: Union[str, List[str]]) -> List[List[float]]:
     if isinstance(text, list) and len(text) > 100:
         logger.warning(f"Very large batch of {len(text)} texts provided to generate_embed, consider splitting")
 
-    global _embedding_cache
     if not hasattr(generate_embed, '_embedding_cache'):
-        generate_embed._embedding_cache = {}
+        generate_embed._embedding_cache = OrderedDict()
+
+    persistent_cache = get_embedding_cache()
+    cache_keys = [
+        make_cache_key(AI_EMBEDDING_PROVIDER, EMBEDDING_MODEL, embedding_dims, t) for t in text
+    ]
+    cached = _lookup_cached_embeddings(cache_keys, persistent_cache)
 
     cache_hits = []
     cache_misses = []
-    cache_keys = []
-
     for i, t in enumerate(text):
-        cache_key = hash(t)
-        cache_keys.append(cache_key)
-
-        if cache_key in generate_embed._embedding_cache:
-            cache_hits.append((i, generate_embed._embedding_cache[cache_key]))
+        if cache_keys[i] in cached:
+            cache_hits.append((i, cached[cache_keys[i]]))
         else:
             cache_misses.append((i, t))
 
@@ -837,9 +899,10 @@ def generate_embed(text: Union[str, List[str]]) -> List[List[float]]:
                 logger.error(f"Ollama ResponseError: {str(e)}")
                 embeddings_for_misses = [[0.0] * embedding_dims] * len(texts_to_process)
 
-        for (i, t), embedding in zip(cache_misses, embeddings_for_misses):
-            cache_key = cache_keys[i]
-            generate_embed._embedding_cache[cache_key] = embedding
+        _store_cached_embeddings(
+            [(cache_keys[i], embedding) for (i, _), embedding in zip(cache_misses, embeddings_for_misses)],
+            persistent_cache,
+        )
 
         result = [None] * len(text)
         for i, embedding in cache_hits:
@@ -848,11 +911,6 @@ def generate_embed(text: Union[str, List[str]]) -> List[List[float]]:
         for (i, _), embedding in zip(cache_misses, embeddings_for_misses):
             result[i] = embedding
 
-        if len(generate_embed._embedding_cache) > 1000:
-            keys_to_remove = list(generate_embed._embedding_cache.keys())[:200]
-            for key in keys_to_remove:
-                del generate_embed._embedding_cache[key]
-
         return result
 
     except Exception as e:
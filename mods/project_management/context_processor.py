@@ -6,8 +6,10 @@ Extracted from ai_task_creator.py for better modularity and maintainability.
 """
 
 import logging
+from pathlib import Path
 from typing import Dict, List, Optional, Any
-from .semantic_search import SemanticSearchEngine, ContextChunk, SearchResult
+from ..code.retrieval_service import RetrievalService
+from .semantic_search import SemanticSearchEngine, ContextChunk, SearchResult, find_embeddings_directory
 from .context_analyzer import ContextAnalyzer, ProjectContext
 from .context_analyzer_enhanced import EnhancedContextAnalyzer, EnhancedProjectContext
 
@@ -24,7 +26,10 @@ class ContextProcessor:
             project_root: Root directory for project analysis
         """
         self.project_root = project_root
-        self.semantic_search = SemanticSearchEngine(project_root)
+        # Semantic search shared with the other front-ends searching the same index
+        index_dir = str(find_embeddings_directory(Path(project_root)).parent)
+        self.retrieval: Optional[RetrievalService] = RetrievalService.acquire(index_dir)
+        self.semantic_search = SemanticSearchEngine.shared(self.retrieval, project_root)
         self.context_analyzer = ContextAnalyzer(project_root)
         self.enhanced_context_analyzer = EnhancedContextAnalyzer(project_root)
 
@@ -36,6 +41,18 @@ class ContextProcessor:
             'diversity_threshold': 0.8
         }
 
+    def close(self):
+        """Release the retrieval service shared with the other search front-ends."""
+        retrieval, self.retrieval = self.retrieval, None
+        if retrieval is not None:
+            retrieval.release()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def analyze_task_context_enhanced(self, description: str, task_type: str,
                                     specific_files: Optional[List[str]] = None) -> EnhancedProjectContext:
         """Analyze task context using enhanced context analyzer."""
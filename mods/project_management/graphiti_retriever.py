@@ -18,9 +18,17 @@ import numpy as np
 import os
 import time
 import re
+from dataclasses import replace
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple
 from collections import defaultdict, Counter
+from ..code.hybrid_search import (
+    HYBRID_CANDIDATES, HYBRID_FUSION, HYBRID_RRF_K, HybridSearch, HybridSearchConfig, Ranking,
+    chunk_ids, fuse_rankings, keyword_ranker, similarity_ranker
+)
+from ..code.index_store import IndexStore
+from ..code.keyword_index import KeywordIndex, tokenize
+from ..code.retrieval_service import RetrievalService
 from .semantic_search import ContextChunk, SemanticSearchEngine
 
 logger = logging.getLogger("TaskHeroAI.ProjectManagement.GraphitiContextRetriever")
@@ -39,6 +47,12 @@ class GraphitiContextRetriever:
 
         # Find the correct embeddings directory using TaskHero AI configuration
         self.embeddings_dir = self._find_embeddings_directory()
+        index_dir = str(self.embeddings_dir.parent)
+        # Index store, keyword index and semantic search shared with the other front-ends
+        self.retrieval: Optional[RetrievalService] = (
+            RetrievalService.acquire(index_dir) if IndexStore.exists(index_dir) else None
+        )
+        self.index_store: Optional[IndexStore] = self.retrieval.store if self.retrieval is not None else None
 
         self.chunk_size = 1000
         self.chunk_overlap = 200
@@ -62,6 +76,14 @@ class GraphitiContextRetriever:
             'enable_bm25_search': True,
             'bm25_weight': 0.3,
             'semantic_weight': 0.7,
+            # Fusion of the semantic, BM25 and dense rankings: 'rrf', 'weighted', or 'legacy'
+            # for the former per-chunk dictionary merge
+            'hybrid_fusion': HYBRID_FUSION,
+            'hybrid_rrf_k': HYBRID_RRF_K,
+            'hybrid_candidates': HYBRID_CANDIDATES,
+            # Embedding similarity as a third ranker; embeds every query through the AI provider
+            'enable_dense_search': False,
+            'dense_weight': 0.5,
             'enable_task_specific_scoring': True,
             'enable_dynamic_chunking': True,
             'enable_performance_monitoring': True,
@@ -71,16 +93,26 @@ class GraphitiContextRetriever:
         }
 
         # Enhanced search components (using only existing TaskHero AI infrastructure)
-        self.semantic_search = SemanticSearchEngine(str(self.project_root))
+        if self.retrieval is not None:
+            self.semantic_search = SemanticSearchEngine.shared(self.retrieval, str(self.project_root))
+        else:
+            self.semantic_search = SemanticSearchEngine(str(self.project_root))
         self._embedding_cache = {}
         self._relationship_graph = {}
         self._metadata_index = {}
 
         # Phase 3 Enhanced Components
-        self._bm25_index = {}  # BM25 keyword search index
+        self._keyword_index: Optional[KeywordIndex] = None  # BM25 keyword search index
+        self._keyword_chunks: Dict[str, List[Dict]] = {}  # Chunks of each file, for BM25 hits
         self._performance_metrics = defaultdict(list)  # Performance monitoring
         self._task_scoring_cache = {}  # Task-specific scoring cache
 
+        # Files the indexer changed since the caches above were built
+        self._changed_paths: Set[str] = set()
+        self._reload_all = False
+        if self.retrieval is not None:
+            self.retrieval.subscribe(self._on_index_changed)
+
         # Initialize enhanced retrieval
         self._initialize_enhanced_retrieval()
 
@@ -99,7 +131,10 @@ class GraphitiContextRetriever:
                     codebase_root = Path(codebase_path)
                     embeddings_path = codebase_root / ".index" / "embeddings"
 
-                    if embeddings_path.exists() and any(embeddings_path.glob("*.json")):
+                    if IndexStore.exists(str(embeddings_path.parent)):
+                        logger.info(f"Found index store from config: {embeddings_path.parent}")
+                        return embeddings_path
+                    elif embeddings_path.exists() and any(embeddings_path.glob("*.json")):
                         logger.info(f"Found embeddings directory from config: {embeddings_path}")
                         return embeddings_path
                     else:
@@ -119,8 +154,11 @@ class GraphitiContextRetriever:
                 if parent_path not in search_paths:
                     search_paths.insert(1, parent_path)
 
-            # Search for existing embeddings directory
+            # Search for an existing index store or legacy embeddings directory
             for embeddings_path in search_paths:
+                if IndexStore.exists(str(embeddings_path.parent)):
+                    logger.info(f"Found index store at: {embeddings_path.parent}")
+                    return embeddings_path
                 if embeddings_path.exists() and embeddings_path.is_dir():
                     # Check if it contains any .json files (embedding files)
                     if any(embeddings_path.glob("*.json")):
@@ -148,16 +186,10 @@ class GraphitiContextRetriever:
         try:
             logger.info("Initializing enhanced context retrieval...")
 
-            # Check if embeddings directory exists
-            if not self.embeddings_dir.exists():
-                logger.warning(f"Embeddings directory not found: {self.embeddings_dir}")
-                self.is_initialized = False
-                return
-
-            # Check if there are embedding files
-            embedding_files = list(self.embeddings_dir.glob("*.json"))
-            if not embedding_files:
-                logger.warning("No embedding files found in embeddings directory")
+            # Check if there is any indexed data
+            embedding_file_count = self._count_embedding_files()
+            if not embedding_file_count:
+                logger.warning(f"No indexed files found for: {self.embeddings_dir.parent}")
                 self.is_initialized = False
                 return
 
@@ -175,76 +207,61 @@ class GraphitiContextRetriever:
                 self._build_bm25_index()
 
             self.is_initialized = True
-            logger.info(f"Enhanced context retrieval initialized with {len(embedding_files)} embedding files")
+            logger.info(f"Enhanced context retrieval initialized with {embedding_file_count} embedding files")
 
         except Exception as e:
             logger.error(f"Failed to initialize enhanced retrieval: {e}")
             self.is_initialized = False
 
+    def _count_embedding_files(self) -> int:
+        """Count indexed files in the index store (or legacy embedding files)."""
+        if self.index_store is not None:
+            return self.index_store.file_count
+        if self.embeddings_dir.exists():
+            return len(list(self.embeddings_dir.glob("*.json")))
+        return 0
+
+    def _iter_embedding_data(self) -> Iterator[Tuple[str, Dict[str, Any], float]]:
+        """Yield (file_key, data, fallback_timestamp) for every indexed file.
+
+        Index store records are converted to the embedding file layout so both
+        sources share the same metadata handling.
+        """
+        if self.index_store is not None:
+            # Vectors stay in the store; vector search goes through the shared SimilaritySearch
+            for record, _ in self.index_store.iter_records():
+                yield self._record_to_embedding_data(record)
+            return
+
+        for file_path in self.embeddings_dir.glob("*.json"):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                yield file_path.stem, data, file_path.stat().st_mtime
+            except Exception as e:
+                logger.warning(f"Failed to load embedding metadata from {file_path}: {e}")
+
+    def _record_to_embedding_data(self, record: Dict[str, Any]) -> Tuple[str, Dict[str, Any], float]:
+        """Convert an index store record to (file_key, data, fallback_timestamp)."""
+        metadata = dict(record.get('metadata') or {})
+        metadata['description'] = record.get('description', '')
+        data = {
+            'path': record['path'],
+            'chunks': record.get('chunks', []),
+            'metadata': metadata
+        }
+        return self._get_file_key_from_path(record['path']), data, record.get('modified_time', 0)
+
     def _load_embedding_metadata(self):
-        """Load metadata from existing embedding files (supports both old and new formats)."""
+        """Load metadata from the index store or legacy embedding files (supports both old and new formats)."""
         try:
-            embedding_files = list(self.embeddings_dir.glob("*.json"))
             self._embedding_cache = {}
 
-            for file_path in embedding_files:
+            for file_key, data, fallback_timestamp in self._iter_embedding_data():
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-
-                    # Extract basic data
-                    chunks = data.get('chunks', [])
-                    embeddings = data.get('embeddings', [])
-                    original_file_path = data.get('path', '')
-
-                    # Check for enhanced metadata (new format)
-                    metadata = data.get('metadata', {})
-
-                    # Use enhanced metadata if available, otherwise create basic metadata
-                    if metadata and metadata.get('graphiti_compatible'):
-                        # New enhanced format
-                        file_metadata = {
-                            'chunks': chunks,
-                            'embeddings': embeddings,
-                            'file_path': original_file_path,
-                            'timestamp': metadata.get('timestamp', file_path.stat().st_mtime),
-                            'chunks_count': len(chunks),
-                            'embeddings_count': len(embeddings) if isinstance(embeddings, list) else 0,
-                            'file_name': metadata.get('file_name', ''),
-                            'file_extension': metadata.get('file_extension', ''),
-                            'file_size': metadata.get('file_size', 0),
-                            'file_hash': metadata.get('file_hash', ''),
-                            'modified_time': metadata.get('modified_time', 0),
-                            'description': metadata.get('description', ''),
-                            'file_type': metadata.get('file_type', 'unknown'),
-                            'language': metadata.get('language', 'unknown'),
-                            'enhanced_metadata': True
-                        }
-                    else:
-                        # Legacy format - create basic metadata
-                        file_metadata = {
-                            'chunks': chunks,
-                            'embeddings': embeddings,
-                            'file_path': original_file_path,
-                            'timestamp': file_path.stat().st_mtime if file_path.exists() else 0,
-                            'chunks_count': len(chunks),
-                            'embeddings_count': len(embeddings) if isinstance(embeddings, list) else 0,
-                            'file_name': Path(original_file_path).name if original_file_path else '',
-                            'file_extension': Path(original_file_path).suffix if original_file_path else '',
-                            'file_size': 0,
-                            'file_hash': '',
-                            'modified_time': 0,
-                            'description': f"File: {Path(original_file_path).name}" if original_file_path else '',
-                            'file_type': self._determine_file_type_from_path(original_file_path),
-                            'language': self._determine_language_from_path(original_file_path),
-                            'enhanced_metadata': False
-                        }
-
-                    file_key = file_path.stem
-                    self._embedding_cache[file_key] = file_metadata
-
+                    self._embedding_cache[file_key] = self._build_file_metadata(data, fallback_timestamp)
                 except Exception as e:
-                    logger.warning(f"Failed to load embedding metadata from {file_path}: {e}")
+                    logger.warning(f"Failed to load embedding metadata for {file_key}: {e}")
                     continue
 
             enhanced_count = sum(1 for data in self._embedding_cache.values() if data.get('enhanced_metadata'))
@@ -253,6 +270,105 @@ class GraphitiContextRetriever:
         except Exception as e:
             logger.error(f"Failed to load embedding metadata: {e}")
 
+    def _build_file_metadata(self, data: Dict[str, Any], fallback_timestamp: float) -> Dict[str, Any]:
+        """Build the cached metadata of one indexed file (supports both old and new formats)."""
+        # Extract basic data
+        chunks = data.get('chunks', [])
+        # Store records leave out the vectors; there is one per chunk
+        embeddings_count = len(data['embeddings']) if 'embeddings' in data else len(chunks)
+        original_file_path = data.get('path', '')
+
+        # Check for enhanced metadata (new format)
+        metadata = data.get('metadata', {})
+
+        # Use enhanced metadata if available, otherwise create basic metadata
+        if metadata and metadata.get('graphiti_compatible'):
+            # New enhanced format
+            return {
+                'chunks': chunks,
+                'file_path': original_file_path,
+                'timestamp': metadata.get('timestamp', fallback_timestamp),
+                'chunks_count': len(chunks),
+                'embeddings_count': embeddings_count,
+                'file_name': metadata.get('file_name', ''),
+                'file_extension': metadata.get('file_extension', ''),
+                'file_size': metadata.get('file_size', 0),
+                'file_hash': metadata.get('file_hash', ''),
+                'modified_time': metadata.get('modified_time', 0),
+                'description': metadata.get('description', ''),
+                'file_type': metadata.get('file_type', 'unknown'),
+                'language': metadata.get('language', 'unknown'),
+                'enhanced_metadata': True
+            }
+
+        # Legacy format - create basic metadata
+        return {
+            'chunks': chunks,
+            'file_path': original_file_path,
+            'timestamp': fallback_timestamp,
+            'chunks_count': len(chunks),
+            'embeddings_count': embeddings_count,
+            'file_name': Path(original_file_path).name if original_file_path else '',
+            'file_extension': Path(original_file_path).suffix if original_file_path else '',
+            'file_size': 0,
+            'file_hash': '',
+            'modified_time': 0,
+            'description': f"File: {Path(original_file_path).name}" if original_file_path else '',
+            'file_type': self._determine_file_type_from_path(original_file_path),
+            'language': self._determine_language_from_path(original_file_path),
+            'enhanced_metadata': False
+        }
+
+    def _on_index_changed(self, updated: Optional[List[str]], removed: Optional[List[str]]):
+        """Remember files the indexer changed; the caches are updated before the next retrieval."""
+        if updated is None or removed is None:
+            self._reload_all = True
+        else:
+            self._changed_paths.update(updated)
+            self._changed_paths.update(removed)
+
+    def _apply_index_changes(self):
+        """Bring the metadata, relationship and BM25 caches up to date with the index store.
+
+        Files pushed by the indexer are re-read one by one; changes made by another
+        process (or too many files at once) reload everything.
+        """
+        if self.retrieval is None:
+            return
+        self.retrieval.refresh()
+        if not self._reload_all and not self._changed_paths:
+            return
+
+        try:
+            changed, self._changed_paths = self._changed_paths, set()
+            if self._reload_all or len(changed) > max(100, len(self._embedding_cache) // 4):
+                self._reload_all = False
+                self._load_embedding_metadata()
+                self._build_relationship_graph()
+            else:
+                for path in changed:
+                    file_key = self._get_file_key_from_path(path)
+                    self._embedding_cache.pop(file_key, None)
+                    self._relationship_graph.pop(file_key, None)
+                    record = self.index_store.get_record(path)
+                    if record is None:
+                        continue
+                    file_key, data, fallback_timestamp = self._record_to_embedding_data(record)
+                    file_metadata = self._build_file_metadata(data, fallback_timestamp)
+                    self._embedding_cache[file_key] = file_metadata
+                    self._relationship_graph[file_key] = self._extract_file_relationships(
+                        file_metadata['file_path'], file_metadata['chunks']
+                    )
+                logger.info(f"Applied index changes to {len(changed)} files")
+
+            self._build_metadata_index()
+            if self.config['enable_bm25_search']:
+                self._build_bm25_index()
+            self.is_initialized = bool(self._embedding_cache)
+
+        except Exception as e:
+            logger.error(f"Failed to apply index changes: {e}")
+
     def _determine_file_type_from_path(self, file_path: str) -> str:
         """Determine file type from file path."""
         if not file_path:
@@ -407,78 +523,39 @@ class GraphitiContextRetriever:
         return list(set(relationships))  # Remove duplicates
 
     def _build_bm25_index(self):
-        """Build BM25 index for keyword search (Phase 3 Enhancement)."""
-        try:
-            logger.info("Building BM25 index for keyword search...")
-            self._bm25_index = {
-                'documents': [],
-                'doc_frequencies': defaultdict(int),
-                'doc_lengths': [],
-                'avg_doc_length': 0,
-                'total_docs': 0,
-                'file_mapping': {}  # Maps doc index to file info
-            }
+        """Load the BM25 inverted index for keyword search (Phase 3 Enhancement).
 
-            documents = []
-            file_mapping = {}
+        The index is shared through the retrieval service, kept up to date by the
+        indexer and only rebuilt when it is missing or out of date. Legacy
+        embedding directories are indexed in memory.
+        """
+        try:
+            if self.retrieval is not None:
+                self._keyword_index = self.retrieval.get_keyword_index()
+            else:
+                logger.info("Building BM25 index for keyword search...")
+                self._keyword_index = KeywordIndex()
+                self._keyword_index.update_files(
+                    (data['file_path'], data['chunks']) for data in self._embedding_cache.values()
+                )
+                self._keyword_index.compact()
 
-            for file_key, data in self._embedding_cache.items():
-                chunks = data['chunks']
-                file_path = data['file_path']
+            self._keyword_chunks = {data['file_path']: data['chunks'] for data in self._embedding_cache.values()}
 
-                for i, chunk in enumerate(chunks):
-                    text = chunk.get('text', '')
-                    if text.strip():
-                        # Tokenize and clean text
-                        tokens = self._tokenize_text(text)
-                        documents.append(tokens)
-
-                        # Map document index to file info
-                        doc_index = len(documents) - 1
-                        file_mapping[doc_index] = {
-                            'file_path': file_path,
-                            'chunk_index': i,
-                            'start_line': chunk.get('start_line', 0),
-                            'end_line': chunk.get('end_line', 0),
-                            'original_text': text
-                        }
-
-            # Calculate document frequencies and lengths
-            for doc in documents:
-                doc_length = len(doc)
-                self._bm25_index['doc_lengths'].append(doc_length)
-
-                # Count unique terms in document
-                unique_terms = set(doc)
-                for term in unique_terms:
-                    self._bm25_index['doc_frequencies'][term] += 1
-
-            # Calculate average document length
-            if documents:
-                self._bm25_index['avg_doc_length'] = sum(self._bm25_index['doc_lengths']) / len(documents)
-                self._bm25_index['total_docs'] = len(documents)
-                self._bm25_index['documents'] = documents
-                self._bm25_index['file_mapping'] = file_mapping
-
-                logger.info(f"Built BM25 index with {len(documents)} documents, avg length: {self._bm25_index['avg_doc_length']:.1f}")
+            stats = self._keyword_index.get_stats()
+            if stats['documents']:
+                logger.info(f"BM25 index has {stats['documents']} documents, avg length: {stats['avg_doc_length']:.1f}")
             else:
                 logger.warning("No documents found for BM25 indexing")
 
         except Exception as e:
             logger.error(f"Failed to build BM25 index: {e}")
+            self._keyword_index = None
 
     def _tokenize_text(self, text: str) -> List[str]:
         """Tokenize text for BM25 search."""
         try:
-            # Convert to lowercase and split on non-alphanumeric characters
-            tokens = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', text.lower())
-
-            # Filter out very short tokens and common stop words
-            stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'}
-
-            filtered_tokens = [token for token in tokens if len(token) > 2 and token not in stop_words]
-            return filtered_tokens
-
+            return tokenize(text)
         except Exception as e:
             logger.warning(f"Text tokenization failed: {e}")
             return []
@@ -536,9 +613,19 @@ class GraphitiContextRetriever:
             return False
 
     async def retrieve_context(self, query: str, max_results: int = 10,
-                             file_types: Optional[List[str]] = None) -> List[ContextChunk]:
-        """Retrieve relevant context using enhanced search with relationship awareness."""
+                             file_types: Optional[List[str]] = None,
+                             hybrid_config: Optional[HybridSearchConfig] = None) -> List[ContextChunk]:
+        """Retrieve relevant context using enhanced search with relationship awareness.
+
+        Args:
+            query: The search query
+            max_results: Maximum number of chunks to return
+            file_types: Optional list of file types for semantic search to filter by
+            hybrid_config: Fusion settings for this call. If None, they follow the
+                hybrid_* and *_weight keys of the retriever config
+        """
         try:
+            self._apply_index_changes()
             if not self.is_initialized:
                 logger.warning("Enhanced retrieval not initialized - using fallback")
                 return await self._fallback_retrieval(query, max_results, file_types)
@@ -548,13 +635,17 @@ class GraphitiContextRetriever:
             # Performance monitoring start
             start_time = time.time()
 
-            # Step 1: Get initial results from semantic search
-            initial_results = await self._get_semantic_results(query, max_results * 2, file_types)
+            if hybrid_config is not None or self.config['hybrid_fusion'] != 'legacy':
+                # Step 1: Semantic, BM25 (and dense) rankings fused over shared chunk ids
+                initial_results = self._get_hybrid_results(query, max_results, file_types, hybrid_config)
+            else:
+                # Step 1: Get initial results from semantic search
+                initial_results = await self._get_semantic_results(query, max_results * 2, file_types)
 
-            # Step 1.5: Phase 3 - Hybrid search with BM25 (if enabled)
-            if self.config['enable_bm25_search'] and self._bm25_index.get('total_docs', 0) > 0:
-                bm25_results = self._get_bm25_results(query, max_results)
-                initial_results = self._combine_hybrid_results(initial_results, bm25_results, query)
+                # Step 1.5: Phase 3 - Hybrid search with BM25 (if enabled)
+                if self.config['enable_bm25_search'] and self._keyword_index is not None and self._keyword_index.doc_count > 0:
+                    bm25_results = self._get_bm25_results(query, max_results)
+                    initial_results = self._combine_hybrid_results(initial_results, bm25_results, query)
 
             # Step 2: Apply relationship-based enhancement
             enhanced_results = self._apply_relationship_enhancement(initial_results, query)
@@ -617,63 +708,130 @@ class GraphitiContextRetriever:
             logger.error(f"Semantic search failed: {e}")
             return []
 
-    def _get_bm25_results(self, query: str, max_results: int) -> List[ContextChunk]:
-        """Get results using BM25 keyword search (Phase 3 Enhancement)."""
+    def get_hybrid_config(self) -> HybridSearchConfig:
+        """Build the hybrid search settings from the retriever config.
+
+        Returns:
+            HybridSearchConfig weighing each ranker by its *_weight key, with disabled rankers at 0
+        """
+        fusion = self.config['hybrid_fusion']
+        return HybridSearchConfig(
+            fusion=fusion if fusion != 'legacy' else HYBRID_FUSION,
+            rrf_k=self.config['hybrid_rrf_k'],
+            weights={
+                'semantic': self.config['semantic_weight'],
+                'bm25': self.config['bm25_weight'] if self.config['enable_bm25_search'] else 0.0,
+                'dense': self.config['dense_weight'] if self.config['enable_dense_search'] else 0.0,
+            },
+            candidates=self.config['hybrid_candidates'],
+        )
+
+    def _get_hybrid_results(self, query: str, max_results: int, file_types: Optional[List[str]],
+                            hybrid_config: Optional[HybridSearchConfig] = None) -> List[ContextChunk]:
+        """Get initial results from the semantic, BM25 and dense rankings fused in one pass.
+
+        The rankers run concurrently and only return chunk ids; ContextChunks are only
+        built for the fused top results.
+        """
         try:
-            if not self._bm25_index.get('total_docs', 0):
-                return []
+            config = hybrid_config or self.get_hybrid_config()
+            config = replace(config, candidates=max(config.candidates, max_results * 2))
 
-            query_tokens = self._tokenize_text(query)
-            if not query_tokens:
+            rankers = {
+                'semantic': lambda text, top_k: self.semantic_search.rank_chunks(text, top_k, file_types),
+                'bm25': keyword_ranker(lambda: self._keyword_index),
+            }
+            if self.retrieval is not None:
+                rankers['dense'] = similarity_ranker(
+                    self.retrieval.get_similarity_search, str(Path(self.retrieval.index_dir).parent)
+                )
+            rankings = HybridSearch(rankers, config).rank(query)
+            fused = fuse_rankings(
+                [(ranking, config.weights.get(name, 1.0)) for name, ranking in rankings.items()],
+                max_results * 2, config.fusion, config.rrf_k
+            )
+            if not len(fused):
                 return []
 
-            # Calculate BM25 scores for all documents
-            scores = []
-            k1, b = 1.5, 0.75  # BM25 parameters
-
-            for doc_idx, doc in enumerate(self._bm25_index['documents']):
-                score = 0.0
-                doc_length = self._bm25_index['doc_lengths'][doc_idx]
-
-                for term in query_tokens:
-                    if term in doc:
-                        # Term frequency in document
-                        tf = doc.count(term)
-
-                        # Document frequency
-                        df = self._bm25_index['doc_frequencies'][term]
+            semantic_ids = rankings.get('semantic', Ranking.empty()).ids
+            lexical_ids = rankings.get('bm25', Ranking.empty()).ids
+            in_semantic = np.isin(fused.ids, semantic_ids)
+            in_lexical = np.isin(fused.ids, lexical_ids)
+            paths, chunk_indexes = chunk_ids.decode(fused.ids)
+
+            results = []
+            chunks = self.semantic_search.get_chunks(fused.ids)
+            for i, chunk in enumerate(chunks):
+                score = float(fused.scores[i])
+                if chunk is None:
+                    chunk = self._chunk_from_keyword_data(paths[i], int(chunk_indexes[i]), score)
+                    if chunk is None:
+                        continue
+                chunk_type = chunk.chunk_type
+                if in_semantic[i] and in_lexical[i]:
+                    chunk_type = 'hybrid_result'
+                elif in_lexical[i]:
+                    chunk_type = 'bm25_result'
+                results.append(replace(chunk, chunk_type=chunk_type, relevance_score=score))
+
+            logger.info(f"Hybrid search fused {', '.join(f'{len(r)} {name}' for name, r in rankings.items())} "
+                        f"ranked chunks into {len(results)} results ({config.fusion})")
+            return results
 
-                        # Inverse document frequency
-                        idf = np.log((self._bm25_index['total_docs'] - df + 0.5) / (df + 0.5))
+        except Exception as e:
+            logger.error(f"Hybrid search failed: {e}")
+            return []
 
-                        # BM25 score component
-                        score += idf * (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * doc_length / self._bm25_index['avg_doc_length']))
+    def _chunk_from_keyword_data(self, file_path: str, chunk_index: int, score: float) -> Optional[ContextChunk]:
+        """Build a ContextChunk for a chunk semantic search does not hold, from the BM25 chunk data."""
+        chunks = self._keyword_chunks.get(file_path)
+        if not chunks or chunk_index >= len(chunks):
+            return None
+        chunk_data = chunks[chunk_index]
+        return ContextChunk(
+            text=chunk_data.get('text', ''),
+            file_path=file_path,
+            chunk_type='bm25_result',
+            start_line=chunk_data.get('start_line', 0),
+            end_line=chunk_data.get('end_line', 0),
+            confidence=score,
+            relevance_score=score,
+            file_name=Path(file_path).name,
+            file_type=Path(file_path).suffix,
+            last_modified=None,
+            chunk_index=chunk_index
+        )
 
-                scores.append((doc_idx, score))
+    def _get_bm25_results(self, query: str, max_results: int) -> List[ContextChunk]:
+        """Get results using BM25 keyword search (Phase 3 Enhancement)."""
+        try:
+            if self._keyword_index is None or not self._keyword_index.doc_count:
+                return []
 
-            # Sort by score and get top results
-            scores.sort(key=lambda x: x[1], reverse=True)
-            top_scores = scores[:max_results * 2]  # Get more for diversity
+            # Only the postings of the query terms are scored; get more for diversity
+            hits = self._keyword_index.search(query, max_results * 2)
 
             # Convert to ContextChunk objects
             bm25_chunks = []
-            for doc_idx, score in top_scores:
-                if score > 0:  # Only include documents with positive scores
-                    file_info = self._bm25_index['file_mapping'][doc_idx]
-
-                    chunk = ContextChunk(
-                        text=file_info['original_text'],
-                        file_path=file_info['file_path'],
-                        chunk_type='bm25_result',
-                        start_line=file_info['start_line'],
-                        end_line=file_info['end_line'],
-                        confidence=min(1.0, score / 10.0),  # Normalize score
-                        relevance_score=min(1.0, score / 10.0),
-                        file_name=Path(file_info['file_path']).name,
-                        file_type=Path(file_info['file_path']).suffix,
-                        last_modified=None
-                    )
-                    bm25_chunks.append(chunk)
+            for file_path, chunk_index, score in hits:
+                chunks = self._keyword_chunks.get(file_path)
+                if not chunks or chunk_index >= len(chunks):
+                    continue
+                chunk_data = chunks[chunk_index]
+
+                chunk = ContextChunk(
+                    text=chunk_data.get('text', ''),
+                    file_path=file_path,
+                    chunk_type='bm25_result',
+                    start_line=chunk_data.get('start_line', 0),
+                    end_line=chunk_data.get('end_line', 0),
+                    confidence=min(1.0, score / 10.0),  # Normalize score
+                    relevance_score=min(1.0, score / 10.0),
+                    file_name=Path(file_path).name,
+                    file_type=Path(file_path).suffix,
+                    last_modified=None
+                )
+                bm25_chunks.append(chunk)
 
             logger.info(f"BM25 search found {len(bm25_chunks)} relevant chunks")
             return bm25_chunks
@@ -1434,9 +1592,7 @@ class GraphitiContextRetriever:
             logger.error(f"Enhanced fallback retrieval failed: {e}")
             # Final fallback to basic semantic search
             try:
-                from .semantic_search import SemanticSearchEngine
-                semantic_search = SemanticSearchEngine(str(self.project_root))
-                search_result = semantic_search.search(query=query, max_results=max_results, file_types=file_types)
+                search_result = self.semantic_search.search(query=query, max_results=max_results, file_types=file_types)
                 return search_result.chunks if search_result else []
             except Exception as e2:
                 logger.error(f"Basic fallback also failed: {e2}")
@@ -1454,7 +1610,7 @@ class GraphitiContextRetriever:
                 }
 
             # Get actual statistics from enhanced system
-            embedding_files = len(list(self.embeddings_dir.glob("*.json"))) if self.embeddings_dir.exists() else 0
+            embedding_files = self._count_embedding_files()
             relationship_nodes = len(self._relationship_graph)
             cached_files = len(self._embedding_cache)
 
@@ -1478,11 +1634,13 @@ class GraphitiContextRetriever:
                     'relationship_enhancement': self.config['enable_relationship_expansion'],
                     'semantic_clustering': self.config['use_semantic_clustering'],
                     'hybrid_search': self.config['enable_hybrid_search'],
+                    'hybrid_fusion': self.config['hybrid_fusion'],
+                    'dense_search': self.config['enable_dense_search'],
                     # Phase 3 Enhanced Features
                     'bm25_search': self.config['enable_bm25_search'],
                     'task_specific_scoring': self.config['enable_task_specific_scoring'],
                     'performance_monitoring': self.config['enable_performance_monitoring'],
-                    'bm25_index_size': self._bm25_index.get('total_docs', 0)
+                    'bm25_index_size': self._keyword_index.doc_count if self._keyword_index is not None else 0
                 },
                 'performance_metrics': {
                     'avg_search_time': sum(self._performance_metrics['search_times'][-10:]) / min(10, len(self._performance_metrics['search_times'])) if self._performance_metrics['search_times'] else 0.0,
@@ -1575,9 +1733,18 @@ class GraphitiContextRetriever:
             if self.is_initialized:
                 # Check embeddings directory
                 health_status['embeddings_dir_exists'] = self.embeddings_dir.exists()
+                health_status['index_store_exists'] = self.index_store is not None
 
                 # Check embedding files
-                if self.embeddings_dir.exists():
+                if self.index_store is not None:
+                    health_status['embedding_files_count'] = self.index_store.file_count
+                    health_status['embedding_files_accessible'] = True
+                    sample = next(self.index_store.iter_records(), None)
+                    health_status['sample_file_readable'] = sample is not None
+                    if sample is not None:
+                        health_status['sample_has_metadata'] = 'metadata' in sample[0]
+                        health_status['sample_has_chunks'] = 'chunks' in sample[0]
+                elif self.embeddings_dir.exists():
                     embedding_files = list(self.embeddings_dir.glob("*.json"))
                     health_status['embedding_files_count'] = len(embedding_files)
                     health_status['embedding_files_accessible'] = True
@@ -1665,9 +1832,17 @@ class GraphitiContextRetriever:
                 'error': str(e)
             }
 
+    def close(self):
+        """Release the retrieval service shared with the other search front-ends."""
+        retrieval, self.retrieval = getattr(self, 'retrieval', None), None
+        if retrieval is not None:
+            retrieval.unsubscribe(self._on_index_changed)
+            retrieval.release()
+
     def __del__(self):
         """Cleanup when the retriever is destroyed."""
         try:
+            self.close()
             if self.is_initialized:
                 # Enhanced retrieval cleanup
                 self._embedding_cache.clear()
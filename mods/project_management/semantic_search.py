@@ -15,18 +15,101 @@ Phase 4A Implementation:
 
 import json
 import logging
+import os
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Callable, Iterable, Iterator
 from dataclasses import dataclass
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import re
 import time
 from functools import lru_cache
 
+from ..code.hybrid_search import Ranking, chunk_ids
+from ..code.index_store import IndexStore
+from ..code.retrieval_service import RetrievalService
+from .tfidf_index import TfidfIndex
+
 logger = logging.getLogger(__name__)
 
+# File type groups the relevance boosts and diversity selection work with
+CODE_FILE_TYPES = ('python', 'javascript', 'java_family', 'cpp', 'rust', 'go', 'php', 'ruby')
+CONFIG_FILE_TYPES = ('config', 'dependency', 'build')
+SCRIPT_FILE_TYPES = ('script', 'setup')
+DOC_FILE_TYPES = ('documentation', 'markdown')
+DIVERSITY_CATEGORIES = ('code', 'config_script', 'docs', 'task', 'other')
+
+# Multiplicative file type boosts for query keywords:
+# (query keywords, file types, file name substrings, file name suffixes, factor)
+KEYWORD_FILE_TYPE_BOOSTS = (
+    (('setup', 'install'), ('setup', 'config', 'dependency', 'script'), ('setup',), (), 1.2),
+    (('script',), ('script', 'python', 'javascript'), (), ('.bat', '.sh', '.ps1'), 1.2),
+    (('config', 'configuration'), ('config', 'dependency'), (), (), 1.2),
+    (('test', 'testing'), ('test',), (), (), 1.3),
+    (('build', 'deploy'), ('build', 'dependency', 'script'), (), (), 1.2),
+)
+
+# Additive exact match boosts for file names:
+# (query keywords, file name substrings, file name suffixes, boost)
+FILE_NAME_MATCH_BOOSTS = (
+    # Setup files in setup queries
+    (('setup', 'install', 'configure'),
+     ('setup_windows.bat', 'setup_windows.ps1', 'setup_linux.sh', 'setup.py', 'install.bat'), (), 0.9),
+    # Platform-specific files
+    (('windows',), ('windows',), (), 0.7),
+    (('linux',), ('linux',), (), 0.7),
+    # File extensions matching the query context
+    (('windows', 'bat'), (), ('.bat',), 0.5),
+    (('powershell', 'ps1', 'windows'), (), ('.ps1',), 0.5),
+    (('linux', 'bash', 'shell'), (), ('.sh',), 0.5),
+)
+ROOT_FILE_QUERY_TERMS = ('setup', 'install', 'configure', 'run', 'launch')
+
+def find_embeddings_directory(project_root: Path) -> Path:
+    """
+    Find the embeddings directory of a project by searching in its root and parent directories.
+
+    Args:
+        project_root: Root directory of the project
+
+    Returns:
+        Path to the embeddings directory
+    """
+    # List of potential locations to search for .index/embeddings
+    search_paths = [
+        project_root / ".index" / "embeddings",  # In project root
+        project_root.parent / ".index" / "embeddings",  # In parent directory
+        project_root.parent.parent / ".index" / "embeddings",  # In grandparent directory
+    ]
+
+    # Also check if project_root itself contains 'taskheroai' and adjust accordingly
+    if 'taskheroai' in str(project_root).lower():
+        # If project_root points to taskheroai directory, check parent
+        parent_path = project_root.parent / ".index" / "embeddings"
+        if parent_path not in search_paths:
+            search_paths.insert(1, parent_path)
+
+    # Search for an existing index store or legacy embeddings directory
+    for embeddings_path in search_paths:
+        if IndexStore.exists(str(embeddings_path.parent)):
+            logger.info(f"Found index store at: {embeddings_path.parent}")
+            return embeddings_path
+        if embeddings_path.exists() and embeddings_path.is_dir():
+            # Check if it contains any .json files (embedding files)
+            if any(embeddings_path.glob("*.json")):
+                logger.info(f"Found embeddings directory at: {embeddings_path}")
+                return embeddings_path
+            else:
+                logger.debug(f"Embeddings directory exists but is empty: {embeddings_path}")
+
+    # If no existing embeddings found, use the default location (project root)
+    default_path = project_root / ".index" / "embeddings"
+    logger.warning(f"No existing embeddings found. Will use default location: {default_path}")
+
+    # Log all searched paths for debugging
+    logger.debug(f"Searched paths: {[str(p) for p in search_paths]}")
+
+    return default_path
+
 @dataclass
 class ContextChunk:
     """Represents a chunk of context with metadata."""
@@ -40,6 +123,26 @@ class ContextChunk:
     file_name: str = ""
     file_type: str = ""
     last_modified: Optional[float] = None
+    chunk_index: int = -1                   # position among the stored chunks of the file
+
+@dataclass
+class ChunkFeatures:
+    """Arrays the relevance boosts are computed from, aligned with the searched chunks."""
+    file_index: np.ndarray                  # chunk -> file
+    chunk_type_index: np.ndarray            # chunk -> chunk_types
+    chunk_types: List[str]
+    confidence: np.ndarray
+    last_modified: np.ndarray               # NaN where unknown
+    length_boost: np.ndarray
+    categories: np.ndarray                  # chunk -> DIVERSITY_CATEGORIES
+    file_type_index: np.ndarray             # file -> file_types
+    file_types: List[str]
+    name_parts: Dict[str, np.ndarray]       # component of a compound file name -> files
+    plain_names: np.ndarray                 # lower-case names without '_' or '-'
+    plain_name_files: np.ndarray
+    is_root_file: np.ndarray
+    keyword_name_matches: List[np.ndarray]  # per KEYWORD_FILE_TYPE_BOOSTS rule -> files
+    file_name_matches: List[np.ndarray]     # per FILE_NAME_MATCH_BOOSTS rule -> files
 
 @dataclass
 class SearchResult:
@@ -61,38 +164,87 @@ class SemanticSearchEngine:
     - Performance optimization with caching
     """
 
-    def __init__(self, project_root: str, similarity_threshold: float = 0.1):
+    def __init__(self, project_root: str, similarity_threshold: float = 0.1,
+                 retrieval: Optional[RetrievalService] = None):
         """
         Initialize the semantic search engine.
 
         Args:
             project_root: Root directory of the project
             similarity_threshold: Minimum similarity score for results
+            retrieval: Retrieval service of the index to search. The caller keeps its
+                reference; if None, the engine acquires the service of the index it finds
+                once an index store exists and releases it in close()
         """
         self.project_root = Path(project_root)
-        self.embeddings_dir = self._find_embeddings_directory()
+        if retrieval is not None:
+            self.embeddings_dir = Path(retrieval.index_dir) / "embeddings"
+        else:
+            self.embeddings_dir = self._find_embeddings_directory()
         self.similarity_threshold = similarity_threshold
 
-        # Initialize vectorizer with optimized parameters
-        self.vectorizer = TfidfVectorizer(
-            max_features=10000,
-            stop_words='english',
-            ngram_range=(1, 2),
-            min_df=1,
-            max_df=0.95,
-            lowercase=True,
-            strip_accents='unicode'
-        )
-
-        # Cache for processed chunks and vectors
-        self._chunks_cache: Optional[List[ContextChunk]] = None
-        self._vectors_cache: Optional[np.ndarray] = None
-        self._last_cache_time: float = 0
-        self._cache_ttl: float = 300  # 5 minutes cache TTL
+        # Incremental TF-IDF model of the indexed chunks, kept in step with the index
+        # store through change notifications of the retrieval service
+        self._tfidf_index: Optional[TfidfIndex] = None
+        self._file_chunks: Dict[str, List[ContextChunk]] = {}
+        self._retrieval: Optional[RetrievalService] = retrieval
+        self._owns_retrieval: bool = False
+        self._index_changed: bool = True
+        if retrieval is not None:
+            retrieval.subscribe(self._on_index_changed)
+        self._rows_version: int = -1
+        self._live_rows: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._live_chunks: List[ContextChunk] = []
+        self._chunk_features: Optional[ChunkFeatures] = None
+        # Chunk ids shared with the other rankers of hybrid search, and their sort order
+        self._live_ids: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._live_id_order: np.ndarray = np.zeros(0, dtype=np.int64)
 
         logger.info(f"Initialized SemanticSearchEngine with threshold {similarity_threshold}")
         logger.info(f"Using embeddings directory: {self.embeddings_dir}")
 
+    @classmethod
+    def shared(cls, retrieval: RetrievalService, project_root: str,
+               similarity_threshold: float = 0.1) -> 'SemanticSearchEngine':
+        """
+        Get the engine shared by every front-end searching the index of a retrieval service.
+
+        The engine and its TF-IDF model are built once per process and dropped with the
+        service, so callers must hold a reference to the service while they use it.
+
+        Args:
+            retrieval: Retrieval service of the index to search
+            project_root: Root directory of the project
+            similarity_threshold: Minimum similarity score for results
+
+        Returns:
+            The shared SemanticSearchEngine
+        """
+        return retrieval.shared(
+            ('semantic_search', similarity_threshold),
+            lambda: cls(project_root, similarity_threshold, retrieval=retrieval)
+        )
+
+    def close(self):
+        """Release the retrieval service if the engine acquired it itself."""
+        retrieval, self._retrieval = self._retrieval, None
+        if retrieval is not None:
+            retrieval.unsubscribe(self._on_index_changed)
+            if self._owns_retrieval:
+                retrieval.release()
+        self._owns_retrieval = False
+        self._index_changed = True
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _on_index_changed(self, updated: Optional[List[str]], removed: Optional[List[str]]):
+        """Mark the TF-IDF index for a sync with the index store on the next search."""
+        self._index_changed = True
+
     def _find_embeddings_directory(self) -> Path:
         """
         Find the correct embeddings directory by searching in project root and parent directories.
@@ -100,88 +252,220 @@ class SemanticSearchEngine:
         Returns:
             Path to the embeddings directory
         """
-        # List of potential locations to search for .index/embeddings
-        search_paths = [
-            self.project_root / ".index" / "embeddings",  # In project root
-            self.project_root.parent / ".index" / "embeddings",  # In parent directory
-            self.project_root.parent.parent / ".index" / "embeddings",  # In grandparent directory
-        ]
-
-        # Also check if project_root itself contains 'taskheroai' and adjust accordingly
-        if 'taskheroai' in str(self.project_root).lower():
-            # If project_root points to taskheroai directory, check parent
-            parent_path = self.project_root.parent / ".index" / "embeddings"
-            if parent_path not in search_paths:
-                search_paths.insert(1, parent_path)
-
-        # Search for existing embeddings directory
-        for embeddings_path in search_paths:
-            if embeddings_path.exists() and embeddings_path.is_dir():
-                # Check if it contains any .json files (embedding files)
-                if any(embeddings_path.glob("*.json")):
-                    logger.info(f"Found embeddings directory at: {embeddings_path}")
-                    return embeddings_path
-                else:
-                    logger.debug(f"Embeddings directory exists but is empty: {embeddings_path}")
-
-        # If no existing embeddings found, use the default location (project root)
-        default_path = self.project_root / ".index" / "embeddings"
-        logger.warning(f"No existing embeddings found. Will use default location: {default_path}")
-
-        # Log all searched paths for debugging
-        logger.debug(f"Searched paths: {[str(p) for p in search_paths]}")
-
-        return default_path
+        return find_embeddings_directory(self.project_root)
+
+    def _build_context_chunks(self, file_path: str, chunks_data: List[Dict[str, Any]],
+                              last_modified: Optional[float]) -> List[ContextChunk]:
+        """
+        Convert stored chunk dictionaries of one file into ContextChunk objects.
+
+        Args:
+            file_path: Path of the source file
+            chunks_data: Chunk dictionaries as stored in the index
+            last_modified: Modification timestamp for freshness scoring
+
+        Returns:
+            List of ContextChunk objects with meaningful text
+        """
+        file_name = Path(file_path).name
+        file_type = self._determine_file_type(file_name)
+        chunks = []
+
+        for chunk_index, chunk_data in enumerate(chunks_data):
+            chunk = ContextChunk(
+                text=chunk_data.get('text', ''),
+                file_path=file_path,
+                chunk_type=chunk_data.get('type', 'unknown'),
+                start_line=chunk_data.get('start_line', 0),
+                end_line=chunk_data.get('end_line', 0),
+                confidence=chunk_data.get('confidence', 1.0),
+                file_name=file_name,
+                file_type=file_type,
+                last_modified=last_modified,
+                chunk_index=chunk_index
+            )
+
+            # Only include chunks with meaningful text
+            if chunk.text.strip() and len(chunk.text.strip()) > 10:
+                chunks.append(chunk)
+
+        return chunks
 
     def _load_chunks_from_embeddings(self) -> List[ContextChunk]:
         """
-        Load and process chunks from existing embedding files.
+        Load and process chunks from the index store (or legacy embedding files).
 
         Returns:
             List of ContextChunk objects
         """
-        chunks = []
+        self._refresh_index()
+        return list(self._live_chunks)
+
+    def _refresh_index(self):
+        """
+        Bring the TF-IDF index up to date with the indexed chunks.
+
+        Only files whose content changed since the last refresh are re-analyzed. With an
+        index store nothing is read at all until its manifest changes.
+        """
+        index_dir = str(self.embeddings_dir.parent)
+        if IndexStore.exists(index_dir):
+            self._refresh_from_store(index_dir)
+        else:
+            self._refresh_from_embedding_files()
+
+        index = self._tfidf_index
+        if index is not None and index.version != self._rows_version:
+            rows, keys = index.live_rows()
+            self._live_rows = rows
+            self._live_chunks = [self._file_chunks[path][chunk_index] for path, chunk_index in keys]
+            self._chunk_features = self._build_chunk_features(self._live_chunks)
+            self._live_ids = chunk_ids.chunk_ids(
+                [chunk.file_path for chunk in self._live_chunks],
+                np.fromiter((chunk.chunk_index for chunk in self._live_chunks), dtype=np.int64,
+                            count=len(self._live_chunks))
+            )
+            self._live_id_order = np.argsort(self._live_ids, kind='stable')
+            self._rows_version = index.version
+
+    def _refresh_from_store(self, index_dir: str):
+        """
+        Apply index store changes to the TF-IDF index.
+
+        Nothing is read while the retrieval service reports no change.
+
+        Args:
+            index_dir: Directory containing the index store
+        """
+        if self._retrieval is None:
+            self._retrieval = RetrievalService.acquire(index_dir)
+            self._owns_retrieval = True
+            self._retrieval.subscribe(self._on_index_changed)
+        # Picks up writes by other processes; the indexer pushes its own changes
+        self._retrieval.refresh()
+        if self._tfidf_index is not None and not self._index_changed:
+            return
+        self._index_changed = False
+        store = self._retrieval.store
+
+        index_path = TfidfIndex.path_for(store.store_dir)
+        save = False
+        if self._tfidf_index is None:
+            self._tfidf_index = TfidfIndex.load(index_path)
+            save = self._tfidf_index is None
+            if save:
+                self._tfidf_index = TfidfIndex()
+
+        entries = {path: entry.get('hash') for path, entry in store.iter_entries()}
+        self._sync_tfidf_index(entries, lambda paths: self._read_store_chunks(store, paths, len(entries)))
+        self._tfidf_index.generation = store.vector_generation
+        self._tfidf_index.schedule_maintenance(index_path, save=save)
+
+    def _read_store_chunks(self, store: IndexStore, paths: List[str],
+                           total_files: int) -> Iterator[Tuple[str, List[ContextChunk]]]:
+        """
+        Read the chunks of indexed files from the index store.
+
+        Args:
+            store: The index store
+            paths: Paths of the files to read
+            total_files: Number of files in the store
+
+        Yields:
+            Tuples of (file path, ContextChunk objects)
+        """
+        wanted = set(paths)
+        if len(wanted) > total_files // 2:
+            # Reading whole segments sequentially beats seeking to most of their records
+            records = (record for record, _ in store.iter_records() if record['path'] in wanted)
+        else:
+            records = (record for record in map(store.get_record, paths) if record is not None)
+
+        for record in records:
+            yield record['path'], self._build_context_chunks(
+                record['path'], record.get('chunks', []), record.get('modified_time')
+            )
 
+    def _refresh_from_embedding_files(self):
+        """Apply changed legacy embedding files to the TF-IDF index."""
         if not self.embeddings_dir.exists():
-            logger.warning(f"Embeddings directory not found: {self.embeddings_dir}")
-            logger.info(f"Project root was set to: {self.project_root}")
-            logger.info("Please ensure the project has been indexed and embeddings have been generated.")
-            return chunks
+            if self._tfidf_index is None:
+                logger.warning(f"Embeddings directory not found: {self.embeddings_dir}")
+                logger.info(f"Project root was set to: {self.project_root}")
+                logger.info("Please ensure the project has been indexed and embeddings have been generated.")
+                return
+            entries = {}
+        else:
+            # One directory scan; files count as changed when their mtime or size differs
+            entries = {}
+            with os.scandir(self.embeddings_dir) as scan:
+                for entry in scan:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        stat = entry.stat()
+                        entries[entry.path] = f"{stat.st_mtime_ns}:{stat.st_size}"
+
+        if self._tfidf_index is None:
+            self._tfidf_index = TfidfIndex()
+        self._sync_tfidf_index(entries, self._read_embedding_files)
+
+    def _read_embedding_files(self, paths: List[str]) -> Iterator[Tuple[str, List[ContextChunk]]]:
+        """
+        Read the chunks of legacy embedding files.
+
+        Args:
+            paths: Paths of the embedding files to read
 
-        for embedding_file in self.embeddings_dir.glob("*.json"):
+        Yields:
+            Tuples of (embedding file path, ContextChunk objects)
+        """
+        for embedding_file in paths:
             try:
                 with open(embedding_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
 
-                file_path = data.get('path', str(embedding_file))
-                file_name = Path(file_path).name
-                file_type = self._determine_file_type(file_name)
-                last_modified = embedding_file.stat().st_mtime
-
-                # Process chunks from the file
-                for chunk_data in data.get('chunks', []):
-                    chunk = ContextChunk(
-                        text=chunk_data.get('text', ''),
-                        file_path=file_path,
-                        chunk_type=chunk_data.get('type', 'unknown'),
-                        start_line=chunk_data.get('start_line', 0),
-                        end_line=chunk_data.get('end_line', 0),
-                        confidence=chunk_data.get('confidence', 1.0),
-                        file_name=file_name,
-                        file_type=file_type,
-                        last_modified=last_modified
-                    )
-
-                    # Only include chunks with meaningful text
-                    if chunk.text.strip() and len(chunk.text.strip()) > 10:
-                        chunks.append(chunk)
-
+                chunks = self._build_context_chunks(
+                    data.get('path', embedding_file), data.get('chunks', []), os.path.getmtime(embedding_file)
+                )
             except Exception as e:
                 logger.error(f"Error loading embedding file {embedding_file}: {e}")
                 continue
+            yield embedding_file, chunks
 
-        logger.info(f"Loaded {len(chunks)} chunks from {len(list(self.embeddings_dir.glob('*.json')))} files")
-        return chunks
+    def _sync_tfidf_index(self, entries: Dict[str, Optional[str]],
+                          read_chunks: Callable[[List[str]], Iterable[Tuple[str, List[ContextChunk]]]]):
+        """
+        Re-analyze the files whose hash differs from the TF-IDF index and drop deleted ones.
+
+        Args:
+            entries: Mapping of every indexed file to its current content hash
+            read_chunks: Callable reading the chunks of the given files
+        """
+        index = self._tfidf_index
+        known = index.file_hashes()
+        removed = [path for path in known if path not in entries]
+        changed = {path for path, file_hash in entries.items() if path not in known or known[path] != file_hash}
+        # A freshly loaded index has rows but no ContextChunk objects for them yet
+        missing = [path for path in entries if path not in self._file_chunks and path not in changed]
+
+        updates = []
+        loaded = set()
+        for path, chunks in read_chunks(sorted(changed) + missing):
+            loaded.add(path)
+            self._file_chunks[path] = chunks
+            if path in changed or index.file_row_count(path) != len(chunks):
+                updates.append((path, entries[path], [chunk.text for chunk in chunks]))
+
+        # Files that could not be read are left out until they change again
+        removed.extend(path for path in missing if path not in loaded)
+        removed.extend(path for path in changed if path not in loaded and path in known)
+        for path in removed:
+            self._file_chunks.pop(path, None)
+
+        index.remove_files(removed)
+        index.update_files(updates)
+        if updates or removed:
+            logger.info(f"Updated TF-IDF index: {len(updates)} files analyzed, {len(removed)} removed, "
+                        f"{index.row_count} chunks from {index.file_count} files")
 
     def _determine_file_type(self, file_name: str) -> str:
         """
@@ -265,34 +549,6 @@ class SemanticSearchEngine:
         else:
             return 'other'
 
-    def _get_cached_data(self) -> Tuple[Optional[List[ContextChunk]], Optional[np.ndarray]]:
-        """
-        Get cached chunks and vectors if still valid.
-
-        Returns:
-            Tuple of (chunks, vectors) or (None, None) if cache invalid
-        """
-        current_time = time.time()
-
-        if (self._chunks_cache is not None and
-            self._vectors_cache is not None and
-            current_time - self._last_cache_time < self._cache_ttl):
-            return self._chunks_cache, self._vectors_cache
-
-        return None, None
-
-    def _update_cache(self, chunks: List[ContextChunk], vectors: np.ndarray):
-        """
-        Update the cache with new data.
-
-        Args:
-            chunks: List of context chunks
-            vectors: TF-IDF vectors
-        """
-        self._chunks_cache = chunks
-        self._vectors_cache = vectors
-        self._last_cache_time = time.time()
-
     def _preprocess_query(self, query: str) -> str:
         """
         Preprocess and expand the search query with enhanced intelligence.
@@ -470,7 +726,7 @@ class SemanticSearchEngine:
             boost_factors = self._calculate_file_type_boost(chunk, query_lower, query_intent)
 
             # Chunk type relevance
-            boost_factors *= self._calculate_chunk_type_boost(chunk, query_intent)
+            boost_factors *= self._calculate_chunk_type_boost(chunk.chunk_type, query_intent)
 
             # Confidence boost
             boost_factors *= chunk.confidence
@@ -486,6 +742,213 @@ class SemanticSearchEngine:
 
         return chunks
 
+    def _build_chunk_features(self, chunks: List[ContextChunk]) -> ChunkFeatures:
+        """
+        Precompute the per-chunk and per-file arrays the vectorized relevance scoring uses.
+
+        Args:
+            chunks: Chunks in search order
+
+        Returns:
+            ChunkFeatures aligned with the chunks
+        """
+        count = len(chunks)
+        file_ids: Dict[str, int] = {}
+        file_chunks: List[ContextChunk] = []
+        chunk_type_ids: Dict[str, int] = {}
+        file_index = np.empty(count, dtype=np.int32)
+        chunk_type_index = np.empty(count, dtype=np.int32)
+        confidence = np.empty(count, dtype=np.float64)
+        last_modified = np.full(count, np.nan)
+        length_boost = np.empty(count, dtype=np.float64)
+
+        for i, chunk in enumerate(chunks):
+            file_id = file_ids.get(chunk.file_path)
+            if file_id is None:
+                file_id = file_ids[chunk.file_path] = len(file_chunks)
+                file_chunks.append(chunk)
+            file_index[i] = file_id
+            chunk_type_index[i] = chunk_type_ids.setdefault(chunk.chunk_type, len(chunk_type_ids))
+            confidence[i] = chunk.confidence
+            if chunk.last_modified:
+                last_modified[i] = chunk.last_modified
+            length_boost[i] = self._calculate_length_boost(chunk)
+
+        names = [chunk.file_name.lower() for chunk in file_chunks]
+        file_type_ids: Dict[str, int] = {}
+        file_type_index = np.array([file_type_ids.setdefault(chunk.file_type, len(file_type_ids))
+                                    for chunk in file_chunks], dtype=np.int32)
+        type_categories = np.array([DIVERSITY_CATEGORIES.index(self._diversity_category(file_type))
+                                    for file_type in file_type_ids], dtype=np.int8)
+        categories = type_categories[file_type_index[file_index]] if count else np.zeros(0, dtype=np.int8)
+
+        # Compound names ("setup_windows.bat") match whole components, other names any substring
+        name_parts: Dict[str, List[int]] = {}
+        plain_name_files = []
+        for file_id, name in enumerate(names):
+            if '_' in name or '-' in name:
+                for part in set(name.replace('_', ' ').replace('-', ' ').split()):
+                    name_parts.setdefault(part, []).append(file_id)
+            else:
+                plain_name_files.append(file_id)
+
+        def files_matching(name_substrings: Tuple[str, ...], name_suffixes: Tuple[str, ...]) -> np.ndarray:
+            return np.array([any(part in name for part in name_substrings) or name.endswith(name_suffixes)
+                             for name in names], dtype=bool)
+
+        return ChunkFeatures(
+            file_index=file_index,
+            chunk_type_index=chunk_type_index,
+            chunk_types=list(chunk_type_ids),
+            confidence=confidence,
+            last_modified=last_modified,
+            length_boost=length_boost,
+            categories=categories,
+            file_type_index=file_type_index,
+            file_types=list(file_type_ids),
+            name_parts={part: np.array(files, dtype=np.int32) for part, files in name_parts.items()},
+            plain_names=np.array([names[file_id] for file_id in plain_name_files], dtype=str),
+            plain_name_files=np.array(plain_name_files, dtype=np.int32),
+            is_root_file=np.array([
+                '/' not in chunk.file_path.strip('/') and '\\' not in chunk.file_path.strip('\\')
+                for chunk in file_chunks
+            ], dtype=bool),
+            keyword_name_matches=[files_matching(name_parts_rule, suffixes)
+                                  for _, _, name_parts_rule, suffixes, _ in KEYWORD_FILE_TYPE_BOOSTS],
+            file_name_matches=[files_matching(name_parts_rule, suffixes)
+                               for _, name_parts_rule, suffixes, _ in FILE_NAME_MATCH_BOOSTS],
+        )
+
+    def _score_chunks(self, features: ChunkFeatures, similarities: np.ndarray,
+                      query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every chunk with array operations.
+
+        This is the vectorized form of _calculate_exact_match_boost and
+        _calculate_relevance_scores; the two must stay in step.
+
+        Args:
+            features: Precomputed chunk features
+            similarities: Cosine similarity of every chunk
+            query: Original search query
+
+        Returns:
+            Tuple of (exact match boosts, relevance scores) per chunk
+        """
+        query_lower = query.lower()
+        query_intent = self._classify_query_intent(query_lower)
+
+        exact_match_boosts = self._exact_match_boosts(features, query_lower)[features.file_index]
+
+        chunk_type_boosts = np.array([self._calculate_chunk_type_boost(chunk_type, query_intent)
+                                      for chunk_type in features.chunk_types], dtype=np.float64)
+        boost_factors = self._file_type_boosts(features, query_lower, query_intent)[features.file_index]
+        if len(chunk_type_boosts):
+            boost_factors *= chunk_type_boosts[features.chunk_type_index]
+        boost_factors *= features.confidence
+        boost_factors *= self._freshness_boosts(features.last_modified)
+        boost_factors *= features.length_boost
+
+        return exact_match_boosts, similarities * boost_factors + exact_match_boosts
+
+    def _exact_match_boosts(self, features: ChunkFeatures, query_lower: str) -> np.ndarray:
+        """
+        Vectorized _calculate_exact_match_boost.
+
+        Args:
+            features: Precomputed chunk features
+            query_lower: Lowercase query string
+
+        Returns:
+            Exact match boost of every file
+        """
+        boosts = np.zeros(len(features.file_type_index), dtype=np.float64)
+
+        for term in query_lower.split():
+            if len(term) > 2:  # Skip very short terms
+                compound_files = features.name_parts.get(term)
+                if compound_files is not None:
+                    boosts[compound_files] += 0.8
+                if len(features.plain_names):
+                    boosts[features.plain_name_files[np.char.find(features.plain_names, term) >= 0]] += 0.6
+
+        for (keywords, _, _, match_boost), files in zip(FILE_NAME_MATCH_BOOSTS, features.file_name_matches):
+            if any(keyword in query_lower for keyword in keywords):
+                boosts[files] += match_boost
+
+        if any(setup_term in query_lower for setup_term in ROOT_FILE_QUERY_TERMS):
+            boosts[features.is_root_file] += 0.3
+
+        return boosts
+
+    def _file_type_boosts(self, features: ChunkFeatures, query_lower: str, query_intent: str) -> np.ndarray:
+        """
+        Vectorized _calculate_file_type_boost.
+
+        Args:
+            features: Precomputed chunk features
+            query_lower: Lowercase query string
+            query_intent: Classified query intent
+
+        Returns:
+            File type boost of every file
+        """
+        type_boosts = np.array([self._file_type_intent_boost(file_type, query_intent)
+                                for file_type in features.file_types], dtype=np.float64)
+        boosts = type_boosts[features.file_type_index] if len(type_boosts) else np.zeros(0, dtype=np.float64)
+
+        for (keywords, boosted_types, _, _, factor), name_matches in zip(KEYWORD_FILE_TYPE_BOOSTS,
+                                                                          features.keyword_name_matches):
+            if any(keyword in query_lower for keyword in keywords):
+                type_matches = np.array([file_type in boosted_types for file_type in features.file_types], dtype=bool)
+                boosts[type_matches[features.file_type_index] | name_matches] *= factor
+
+        return boosts
+
+    def _freshness_boosts(self, last_modified: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_freshness_boost over modification times (NaN when unknown)."""
+        days_old = (time.time() - last_modified) / (24 * 3600)
+        boosts = np.ones(len(last_modified), dtype=np.float64)
+        boosts[days_old < 30] = 1.05  # Files modified in last month
+        boosts[days_old < 7] = 1.1  # Files modified in last week
+        return boosts
+
+    def _top_candidates(self, relevance: np.ndarray, valid: np.ndarray, categories: np.ndarray,
+                        max_results: int) -> np.ndarray:
+        """
+        Find the valid chunks diversity-aware selection can pick from, best first.
+
+        Those are the best max_results + 1 chunks overall and the best max_results of every
+        diversity category, with ties at the cut-off kept, so _select_diverse_chunks picks
+        the same chunks as it would from all valid chunks.
+
+        Args:
+            relevance: Relevance score of every chunk
+            valid: Mask of chunks passing the similarity threshold
+            categories: Diversity category of every chunk
+            max_results: Maximum number of results to return
+
+        Returns:
+            Chunk indices sorted by descending relevance, ties in chunk order
+        """
+        valid_ids = np.flatnonzero(valid)
+        limit = max(max_results, 1)
+        groups = [(valid_ids, limit + 1)]
+        valid_categories = categories[valid_ids]
+        groups.extend((valid_ids[valid_categories == category], limit)
+                      for category in range(len(DIVERSITY_CATEGORIES)))
+
+        candidates = np.zeros(len(relevance), dtype=bool)
+        for ids, count in groups:
+            if len(ids) > count:
+                scores = relevance[ids]
+                cutoff = np.partition(scores, len(scores) - count)[len(scores) - count]
+                ids = ids[scores >= cutoff]
+            candidates[ids] = True
+
+        candidate_ids = np.flatnonzero(candidates)
+        return candidate_ids[np.argsort(-relevance[candidate_ids], kind='stable')]
+
     def _classify_query_intent(self, query_lower: str) -> str:
         """
         Classify the intent of the query to determine appropriate scoring strategy.
@@ -542,17 +1005,39 @@ class SemanticSearchEngine:
             query_lower: Lowercase query string
             query_intent: Classified query intent
 
+        Returns:
+            File type boost factor
+        """
+        boost = self._file_type_intent_boost(chunk.file_type, query_intent)
+
+        # Additional specific keyword matching (reduced impact)
+        file_name = chunk.file_name.lower()
+        for keywords, file_types, name_parts, name_suffixes, factor in KEYWORD_FILE_TYPE_BOOSTS:
+            if any(keyword in query_lower for keyword in keywords):
+                if (chunk.file_type in file_types or any(part in file_name for part in name_parts)
+                        or file_name.endswith(name_suffixes)):
+                    boost *= factor
+
+        return boost
+
+    def _file_type_intent_boost(self, file_type: str, query_intent: str) -> float:
+        """
+        Calculate the part of the file type boost that depends only on the query intent.
+
+        Args:
+            file_type: File type category of the chunk
+            query_intent: Classified query intent
+
         Returns:
             File type boost factor
         """
         boost = 1.0
-        file_type = chunk.file_type
 
         # Define file type groups for easier scoring
-        code_files = ['python', 'javascript', 'java_family', 'cpp', 'rust', 'go', 'php', 'ruby']
-        config_files = ['config', 'dependency', 'build']
-        script_files = ['script', 'setup']
-        doc_files = ['documentation', 'markdown']
+        code_files = list(CODE_FILE_TYPES)
+        config_files = list(CONFIG_FILE_TYPES)
+        script_files = list(SCRIPT_FILE_TYPES)
+        doc_files = list(DOC_FILE_TYPES)
 
         # Intent-based scoring with balanced approach
         if query_intent == 'technical':
@@ -612,42 +1097,20 @@ class SemanticSearchEngine:
             elif file_type in config_files:
                 boost *= 1.05
 
-        # Additional specific keyword matching (reduced impact)
-        if 'setup' in query_lower or 'install' in query_lower:
-            if file_type in ['setup', 'config', 'dependency', 'script'] or 'setup' in chunk.file_name.lower():
-                boost *= 1.2
-
-        if 'script' in query_lower:
-            if file_type in ['script', 'python', 'javascript'] or chunk.file_name.lower().endswith(('.bat', '.sh', '.ps1')):
-                boost *= 1.2
-
-        if 'config' in query_lower or 'configuration' in query_lower:
-            if file_type in ['config', 'dependency']:
-                boost *= 1.2
-
-        if 'test' in query_lower or 'testing' in query_lower:
-            if file_type == 'test':
-                boost *= 1.3
-
-        if 'build' in query_lower or 'deploy' in query_lower:
-            if file_type in ['build', 'dependency', 'script']:
-                boost *= 1.2
-
         return boost
 
-    def _calculate_chunk_type_boost(self, chunk: ContextChunk, query_intent: str) -> float:
+    def _calculate_chunk_type_boost(self, chunk_type: str, query_intent: str) -> float:
         """
         Calculate chunk type boost based on query intent.
 
         Args:
-            chunk: Context chunk to score
+            chunk_type: Type of the chunk
             query_intent: Classified query intent
 
         Returns:
             Chunk type boost factor
         """
         boost = 1.0
-        chunk_type = chunk.chunk_type
 
         if query_intent == 'technical':
             if chunk_type == 'function_definition':
@@ -719,29 +1182,15 @@ class SemanticSearchEngine:
                     else:
                         boost += 0.6  # High boost for substring match
 
-        # Special handling for setup-related queries
-        if any(setup_term in query_lower for setup_term in ['setup', 'install', 'configure']):
-            setup_files = ['setup_windows.bat', 'setup_windows.ps1', 'setup_linux.sh', 'setup.py', 'install.bat']
-            if any(setup_file in file_name for setup_file in setup_files):
-                boost += 0.9  # Maximum boost for setup files in setup queries
-
-        # Windows/Linux platform-specific matching
-        if 'windows' in query_lower and 'windows' in file_name:
-            boost += 0.7  # High boost for Windows-specific files
-        if 'linux' in query_lower and 'linux' in file_name:
-            boost += 0.7  # High boost for Linux-specific files
-
-        # File extension prioritization based on query context
-        if file_name.endswith('.bat') and ('windows' in query_lower or 'bat' in query_lower):
-            boost += 0.5  # High boost for .bat files in Windows queries
-        if file_name.endswith('.ps1') and ('powershell' in query_lower or 'ps1' in query_lower or 'windows' in query_lower):
-            boost += 0.5  # High boost for PowerShell files
-        if file_name.endswith('.sh') and ('linux' in query_lower or 'bash' in query_lower or 'shell' in query_lower):
-            boost += 0.5  # High boost for shell scripts
+        # Setup, platform-specific and extension matches for the query context
+        for keywords, name_parts, name_suffixes, match_boost in FILE_NAME_MATCH_BOOSTS:
+            if any(keyword in query_lower for keyword in keywords):
+                if any(part in file_name for part in name_parts) or file_name.endswith(name_suffixes):
+                    boost += match_boost
 
         # Root directory boost for setup-related queries
         is_root_file = '/' not in chunk.file_path.strip('/') and '\\' not in chunk.file_path.strip('\\')
-        if is_root_file and any(setup_term in query_lower for setup_term in ['setup', 'install', 'configure', 'run', 'launch']):
+        if is_root_file and any(setup_term in query_lower for setup_term in ROOT_FILE_QUERY_TERMS):
             boost += 0.3  # Significant boost for root setup files
 
         return boost
@@ -808,21 +1257,8 @@ class SemanticSearchEngine:
             'other': []
         }
 
-        code_files = ['python', 'javascript', 'java_family', 'cpp', 'rust', 'go', 'php', 'ruby']
-        config_script_files = ['config', 'dependency', 'build', 'script', 'setup']
-        doc_files = ['documentation', 'markdown']
-
         for chunk in chunks:
-            if chunk.file_type in code_files or chunk.file_type == 'test':
-                categorized_chunks['code'].append(chunk)
-            elif chunk.file_type in config_script_files:
-                categorized_chunks['config_script'].append(chunk)
-            elif chunk.file_type in doc_files:
-                categorized_chunks['docs'].append(chunk)
-            elif chunk.file_type == 'task' or chunk.file_type == 'template':
-                categorized_chunks['task'].append(chunk)
-            else:
-                categorized_chunks['other'].append(chunk)
+            categorized_chunks[self._diversity_category(chunk.file_type)].append(chunk)
 
         # Select chunks according to target ratios, but prioritize relevance within each category
         for category, target_count in target_counts.items():
@@ -849,6 +1285,26 @@ class SemanticSearchEngine:
 
         return selected_chunks[:max_results]
 
+    def _diversity_category(self, file_type: str) -> str:
+        """
+        Get the group a file type counts towards in diversity-aware selection.
+
+        Args:
+            file_type: File type category
+
+        Returns:
+            One of DIVERSITY_CATEGORIES
+        """
+        if file_type in CODE_FILE_TYPES or file_type == 'test':
+            return 'code'
+        elif file_type in CONFIG_FILE_TYPES + SCRIPT_FILE_TYPES:
+            return 'config_script'
+        elif file_type in DOC_FILE_TYPES:
+            return 'docs'
+        elif file_type == 'task' or file_type == 'template':
+            return 'task'
+        return 'other'
+
     def search_multi_query(self, query: str, max_results: int = 10,
                           file_types: Optional[List[str]] = None) -> SearchResult:
         """
@@ -1024,91 +1480,121 @@ class SemanticSearchEngine:
         """
         start_time = time.time()
 
-        # Check cache first
-        cached_chunks, cached_vectors = self._get_cached_data()
+        # Apply index changes to the TF-IDF model
+        self._refresh_index()
+        chunks = self._live_chunks
+        features = self._chunk_features
 
-        if cached_chunks is None or cached_vectors is None:
-            # Load and process chunks
-            chunks = self._load_chunks_from_embeddings()
-
-            if not chunks:
-                return SearchResult(
-                    query=query,
-                    chunks=[],
-                    total_chunks=0,
-                    search_time=time.time() - start_time,
-                    similarity_threshold=self.similarity_threshold
-                )
+        if not chunks:
+            return SearchResult(
+                query=query,
+                chunks=[],
+                total_chunks=0,
+                search_time=time.time() - start_time,
+                similarity_threshold=self.similarity_threshold
+            )
+
+        relevance, valid = self._score_query(query, file_types)
+
+        # Only the chunks diversity-aware selection can pick get their scores and are sorted
+        valid_chunks = []
+        for index in self._top_candidates(relevance, valid, features.categories, max_results):
+            chunk = chunks[index]
+            chunk.relevance_score = relevance[index]
+            valid_chunks.append(chunk)
 
-            # Create TF-IDF vectors
-            chunk_texts = [chunk.text for chunk in chunks]
-            vectors = self.vectorizer.fit_transform(chunk_texts)
+        # Apply diversity-aware selection for balanced context
+        result_chunks = self._select_diverse_chunks(valid_chunks, max_results, query)
 
-            # Update cache
-            self._update_cache(chunks, vectors)
-        else:
-            chunks, vectors = cached_chunks, cached_vectors
+        search_time = time.time() - start_time
 
-        # Filter by file types if specified
-        if file_types:
-            filtered_indices = []
-            filtered_chunks = []
-            for i, chunk in enumerate(chunks):
-                if chunk.file_type in file_types:
-                    filtered_indices.append(i)
-                    filtered_chunks.append(chunk)
+        logger.info(f"Search completed: '{query}' -> {len(result_chunks)} results in {search_time:.3f}s")
 
-            if filtered_indices:
-                vectors = vectors[filtered_indices]
-                chunks = filtered_chunks
+        return SearchResult(
+            query=query,
+            chunks=result_chunks,
+            total_chunks=int(valid.sum()),
+            search_time=search_time,
+            similarity_threshold=self.similarity_threshold
+        )
 
-        # Preprocess query
-        processed_query = self._preprocess_query(query)
+    def _score_query(self, query: str, file_types: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every live chunk for a query.
 
-        # Transform query to vector space
-        query_vector = self.vectorizer.transform([processed_query])
+        Args:
+            query: Search query
+            file_types: Optional list of file types to filter by
 
-        # Calculate similarities
-        similarities = cosine_similarity(query_vector, vectors).flatten()
+        Returns:
+            Tuple of (relevance score of every chunk, mask of chunks that pass the threshold
+            and file type filter)
+        """
+        features = self._chunk_features
 
-        # PHASE 4 FIX: Apply exact match boosts before filtering to ensure exact matches aren't lost
-        query_lower = query.lower()
-        query_intent = self._classify_query_intent(query_lower)
+        # Preprocess query
+        processed_query = self._preprocess_query(query)
 
-        # Calculate exact match boosts for all chunks first
-        exact_match_boosts = []
-        for chunk in chunks:
-            boost = self._calculate_exact_match_boost(chunk, query_lower, query_intent)
-            exact_match_boosts.append(boost)
+        # Calculate cosine similarities against the TF-IDF model
+        similarities = self._tfidf_index.similarities(processed_query)[self._live_rows]
 
-        # Apply exact match boosts to similarities for filtering decision
-        boosted_similarities = similarities + np.array(exact_match_boosts)
+        # Score all chunks at once; exact match boosts count towards the threshold so exact
+        # matches aren't lost
+        exact_match_boosts, relevance = self._score_chunks(features, similarities, query)
+        valid = similarities + exact_match_boosts >= self.similarity_threshold
 
-        # Filter by similarity threshold (now considering exact match boosts)
-        valid_indices = boosted_similarities >= self.similarity_threshold
-        valid_chunks = [chunks[i] for i in range(len(chunks)) if valid_indices[i]]
-        valid_similarities = similarities[valid_indices]
+        # Filter by file types if specified
+        if file_types:
+            allowed_types = np.array([file_type in file_types for file_type in features.file_types], dtype=bool)
+            allowed = allowed_types[features.file_type_index[features.file_index]]
+            if allowed.any():
+                valid &= allowed
 
-        # Calculate enhanced relevance scores (exact match boost will be applied again, but that's fine)
-        valid_chunks = self._calculate_relevance_scores(valid_chunks, valid_similarities, query)
+        return relevance, valid
 
-        # Sort by relevance score (descending)
-        valid_chunks.sort(key=lambda x: x.relevance_score, reverse=True)
+    def rank_chunks(self, query: str, top_k: int = 10, file_types: Optional[List[str]] = None) -> Ranking:
+        """
+        Rank chunks by relevance without diversity-aware selection, for hybrid search.
 
-        # Apply diversity-aware selection for balanced context
-        result_chunks = self._select_diverse_chunks(valid_chunks, max_results, query)
+        Args:
+            query: Search query
+            top_k: Number of chunks to return
+            file_types: Optional list of file types to filter by
 
-        search_time = time.time() - start_time
+        Returns:
+            Ranking of the best chunk ids (see mods.code.hybrid_search), ties in chunk order
+        """
+        self._refresh_index()
+        if not self._live_chunks or top_k <= 0:
+            return Ranking.empty()
+
+        relevance, valid = self._score_query(query, file_types)
+        ids = np.flatnonzero(valid)
+        if len(ids) > top_k:
+            scores = relevance[ids]
+            cutoff = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+            ids = ids[scores >= cutoff]
+        ids = ids[np.argsort(-relevance[ids], kind='stable')][:top_k]
+        return Ranking(self._live_ids[ids], relevance[ids].astype(np.float64))
+
+    def get_chunks(self, ids: np.ndarray) -> List[Optional[ContextChunk]]:
+        """
+        Look up indexed chunks by their hybrid search chunk id.
 
-        logger.info(f"Search completed: '{query}' -> {len(result_chunks)} results in {search_time:.3f}s")
+        Args:
+            ids: Chunk ids, e.g. from rank_chunks or a fused Ranking
 
-        return SearchResult(
-            query=query,
-            chunks=result_chunks,
-            total_chunks=len(valid_chunks),
-            search_time=search_time,
-            similarity_threshold=self.similarity_threshold
-        )
+        Returns:
+            The chunk of every id, or None where no searchable chunk has that id
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(self._live_ids) or not len(ids):
+            return [None] * len(ids)
+        sorted_ids = self._live_ids[self._live_id_order]
+        positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        found = sorted_ids[positions] == ids
+        rows = self._live_id_order[positions]
+        return [self._live_chunks[row] if is_found else None for row, is_found in zip(rows.tolist(), found.tolist())]
 
     def get_context_summary(self, chunks: List[ContextChunk]) -> Dict[str, Any]:
         """
@@ -1156,10 +1642,16 @@ class SemanticSearchEngine:
         }
 
     def clear_cache(self):
-        """Clear the internal cache."""
-        self._chunks_cache = None
-        self._vectors_cache = None
-        self._last_cache_time = 0
+        """Clear the in-memory TF-IDF model; the next search reloads it from the index."""
+        self._tfidf_index = None
+        self._file_chunks = {}
+        self._index_changed = True
+        self._rows_version = -1
+        self._live_rows = np.zeros(0, dtype=np.int64)
+        self._live_chunks = []
+        self._chunk_features = None
+        self._live_ids = np.zeros(0, dtype=np.int64)
+        self._live_id_order = np.zeros(0, dtype=np.int64)
         logger.info("Cache cleared")
 
     def get_indexed_file_type_counts(self) -> Dict[str, int]:
@@ -1167,11 +1659,8 @@ class SemanticSearchEngine:
         Returns a dictionary of file types and their counts from the currently loaded chunks.
         If chunks are not loaded, it will load them.
         """
-        chunks, _ = self._get_cached_data()
-        if chunks is None:
-            chunks = self._load_chunks_from_embeddings()
-            # No need to update cache here, _load_chunks_from_embeddings already does it
-            # or it's handled by the search method.
+        self._refresh_index()
+        chunks = self._live_chunks
 
         file_type_counts = {}
         for chunk in chunks:
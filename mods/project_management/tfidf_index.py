@@ -0,0 +1,531 @@
+"""Incremental TF-IDF model over indexed chunks for SemanticSearchEngine.
+
+Instead of refitting a ``TfidfVectorizer`` over every chunk, the model keeps
+the raw term counts of each chunk as rows of sparse CSR blocks together with
+the document frequency of every term. Term weights are derived from the
+document frequencies at query time, using the same smoothed idf,
+``max_df`` cut-off and l2 normalization as the vectorizer the engine used
+before, so scores match a full refit:
+
+    idf(t)   = ln((1 + n) / (1 + df(t))) + 1       (0 if df(t) > MAX_DF * n)
+    score(d) = sum_t count(d, t) * idf(t) * q(t) / norm(d)
+
+Re-indexed and removed files are applied incrementally. New rows are appended
+as a new block, old rows are marked dead in an ``alive`` mask, and the index
+is compacted once dead rows make up too large a share of it. Row norms of
+untouched chunks depend on idf and drift as documents come and go, so they
+are recomputed in a background thread once enough rows have changed, and the
+model is saved at the same time as ``<index_dir>/store/tfidf.npz``.
+
+Each file is stored with the content hash it was analyzed from, which lets
+the engine apply only the files whose hash differs from the index store.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger("TaskHeroAI.ProjectManagement.TfidfIndex")
+
+TFIDF_INDEX_VERSION = 1
+TFIDF_INDEX_NAME = "tfidf.npz"
+# Terms found in more than this share of chunks get no weight, like TfidfVectorizer(max_df=...)
+MAX_DF = 0.95
+# Recompute row norms once this share of rows was added or removed since the last time
+RENORMALIZE_RATIO = 0.1
+# Compact once dead rows exceed this share of the index
+COMPACT_RATIO = 0.25
+# Merge appended blocks into one once there are more than this many
+MAX_BLOCKS = 16
+
+
+def build_analyzer() -> Callable[[str], List[str]]:
+    """Build the analyzer turning chunk text into terms.
+
+    Returns:
+        Callable[[str], List[str]]: Analyzer producing the unigrams and bigrams of a text.
+    """
+    return TfidfVectorizer(
+        stop_words='english',
+        ngram_range=(1, 2),
+        lowercase=True,
+        strip_accents='unicode'
+    ).build_analyzer()
+
+
+class TfidfIndex:
+    """Sparse TF-IDF model over the chunks of indexed files.
+
+    Usage:
+        index = TfidfIndex.load(path) or TfidfIndex()
+        index.update_files([(path, file_hash, chunk_texts)])
+        rows, keys = index.live_rows()
+        scores = index.similarities("parse gitignore")[rows]
+        index.schedule_maintenance(path)
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._analyzer = build_analyzer()
+        self._lock = threading.RLock()
+        self.generation: Optional[int] = None
+        # Bumped whenever rows are added, removed or renumbered
+        self.version = 0
+
+        self._terms: List[str] = []
+        self._term_ids: Dict[str, int] = {}
+        self._df = np.zeros(0, dtype=np.int64)
+
+        self._blocks: List[sparse.csr_matrix] = []
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_files = np.zeros(0, dtype=np.int32)
+        self._row_chunks = np.zeros(0, dtype=np.int32)
+
+        self._paths: List[str] = []
+        self._path_ids: Dict[str, int] = {}
+        # path -> (first row, row count, content hash)
+        self._files: Dict[str, Tuple[int, int, Optional[str]]] = {}
+        self._live_rows = 0
+        self._changed_rows = 0
+        self._weights: Optional[np.ndarray] = None
+        self._maintenance_thread: Optional[threading.Thread] = None
+
+    @property
+    def row_count(self) -> int:
+        """Number of live chunk rows."""
+        return self._live_rows
+
+    @property
+    def file_count(self) -> int:
+        """Number of files in the index."""
+        return len(self._files)
+
+    def file_hashes(self) -> Dict[str, Optional[str]]:
+        """Get the content hash every indexed file was analyzed from.
+
+        Returns:
+            Dict[str, Optional[str]]: Mapping of file path to content hash.
+        """
+        with self._lock:
+            return {path: file_hash for path, (_, _, file_hash) in self._files.items()}
+
+    def file_row_count(self, path: str) -> int:
+        """Get the number of chunk rows stored for a file.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            int: Number of rows, or -1 if the file is not indexed.
+        """
+        with self._lock:
+            entry = self._files.get(path)
+            return entry[1] if entry is not None else -1
+
+    def update_files(self, files: Iterable[Tuple[str, Optional[str], List[str]]]) -> int:
+        """Add or replace the chunks of files.
+
+        Args:
+            files (Iterable[Tuple[str, Optional[str], List[str]]]): (path, content hash, chunk texts)
+                for every file to add; previous rows of the same paths are replaced.
+
+        Returns:
+            int: Number of rows added.
+        """
+        # A path listed twice keeps its last chunks
+        files = list({path: (path, file_hash, texts) for path, file_hash, texts in files}.values())
+        if not files:
+            return 0
+
+        # Analyzing is the slow part and needs no lock
+        analyzed = [(path, file_hash, [Counter(self._analyzer(text)) for text in texts])
+                    for path, file_hash, texts in files]
+
+        with self._lock:
+            for path, _, _ in analyzed:
+                self._remove_file(path)
+
+            indptr = [0]
+            indices: List[int] = []
+            counts: List[int] = []
+            row_files: List[int] = []
+            row_chunks: List[int] = []
+            start = len(self._alive)
+            for path, file_hash, documents in analyzed:
+                path_id = self._path_ids.get(path)
+                if path_id is None:
+                    path_id = self._path_ids[path] = len(self._paths)
+                    self._paths.append(path)
+                self._files[path] = (start + len(row_files), len(documents), file_hash)
+                for chunk_index, term_counts in enumerate(documents):
+                    for term, count in term_counts.items():
+                        term_id = self._term_ids.get(term)
+                        if term_id is None:
+                            term_id = self._term_ids[term] = len(self._terms)
+                            self._terms.append(term)
+                        indices.append(term_id)
+                        counts.append(count)
+                    indptr.append(len(indices))
+                    row_files.append(path_id)
+                    row_chunks.append(chunk_index)
+
+            added = len(row_files)
+            if added:
+                block = sparse.csr_matrix(
+                    (np.array(counts, dtype=np.float32), np.array(indices, dtype=np.int32),
+                     np.array(indptr, dtype=np.int64)),
+                    shape=(added, len(self._terms)),
+                )
+                self._blocks.append(block)
+                self._grow_df()
+                self._df += np.bincount(block.indices, minlength=len(self._df))
+                self._alive = np.concatenate([self._alive, np.ones(added, dtype=bool)])
+                self._row_files = np.concatenate([self._row_files, np.array(row_files, dtype=np.int32)])
+                self._row_chunks = np.concatenate([self._row_chunks, np.array(row_chunks, dtype=np.int32)])
+                if self._live_rows:
+                    # Only rows added to an existing corpus move the idf of older rows
+                    self._changed_rows += added
+                self._live_rows += added
+                self._weights = None
+                # New rows are normalized with the current idf; older rows catch up on renormalization
+                self._norms = np.concatenate([self._norms, self._row_norms(block, self._idf())])
+
+            self.version += 1
+            self._maybe_compact()
+            return added
+
+    def remove_files(self, paths: Iterable[str]) -> int:
+        """Remove the chunks of files.
+
+        Args:
+            paths (Iterable[str]): Paths of the files to remove.
+
+        Returns:
+            int: Number of files that were in the index.
+        """
+        with self._lock:
+            removed = sum(1 for path in paths if self._remove_file(path))
+            if removed:
+                self.version += 1
+                self._maybe_compact()
+            return removed
+
+    def live_rows(self) -> Tuple[np.ndarray, List[Tuple[str, int]]]:
+        """Get the live rows and the chunk each of them holds.
+
+        Returns:
+            Tuple[np.ndarray, List[Tuple[str, int]]]: Row numbers, and the (path, chunk index)
+            of every row in the same order.
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._alive)
+            paths = self._paths
+            keys = [(paths[path_id], chunk_index) for path_id, chunk_index
+                    in zip(self._row_files[rows].tolist(), self._row_chunks[rows].tolist())]
+            return rows, keys
+
+    def similarities(self, query: str) -> np.ndarray:
+        """Compute the cosine similarity of a query with every row.
+
+        Args:
+            query (str): Query text.
+
+        Returns:
+            np.ndarray: Similarity of every row (dead rows included), indexed like :meth:`live_rows`.
+        """
+        query_terms = Counter(self._analyzer(query))
+        with self._lock:
+            idf = self._idf()
+            term_ids = [self._term_ids.get(term) for term in query_terms]
+            known = [(term_id, count) for term_id, count in zip(term_ids, query_terms.values())
+                     if term_id is not None and idf[term_id] > 0]
+            scores = np.zeros(len(self._alive), dtype=np.float64)
+            if not known:
+                return scores
+
+            ids = np.array([term_id for term_id, _ in known])
+            query_weights = np.array([count for _, count in known], dtype=np.float64) * idf[ids]
+            weights = np.zeros(len(self._terms), dtype=np.float32)
+            weights[ids] = query_weights / np.linalg.norm(query_weights) * idf[ids]
+
+            start = 0
+            for block in self._blocks:
+                end = start + block.shape[0]
+                scores[start:end] = block @ weights[:block.shape[1]]
+                start = end
+            norms = self._norms
+
+        np.divide(scores, norms, out=scores, where=norms > 0)
+        scores[norms <= 0] = 0
+        return scores
+
+    def renormalize(self) -> bool:
+        """Recompute the norm of every row from the current document frequencies.
+
+        The norms are computed without holding the lock and dropped if rows changed meanwhile.
+
+        Returns:
+            bool: Whether the new norms were applied.
+        """
+        with self._lock:
+            version = self.version
+            blocks = list(self._blocks)
+            idf = self._idf().copy()
+            changed_rows = self._changed_rows
+
+        norms = np.concatenate([self._row_norms(block, idf) for block in blocks]) if blocks else np.zeros(0, np.float32)
+
+        with self._lock:
+            if self.version != version:
+                return False
+            self._norms = norms
+            self._changed_rows -= changed_rows
+            return True
+
+    def needs_renormalization(self) -> bool:
+        """Check whether enough rows changed for the row norms to be recomputed.
+
+        Returns:
+            bool: True if :meth:`renormalize` is due.
+        """
+        with self._lock:
+            return self._changed_rows > max(1.0, RENORMALIZE_RATIO * self._live_rows)
+
+    def schedule_maintenance(self, path: Optional[str] = None, save: bool = False) -> None:
+        """Renormalize and save the index in a background thread if that is due.
+
+        Args:
+            path (Optional[str]): File to save the index to; nothing is saved without one.
+            save (bool): Whether to save even if no renormalization is due.
+        """
+        renormalize = self.needs_renormalization()
+        if not renormalize and not (save and path):
+            return
+        if self._maintenance_thread is not None and self._maintenance_thread.is_alive():
+            return
+
+        def maintain():
+            try:
+                if renormalize and not self.renormalize():
+                    return
+                if path:
+                    self.save(path)
+                    logger.debug(f"Saved TF-IDF index with {self.row_count} rows to {path}")
+            except Exception as e:
+                logger.warning(f"TF-IDF index maintenance failed: {e}")
+
+        self._maintenance_thread = threading.Thread(target=maintain, name="TfidfIndexMaintenance", daemon=True)
+        self._maintenance_thread.start()
+
+    def wait_for_maintenance(self, timeout: Optional[float] = None) -> None:
+        """Wait for a running background renormalization or save to finish.
+
+        Args:
+            timeout (Optional[float]): Maximum number of seconds to wait.
+        """
+        thread = self._maintenance_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def compact(self) -> None:
+        """Drop dead rows and merge all blocks into one."""
+        with self._lock:
+            self._compact()
+
+    def save(self, path: str) -> None:
+        """Write the index to a .npz file, replacing it atomically.
+
+        Args:
+            path (str): Destination file.
+        """
+        with self._lock:
+            blocks = list(self._blocks)
+            meta = {
+                "version": TFIDF_INDEX_VERSION,
+                "generation": self.generation,
+                "paths": list(self._paths),
+                "files": {file_path: list(entry) for file_path, entry in self._files.items()},
+                "changed_rows": self._changed_rows,
+            }
+            arrays = {
+                "terms": "\n".join(self._terms),
+                "df": self._df.copy(),
+                "norms": self._norms,
+                "alive": self._alive.copy(),
+                "row_files": self._row_files,
+                "row_chunks": self._row_chunks,
+            }
+
+        matrix = self._stack(blocks, len(arrays["df"]))
+        arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+        arrays["terms"] = np.frombuffer(arrays["terms"].encode("utf-8"), dtype=np.uint8)
+        arrays["data"] = matrix.data
+        arrays["indices"] = matrix.indices
+        arrays["indptr"] = matrix.indptr
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def path_for(store_dir: str) -> str:
+        """Get the file the TF-IDF index of an index store is saved to.
+
+        Args:
+            store_dir (str): Directory of the index store.
+
+        Returns:
+            str: Path of the .npz file.
+        """
+        return os.path.join(store_dir, TFIDF_INDEX_NAME)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TfidfIndex"]:
+        """Load an index written by :meth:`save`.
+
+        Args:
+            path (str): File to load.
+
+        Returns:
+            Optional[TfidfIndex]: The index, or None if the file is missing, unreadable
+            or from another format version.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                if meta.get("version") != TFIDF_INDEX_VERSION:
+                    logger.info(f"Ignoring TF-IDF index {path} with version {meta.get('version')}")
+                    return None
+                index = cls()
+                index.generation = meta.get("generation")
+                terms = data["terms"].tobytes().decode("utf-8")
+                index._terms = terms.split("\n") if terms else []
+                index._term_ids = {term: term_id for term_id, term in enumerate(index._terms)}
+                index._df = data["df"]
+                index._norms = data["norms"]
+                index._alive = data["alive"]
+                index._row_files = data["row_files"]
+                index._row_chunks = data["row_chunks"]
+                rows = len(index._alive)
+                if rows:
+                    index._blocks = [sparse.csr_matrix(
+                        (data["data"], data["indices"], data["indptr"]), shape=(rows, len(index._terms))
+                    )]
+            index._paths = meta["paths"]
+            index._path_ids = {file_path: path_id for path_id, file_path in enumerate(index._paths)}
+            index._files = {file_path: (start, count, file_hash)
+                            for file_path, (start, count, file_hash) in meta["files"].items()}
+            index._changed_rows = meta.get("changed_rows", 0)
+            index._live_rows = int(index._alive.sum())
+            return index
+        except Exception as e:
+            logger.warning(f"Could not load TF-IDF index {path}: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics.
+
+        Returns:
+            Dict[str, Any]: Dictionary with index metrics.
+        """
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "rows": self._live_rows,
+                "dead_rows": int(len(self._alive) - self._live_rows),
+                "terms": int(np.count_nonzero(self._df)),
+                "blocks": len(self._blocks),
+                "nonzeros": int(sum(block.nnz for block in self._blocks)),
+                "changed_rows": self._changed_rows,
+                "generation": self.generation,
+            }
+
+    def _remove_file(self, path: str) -> bool:
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return False
+        start, count, _ = entry
+        if count:
+            rows = self._rows(start, start + count)
+            self._df -= np.bincount(rows.indices, minlength=len(self._df))
+            self._alive[start:start + count] = False
+            self._live_rows -= count
+            self._changed_rows += count
+            self._weights = None
+        return True
+
+    def _rows(self, start: int, end: int) -> sparse.csr_matrix:
+        # A file's rows were appended together, so they never span two blocks
+        offset = 0
+        for block in self._blocks:
+            if start < offset + block.shape[0]:
+                return block[start - offset:end - offset]
+            offset += block.shape[0]
+        raise IndexError(f"Rows {start}:{end} are out of range")
+
+    def _grow_df(self) -> None:
+        if len(self._df) < len(self._terms):
+            self._df = np.concatenate([self._df, np.zeros(len(self._terms) - len(self._df), dtype=np.int64)])
+
+    def _idf(self) -> np.ndarray:
+        if self._weights is None or len(self._weights) != len(self._df):
+            rows = self._live_rows
+            df = self._df.astype(np.float64)
+            idf = np.log((1.0 + rows) / (1.0 + df)) + 1.0
+            idf[(df <= 0) | (df > MAX_DF * rows)] = 0.0
+            self._weights = idf
+        return self._weights
+
+    @staticmethod
+    def _row_norms(block: sparse.csr_matrix, idf: np.ndarray) -> np.ndarray:
+        squared = block.multiply(block).tocsr()
+        return np.sqrt(squared @ np.square(idf[:block.shape[1]])).astype(np.float32)
+
+    @staticmethod
+    def _stack(blocks: List[sparse.csr_matrix], columns: int) -> sparse.csr_matrix:
+        if not blocks:
+            return sparse.csr_matrix((0, columns), dtype=np.float32)
+        resized = [sparse.csr_matrix((block.data, block.indices, block.indptr), shape=(block.shape[0], columns))
+                   for block in blocks]
+        return sparse.vstack(resized, format="csr", dtype=np.float32)
+
+    def _maybe_compact(self) -> None:
+        dead = len(self._alive) - self._live_rows
+        if dead and dead > COMPACT_RATIO * len(self._alive):
+            self._compact()
+        elif len(self._blocks) > MAX_BLOCKS:
+            # Row numbers stay the same, so this needs no version bump
+            self._blocks = [self._blocks[0], self._stack(self._blocks[1:], len(self._terms))]
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._alive)
+        self._blocks = [self._stack(self._blocks, len(self._terms))[keep]] if len(keep) else []
+        self._norms = self._norms[keep]
+        self._row_files = self._row_files[keep]
+        self._row_chunks = self._row_chunks[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+
+        new_rows = np.zeros(int(keep[-1]) + 1 if len(keep) else 0, dtype=np.int64)
+        new_rows[keep] = np.arange(len(keep))
+        self._files = {path: (int(new_rows[start]) if count else 0, count, file_hash)
+                       for path, (start, count, file_hash) in self._files.items()}
+
+        old_paths = self._paths
+        self._paths = sorted(self._files)
+        self._path_ids = {path: path_id for path_id, path in enumerate(self._paths)}
+        if len(self._row_files):
+            path_map = np.array([self._path_ids.get(path, -1) for path in old_paths], dtype=np.int32)
+            self._row_files = path_map[self._row_files]
+        self.version += 1
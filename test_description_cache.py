@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for trivia-insensitive description cache keys
+
+Checks that comment and whitespace edits share a trivia key, while edits that
+change code - inside string literals, in Python indentation, or in file types
+that cannot be normalized safely - never do.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+
+def _keys(content, extension):
+    from mods.description_cache import make_description_keys
+
+    return make_description_keys(content, extension, "provider", "model", 1, ignore_trivia=True)
+
+
+def _same_description(a, b, extension):
+    return bool(set(_keys(a, extension)) & set(_keys(b, extension)))
+
+
+def test_trivia_edits_share_a_key():
+    """Comments and insignificant whitespace do not change the trivia key."""
+    assert _same_description(
+        "def a():\n    return 1  # one\n",
+        "# header\ndef a():\n\n        return 1\n",
+        ".py",
+    )
+    assert _same_description(
+        "const x = 1; // one\nconst y = 2;\n",
+        "/* header */\nconst x  =  1;\n\n\nconst y = 2; /* two */\n",
+        ".js",
+    )
+
+
+def test_code_edits_never_share_a_key():
+    """Code that differs, including in strings and layout, gets different keys."""
+    collisions = [
+        ('const re = "/*admin*/";\n', 'const re = "/*guest*/";\n', ".js"),
+        ('glob("src/**/*.ts");\n', 'glob("src *.ts");\n', ".ts"),
+        ("const s = '// a';\n", "const s = '// b';\n", ".js"),
+        ('printf("a  b");\n', 'printf("a b");\n', ".c"),
+        ("return\nx;\n", "return x;\n", ".js"),
+        ("if x:\n    a()\n    b()\n", "if x:\n    a()\nb()\n", ".py"),
+        ("return\nx\n", "return x\n", ".py"),
+        ("a:\n  b: 1\n", "a:\nb: 1\n", ".yaml"),
+        ("echo a # b\n", "echo a\n", ".sh"),
+        ('let s = "unterminated /* a */\n', 'let s = "unterminated /* b */\n', ".js"),
+    ]
+    for a, b, extension in collisions:
+        assert not _same_description(a, b, extension), (a, b, extension)
+
+
+def test_unsupported_types_only_have_the_exact_key():
+    """File types that are not normalized fall back to the exact content hash."""
+    from mods.description_cache import normalize_source
+
+    assert len(_keys("a:\n  b: 1\n", ".yaml")) == 1
+    assert normalize_source("fn f<'a>(x: &'a str) {}", ".rs") is None
+    assert normalize_source("def f(:\n", ".py") is None
+
+
+if __name__ == "__main__":
+    test_trivia_edits_share_a_key()
+    test_code_edits_never_share_a_key()
+    test_unsupported_types_only_have_the_exact_key()
+    print("✅ Description cache key test passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared file snapshot used by CodebaseTools
+
+Checks that FileSnapshot walks the tree once, leaves out ignored and binary
+files, and applies paths reported by watch mode without walking again.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _fake_embed(texts):
+    texts = [texts] if isinstance(texts, str) else texts
+    return [[float(len(text) % 7), 1.0, 0.5] for text in texts]
+
+
+def test_snapshot_updates_invalidated_paths(isolated_caches, monkeypatch):
+    """Reported paths are updated in place; the tree is walked only once."""
+    import mods.code.embed as embed_module
+    import mods.code.indexer as indexer_module
+    from mods.code.indexer import FileIndexer
+
+    # apply_file_changes() indexes the reported files; keep the providers out of it
+    monkeypatch.setattr(embed_module, "generate_embed", _fake_embed)
+    monkeypatch.setattr(indexer_module, "generate_description", lambda prompt: "Sample description")
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        _write(os.path.join(project_dir, ".gitignore"), "ignored/\n")
+        _write(os.path.join(project_dir, "app.py"), "print('app')\n")
+        _write(os.path.join(project_dir, "pkg", "util.py"), "def util():\n    pass\n")
+        _write(os.path.join(project_dir, "ignored", "skip.py"), "print('skip')\n")
+        with open(os.path.join(project_dir, "image.png"), "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n\x00\x00")
+
+        indexer = FileIndexer(project_dir)
+        snapshot = indexer.file_snapshot
+        snapshot.ttl_seconds = 3600
+
+        files = snapshot.files()
+        print(f"Initial snapshot: {[file.rel_path for file in files]}")
+        assert [file.rel_path for file in files] == [".gitignore", "app.py", "pkg/util.py"]
+        assert files[1].extension == ".py" and files[1].size == len("print('app')\n")
+        assert snapshot.files() is files, "unchanged snapshot should be reused"
+
+        new_file = os.path.join(project_dir, "pkg", "new.md")
+        _write(new_file, "# New\n")
+        assert new_file not in {file.path for file in snapshot.files()}, "unreported files appear only after the TTL"
+
+        shutil.rmtree(os.path.join(project_dir, "pkg"))
+        _write(new_file, "# New\n")
+        indexer.apply_file_changes([new_file], [os.path.join(project_dir, "pkg", "util.py")])
+
+        files = snapshot.files()
+        print(f"After changes: {[file.rel_path for file in files]}")
+        assert [file.rel_path for file in files] == [".gitignore", "app.py", "pkg/new.md"]
+        assert snapshot.rebuilds == 1, f"snapshot walked {snapshot.rebuilds} times"
+
+        snapshot.invalidate([os.path.join(project_dir, ".gitignore")])
+        snapshot.files()
+        assert snapshot.rebuilds == 2, "a changed .gitignore should rebuild the snapshot"
+
+
+if __name__ == "__main__":
+    # The test uses the isolated_caches fixture from conftest.py
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
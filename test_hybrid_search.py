@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for hybrid retrieval with rank fusion
+
+Checks that fusing rankings of chunk ids with NumPy gives the same order and
+scores as summing the contributions of every chunk in a dictionary, that the
+rankers share one id space, and that GraphitiContextRetriever returns fused
+semantic and BM25 results.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+
+def _reference_fusion(rankings, top_k, fusion, rrf_k):
+    """Fusion with one dictionary entry per chunk, as the retriever used to merge results."""
+    total_weight = sum(weight for _, weight in rankings if weight > 0)
+    scores = {}
+    for ranking, weight in rankings:
+        if weight <= 0 or not len(ranking):
+            continue
+        best = max(ranking.scores)
+        for rank, (chunk_id, score) in enumerate(zip(ranking.ids.tolist(), ranking.scores.tolist()), 1):
+            if fusion == "rrf":
+                contribution = weight * (rrf_k + 1) / (rrf_k + rank)
+            else:
+                contribution = weight * score / best if best > 0 else 0.0
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + contribution
+    ordered = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+    return [chunk_id for chunk_id, _ in ordered], [score / total_weight for _, score in ordered]
+
+
+def test_fusion_matches_reference():
+    """Vectorized fusion ranks and scores like the per-chunk dictionary merge."""
+    from mods.code.hybrid_search import Ranking, fuse_rankings
+
+    rng = random.Random(5)
+    for _ in range(200):
+        rankings = []
+        for _ in range(rng.randint(1, 3)):
+            ids = rng.sample(range(60), rng.randint(0, 30))
+            # Repeated scores, so ties are common
+            scores = sorted((rng.choice([0.1, 0.5, 1.0, rng.random() * 10]) for _ in ids), reverse=True)
+            rankings.append((Ranking(np.array(ids, dtype=np.int64), np.array(scores)), rng.choice([0.0, 0.3, 1.0])))
+        top_k = rng.choice([1, 5, 20, 100])
+        for fusion in ("rrf", "weighted"):
+            fused = fuse_rankings(rankings, top_k, fusion, rrf_k=60)
+            expected_ids, expected_scores = _reference_fusion(rankings, top_k, fusion, 60)
+            assert fused.ids.tolist() == expected_ids, f"{fusion}: {fused.ids.tolist()} != {expected_ids}"
+            assert np.allclose(fused.scores, expected_scores)
+
+    # A chunk ranked first everywhere scores 1.0
+    both = [(Ranking(np.array([7, 3]), np.array([2.0, 1.0])), 0.7), (Ranking(np.array([7]), np.array([9.0])), 0.3)]
+    assert fuse_rankings(both, 1, "rrf").scores.tolist() == [1.0]
+    assert fuse_rankings(both, 1, "weighted").scores.tolist() == [1.0]
+
+
+def test_chunk_ids_and_concurrent_search():
+    """Chunk ids round-trip and concurrent rankers fuse like sequential ones."""
+    from mods.code.hybrid_search import HybridSearch, HybridSearchConfig, Ranking, chunk_ids
+
+    ids = chunk_ids.chunk_ids(["/a.py", "/b.py", "/a.py"], [0, 3, 12])
+    assert ids[0] != ids[2] and chunk_ids.chunk_ids(["/a.py"], [12])[0] == ids[2]
+    paths, chunk_indexes = chunk_ids.decode(ids)
+    assert paths == ["/a.py", "/b.py", "/a.py"] and chunk_indexes.tolist() == [0, 3, 12]
+
+    def failing(query, top_k):
+        raise RuntimeError("unavailable")
+
+    search = HybridSearch({
+        "semantic": lambda query, top_k: Ranking(ids[:top_k], np.array([0.9, 0.5, 0.1])[:top_k]),
+        "bm25": lambda query, top_k: Ranking(ids[::-1][:top_k], np.array([7.0, 3.0, 1.0])[:top_k]),
+        "dense": failing,
+    })
+    concurrent = search.search("query", top_k=3, config=HybridSearchConfig(weights={"bm25": 0.5}))
+    sequential = search.search("query", top_k=3, config=HybridSearchConfig(weights={"bm25": 0.5}, concurrent=False))
+    assert concurrent.ids.tolist() == sequential.ids.tolist() == ids.tolist()
+    skipped = search.search("query", top_k=3, config=HybridSearchConfig(weights={"semantic": 0, "dense": 0}))
+    assert skipped.ids.tolist() == ids[::-1].tolist()
+
+
+def test_retriever_fuses_semantic_and_keyword_rankings():
+    """retrieve_context returns fused results, configurable per call."""
+    from mods.code.hybrid_search import HybridSearchConfig
+    from mods.code.index_store import IndexStore
+    from mods.project_management.graphiti_retriever import GraphitiContextRetriever
+
+    sources = {
+        "parser.py": ["def parse_gitignore(patterns):\n    return compile_matcher(patterns)",
+                      "def compile_matcher(patterns):\n    return [re.compile(p) for p in patterns]"],
+        "watcher.py": ["def watch_directory(path):\n    return debounce_events(path)"],
+        "store.py": ["def write_manifest(store):\n    return persist_segments(store)"],
+        "README.md": ["Installation guide: run the setup script, then index the project directory"],
+    }
+    with tempfile.TemporaryDirectory() as project_dir:
+        store = IndexStore(os.path.join(project_dir, ".index"))
+        for i, (name, texts) in enumerate(sources.items()):
+            chunks = [{"text": text, "type": "function", "start_line": 1 + 10 * j, "end_line": 5 + 10 * j}
+                      for j, text in enumerate(texts)]
+            store.put({"path": os.path.join(project_dir, name), "hash": str(i), "chunks": chunks},
+                      [[0.0, 1.0]] * len(chunks))
+
+        retriever = GraphitiContextRetriever(project_dir)
+        try:
+            parser = os.path.join(project_dir, "parser.py")
+            fused = retriever._get_hybrid_results("compile_matcher patterns", 3, None)
+            assert fused and fused[0].file_path == parser
+            assert any(chunk.chunk_type == "hybrid_result" for chunk in fused)
+            assert all(0 < chunk.relevance_score <= 1 for chunk in fused)
+
+            for fusion in ("rrf", "weighted"):
+                results = asyncio.run(retriever.retrieve_context(
+                    "compile_matcher patterns", max_results=3, hybrid_config=HybridSearchConfig(fusion=fusion)
+                ))
+                assert results and results[0].file_path == parser, fusion
+
+            retriever.configure(hybrid_fusion="legacy")
+            legacy = asyncio.run(retriever.retrieve_context("compile_matcher patterns", max_results=3))
+            assert legacy and legacy[0].file_path == parser
+        finally:
+            retriever.close()
+            retriever.semantic_search._tfidf_index.wait_for_maintenance()
+
+
+if __name__ == "__main__":
+    test_fusion_matches_reference()
+    test_chunk_ids_and_concurrent_search()
+    test_retriever_fuses_semantic_and_keyword_rankings()
+    print("✅ Hybrid search test passed")
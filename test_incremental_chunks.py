@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for chunk-level incremental re-indexing
+
+Checks that re-indexing a changed file only embeds the chunks whose text
+changed, reuses the stored vectors of the others, and updates the loaded
+SimilaritySearch in place.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+
+def _function_source(index, operator="+"):
+    return (
+        f"def compute_{index}(value):\n"
+        f"    total = value\n"
+        f"    for step in range({index + 2}):\n"
+        f"        total {operator}= step * {index}\n"
+        f"    return total  # helper number {index}\n\n"
+    )
+
+
+def test_reindex_embeds_only_changed_chunks(isolated_caches):
+    """Only the edited function is embedded again and search sees it at once."""
+    import mods.code.embed as embed_module
+    import mods.code.indexer as indexer_module
+
+    embedded_texts = []
+
+    def fake_embed(texts):
+        texts = [texts] if isinstance(texts, str) else texts
+        embedded_texts.extend(texts)
+        return [np.random.default_rng(sum(text.encode())).standard_normal(8).tolist() for text in texts]
+
+    original_embed = embed_module.generate_embed
+    original_description = indexer_module.generate_description
+    embed_module.generate_embed = fake_embed
+    indexer_module.generate_description = lambda prompt: "Sample description"
+
+    try:
+        with tempfile.TemporaryDirectory() as project_dir:
+            path = os.path.join(project_dir, "helpers.py")
+            functions = [_function_source(i) for i in range(12)]
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("".join(functions))
+
+            indexer = indexer_module.FileIndexer(project_dir)
+            indexer.index_directory()
+            search = indexer.similarity_search
+            assert search is not None, "index_directory did not load a SimilaritySearch"
+            chunk_count = search.get_performance_stats()["total_chunks"]
+
+            functions[3] = _function_source(3, operator="-")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("".join(functions))
+
+            embedded_texts.clear()
+            metadata = indexer.reindex_file(path)
+            print(f"Re-embedded {len(embedded_texts)} of {len(metadata.chunks)} chunks")
+
+            assert len(embedded_texts) == 1, f"embedded {len(embedded_texts)} chunks instead of 1"
+            assert "total -= step" in embedded_texts[0]
+            assert len(metadata.embeddings) == len(metadata.chunks)
+
+            stats = search.get_performance_stats()
+            assert stats["total_chunks"] == chunk_count
+            assert stats["updated_chunks"] == len(metadata.chunks)
+
+            changed = next(i for i, chunk in enumerate(metadata.chunks) if "total -= step" in chunk["text"])
+            embed_module.generate_embed = lambda text: [metadata.embeddings[changed]]
+            result = search.search("changed helper", top_k=1, threshold=-1)[0]
+            assert result["file"] == "helpers.py"
+            assert "total -= step" in result["chunk"]["text"]
+    finally:
+        embed_module.generate_embed = original_embed
+        indexer_module.generate_description = original_description
+
+
+if __name__ == "__main__":
+    # The tests use the isolated_caches fixture from conftest.py
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
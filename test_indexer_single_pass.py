@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass indexing pipeline
+
+Checks that FileIndexer._process_single_file opens every file once and
+parses it with tree-sitter at most once, while still producing chunks,
+signatures, a description, embeddings and enhanced metadata.
+"""
+
+import builtins
+import os
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+SAMPLE_FILES = {
+    "service.py": (
+        "import os\n\n"
+        "class Greeter:\n"
+        "    def greet(self, name):\n"
+        "        return f'hello {name}'\n\n"
+        "def main():\n"
+        "    print(Greeter().greet(os.getenv('USER', 'world')))\n"
+    ),
+    "notes.md": "# Notes\n\nSome documentation about the service module.\n",
+    "data.unknownext": "opaque payload that no chunker understands\n",
+}
+
+
+class CountingParser:
+    """Wraps a tree-sitter parser and counts parse calls."""
+
+    def __init__(self, parser, counter):
+        self._parser = parser
+        self._counter = counter
+
+    def parse(self, source_bytes, *args, **kwargs):
+        self._counter["parse"] += 1
+        return self._parser.parse(source_bytes, *args, **kwargs)
+
+
+def _fake_embed(texts):
+    texts = [texts] if isinstance(texts, str) else texts
+    return [[float(len(text) % 7), 1.0, 0.5] for text in texts]
+
+
+def test_process_single_file_reads_and_parses_once(isolated_caches):
+    """Each file is opened exactly once and parsed at most once."""
+    import mods.code.embed as embed_module
+    import mods.code.indexer as indexer_module
+    from mods.code.directory import DirectoryEntry, EntryType
+
+    original_embed = embed_module.generate_embed
+    original_description = indexer_module.generate_description
+    embed_module.generate_embed = _fake_embed
+    indexer_module.generate_description = lambda prompt: "Sample description"
+
+    try:
+        with tempfile.TemporaryDirectory() as project_dir:
+            for name, content in SAMPLE_FILES.items():
+                with open(os.path.join(project_dir, name), "w", encoding="utf-8") as f:
+                    f.write(content)
+
+            indexer = indexer_module.FileIndexer(project_dir)
+            chunker = indexer.code_embedder.chunker
+
+            for name in SAMPLE_FILES:
+                path = os.path.join(project_dir, name)
+                entry = DirectoryEntry(
+                    name=name,
+                    path=path,
+                    parent=project_dir,
+                    entry_type=EntryType.FILE,
+                    size=os.path.getsize(path),
+                    extension=os.path.splitext(name)[1],
+                    file_hash="test",
+                    modified_time=os.path.getmtime(path),
+                )
+
+                counts = Counter()
+                # Parsers are created lazily; create this file's parser before wrapping it
+                chunker.warm_parsers([os.path.splitext(name)[1]])
+                original_parsers = dict(chunker.parsers)
+                chunker.parsers = {
+                    lang: CountingParser(parser, counts) for lang, parser in original_parsers.items()
+                }
+                original_open = builtins.open
+
+                def counting_open(file, *args, **kwargs):
+                    if os.fspath(file) == path:
+                        counts["open"] += 1
+                    return original_open(file, *args, **kwargs)
+
+                builtins.open = counting_open
+                try:
+                    metadata = indexer._process_single_file(entry)
+                finally:
+                    builtins.open = original_open
+                    chunker.parsers = original_parsers
+
+                expected_parses = 1 if chunker._detect_language(path) in original_parsers else 0
+                print(f"{name}: opened {counts['open']}x, parsed {counts['parse']}x")
+
+                assert metadata is not None, f"{name} was not indexed"
+                assert counts["open"] == 1, f"{name} opened {counts['open']} times"
+                assert counts["parse"] == expected_parses, f"{name} parsed {counts['parse']} times"
+                assert metadata.chunks and len(metadata.embeddings) == len(metadata.chunks)
+                assert metadata.description == "Sample description"
+                if name == "service.py":
+                    assert metadata.signatures, "no signatures extracted from service.py"
+    finally:
+        embed_module.generate_embed = original_embed
+        indexer_module.generate_description = original_description
+
+
+if __name__ == "__main__":
+    # The tests use the isolated_caches fixture from conftest.py
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the BM25 keyword index
+
+Checks that KeywordIndex scores like a plain per-document BM25 loop, keeps
+doing so as files are re-indexed and removed in place, and survives a
+save/load round trip.
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+VOCABULARY = [f"symbol{i}" for i in range(300)]
+QUERIES = ["symbol1 symbol7", "symbol3 symbol3 symbol250", "symbol299", "no_such_symbol"]
+
+
+def _random_chunks(rng):
+    return [
+        {"text": " ".join(rng.choice(VOCABULARY[:rng.randint(10, 300)]) for _ in range(rng.randint(0, 30)))}
+        for _ in range(rng.randint(0, 4))
+    ]
+
+
+def _reference_scores(files, query, k1=1.5, b=0.75):
+    """BM25 computed document by document."""
+    from mods.code.keyword_index import tokenize
+
+    docs = [
+        (path, chunk_index, tokenize(chunk["text"]))
+        for path, chunks in files.items()
+        for chunk_index, chunk in enumerate(chunks)
+        if chunk["text"].strip()
+    ]
+    average_length = sum(len(tokens) for _, _, tokens in docs) / len(docs)
+    df = Counter(term for _, _, tokens in docs for term in set(tokens))
+    results = {}
+    for path, chunk_index, tokens in docs:
+        score = 0.0
+        for term in tokenize(query):
+            if term in tokens:
+                tf = tokens.count(term)
+                idf = math.log((len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / average_length))
+        if score > 0:
+            results[(path, chunk_index)] = score
+    return results
+
+
+def _assert_matches(index, files):
+    for query in QUERIES:
+        expected = _reference_scores(files, query)
+        found = index.search(query, top_k=len(expected) + 5)
+        assert len(found) == len(expected), f"{query!r}: {len(found)} hits, expected {len(expected)}"
+        for path, chunk_index, score in found:
+            assert math.isclose(score, expected[(path, chunk_index)], rel_tol=1e-4), (query, path, chunk_index)
+        assert [score for _, _, score in found] == sorted((score for _, _, score in found), reverse=True)
+
+
+def test_keyword_index_matches_bm25():
+    """Scores match BM25 through incremental updates, compaction and reloading."""
+    import mods.code.keyword_index as keyword_index_module
+    from mods.code.keyword_index import KeywordIndex
+
+    rng = random.Random(3)
+    files = {f"/project/file{i}.py": _random_chunks(rng) for i in range(150)}
+    index = KeywordIndex()
+    index.update_files(files.items())
+    _assert_matches(index, files)
+
+    original_min_postings = keyword_index_module.COMPACT_MIN_POSTINGS
+    keyword_index_module.COMPACT_MIN_POSTINGS = 200
+    try:
+        for _ in range(20):
+            changed = {f"/project/file{rng.randrange(200)}.py": _random_chunks(rng) for _ in range(5)}
+            removed = [path for path in rng.sample(sorted(files), 3) if path not in changed]
+            index.remove_files(removed)
+            index.update_files(changed.items())
+            for path in removed:
+                del files[path]
+            files.update(changed)
+            _assert_matches(index, files)
+    finally:
+        keyword_index_module.COMPACT_MIN_POSTINGS = original_min_postings
+
+    stats = index.get_stats()
+    print(f"After updates: {stats}")
+    assert stats["files"] == len(files)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        path = os.path.join(index_dir, "keywords.npz")
+        index.generation = 12
+        index.save(path)
+        loaded = KeywordIndex.load(path)
+        assert loaded is not None and loaded.generation == 12
+        _assert_matches(loaded, files)
+
+
+if __name__ == "__main__":
+    test_keyword_index_matches_bm25()
+    print("✅ Keyword index test passed")
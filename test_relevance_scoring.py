@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized relevance scoring in SemanticSearchEngine
+
+Checks that scoring all chunks with array operations and only sorting the top
+candidates picks the same results, with the same scores, as running the
+per-chunk boosts over every chunk.
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+FILE_NAMES = [
+    "setup_windows.bat", "setup_linux.sh", "install.bat", "setup.py", "README.md", "run-server.ps1",
+    "config.json", "task_001.md", "template_report.md", "test_parser.py", "parser.py", "main.js",
+    "Makefile", "deploy.sh", "notes.txt", "package.json", "windows_helper.py", "style.css",
+]
+DIRECTORIES = ["", "src/", "docs/", "scripts/deep/"]
+CHUNK_TYPES = ["function_definition", "class_definition", "import_statement", "documentation_section", "unknown"]
+QUERIES = [
+    "setup windows install", "linux shell script", "parser test", "config json settings",
+    "task management template", "run the server", "document guide readme", "build deploy", "bat",
+]
+
+
+def _random_chunks(engine, rng, count):
+    from mods.project_management.semantic_search import ContextChunk
+
+    now = time.time()
+    chunks = []
+    for i in range(count):
+        name = rng.choice(FILE_NAMES)
+        chunks.append(ContextChunk(
+            text="x" * rng.choice([20, 60, 150, 1500, 2500]),
+            file_path=rng.choice(DIRECTORIES) + name,
+            chunk_type=rng.choice(CHUNK_TYPES),
+            start_line=i,
+            end_line=i + 5,
+            confidence=rng.choice([1.0, 0.9, 0.5]),
+            file_name=name,
+            file_type=engine._determine_file_type(name),
+            last_modified=rng.choice([None, now - 2 * 86400, now - 20 * 86400, now - 90 * 86400]),
+        ))
+    return chunks
+
+
+def _reference_search(engine, chunks, similarities, query, max_results):
+    """The former per-chunk pipeline of SemanticSearchEngine.search."""
+    query_lower = query.lower()
+    query_intent = engine._classify_query_intent(query_lower)
+    exact_match_boosts = [engine._calculate_exact_match_boost(chunk, query_lower, query_intent) for chunk in chunks]
+    valid = similarities + np.array(exact_match_boosts) >= engine.similarity_threshold
+    valid_chunks = [chunk for chunk, is_valid in zip(chunks, valid) if is_valid]
+    valid_chunks = engine._calculate_relevance_scores(valid_chunks, similarities[valid], query)
+    valid_chunks.sort(key=lambda x: x.relevance_score, reverse=True)
+    selected = engine._select_diverse_chunks(valid_chunks, max_results, query)
+    return [(chunk.start_line, chunk.relevance_score) for chunk in selected], len(valid_chunks)
+
+
+def _vectorized_search(engine, chunks, features, similarities, query, max_results):
+    exact_match_boosts, relevance = engine._score_chunks(features, similarities, query)
+    valid = similarities + exact_match_boosts >= engine.similarity_threshold
+    candidates = []
+    for index in engine._top_candidates(relevance, valid, features.categories, max_results):
+        chunks[index].relevance_score = relevance[index]
+        candidates.append(chunks[index])
+    selected = engine._select_diverse_chunks(candidates, max_results, query)
+    return [(chunk.start_line, chunk.relevance_score) for chunk in selected], int(valid.sum())
+
+
+def test_vectorized_scoring_matches_per_chunk_boosts():
+    """Vectorized scoring selects the same chunks with the same scores."""
+    from mods.project_management.semantic_search import SemanticSearchEngine
+
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as project_dir:
+        engine = SemanticSearchEngine(project_dir)
+        chunks = _random_chunks(engine, rng, 2000)
+        features = engine._build_chunk_features(chunks)
+
+        for query in QUERIES:
+            for max_results in (3, 10, 40):
+                # Many zero and repeated similarities, so ties at the top-k cut-off are common
+                similarities = np.array([rng.choice([0.0, 0.0, 0.05, 0.2, rng.random()]) for _ in chunks])
+                expected = _reference_search(engine, chunks, similarities, query, max_results)
+                found = _vectorized_search(engine, chunks, features, similarities, query, max_results)
+                assert found == expected, f"{query!r} (max_results={max_results}): {found[0][:3]} != {expected[0][:3]}"
+
+    print(f"Checked {len(QUERIES) * 3} searches over {len(chunks)} chunks")
+
+
+if __name__ == "__main__":
+    test_vectorized_scoring_matches_per_chunk_boosts()
+    print("✅ Relevance scoring test passed")
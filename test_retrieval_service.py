@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared retrieval service
+
+Checks that every user of an index directory gets the same reference-counted
+RetrievalService, that the search front-ends share its store, keyword index
+and semantic search engine with the indexer, and that changes are pushed to
+them by the indexer or picked up from writes by another process.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+
+class _Listener:
+    def __init__(self):
+        self.changes = []
+
+    def __call__(self, updated, removed):
+        self.changes.append((updated, removed))
+
+
+def _put(store, project_dir, name, file_hash, text):
+    chunks = [{"text": text, "type": "function", "start_line": 1, "end_line": 5}]
+    store.put({"path": os.path.join(project_dir, name), "hash": file_hash, "chunks": chunks}, [[0.0, 1.0]])
+
+
+def test_service_is_shared_and_reference_counted():
+    """One service per index directory, dropped with its last reference."""
+    from mods.code.index_store import IndexStore
+    from mods.code.retrieval_service import RetrievalService
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        index_dir = os.path.join(project_dir, ".index")
+        first = RetrievalService.acquire(index_dir)
+        second = RetrievalService.acquire(os.path.join(project_dir, "sub", "..", ".index"))
+        assert first is second and first.ref_count == 2
+
+        listener = _Listener()
+        first.subscribe(listener.__call__)
+
+        # Writes by another process are picked up from the manifest
+        store = IndexStore(index_dir)
+        _put(store, project_dir, "parser.py", "a", "def parse_gitignore(patterns): compile matcher")
+        _put(store, project_dir, "watcher.py", "b", "def watch_directory(path): debounce events")
+        _put(store, project_dir, "README.md", "c", "Project overview and installation instructions")
+        assert first.refresh() and listener.changes == [(None, None)]
+        assert not first.refresh()
+        assert [path for path, _, _ in first.keyword_search("matcher")] == [os.path.join(project_dir, "parser.py")]
+
+        # Pushed changes reach listeners right away; collected listeners are dropped
+        first.notify_changed(["a.py"], ["b.py"])
+        assert listener.changes[-1] == (["a.py"], ["b.py"])
+        del listener
+        gc.collect()
+        first.notify_changed(["a.py"])
+        assert first.get_stats()["listeners"] == 0
+
+        assert first.shared("model", object) is second.shared("model", object)
+        second.release()
+        assert RetrievalService.acquire(index_dir) is first
+        first.release()
+        first.release()
+        assert first.ref_count == 0
+        third = RetrievalService.acquire(index_dir)
+        assert third is not first
+        third.release()
+
+
+def test_front_ends_share_the_indexer_service(isolated_caches):
+    """The indexer pushes its changes to the retriever and semantic search it shares the index with."""
+    import mods.code.embed as embed_module
+    import mods.code.indexer as indexer_module
+    from mods.project_management.graphiti_retriever import GraphitiContextRetriever
+    from mods.project_management.semantic_search import SemanticSearchEngine
+
+    def fake_embed(texts):
+        texts = [texts] if isinstance(texts, str) else texts
+        return [np.random.default_rng(sum(text.encode())).standard_normal(8).tolist() for text in texts]
+
+    original_embed = embed_module.generate_embed
+    original_description = indexer_module.generate_description
+    embed_module.generate_embed = fake_embed
+    indexer_module.generate_description = lambda prompt: "Sample description"
+
+    try:
+        with tempfile.TemporaryDirectory() as project_dir:
+            files = {
+                "parser.py": "def parse_gitignore(patterns):\n    return compile_matcher(patterns)\n",
+                "watcher.py": "def watch_directory(path):\n    return debounce_events(path)\n",
+                "store.py": "def write_manifest(store):\n    return persist_segments(store)\n",
+            }
+            for name, source in files.items():
+                with open(os.path.join(project_dir, name), "w", encoding="utf-8") as f:
+                    f.write(source)
+
+            indexer = indexer_module.FileIndexer(project_dir)
+            indexer.index_directory()
+            retriever = GraphitiContextRetriever(project_dir)
+            service = indexer.retrieval
+            assert retriever.retrieval is service and retriever.index_store is indexer.index_store
+            assert service.ref_count >= 2
+            assert retriever.semantic_search is SemanticSearchEngine.shared(service, project_dir)
+            assert retriever._keyword_index is indexer.keyword_index
+
+            path = os.path.join(project_dir, "watcher.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("def watch_directory(path):\n    return throttle_notifications(path)\n")
+            indexer.apply_file_changes([path])
+            assert path in retriever._changed_paths
+
+            retriever._apply_index_changes()
+            chunks = retriever._embedding_cache[retriever._get_file_key_from_path(path)]["chunks"]
+            assert "throttle_notifications" in chunks[0]["text"]
+            hits = retriever._get_bm25_results("throttle_notifications", 3)
+            assert [chunk.file_path for chunk in hits] == [path]
+            result = retriever.semantic_search.search("throttle_notifications", max_results=3)
+            assert result.chunks and result.chunks[0].file_path == path
+            print(f"Service after changes: {service.get_stats()}")
+
+            retriever.close()
+            indexer.close()
+            assert service.ref_count == 0
+            retriever.semantic_search._tfidf_index.wait_for_maintenance()
+    finally:
+        embed_module.generate_embed = original_embed
+        indexer_module.generate_description = original_description
+
+
+if __name__ == "__main__":
+    # The tests use the isolated_caches fixture from conftest.py
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
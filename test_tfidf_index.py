@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental TF-IDF index behind SemanticSearchEngine
+
+Checks that TfidfIndex scores like a TfidfVectorizer refitted over all chunks,
+keeps doing so as files are re-indexed and removed in place, survives a
+save/load round trip, and that the search engine only re-analyzes files whose
+hash changed in the index store.
+"""
+
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the current directory to Python path for absolute imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+VOCABULARY = [f"symbol{i}" for i in range(200)]
+QUERIES = ["symbol1 symbol7", "symbol3 symbol3 symbol150 shared", "symbol199", "no_such_symbol"]
+
+
+def _random_chunks(rng):
+    # "shared" is in every chunk, so the max_df cut-off applies to it
+    return [
+        " ".join(rng.choice(VOCABULARY[:rng.randint(5, 200)]) for _ in range(rng.randint(1, 30))) + " shared"
+        for _ in range(rng.randint(0, 4))
+    ]
+
+
+def _assert_matches(index, files):
+    """Compare with a full refit of the vectorizer SemanticSearchEngine used before."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    rows, keys = index.live_rows()
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), min_df=1, max_df=0.95,
+                                 lowercase=True, strip_accents='unicode')
+    vectors = vectorizer.fit_transform([files[path][chunk_index] for path, chunk_index in keys])
+    for query in QUERIES:
+        expected = cosine_similarity(vectorizer.transform([query]), vectors).flatten()
+        found = index.similarities(query)[rows]
+        assert np.allclose(found, expected, atol=1e-5), f"{query!r}: off by {np.abs(found - expected).max()}"
+
+
+def test_tfidf_index_matches_refit():
+    """Scores match a refit through incremental updates, compaction and reloading."""
+    from mods.project_management.tfidf_index import TfidfIndex
+
+    rng = random.Random(5)
+    files = {f"/project/file{i}.py": _random_chunks(rng) for i in range(100)}
+    index = TfidfIndex()
+    index.update_files((path, "v0", texts) for path, texts in files.items())
+    _assert_matches(index, files)
+
+    for step in range(30):
+        changed = {f"/project/file{rng.randrange(130)}.py": _random_chunks(rng) for _ in range(4)}
+        removed = [path for path in rng.sample(sorted(files), 3) if path not in changed]
+        index.remove_files(removed)
+        index.update_files((path, f"v{step + 1}", texts) for path, texts in changed.items())
+        for path in removed:
+            del files[path]
+        files.update(changed)
+        index.renormalize()
+        _assert_matches(index, files)
+
+    stats = index.get_stats()
+    print(f"After updates: {stats}")
+    assert stats["files"] == len(files) and stats["changed_rows"] == 0
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        path = os.path.join(index_dir, "tfidf.npz")
+        index.generation = 7
+        index.save(path)
+        loaded = TfidfIndex.load(path)
+        assert loaded is not None and loaded.generation == 7
+        assert loaded.file_hashes() == index.file_hashes()
+        _assert_matches(loaded, files)
+
+
+def test_search_engine_applies_changed_files():
+    """The engine follows index store changes without refitting unchanged files."""
+    from mods.code.index_store import IndexStore
+    from mods.project_management.semantic_search import SemanticSearchEngine
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        store = IndexStore(os.path.join(project_dir, ".index"))
+
+        def put(name, file_hash, text):
+            chunks = [{"text": text, "type": "function", "start_line": 1, "end_line": 5}]
+            store.put({"path": os.path.join(project_dir, name), "hash": file_hash, "chunks": chunks}, [[0.0, 1.0]])
+
+        put("parser.py", "a", "def parse_gitignore(patterns): compile gitignore patterns into a matcher")
+        put("watcher.py", "b", "def watch_directory(path): debounce file system events while watching")
+        put("store.py", "c", "def write_manifest(store): persist the segment manifest atomically")
+        put("README.md", "d", "Project overview and installation instructions for developers")
+
+        engine = SemanticSearchEngine(project_dir)
+        result = engine.search("gitignore patterns matcher", max_results=3)
+        assert result.chunks and result.chunks[0].file_name == "parser.py"
+        index = engine._tfidf_index
+        version = index.version
+
+        # Nothing changed: the index is left alone
+        engine.search("debounce watching", max_results=3)
+        assert index.version == version
+
+        put("watcher.py", "b2", "def watch_directory(path): debounce gitignore patterns matcher events")
+        store.remove([os.path.join(project_dir, "store.py")])
+        result = engine.search("gitignore patterns matcher", max_results=3)
+        print(f"After changes: {index.get_stats()}")
+        assert {chunk.file_name for chunk in result.chunks} == {"parser.py", "watcher.py"}
+        assert index.file_hashes() == {
+            os.path.join(project_dir, "parser.py"): "a",
+            os.path.join(project_dir, "watcher.py"): "b2",
+            os.path.join(project_dir, "README.md"): "d",
+        }
+        assert engine.get_indexed_file_type_counts() == {"python": 2, "documentation": 1}
+        index.wait_for_maintenance()
+
+
+if __name__ == "__main__":
+    test_tfidf_index_matches_refit()
+    test_search_engine_applies_changed_files()
+    print("✅ TF-IDF index test passed")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark for BM25 keyword search over indexed chunks
+
+Generates a synthetic corpus of code-like chunks (identifiers drawn from a
+Zipf distribution, so a few terms are very common and most are rare) and
+compares, at each corpus size:
+
+- legacy: GraphitiContextRetriever's former BM25, which built token lists and
+  document frequencies on every retriever construction and scored every
+  document with ``doc.count(term)`` for every query;
+- inverted: KeywordIndex, which accumulates scores over the NumPy postings of
+  the query terms only, is loaded from disk instead of rebuilt, and takes
+  re-indexed files in place.
+
+Usage:
+    python tests/benchmark_bm25.py [--chunks 10000 100000] [--queries 50]
+"""
+
+import argparse
+import math
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from mods.code.keyword_index import KeywordIndex, tokenize
+
+
+def make_corpus(chunks: int, vocabulary: int, chunk_tokens: int, chunks_per_file: int, seed: int = 42):
+    """Return {path: [chunk dicts]} with ``chunks`` chunks of about ``chunk_tokens`` identifiers."""
+    rng = np.random.default_rng(seed)
+    words = np.array([f"ident_{i}" for i in range(vocabulary)])
+    files = {}
+    for start in range(0, chunks, chunks_per_file):
+        file_chunks = []
+        for _ in range(min(chunks_per_file, chunks - start)):
+            length = max(1, int(rng.normal(chunk_tokens, chunk_tokens / 4)))
+            ids = np.minimum(rng.zipf(1.3, length), vocabulary) - 1
+            file_chunks.append({"text": " ".join(words[ids]), "start_line": 1, "end_line": 40})
+        files[f"/project/src/module_{start // chunks_per_file:06d}.py"] = file_chunks
+    return files
+
+
+def make_queries(queries: int, vocabulary: int, seed: int = 7):
+    """Queries of 2-5 identifiers, mixing common and rare terms."""
+    rng = np.random.default_rng(seed)
+    return [
+        " ".join(f"ident_{int(i)}" for i in rng.integers(0, min(vocabulary, 5000), rng.integers(2, 6)))
+        for _ in range(queries)
+    ]
+
+
+class LegacyBM25:
+    """The per-document BM25 loop GraphitiContextRetriever used before KeywordIndex."""
+
+    def __init__(self, files):
+        self.documents = []
+        self.doc_lengths = []
+        self.doc_frequencies = defaultdict(int)
+        for chunks in files.values():
+            for chunk in chunks:
+                if chunk["text"].strip():
+                    self.documents.append(tokenize(chunk["text"]))
+        for doc in self.documents:
+            self.doc_lengths.append(len(doc))
+            for term in set(doc):
+                self.doc_frequencies[term] += 1
+        self.avg_doc_length = sum(self.doc_lengths) / len(self.documents)
+
+    def search(self, query, top_k):
+        k1, b = 1.5, 0.75
+        total_docs = len(self.documents)
+        scores = []
+        for doc_idx, doc in enumerate(self.documents):
+            score = 0.0
+            doc_length = self.doc_lengths[doc_idx]
+            for term in tokenize(query):
+                if term in doc:
+                    tf = doc.count(term)
+                    df = self.doc_frequencies[term]
+                    idf = math.log((total_docs - df + 0.5) / (df + 0.5))
+                    score += idf * (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * doc_length / self.avg_doc_length))
+            scores.append((doc_idx, score))
+        scores.sort(key=lambda x: x[1], reverse=True)
+        return [item for item in scores[:top_k] if item[1] > 0]
+
+
+def latencies(search, queries, top_k):
+    """Per-query latencies in milliseconds."""
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, top_k)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run(chunks: int, args) -> None:
+    files = make_corpus(chunks, args.vocabulary, args.chunk_tokens, args.chunks_per_file)
+    queries = make_queries(args.queries, args.vocabulary)
+    print(f"\n{chunks} chunks in {len(files)} files, {args.queries} queries, top {args.top_k}")
+
+    start = time.perf_counter()
+    legacy = LegacyBM25(files)
+    legacy_build = time.perf_counter() - start
+    legacy_queries = queries[:args.legacy_queries]
+    legacy_times = latencies(legacy.search, legacy_queries, args.top_k)
+
+    start = time.perf_counter()
+    index = KeywordIndex()
+    index.update_files(files.items())
+    index.compact()
+    build = time.perf_counter() - start
+    times = latencies(index.search, queries, args.top_k)
+
+    # Same ranking as the legacy loop (ties aside)
+    for query in legacy_queries[:5]:
+        expected = [score for _, score in legacy.search(query, args.top_k)]
+        found = [score for _, _, score in index.search(query, args.top_k)]
+        if not np.allclose(expected, found, rtol=1e-4):
+            print(f"  Warning: scores differ for {query!r}")
+
+    directory = tempfile.mkdtemp(prefix="taskhero_bm25_")
+    try:
+        path = os.path.join(directory, "keywords.npz")
+        start = time.perf_counter()
+        index.save(path)
+        save = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+        start = time.perf_counter()
+        KeywordIndex.load(path)
+        load = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Re-index a handful of files in place, as watch mode does
+    changed = list(files.items())[:args.changed_files]
+    start = time.perf_counter()
+    index.update_files(changed)
+    update = time.perf_counter() - start
+
+    print(f"{'':<12}{'build (s)':>12}{'p50 (ms)':>12}{'p95 (ms)':>12}{'mean (ms)':>12}")
+    for name, build_time, samples in (("legacy", legacy_build, legacy_times), ("inverted", build, times)):
+        p95 = float(np.percentile(samples, 95))
+        print(f"{name:<12}{build_time:>12.2f}{statistics.median(samples):>12.2f}{p95:>12.2f}"
+              f"{statistics.mean(samples):>12.2f}")
+    print(f"Query speed-up (median): {statistics.median(legacy_times) / statistics.median(times):.0f}x; "
+          f"load {load:.2f}s instead of a {legacy_build:.2f}s rebuild; "
+          f"saved {size_mb:.1f} MB in {save:.2f}s; "
+          f"re-indexing {len(changed)} files took {update * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 keyword search")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--legacy-queries", type=int, default=10, help="Queries timed with the slow legacy loop")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--chunk-tokens", type=int, default=80)
+    parser.add_argument("--chunks-per-file", type=int, default=10)
+    parser.add_argument("--changed-files", type=int, default=5)
+    args = parser.parse_args()
+
+    for chunks in args.chunks:
+        run(chunks, args)
+
+
+if __name__ == "__main__":
+    main()
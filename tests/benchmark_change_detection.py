@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark for no-change rescans with stat-only change detection
+
+Creates a synthetic source tree, records every file in a FileIndexer metadata
+cache as if it had been indexed, and times get_outdated_files() on the
+unchanged tree with content hashing (INDEX_STAT_CHANGE_DETECTION=FALSE) and
+with the (size, mtime_ns, inode) short-circuit. Files are written once and
+then back-dated, so their stat signatures are trusted.
+
+The tree sits in the page cache, so the hashing numbers are a lower bound:
+on a cold cache every hashed byte is also a disk read.
+
+Usage:
+    python tests/benchmark_change_detection.py [--files 100000] [--file-size 4096]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import mods.code.indexer as indexer_module
+from mods.code.directory import DirectoryParser
+from mods.code.indexer import FileIndexer
+
+
+def make_tree(root: str, files: int, file_size: int, files_per_dir: int = 100) -> None:
+    """Write ``files`` Python files of about ``file_size`` bytes, back-dated by an hour."""
+    line = "value = compute(value)  # padding line for the benchmark tree\n"
+    body = line * max(1, file_size // len(line))
+    past = time.time() - 3600
+    for i in range(files):
+        directory = os.path.join(root, "src", f"pkg_{i // files_per_dir:05d}")
+        if i % files_per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"module_{i}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# module {i}\n{body}")
+        os.utime(path, (past, past))
+
+
+def record_index(indexer: FileIndexer) -> None:
+    """Fill the indexer's metadata cache from a full hashing scan, as a stored manifest would."""
+    parser = DirectoryParser(indexer.root_path, gitignore_path=indexer.gitignore_path)
+    for entry in parser.walk_files():
+        indexer.metadata_cache[entry.path] = {
+            "hash": entry.file_hash,
+            "modified_time": entry.modified_time,
+            "stat": indexer._trusted_stat_signature(entry),
+            "description_status": "complete",
+        }
+
+
+def timed_rescan(indexer: FileIndexer, stat_detection: bool, repeats: int) -> float:
+    """Return the best wall time of get_outdated_files() over ``repeats`` runs."""
+    indexer_module.INDEX_STAT_CHANGE_DETECTION = stat_detection
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        outdated = indexer.get_outdated_files(cleanup_deleted=False)
+        best = min(best, time.perf_counter() - start)
+        assert not outdated, f"{len(outdated)} files reported outdated on an unchanged tree"
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark no-change rescans with and without stat change detection")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--file-size", type=int, default=4096, help="Approximate size of each file in bytes")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated tree")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="taskhero_rescan_")
+    try:
+        print(f"Writing {args.files} files of ~{args.file_size} bytes to {root}...")
+        start = time.perf_counter()
+        make_tree(root, args.files, args.file_size)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        indexer = FileIndexer(root)
+        print("Recording the index (full hashing scan)...")
+        record_index(indexer)
+        print(f"  {len(indexer.metadata_cache)} files recorded")
+
+        hashed = timed_rescan(indexer, stat_detection=False, repeats=args.repeats)
+        stat_only = timed_rescan(indexer, stat_detection=True, repeats=args.repeats)
+
+        print()
+        print(f"{'mode':<28}{'rescan (s)':>12}{'files/s':>14}")
+        print(f"{'hash every file':<28}{hashed:>12.2f}{args.files / hashed:>14.0f}")
+        print(f"{'stat signature':<28}{stat_only:>12.2f}{args.files / stat_only:>14.0f}")
+        print(f"Speed-up: {hashed / stat_only:.1f}x")
+    finally:
+        if args.keep:
+            print(f"Tree kept at {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Benchmark for .gitignore matching during directory walks
+
+Creates a synthetic JavaScript/Python project with a large node_modules tree
+(also nested inside workspace packages), a large build/ output directory and a
+.gitignore of typical size, then compares:
+
+- legacy: every path tested against every GitIgnorePattern in turn, with
+  os.path.relpath() per pattern, as DirectoryParser did before the rules were
+  compiled;
+- compiled: GitIgnoreMatcher (literal-name dict, one alternation regex per
+  pattern class, literal-prefix trie for anchored patterns).
+
+Both walks prune ignored directories, so node_modules/ and build/ are never
+listed; the matching cost shows on the files that are kept, which every
+pattern has to reject.
+
+Usage:
+    python tests/benchmark_gitignore.py [--source-files 20000] [--packages 2000] [--build-files 20000]
+"""
+
+import argparse
+import fnmatch
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from mods.code.directory import DEFAULT_IGNORED_NAMES, DirectoryParser
+
+GITIGNORE = """
+# Dependencies
+node_modules/
+jspm_packages/
+bower_components/
+.pnp
+.pnp.js
+# Build output
+build/
+dist/
+out/
+/coverage
+*.tsbuildinfo
+.next/
+.nuxt/
+.cache/
+# Python
+__pycache__/
+*.py[cod]
+*$py.class
+*.so
+.Python
+develop-eggs/
+downloads/
+eggs/
+.eggs/
+lib64/
+parts/
+sdist/
+var/
+wheels/
+*.egg-info/
+.installed.cfg
+*.egg
+MANIFEST
+*.manifest
+*.spec
+pip-log.txt
+pip-delete-this-directory.txt
+htmlcov/
+.tox/
+.nox/
+.coverage.*
+nosetests.xml
+coverage.xml
+*.cover
+.hypothesis/
+.pytest_cache/
+*.mo
+*.pot
+.env
+.venv
+env/
+venv/
+ENV/
+.mypy_cache/
+.dmypy.json
+.pyre/
+# Logs and editors
+logs
+*.log
+npm-debug.log*
+yarn-debug.log*
+yarn-error.log*
+.idea/
+.vscode/*
+!.vscode/settings.json
+*.sublime-workspace
+.DS_Store
+Thumbs.db
+# Project specific
+/config/local.*
+docs/_build/
+src/**/generated/
+**/fixtures/*.snap
+!src/app/keep.generated.ts
+"""
+
+
+def write_file(path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("// benchmark\n")
+
+
+def make_tree(root: str, source_files: int, packages: int, build_files: int, files_per_dir: int = 50) -> None:
+    """Write the source tree, node_modules packages and build output."""
+    with open(os.path.join(root, ".gitignore"), "w", encoding="utf-8") as f:
+        f.write(GITIGNORE)
+    for i in range(source_files):
+        extension = ("ts", "py", "js", "md")[i % 4]
+        write_file(os.path.join(root, "src", f"module_{i // files_per_dir:04d}", f"file_{i}.{extension}"))
+    for i in range(packages):
+        package = os.path.join(root, "node_modules", f"pkg-{i}")
+        for name in ("package.json", "index.js", "README.md", os.path.join("lib", "util.js"), os.path.join("lib", "core.js")):
+            write_file(os.path.join(package, name))
+        if i % 50 == 0:
+            write_file(os.path.join(root, "packages", f"workspace-{i}", "node_modules", "dep", "index.js"))
+            write_file(os.path.join(root, "packages", f"workspace-{i}", "src", "index.ts"))
+    for i in range(build_files):
+        write_file(os.path.join(root, "build", f"chunk_{i // files_per_dir:04d}", f"bundle_{i}.js"))
+
+
+class LegacyDirectoryParser(DirectoryParser):
+    """DirectoryParser with the pattern-by-pattern matching it used before GitIgnoreMatcher."""
+
+    def _matches_ignore_rules(self, abs_path, is_dir, rules):
+        path_basename = os.path.basename(abs_path)
+        if path_basename in DEFAULT_IGNORED_NAMES:
+            return True
+        for pattern in self.extra_exclude_patterns:
+            if fnmatch.fnmatch(path_basename, pattern):
+                return True
+        ignored_status = False
+        for pattern_obj in self.gitignore_patterns:
+            if pattern_obj.matches(abs_path, is_dir):
+                ignored_status = not pattern_obj.is_negation
+        return ignored_status
+
+
+def timed_walk(parser_class, root: str, repeats: int):
+    """Return the best walk time over ``repeats`` runs and the last parser."""
+    best = float("inf")
+    parser = None
+    for _ in range(repeats):
+        parser = parser_class(root, gitignore_path=os.path.join(root, ".gitignore"), hash_files=False)
+        start = time.perf_counter()
+        for _entry in parser.walk_files():
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best, parser
+
+
+def timed_matching(parser: DirectoryParser, paths, repeats: int) -> float:
+    """Return the best time to classify ``paths`` with the parser's rules."""
+    rules = parser._rules_for_directory(parser.root_directory_path)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for path in paths:
+            parser._matches_ignore_rules(path, False, rules)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled .gitignore matching")
+    parser.add_argument("--source-files", type=int, default=20_000)
+    parser.add_argument("--packages", type=int, default=2_000, help="Packages in node_modules (5 files each)")
+    parser.add_argument("--build-files", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated tree")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="taskhero_gitignore_")
+    try:
+        print(f"Writing {args.source_files} source files, {args.packages} node_modules packages "
+              f"and {args.build_files} build files to {root}...")
+        start = time.perf_counter()
+        make_tree(root, args.source_files, args.packages, args.build_files)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        legacy_time, legacy = timed_walk(LegacyDirectoryParser, root, args.repeats)
+        compiled_time, compiled = timed_walk(DirectoryParser, root, args.repeats)
+        kept_paths = [entry.path for entry in compiled.walk_files()]
+        if legacy.file_count != compiled.file_count:
+            print(f"Warning: legacy kept {legacy.file_count} files, compiled kept {compiled.file_count}")
+
+        legacy_match = timed_matching(legacy, kept_paths, args.repeats)
+        compiled_match = timed_matching(compiled, kept_paths, args.repeats)
+
+        print()
+        print(f"{len(compiled.gitignore_patterns)} patterns; kept {compiled.file_count} files in "
+              f"{compiled.dir_count} directories; {compiled.ignored_count} paths ignored (pruned before listing)")
+        print(f"{'matcher':<12}{'walk (s)':>12}{'match kept paths (s)':>24}{'paths/s':>14}")
+        print(f"{'legacy':<12}{legacy_time:>12.2f}{legacy_match:>24.3f}{len(kept_paths) / legacy_match:>14.0f}")
+        print(f"{'compiled':<12}{compiled_time:>12.2f}{compiled_match:>24.3f}{len(kept_paths) / compiled_match:>14.0f}")
+        print(f"Speed-up: walk {legacy_time / compiled_time:.1f}x, matching {legacy_match / compiled_match:.1f}x")
+    finally:
+        if args.keep:
+            print(f"Tree kept at {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark for hybrid retrieval in GraphitiContextRetriever
+
+Indexes the Python sources of this repository (``mods/`` by default) into an
+index store, in chunks of a fixed number of lines, and runs a fixed set of
+queries, each labeled with the file that answers it, through:
+
+- legacy: semantic search with diversity selection, BM25, and the former
+  dictionary merge of the two (``_combine_hybrid_results``);
+- rrf / weighted: both rankings computed concurrently over shared chunk ids
+  and fused with NumPy (``_get_hybrid_results``).
+
+Reports latency (p50/p95) and quality: the mean reciprocal rank of the
+labeled file and how often it is in the top k.
+
+Query expansion in SemanticSearchEngine iterates over sets, so quality can
+shift slightly between runs; fix PYTHONHASHSEED to compare runs.
+
+Usage:
+    PYTHONHASHSEED=0 python tests/benchmark_hybrid_retrieval.py [--source mods] [--repeat 5] [--top-k 10]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from mods.code.hybrid_search import HybridSearchConfig
+from mods.code.index_store import IndexStore
+from mods.project_management.graphiti_retriever import GraphitiContextRetriever
+
+# Query -> file (relative to the project root) that answers it
+QUERIES = {
+    "reciprocal rank fusion of rankings": "mods/code/hybrid_search.py",
+    "BM25 inverted index postings": "mods/code/keyword_index.py",
+    "debounce file system watch events": "mods/code/watcher.py",
+    "quantize embeddings to int8": "mods/code/quantization.py",
+    "approximate nearest neighbour index": "mods/code/ann_index.py",
+    "git changed files since commit": "mods/code/git_changes.py",
+    "batch embedding requests": "mods/code/embedding_batcher.py",
+    "description generation queue": "mods/code/description_queue.py",
+    "segment manifest of the index store": "mods/code/index_store.py",
+    "reference counted retrieval service": "mods/code/retrieval_service.py",
+    "file snapshot time to live": "mods/code/file_snapshot.py",
+    "cosine similarity search over chunk embeddings": "mods/code/embed.py",
+    "kanban board columns": "mods/project_management/kanban_board.py",
+    "mermaid diagram generation": "mods/project_management/mermaid_generator.py",
+    "TF-IDF vocabulary document frequency": "mods/project_management/tfidf_index.py",
+    "template validation errors": "mods/project_management/template_validator.py",
+    "task quality score": "mods/project_management/quality_scorer.py",
+    "project planner milestones": "mods/project_management/project_planner.py",
+}
+
+
+def build_store(index_dir: str, source: Path, chunk_lines: int) -> int:
+    """Index every Python file under ``source`` in chunks of ``chunk_lines`` lines."""
+    store = IndexStore(index_dir)
+    chunks_total = 0
+    for i, path in enumerate(sorted(source.rglob("*.py"))):
+        if "__pycache__" in path.parts:
+            continue
+        lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+        chunks = [
+            {"text": "\n".join(lines[start:start + chunk_lines]), "type": "code_block",
+             "start_line": start + 1, "end_line": min(start + chunk_lines, len(lines))}
+            for start in range(0, len(lines), chunk_lines)
+        ]
+        if chunks:
+            store.put({"path": str(path.resolve()), "hash": str(i), "chunks": chunks,
+                       "modified_time": path.stat().st_mtime}, [[0.0, 1.0]] * len(chunks))
+            chunks_total += len(chunks)
+    return chunks_total
+
+
+def legacy_search(retriever: GraphitiContextRetriever, query: str, max_results: int):
+    semantic = retriever.semantic_search.search(query, max_results=max_results * 2).chunks
+    bm25 = retriever._get_bm25_results(query, max_results)
+    return retriever._combine_hybrid_results(semantic, bm25, query)
+
+
+def reciprocal_rank(results, expected: str, top_k: int) -> float:
+    for rank, chunk in enumerate(results[:top_k], 1):
+        if os.path.normcase(chunk.file_path) == os.path.normcase(expected):
+            return 1.0 / rank
+    return 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hybrid retrieval against the former merge")
+    parser.add_argument("--source", default="mods", help="Directory (relative to the project root) to index")
+    parser.add_argument("--chunk-lines", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs of every query")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rrf-k", type=float, default=60)
+    parser.add_argument("--sequential", action="store_true", help="Run the rankers one after another")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as project_dir:
+        start = time.perf_counter()
+        chunks = build_store(os.path.join(project_dir, ".index"), project_root / args.source, args.chunk_lines)
+        retriever = GraphitiContextRetriever(project_dir)
+        retriever.semantic_search.search("warm up")
+        retriever.semantic_search._tfidf_index.wait_for_maintenance()
+        print(f"{chunks} chunks from {args.source}/ indexed in {time.perf_counter() - start:.1f}s; "
+              f"{len(QUERIES)} labeled queries, top {args.top_k}")
+
+        base = retriever.get_hybrid_config()
+        methods = {"legacy": lambda query: legacy_search(retriever, query, args.top_k)}
+        for fusion in ("rrf", "weighted"):
+            config = HybridSearchConfig(fusion=fusion, rrf_k=args.rrf_k, weights=base.weights,
+                                        candidates=base.candidates, concurrent=not args.sequential)
+            methods[fusion] = lambda query, config=config: retriever._get_hybrid_results(query, args.top_k, None, config)
+
+        print(f"{'':<10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'MRR':>8}{'hit@1':>8}{'hit@' + str(args.top_k):>8}")
+        try:
+            for name, search in methods.items():
+                times, ranks = [], []
+                for query, expected in QUERIES.items():
+                    expected = str((project_root / expected).resolve())
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        results = search(query)
+                        times.append((time.perf_counter() - start) * 1000)
+                    ranks.append(reciprocal_rank(results, expected, args.top_k))
+                print(f"{name:<10}{statistics.median(times):>10.2f}{float(np.percentile(times, 95)):>10.2f}"
+                      f"{statistics.mean(ranks):>8.3f}{sum(rank == 1.0 for rank in ranks) / len(ranks):>8.2f}"
+                      f"{sum(rank > 0 for rank in ranks) / len(ranks):>8.2f}")
+        finally:
+            retriever.close()
+            retriever.semantic_search._tfidf_index.wait_for_maintenance()
+
+
+if __name__ == "__main__":
+    main()
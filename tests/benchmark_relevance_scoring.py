@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark for relevance scoring in SemanticSearchEngine.search
+
+Generates synthetic chunks spread over files of different types and random
+TF-IDF similarities, then times, at each corpus size, everything search does
+after the similarities are known:
+
+- loop: the former per-chunk pipeline, which called the exact match boost for
+  every chunk, the relevance boosts for every chunk above the threshold and
+  sorted all of them;
+- vectorized: ``_score_chunks`` over precomputed chunk features plus
+  ``_top_candidates``, which leaves only the few chunks diversity-aware
+  selection can pick for Python.
+
+Usage:
+    python tests/benchmark_relevance_scoring.py [--chunks 10000 100000] [--queries 20]
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from mods.project_management.semantic_search import ContextChunk, SemanticSearchEngine
+
+QUERIES = [
+    "setup windows install script", "parse module helper function", "document guide readme",
+    "task management template", "config settings loader", "build deploy pipeline",
+]
+FILE_NAMES = ["module_{}.py", "helper-{}.js", "guide_{}.md", "task_{}.md", "settings_{}.json", "setup_{}.sh"]
+CHUNK_TYPES = ["function_definition", "class_definition", "import_statement", "documentation_section"]
+
+
+def make_chunks(engine: SemanticSearchEngine, chunks: int, chunks_per_file: int, seed: int = 42):
+    """Return ``chunks`` ContextChunks in files of ``chunks_per_file`` chunks."""
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    result = []
+    for i in range(chunks):
+        file_id = i // chunks_per_file
+        name = FILE_NAMES[file_id % len(FILE_NAMES)].format(file_id)
+        result.append(ContextChunk(
+            text="x" * int(rng.integers(20, 2500)),
+            file_path=f"/project/src/pkg{file_id % 50}/{name}",
+            chunk_type=CHUNK_TYPES[int(rng.integers(len(CHUNK_TYPES)))],
+            start_line=i,
+            end_line=i + 20,
+            confidence=1.0,
+            file_name=name,
+            file_type=engine._determine_file_type(name),
+            last_modified=now - float(rng.random()) * 60 * 86400,
+        ))
+    return result
+
+
+def make_similarities(chunks: int, seed: int):
+    """Similarities shaped like TF-IDF output: most chunks share no term with the query."""
+    rng = np.random.default_rng(seed)
+    return rng.random(chunks) * (rng.random(chunks) < 0.2)
+
+
+def loop_search(engine, chunks, similarities, query, max_results):
+    query_lower = query.lower()
+    query_intent = engine._classify_query_intent(query_lower)
+    exact_match_boosts = [engine._calculate_exact_match_boost(chunk, query_lower, query_intent) for chunk in chunks]
+    valid = similarities + np.array(exact_match_boosts) >= engine.similarity_threshold
+    valid_chunks = [chunk for chunk, is_valid in zip(chunks, valid) if is_valid]
+    valid_chunks = engine._calculate_relevance_scores(valid_chunks, similarities[valid], query)
+    valid_chunks.sort(key=lambda x: x.relevance_score, reverse=True)
+    return engine._select_diverse_chunks(valid_chunks, max_results, query)
+
+
+def vectorized_search(engine, chunks, features, similarities, query, max_results):
+    exact_match_boosts, relevance = engine._score_chunks(features, similarities, query)
+    valid = similarities + exact_match_boosts >= engine.similarity_threshold
+    candidates = []
+    for index in engine._top_candidates(relevance, valid, features.categories, max_results):
+        chunks[index].relevance_score = relevance[index]
+        candidates.append(chunks[index])
+    return engine._select_diverse_chunks(candidates, max_results, query)
+
+
+def run(count: int, engine: SemanticSearchEngine, args) -> None:
+    chunks = make_chunks(engine, count, args.chunks_per_file)
+    start = time.perf_counter()
+    features = engine._build_chunk_features(chunks)
+    build = time.perf_counter() - start
+    print(f"\n{count} chunks in {count // args.chunks_per_file} files, {args.queries} queries, top {args.max_results}")
+
+    loop_times, vectorized_times = [], []
+    for i in range(args.queries):
+        query = QUERIES[i % len(QUERIES)]
+        similarities = make_similarities(count, seed=i)
+
+        start = time.perf_counter()
+        vectorized = vectorized_search(engine, chunks, features, similarities, query, args.max_results)
+        vectorized_times.append((time.perf_counter() - start) * 1000)
+
+        if i < args.loop_queries:
+            start = time.perf_counter()
+            expected = loop_search(engine, chunks, similarities, query, args.max_results)
+            loop_times.append((time.perf_counter() - start) * 1000)
+            if [chunk.start_line for chunk in expected] != [chunk.start_line for chunk in vectorized]:
+                print(f"  Warning: results differ for {query!r}")
+
+    print(f"{'':<12}{'p50 (ms)':>12}{'p95 (ms)':>12}{'mean (ms)':>12}")
+    for name, samples in (("loop", loop_times), ("vectorized", vectorized_times)):
+        print(f"{name:<12}{statistics.median(samples):>12.2f}{float(np.percentile(samples, 95)):>12.2f}"
+              f"{statistics.mean(samples):>12.2f}")
+    print(f"Speed-up (median): {statistics.median(loop_times) / statistics.median(vectorized_times):.0f}x; "
+          f"features built once per index change in {build:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark relevance scoring in SemanticSearchEngine")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--loop-queries", type=int, default=3, help="Queries timed with the slow per-chunk loop")
+    parser.add_argument("--max-results", type=int, default=10)
+    parser.add_argument("--chunks-per-file", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as project_dir:
+        engine = SemanticSearchEngine(project_dir)
+        for count in args.chunks:
+            run(count, engine, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark for SimilaritySearch.search
+
+Compares the previous per-file search loop against the single-matmul
+top-k search on a synthetic, row-stacked embedding matrix.
+
+Usage:
+    python tests/benchmark_similarity_search.py [--chunks 500000] [--dims 384]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from mods.code import embed
+
+
+def per_file_search(search: embed.SimilaritySearch, normalized_query: np.ndarray,
+                    top_k: int, threshold: float) -> List[Dict[str, Any]]:
+    """The previous search loop: one matmul and argsort per file."""
+    all_results = []
+    for file_name, file_embeddings in search.normalized_embeddings.items():
+        similarities = file_embeddings @ normalized_query
+        mask = similarities >= threshold
+        if not np.any(mask):
+            continue
+        indices = np.where(mask)[0]
+        top_indices = indices[np.argsort(similarities[indices])[-min(top_k, len(indices)):][::-1]]
+        for idx in top_indices:
+            all_results.append({
+                "file": file_name,
+                "chunk": search.chunks[file_name][idx],
+                "score": float(similarities[idx]),
+            })
+    all_results.sort(key=lambda x: x["score"], reverse=True)
+    return all_results[:top_k]
+
+
+def build_search(num_chunks: int, dims: int, chunks_per_file: int) -> embed.SimilaritySearch:
+    """Create a SimilaritySearch over a synthetic embedding matrix."""
+    search = embed.SimilaritySearch(embeddings_dir=str(project_root / "logs" / "benchmark-missing"))
+    rng = np.random.default_rng(0)
+    num_files = max(1, num_chunks // chunks_per_file)
+    for file_idx in range(num_files):
+        vectors = rng.standard_normal((chunks_per_file, dims), dtype=np.float32)
+        file_key = f"src/module_{file_idx}.py"
+        search._add_legacy_embeddings(file_key, vectors)
+        search.chunks[file_key] = [
+            {"text": f"chunk {i}", "start_line": i, "end_line": i + 1, "type": "function"}
+            for i in range(chunks_per_file)
+        ]
+    search._stack_legacy_embeddings()
+    return search
+
+
+def time_it(func, repeats: int) -> float:
+    """Return the best wall time of several runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SimilaritySearch.search")
+    parser.add_argument("--chunks", type=int, default=500_000)
+    parser.add_argument("--dims", type=int, default=384)
+    parser.add_argument("--chunks-per-file", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.05)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Building {args.chunks} x {args.dims} matrix...")
+    search = build_search(args.chunks, args.dims, args.chunks_per_file)
+    query = np.random.default_rng(1).standard_normal(args.dims).astype(np.float32)
+    normalized_query = query / np.linalg.norm(query)
+    embed.generate_embed = lambda text: [query.tolist()]
+
+    def run_new():
+        search.query_cache.clear()
+        return search.search("benchmark", args.top_k, args.threshold)
+
+    old_results = per_file_search(search, normalized_query, args.top_k, args.threshold)
+    new_results = run_new()
+    same = [(r["file"], r["chunk"]["start_line"]) for r in old_results] == \
+           [(r["file"], r["chunk"]["start_line"]) for r in new_results]
+
+    old_ms = time_it(lambda: per_file_search(search, normalized_query, args.top_k, args.threshold), args.repeats)
+    new_ms = time_it(run_new, args.repeats)
+
+    print(f"Files: {len(search.file_keys)}  Chunks: {search.matrix.shape[0]}  Dims: {args.dims}")
+    print(f"Per-file loop:      {old_ms:9.1f} ms")
+    print(f"Single matmul:      {new_ms:9.1f} ms")
+    print(f"Speedup:            {old_ms / max(new_ms, 1e-9):9.1f}x")
+    print(f"Identical top-{args.top_k}:  {same}")
+
+
+if __name__ == "__main__":
+    main()